@@ -1,39 +1,62 @@
+import time
+
 import numpy as np
 import tensorflow as tf
 from matplotlib import pyplot as plt
 
-x = np.random.normal(0.0, 0.55, (10000, 1))
-y = x * 0.1 + 0.3 + np.random.normal(0.0, 0.03, (10000,1))
-                     
+x = np.random.normal(0.0, 0.55, (10000, 1)).astype(np.float32)
+y = (x * 0.1 + 0.3 + np.random.normal(0.0, 0.03, (10000,1))).astype(np.float32)
+
 plt.plot(x, y, 'r.')
 plt.show()
 
-X = tf.placeholder(tf.float32, shape=[None, 1])
-W = tf.Variable(tf.random_normal([1]))
+# Input pipeline : the whole set is one batch (as the feed_dict of every epoch), kept as a tensor by cache()
+train_ds = tf.data.Dataset.from_tensor_slices((x, y)).batch(len(x)).cache()
+
+W = tf.Variable(tf.random.normal([1]))
 b = tf.Variable(tf.zeros([1]))
+learning_rate = 0.05
+
+def hypothesis(X):
+    return X*W+b
 
-h = X*W+b
+@tf.function(input_signature=[tf.TensorSpec([None, 1], tf.float32), tf.TensorSpec([None, 1], tf.float32)])
+def train_step(X, Y):
+    # Gradient descent on the variables, as tf.train.GradientDescentOptimizer
+    with tf.GradientTape() as tape:
+        Loss = tf.reduce_mean(tf.square(hypothesis(X) - Y))
+    dW, db = tape.gradient(Loss, [W, b])
+    W.assign_sub(learning_rate * dW)
+    b.assign_sub(learning_rate * db)
+    return Loss
 
-Y = tf.placeholder(tf.float32, shape = [None, 1])
-Loss = tf.reduce_mean(tf.square(h - Y))
-optimizer = tf.train.GradientDescentOptimizer(0.05).minimize(Loss)
+@tf.function
+def train_epoch(dataset):
+    Loss = tf.constant(0.)
+    for X, Y in dataset:
+        Loss = train_step(X, Y)
+    return Loss
 
-sess = tf.Session()
-sess.run(tf.global_variables_initializer())
+# Feed overhead : the same step fed with the NumPy arrays from Python, as sess.run(feed_dict=...) did
+train_step(x, y)
+start = time.perf_counter()
+for _ in range(10):
+    train_step(x, y)
+feed_time = (time.perf_counter() - start) / 10
+W.assign(tf.random.normal([1]))
+b.assign(tf.zeros([1]))
 
 # Training loop
+train_epoch(train_ds.take(0))
 for epoch in range(500):
-    _, t_loss = sess.run([optimizer, Loss], feed_dict={X:x, Y:y})
-    
-    print("Epoch : ", epoch, " Loss : ", t_loss)
-    
-    if epoch ==0 :
-        y_pred = sess.run(h, feed_dict={X:x})
+    start = time.perf_counter()
+    t_loss = train_epoch(train_ds)
+    step_time = time.perf_counter() - start
+
+    print("Epoch : ", epoch, " Loss : ", t_loss.numpy(), f" ({1000*step_time:.3f} ms/step, NumPy feed {1000*feed_time:.3f} ms/step)")
+
+    if epoch ==0 or (epoch+1) % 100 == 0 :
+        y_pred = hypothesis(x)
         plt.plot(x, y, 'r.')
         plt.plot(x, y_pred, 'b.')
         plt.show()
-    elif (epoch+1) % 100 == 0 :
-        y_pred = sess.run(h, feed_dict={X:x})
-        plt.plot(x, y, 'r.')
-        plt.plot(x, y_pred, 'b.')
-        plt.show()
\ No newline at end of file
@@ -1,13 +1,18 @@
 # %% 
 import numpy as np
+import sys
+sys.path.append("../..") # utils/tf_steps.py is shared by the tf_subclassing scripts
 import tensorflow as tf
 from tensorflow.keras import models, layers, losses, optimizers
+from utils.tf_steps import Compiled_Steps
 # from matplotlib import pyplot as plt
 tf.random.set_seed(777)
 print("Package Loaded!")
 # %%
 EPOCHS = 500
 BATCH_SIZE = 128
+STEPS_PER_EXECUTION = 50 # train steps per graph call
+JIT_COMPILE = False # XLA
 
 x = np.random.normal(0.0, 0.55, (10000, 1))
 y = x * 0.1 + 0.3 + np.random.normal(0.0, 0.03, (10000,1))
@@ -36,12 +41,8 @@ loss_object = losses.MeanSquaredError()
 optimizer = optimizers.Adam()
 
 # %%
+steps = Compiled_Steps(model, loss_object, optimizer, train_ds.element_spec, None, STEPS_PER_EXECUTION, JIT_COMPILE)
+
 for epoch in range(EPOCHS):
-    for batch_x, batch_y in train_ds:
-        with tf.GradientTape() as tape:
-            predictions = model(batch_x, training=True)
-            loss = loss_object(batch_y, predictions)
-            gradients = tape.gradient(loss, model.trainable_variables)
-            optimizer.apply_gradients(zip(gradients, model.trainable_variables))
-
-    print("{:5}|{:10.6f}".format(epoch+1, loss))
\ No newline at end of file
+    logs = steps.fit_epoch(train_ds)
+    print(f"{epoch+1:5} | " + " | ".join(f"{k} {v:10.6f}" for k, v in logs.items()))
@@ -1,63 +1,101 @@
 import os
+import time
 # For Mac User...
 os.environ['KMP_DUPLICATE_LIB_OK']='True'
 
 import numpy as np
 import tensorflow as tf
-from matplotlib import pyplot as plt
 from tensorflow.keras import utils, datasets
 
 print("Packge Loaded!")
 
 # Data Loading
 (train_x, train_y), (test_x, test_y) = datasets.mnist.load_data()
-train_x, test_x = np.reshape(train_x/255., [-1, 784]), np.reshape(test_x/255., [-1, 784])
+train_x, test_x = np.reshape(train_x/255., [-1, 784]).astype(np.float32), np.reshape(test_x/255., [-1, 784]).astype(np.float32)
 train_y, test_y = utils.to_categorical(train_y, 10), utils.to_categorical(test_y, 10)
 
 print("Train Data's Shape : ", train_x.shape, train_y.shape)
 print("Test Data's Shape : ", test_x.shape, test_y.shape)
 
+epochs = 500
+batch_size = 100
+val_batch_size = 1000
+
+# Input pipeline : the arrays become tensors once, batches are sliced and prefetched by tf.data instead of copied from NumPy every step
+train_ds = tf.data.Dataset.from_tensor_slices((train_x, train_y)).shuffle(10000).batch(batch_size).prefetch(tf.data.AUTOTUNE)
+test_ds = tf.data.Dataset.from_tensor_slices((test_x, test_y)).batch(val_batch_size).prefetch(tf.data.AUTOTUNE)
+
 # Set Network
 hidden_node = 256
 num_classes = 10
-
-X = tf.placeholder(tf.float32, shape=[None, 784])
+learning_rate = 0.05
 
 W1 = tf.Variable(tf.random.normal([784, hidden_node]))
 b1 = tf.Variable(tf.zeros([hidden_node]))
 
 W2 = tf.Variable(tf.random.normal([hidden_node, num_classes]))
 b2 = tf.Variable(tf.zeros([num_classes]))
+params = [W1, b1, W2, b2]
 
-first_hidden = tf.nn.relu(tf.matmul(X, W1)+b1)
-output = tf.matmul(first_hidden, W2)+b2
+def network(X):
+    first_hidden = tf.nn.relu(tf.matmul(X, W1)+b1)
+    return tf.matmul(first_hidden, W2)+b2
 
-Y = tf.placeholder(tf.float32, shape = [None, 10])
-Loss = tf.reduce_mean(tf.nn.softmax_cross_entropy_with_logits_v2(logits=output, labels=Y))
-Optimizer = tf.train.GradientDescentOptimizer(0.05).minimize(Loss)
-Corr = tf.equal(tf.argmax(output,1), tf.argmax(Y,1)) 
-Acc = tf.reduce_mean(tf.cast(Corr, tf.float32)) 
+def loss_and_correct(output, Y):
+    Loss = tf.reduce_mean(tf.nn.softmax_cross_entropy_with_logits(logits=output, labels=Y))
+    Corr = tf.equal(tf.argmax(output,1), tf.argmax(Y,1))
+    return Loss, tf.reduce_sum(tf.cast(Corr, tf.float32))
 
-sess = tf.Session()
-sess.run(tf.global_variables_initializer())
+signature = [tf.TensorSpec([None, 784], tf.float32), tf.TensorSpec([None, num_classes], tf.float32)]
 
+@tf.function(input_signature=signature)
+def train_step(X, Y):
+    # Gradient descent on the variables, as tf.train.GradientDescentOptimizer
+    with tf.GradientTape() as tape:
+        output = network(X)
+        Loss, correct = loss_and_correct(output, Y)
+    grads = tape.gradient(Loss, params)
+    for p, g in zip(params, grads):
+        p.assign_sub(learning_rate * g)
+    return Loss, correct
+
+@tf.function
+def run_epoch(dataset, training):
+    # Whole epoch in one graph, the batches go from the iterator to the step without coming back to Python
+    total_loss, total_correct, total = tf.constant(0.), tf.constant(0.), tf.constant(0.)
+    for X, Y in dataset:
+        if training:
+            Loss, correct = train_step(X, Y)
+        else:
+            Loss, correct = loss_and_correct(network(X), Y)
+        n = tf.cast(tf.shape(X)[0], tf.float32)
+        total_loss += Loss * n
+        total_correct += correct
+        total += n
+    return total_loss / total, total_correct / total
 
 # Training loop
 print("Start Training !")
-epochs = 500
-batch_size = 100
-steps = np.ceil(len(train_x)/batch_size)
+steps = int(np.ceil(len(train_x)/batch_size))
+
+# Feed overhead : one epoch of the same step fed with NumPy slices from Python, as the feed_dict loop did
+train_step(train_x[:batch_size], train_y[:batch_size])
+start = time.perf_counter()
+for step in range(0, len(train_x), batch_size):
+    train_step(train_x[step:step+batch_size], train_y[step:step+batch_size])
+feed_time = (time.perf_counter() - start) / steps
+print(f"NumPy feed : {1000*feed_time:.3f} ms/step")
+
+# Trace once, so the step time does not count it
+run_epoch(train_ds.take(1), True)
+run_epoch(test_ds.take(1), False)
 for epoch in range(epochs):
-    epoch_loss = 0
-    epoch_acc = 0
-    for step in range(0, len(train_x), batch_size):
-        _, step_loss, step_acc = sess.run([Optimizer, Loss, Acc], 
-                                          feed_dict={X:train_x[step:step+batch_size], Y:train_y[step:step+batch_size]})
-        epoch_loss += step_loss
-        epoch_acc += step_acc
-    val_idx = np.random.choice(len(test_x), batch_size, replace=False)
-    val_loss, val_acc = sess.run([Loss, Acc], feed_dict={X:test_x, Y:test_y})
+    start = time.perf_counter()
+    train_loss, train_acc = run_epoch(train_ds, True)
+    step_time = (time.perf_counter() - start) / steps
+    val_loss, val_acc = run_epoch(test_ds, False)
 
     print("\nEpoch : ", epoch)
-    print("Train Loss : ", epoch_loss/steps, " Train Accuracy : ", epoch_acc/steps)
-    print("Validation Loss : ", val_loss, "Validation Accuracy : ", val_acc)
\ No newline at end of file
+    print("Train Loss : ", train_loss.numpy(), " Train Accuracy : ", train_acc.numpy(),
+          f" ({1000*step_time:.3f} ms/step, NumPy feed {1000*feed_time:.3f} ms/step)")
+    print("Validation Loss : ", val_loss.numpy(), "Validation Accuracy : ", val_acc.numpy())
@@ -3,8 +3,11 @@ import os
 os.environ['KMP_DUPLICATE_LIB_OK']='True'
 import numpy as np
 
+import sys
+sys.path.append("../..") # utils/tf_steps.py is shared by the tf_subclassing scripts
 import tensorflow as tf
-from tensorflow.keras import models, layers, optimizers, losses, utils, datasets
+from tensorflow.keras import models, layers, optimizers, losses, metrics, utils, datasets
+from utils.tf_steps import Compiled_Steps
 
 tf.random.set_seed(777)
 
@@ -12,6 +15,8 @@ print("Packge Loaded!")
 # %%
 EPOCHS = 500
 BATCH_SIZE = 128
+STEPS_PER_EXECUTION = 50 # train steps per graph call
+JIT_COMPILE = False # XLA
 
 # Data Loading
 (train_x, train_y), (test_x, test_y) = datasets.mnist.load_data()
@@ -48,15 +53,13 @@ model = MultiLayerNeuralNetwork()
 
 loss_object = losses.SparseCategoricalCrossentropy()
 
+metric = metrics.SparseCategoricalAccuracy(name='acc')
 optimizer = optimizers.Adam()
 
 # %%
+steps = Compiled_Steps(model, loss_object, optimizer, train_ds.element_spec, metric, STEPS_PER_EXECUTION, JIT_COMPILE)
+
 for epoch in range(EPOCHS):
-    for batch_x, batch_y in train_ds:
-        with tf.GradientTape() as tape:
-            predictions = model(batch_x, training=True)
-            loss = loss_object(batch_y, predictions)
-            gradients = tape.gradient(loss, model.trainable_variables)
-            optimizer.apply_gradients(zip(gradients, model.trainable_variables))
-
-    print("{:5}|{:10.6f}".format(epoch+1, loss))
\ No newline at end of file
+    logs = steps.fit_epoch(train_ds)
+    logs.update(steps.evaluate(test_ds))
+    print(f"{epoch+1:5} | " + " | ".join(f"{k} {v:10.6f}" for k, v in logs.items()))
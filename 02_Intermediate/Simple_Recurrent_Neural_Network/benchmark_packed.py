@@ -0,0 +1,97 @@
+# %%
+import time
+import argparse
+
+import numpy as np
+
+import torch
+from torch import nn, optim
+from torch.utils.data import DataLoader
+
+from packed import Sequence_Dataset, Bucket_Batch_Sampler, pad_collate, Packed_Model, rnn_dict
+
+# Training throughput of the padded baseline (random batches, the RNN runs on every padded step)
+# against bucketed + packed batches, for more and more skewed length distributions.
+
+def synthetic_dataset(num_sequences, max_len, skew, input_size, num_classes, seed=0):
+    """
+    Lengths are max_len * u ** skew with u ~ U(0, 1] : skew 0 gives max_len only, skew 1 uniform lengths,
+    larger skews mostly short sequences with a few long ones.
+    """
+    rng = np.random.default_rng(seed)
+    lengths = np.maximum(1, (max_len * (1 - rng.random(num_sequences)) ** skew).astype(np.int64))
+    data = torch.from_numpy(rng.standard_normal((lengths.sum(), input_size), dtype=np.float32))
+    labels = rng.integers(0, num_classes, num_sequences)
+    return Sequence_Dataset(data, lengths, labels)
+
+def last_step(out, lengths):
+    # (B, T, H) outputs of a padded forward -> (B, H) output at the last real step of each sequence
+    idx = (lengths - 1).to(out.device).view(-1, 1, 1).expand(-1, 1, out.size(2))
+    return out.gather(1, idx).squeeze(1)
+
+def train_steps(model, loader, packed, device, max_steps):
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(model.parameters(), lr=0.001)
+    model.train()
+
+    num_sequences, real_steps, computed_steps = 0, 0, 0
+    sync = torch.cuda.synchronize if device.type == "cuda" else (lambda: None)
+    start = None
+    for i, (X, lengths, Y) in enumerate(loader):
+        if i == 1:
+            # The first step (allocations, cuDNN setup) is not timed
+            sync()
+            start = time.perf_counter()
+        if i > max_steps:
+            break
+        X, Y = X.to(device, non_blocking=True), Y.to(device, non_blocking=True)
+
+        optimizer.zero_grad()
+        if packed:
+            y_pred = model(X, lengths)
+        else:
+            out, _ = model.rnn(X, model.initial_state(X.size(0)))
+            y_pred = model.fc(last_step(out, lengths))
+        loss = criterion(y_pred, Y)
+        loss.backward()
+        optimizer.step()
+
+        if i >= 1:
+            num_sequences += len(lengths)
+            real_steps += lengths.sum().item()
+            computed_steps += lengths.sum().item() if packed else X.size(0) * X.size(1)
+    sync()
+    elapsed = time.perf_counter() - start
+    return num_sequences / elapsed, real_steps / max(computed_steps, 1)
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--RNN", default="lstm", type=str, help=f"{list(rnn_dict.keys())}")
+    parser.add_argument("--SKEWS", default=[0., 1., 2., 4.], nargs="+", type=float, help="length skews to compare")
+    parser.add_argument("--NUM_SEQUENCES", default=20000, type=int, help="")
+    parser.add_argument("--MAX_LEN", default=256, type=int, help="")
+    parser.add_argument("--INPUT_SIZE", default=28, type=int, help="")
+    parser.add_argument("--HIDDEN_SIZE", default=128, type=int, help="")
+    parser.add_argument("--NUM_LAYERS", default=2, type=int, help="")
+    parser.add_argument("--BATCH_SIZE", default=256, type=int, help="")
+    parser.add_argument("--STEPS", default=30, type=int, help="timed training steps per run")
+    args = parser.parse_args()
+
+    assert args.RNN in rnn_dict, f"Please use rnn in {list(rnn_dict.keys())}"
+    device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
+
+    print(f"\n{args.RNN.upper()} x {args.NUM_LAYERS}, hidden {args.HIDDEN_SIZE}, batch {args.BATCH_SIZE}, max length {args.MAX_LEN} ({device})\n")
+    print(f"{'skew':>6}{'padded seq/s':>16}{'packed seq/s':>16}{'speedup':>10}{'padded useful':>16}")
+    for skew in args.SKEWS:
+        dataset = synthetic_dataset(args.NUM_SEQUENCES, args.MAX_LEN, skew, args.INPUT_SIZE, 10)
+        padded_loader = DataLoader(dataset, batch_size=args.BATCH_SIZE, shuffle=True, collate_fn=pad_collate, drop_last=True)
+        sampler = Bucket_Batch_Sampler(dataset.lengths, args.BATCH_SIZE, drop_last=True)
+        packed_loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=pad_collate)
+
+        results = []
+        for packed, loader in [(False, padded_loader), (True, packed_loader)]:
+            torch.manual_seed(0)
+            model = Packed_Model(args.INPUT_SIZE, args.HIDDEN_SIZE, args.NUM_LAYERS, 10, args.RNN).to(device)
+            results.append(train_steps(model, loader, packed, device, args.STEPS))
+        (padded, useful), (packed, _) = results
+        print(f"{skew:>6.1f}{padded:>16.1f}{packed:>16.1f}{packed / padded:>9.2f}x{100 * useful:>15.1f}%")
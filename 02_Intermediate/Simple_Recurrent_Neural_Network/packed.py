@@ -0,0 +1,113 @@
+import numpy as np
+
+import torch
+from torch import nn
+from torch.nn.utils.rnn import pad_sequence, pack_padded_sequence
+from torch.utils.data import Dataset, Sampler
+
+# Variable-length sequences for the RNN of PyTorch.py :
+# the batches are bucketed by length and packed, so the RNN never runs on padding.
+
+rnn_dict = {"rnn": nn.RNN, "lstm": nn.LSTM, "gru": nn.GRU}
+
+class Sequence_Dataset(Dataset):
+    """
+    Sequences of different lengths stored back to back in one (sum of lengths, input_size) tensor.
+    Item : ((length, input_size) sequence, label)
+    """
+    def __init__(self, data, lengths, labels):
+        self.data = data
+        self.lengths = torch.as_tensor(lengths, dtype=torch.long)
+        self.offsets = torch.cumsum(self.lengths, 0) - self.lengths
+        self.labels = torch.as_tensor(labels, dtype=torch.long)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, idx):
+        offset, length = self.offsets[idx], self.lengths[idx]
+        return self.data[offset:offset+length], self.labels[idx]
+
+class Bucket_Batch_Sampler(Sampler):
+    """
+    Batches of indices with similar lengths.
+    Every epoch, the shuffled indices are split into buckets of `batch_size * bucket_size` sequences,
+    each bucket is sorted by length and cut into batches, and the batch order is shuffled,
+    so a batch has little padding but the batches still come in a random order.
+    """
+    def __init__(self, lengths, batch_size, bucket_size=50, shuffle=True, drop_last=False, seed=None):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.bucket_size = bucket_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.rng = np.random.default_rng(seed)
+
+    def __iter__(self):
+        idx = self.rng.permutation(len(self.lengths)) if self.shuffle else np.arange(len(self.lengths))
+        chunk = self.batch_size * self.bucket_size
+        batches = []
+        for start in range(0, len(idx), chunk):
+            bucket = idx[start:start+chunk]
+            bucket = bucket[np.argsort(-self.lengths[bucket], kind="stable")]
+            batches += [bucket[i:i+self.batch_size] for i in range(0, len(bucket), self.batch_size)]
+        if self.drop_last:
+            batches = [b for b in batches if len(b) == self.batch_size]
+        if self.shuffle:
+            batches = [batches[i] for i in self.rng.permutation(len(batches))]
+        return iter([b.tolist() for b in batches])
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return sum(-(-min(self.batch_size * self.bucket_size, len(self.lengths) - s) // self.batch_size)
+                   for s in range(0, len(self.lengths), self.batch_size * self.bucket_size))
+
+def pad_collate(batch):
+    """
+    [(sequence, label)] -> (B, T, input_size) padded sequences, (B,) lengths, (B,) labels
+    sorted by decreasing length, so they can be packed without reordering (enforce_sorted=True).
+    """
+    batch = sorted(batch, key=lambda item: len(item[0]), reverse=True)
+    sequences, labels = zip(*batch)
+    lengths = torch.tensor([len(s) for s in sequences], dtype=torch.long)
+    return pad_sequence(sequences, batch_first=True), lengths, torch.stack(labels)
+
+class Packed_Model(nn.Module):
+    """
+    Same classifier as Model of PyTorch.py (RNN -> Linear on the last step), for padded variable-length batches.
+
+    - `rnn_type` : "rnn", "lstm" or "gru"
+    - With `lengths`, the batch is packed, so every sequence stops at its own last step and
+      the final hidden state is the state of that step.
+    - The zero initial state is a buffer, allocated again only when the batch size changes.
+    """
+    def __init__(self, input_size, hidden_size, num_layers, num_classes, rnn_type="rnn"):
+        super(Packed_Model, self).__init__()
+        self.hidden_size = hidden_size
+        self.num_layers = num_layers
+        self.rnn_type = rnn_type
+        self.rnn = rnn_dict[rnn_type](input_size, hidden_size, num_layers, batch_first=True)
+        self.fc = nn.Linear(hidden_size, num_classes)
+        self.register_buffer("h0", torch.zeros(num_layers, 0, hidden_size), persistent=False)
+
+    def initial_state(self, batch_size):
+        if self.h0.size(1) != batch_size:
+            self.h0 = self.h0.new_zeros(self.num_layers, batch_size, self.hidden_size)
+        if self.rnn_type == "lstm":
+            return (self.h0, self.h0)
+        return self.h0
+
+    def forward(self, x, lengths=None, enforce_sorted=True):
+        h0 = self.initial_state(x.size(0))
+        if lengths is None:
+            out, hidden = self.rnn(x, h0)
+            return self.fc(out[:, -1, :])
+
+        # lengths has to be on the CPU
+        packed = pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=enforce_sorted)
+        _, hidden = self.rnn(packed, h0)
+        if self.rnn_type == "lstm":
+            hidden = hidden[0]
+        # hidden is in the order of the batch, also when pack_padded_sequence sorted it
+        return self.fc(hidden[-1])
@@ -0,0 +1,269 @@
+# %%
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+
+import torch
+from torch import nn, optim
+
+# Truncated BPTT on sequences too long for the memory, streamed from memory-mapped files.
+#
+# A stream is stored as {path}_data.npy (N, input_size) float32, {path}_targets.npy (N,) int64 (one class per step)
+# and {path}_index.npy (S, 2) of (offset, length) of each sequence, the sequences being back to back.
+
+# Same network as Model of PyTorch.py
+class Model(nn.Module):
+
+    def __init__(self, input_size, hidden_size, num_layers, num_classes):
+        super(Model, self).__init__()
+        self.hidden_size = hidden_size
+        self.num_layers = num_layers
+        self.rnn = nn.RNN(input_size, hidden_size, num_layers, batch_first=True)
+        self.fc = nn.Linear(hidden_size, num_classes)
+
+    def forward(self, x):
+        h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size, device=x.device)
+
+        out, hidden = self.rnn(x, h0)
+
+        out = self.fc(out[:, -1, :])
+        return out
+
+class Stream_Model(Model):
+    # Prediction at every step, the hidden state is given and returned so it can be carried over chunks
+    def forward(self, x, h):
+        out, h = self.rnn(x, h)
+        return self.fc(out), h
+
+def write_stream(path, sequences, targets):
+    # [(T_i, input_size)], [(T_i,)] -> memory-mappable stream files
+    lengths = np.array([len(s) for s in sequences], dtype=np.int64)
+    index = np.stack([np.cumsum(lengths) - lengths, lengths], axis=1)
+    data = np.lib.format.open_memmap(path + "_data.npy", mode="w+", dtype=np.float32, shape=(lengths.sum(), sequences[0].shape[1]))
+    labels = np.lib.format.open_memmap(path + "_targets.npy", mode="w+", dtype=np.int64, shape=(lengths.sum(),))
+    for (offset, length), s, t in zip(index, sequences, targets):
+        data[offset:offset+length] = s
+        labels[offset:offset+length] = t
+    data.flush()
+    labels.flush()
+    np.save(path + "_index.npy", index)
+
+class Lane_Stream:
+    """
+    Chunks of `chunk` steps of `num_lanes` independent lanes.
+
+    Each lane reads one sequence at a time and takes the next one from a shared queue when it ends,
+    so the batch stays full until the queue is empty. A sequence ending in the middle of a chunk leaves padding
+    (valid = False) until the end of the chunk, the next sequence of the lane starts with the next chunk.
+    Only the rows of one chunk are read from the memory-mapped files, one chunk ahead on a background thread.
+
+    Chunk : x (B, chunk, input_size), y (B, chunk), valid (B, chunk), start (B,) = the lane starts a new sequence
+    """
+    def __init__(self, path, num_lanes, chunk, shuffle=True, seed=None):
+        self.data = np.load(path + "_data.npy", mmap_mode="r")
+        self.targets = np.load(path + "_targets.npy", mmap_mode="r")
+        self.index = np.load(path + "_index.npy")
+        self.num_lanes = num_lanes
+        self.chunk = chunk
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+
+    def read(self, queue, lanes):
+        # lanes : [sequence id, position] of each lane, None when the lane is idle
+        B, T, F = self.num_lanes, self.chunk, self.data.shape[1]
+        x = np.zeros((B, T, F), dtype=np.float32)
+        y = np.zeros((B, T), dtype=np.int64)
+        valid = np.zeros((B, T), dtype=bool)
+        start = np.zeros(B, dtype=bool)
+        for b in range(B):
+            if lanes[b] is None and queue:
+                lanes[b] = [queue.pop(), 0]
+                start[b] = True
+            if lanes[b] is None:
+                continue
+            seq, pos = lanes[b]
+            offset, length = self.index[seq]
+            n = min(T, length - pos)
+            x[b, :n] = self.data[offset+pos:offset+pos+n]
+            y[b, :n] = self.targets[offset+pos:offset+pos+n]
+            valid[b, :n] = True
+            lanes[b] = [seq, pos + n] if pos + n < length else None
+        return x, y, valid, start
+
+    def __iter__(self):
+        order = self.rng.permutation(len(self.index)) if self.shuffle else np.arange(len(self.index))
+        queue = list(order[::-1])
+        lanes = [None] * self.num_lanes
+        with ThreadPoolExecutor(1) as pool:
+            future = pool.submit(self.read, queue, lanes)
+            while True:
+                x, y, valid, start = future.result()
+                if not valid.any():
+                    return
+                # The lane state is only touched by the reading thread, the next read starts once this one is done
+                future = pool.submit(self.read, queue, lanes)
+                yield x, y, valid, start
+
+    def __len__(self):
+        # Number of chunks when the lanes are perfectly balanced
+        steps = (-(-self.index[:, 1] // self.chunk)).sum()
+        return int(-(-steps // self.num_lanes))
+
+def reset_lanes(h, mask):
+    # Zeroes the state of the lanes starting a new sequence, mask : (B,) bool
+    return h * (~mask).to(h.dtype).view(1, -1, 1)
+
+class TBPTT_Trainer:
+    """
+    TBPTT(k1, k2) : every `k1` new steps, the loss of those steps is backpropagated through the last `k2` steps (k1 <= k2).
+
+    - The window is the last k2 - k1 steps of the previous update and the k1 new ones. It starts from the detached state
+      of its first step, the state after k1 steps is kept (detached) as the start of the next window.
+    - Lanes are independent : a lane starting a new sequence gets a zero state at that step, so neither its state nor
+      its gradient reaches the previous sequence.
+    - The window, the states and the graph have a fixed size, the memory does not grow with the sequence length.
+    """
+    def __init__(self, model, optimizer, k1, k2, num_lanes, device, clip_norm=None):
+        assert k1 <= k2, "k2 has to be at least k1"
+        self.model = model
+        self.optimizer = optimizer
+        self.k1, self.k2 = k1, k2
+        self.num_lanes = num_lanes
+        self.device = device
+        self.clip_norm = clip_norm
+        self.criterion = nn.CrossEntropyLoss(reduction="sum")
+
+    def reset(self):
+        # Window of the k2 - k1 previous steps, the state at its first step and the steps where a sequence starts
+        B, overlap = self.num_lanes, self.k2 - self.k1
+        self.h = torch.zeros(self.model.num_layers, B, self.model.hidden_size, device=self.device)
+        self.prev_x = torch.zeros(B, overlap, self.model.rnn.input_size, device=self.device)
+        self.prev_start = torch.zeros(B, overlap, dtype=torch.bool, device=self.device)
+
+    def forward_window(self, x, start):
+        """
+        x : (B, k2, input_size), start : (B, k2) bool
+        Runs the window in segments split where some lane starts a sequence and at k1. Returns the logits and the state after k1 steps.
+        """
+        cuts = {0, self.k1} | set(torch.nonzero(start.any(0)).flatten().tolist())
+        cuts = sorted(c for c in cuts if c < x.size(1)) + [x.size(1)]
+        h, h_next, logits = self.h, None, []
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            if a == self.k1:
+                h_next = h
+            h = reset_lanes(h, start[:, a])
+            out, h = self.model(x[:, a:b], h)
+            logits.append(out)
+        if h_next is None:
+            h_next = h
+        return torch.cat(logits, dim=1), h_next
+
+    def step(self, x, y, valid, start):
+        x = torch.from_numpy(x).to(self.device, non_blocking=True)
+        y = torch.from_numpy(y).to(self.device, non_blocking=True)
+        valid = torch.from_numpy(valid).to(self.device, non_blocking=True)
+        start_steps = torch.zeros(x.shape[:2], dtype=torch.bool, device=self.device)
+        start_steps[:, 0] = torch.from_numpy(start).to(self.device)
+
+        window_x = torch.cat([self.prev_x, x], dim=1)
+        window_start = torch.cat([self.prev_start, start_steps], dim=1)
+        logits, h_next = self.forward_window(window_x, window_start)
+
+        # Loss of the k1 new steps only
+        logits = logits[:, -self.k1:]
+        num_valid = valid.sum()
+        loss = self.criterion(logits[valid], y[valid]) / num_valid.clamp(min=1)
+        if self.model.training:
+            self.optimizer.zero_grad()
+            loss.backward()
+            if self.clip_norm is not None:
+                nn.utils.clip_grad_norm_(self.model.parameters(), self.clip_norm)
+            self.optimizer.step()
+
+        overlap = self.k2 - self.k1
+        self.h = h_next.detach()
+        self.prev_x = window_x[:, window_x.size(1) - overlap:]
+        self.prev_start = window_start[:, window_start.size(1) - overlap:]
+        correct = (logits.argmax(-1) == y)[valid].sum()
+        return loss.detach() * num_valid, correct, num_valid
+
+    def run(self, stream, desc=""):
+        self.reset()
+        # Summed on the device, read once at the end of the pass
+        total_loss = torch.zeros((), device=self.device)
+        total_correct = torch.zeros((), dtype=torch.long, device=self.device)
+        total = torch.zeros((), dtype=torch.long, device=self.device)
+        with tqdm(total=len(stream)) as t:
+            t.set_description(desc)
+            for x, y, valid, start in stream:
+                if self.model.training:
+                    loss, correct, n = self.step(x, y, valid, start)
+                else:
+                    with torch.no_grad():
+                        loss, correct, n = self.step(x, y, valid, start)
+                total_loss += loss
+                total_correct += correct
+                total += n
+                t.update()
+        total = max(total.item(), 1)
+        return total_loss.item() / total, 100 * total_correct.item() / total
+
+def synthetic_stream(path, num_sequences, length, input_size, num_classes, delay=20, seed=0):
+    # Random inputs, the target of a step is the class of the input `delay` steps before (argmax of its first features)
+    rng = np.random.default_rng(seed)
+    sequences, targets = [], []
+    for _ in range(num_sequences):
+        T = int(length * rng.uniform(0.5, 1.5))
+        x = rng.standard_normal((T, input_size), dtype=np.float32)
+        y = np.zeros(T, dtype=np.int64)
+        y[delay:] = np.argmax(x[:-delay, :num_classes], axis=1)
+        sequences.append(x)
+        targets.append(y)
+    write_stream(path, sequences, targets)
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--TRAIN", default=None, type=str, help="stream prefix ({path}_data.npy, _targets.npy, _index.npy), default : synthetic")
+    parser.add_argument("--VAL", default=None, type=str, help="")
+    parser.add_argument("--K1", default=32, type=int, help="new steps per update")
+    parser.add_argument("--K2", default=64, type=int, help="steps the gradient goes through")
+    parser.add_argument("--LANES", default=64, type=int, help="batch size")
+    parser.add_argument("--HIDDEN_SIZE", default=128, type=int, help="")
+    parser.add_argument("--NUM_LAYERS", default=2, type=int, help="")
+    parser.add_argument("--NUM_CLASSES", default=4, type=int, help="")
+    parser.add_argument("--EPOCHS", default=3, type=int, help="")
+    parser.add_argument("--LR", default=0.001, type=float, help="")
+    parser.add_argument("--CLIP_NORM", default=1.0, type=float, help="")
+    args = parser.parse_args()
+
+    device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
+
+    if args.TRAIN is None:
+        os.makedirs("./data", exist_ok=True)
+        args.TRAIN, args.VAL = "./data/stream_train", "./data/stream_val"
+        if not os.path.exists(args.TRAIN + "_index.npy"):
+            synthetic_stream(args.TRAIN, 64, 50000, 8, args.NUM_CLASSES, seed=0)
+            synthetic_stream(args.VAL, 8, 50000, 8, args.NUM_CLASSES, seed=1)
+        print("Synthetic Stream Done !")
+
+    train_stream = Lane_Stream(args.TRAIN, args.LANES, args.K1, shuffle=True)
+    val_stream = Lane_Stream(args.VAL, args.LANES, args.K1, shuffle=False) if args.VAL else None
+
+    model = Stream_Model(train_stream.data.shape[1], args.HIDDEN_SIZE, args.NUM_LAYERS, args.NUM_CLASSES).to(device)
+    optimizer = optim.Adam(model.parameters(), lr=args.LR)
+    trainer = TBPTT_Trainer(model, optimizer, args.K1, args.K2, args.LANES, device, args.CLIP_NORM)
+
+    for epoch in range(args.EPOCHS):
+        model.train()
+        loss, acc = trainer.run(train_stream, f'[{epoch+1}/{args.EPOCHS}]')
+        log = f"Epoch : {epoch+1}, Loss : {loss:.3f}, Acc: {acc:.3f}"
+        if val_stream is not None:
+            model.eval()
+            val_loss, val_acc = trainer.run(val_stream, f'[{epoch+1}/{args.EPOCHS}]')
+            log += f", Val Loss : {val_loss:.3f}, Val Acc : {val_acc:.3f}"
+        print(log + "\n")
+
+    print("Training Done !")
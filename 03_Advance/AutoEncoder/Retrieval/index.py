@@ -0,0 +1,197 @@
+import os
+
+import numpy as np
+
+# Compact on-disk codes and an IVF (inverted file) index for k-NN search on them, NumPy only.
+# Distances are squared L2, computed as |q|^2 - 2 q.x + |x|^2 so every list is one matrix product.
+
+# =================
+# Code storage
+# =================
+def quantize_codes(path, chunk=65536):
+    """
+    {path}_codes.npy float16 -> int8 with a symmetric scale per dimension ({path}_scale.npy), in chunks.
+    The float16 file is replaced, so both formats are read by `load_codes`.
+    """
+    codes = np.load(path + "_codes.npy", mmap_mode="r")
+    scale = np.zeros(codes.shape[1], dtype=np.float32)
+    for i in range(0, len(codes), chunk):
+        scale = np.maximum(scale, np.abs(codes[i:i+chunk].astype(np.float32)).max(0))
+    scale = np.maximum(scale, 1e-8) / 127.
+
+    out = np.lib.format.open_memmap(path + "_int8.npy", mode="w+", dtype=np.int8, shape=codes.shape)
+    for i in range(0, len(codes), chunk):
+        out[i:i+chunk] = np.clip(np.rint(codes[i:i+chunk].astype(np.float32) / scale), -127, 127)
+    out.flush()
+    del out, codes
+    np.save(path + "_scale.npy", scale)
+    os.replace(path + "_int8.npy", path + "_codes.npy")
+
+def load_codes(path):
+    # Memory-mapped (N, D) codes, and the int8 scale (None for float16 codes)
+    codes = np.load(path + "_codes.npy", mmap_mode="r")
+    scale = np.load(path + "_scale.npy") if os.path.exists(path + "_scale.npy") else None
+    return codes, scale
+
+def dequantize(codes, scale=None):
+    codes = np.asarray(codes, dtype=np.float32)
+    return codes if scale is None else codes * scale
+
+# =================
+# Search
+# =================
+def squared_distances(q, x, x_norms=None):
+    # (nq, D), (n, D) -> (nq, n)
+    if x_norms is None:
+        x_norms = np.einsum("ij,ij->i", x, x)
+    d = np.einsum("ij,ij->i", q, q)[:, None] - 2 * q @ x.T + x_norms[None, :]
+    return np.maximum(d, 0)
+
+def top_k(dist, ids, k):
+    # Row-wise k smallest of (nq, n) distances, sorted, with their ids. Rows with less than k candidates are padded with (inf, -1)
+    if dist.shape[1] < k:
+        pad = k - dist.shape[1]
+        dist = np.pad(dist, ((0, 0), (0, pad)), constant_values=np.inf)
+        ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+    part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    dist, ids = np.take_along_axis(dist, part, 1), np.take_along_axis(ids, part, 1)
+    order = np.argsort(dist, axis=1)
+    return np.take_along_axis(dist, order, 1), np.take_along_axis(ids, order, 1)
+
+def brute_force_knn(codes, queries, k, scale=None, chunk=65536):
+    # Exact k-NN over the (memory-mapped) codes, chunk by chunk with a running top-k
+    best_d = np.full((len(queries), 0), np.inf, dtype=np.float32)
+    best_i = np.zeros((len(queries), 0), dtype=np.int64)
+    for i in range(0, len(codes), chunk):
+        x = dequantize(codes[i:i+chunk], scale)
+        d = squared_distances(queries, x)
+        ids = np.broadcast_to(np.arange(i, i + len(x)), d.shape)
+        best_d, best_i = top_k(np.concatenate([best_d, d], 1), np.concatenate([best_i, ids], 1), k)
+    return best_d, best_i
+
+def kmeans(x, num_clusters, iters=20, seed=0, batch_size=16384):
+    # Lloyd iterations, assignments computed in batches. Empty clusters are moved to random points
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), num_clusters, replace=False)].copy()
+    for _ in range(iters):
+        assign = assign_lists(x, centroids, batch_size)
+        counts = np.bincount(assign, minlength=num_clusters)
+        order = np.argsort(assign, kind="stable")
+        clusters, starts = np.unique(assign[order], return_index=True)
+        centroids[clusters] = np.add.reduceat(x[order], starts, axis=0) / counts[clusters, None]
+        empty = counts == 0
+        centroids[empty] = x[rng.choice(len(x), empty.sum(), replace=False)]
+    return centroids
+
+def assign_lists(x, centroids, batch_size=16384):
+    c_norms = np.einsum("ij,ij->i", centroids, centroids)
+    return np.concatenate([np.argmin(squared_distances(x[i:i+batch_size], centroids, c_norms), axis=1)
+                           for i in range(0, len(x), batch_size)])
+
+class IVF_Index:
+    """
+    Inverted file index : the codes are clustered with k-means into `num_lists` lists,
+    a query only scans the `nprobe` lists of its closest centroids.
+
+    - Each list keeps its vectors (float32), their squared norms and ids in buffers with spare capacity,
+      so `add` appends without rebuilding the index.
+    - `search` takes a batch of queries. Each probed list is scanned once for all the queries probing it,
+      with one matrix product, and only its k best candidates per query are kept before the final top-k.
+    """
+    def __init__(self, num_lists=256, nprobe=8):
+        self.num_lists = num_lists
+        self.nprobe = nprobe
+        self.centroids = None
+        self.ntotal = 0
+
+    def train(self, x, scale=None, iters=20, max_samples=65536, seed=0):
+        # k-means on at most `max_samples` rows of the (memory-mapped) codes
+        rng = np.random.default_rng(seed)
+        sample = x if len(x) <= max_samples else x[np.sort(rng.choice(len(x), max_samples, replace=False))]
+        self.centroids = kmeans(dequantize(sample, scale), self.num_lists, iters, seed)
+        self.centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        D = self.centroids.shape[1]
+        self.vectors = [np.empty((0, D), dtype=np.float32) for _ in range(self.num_lists)]
+        self.norms = [np.empty(0, dtype=np.float32) for _ in range(self.num_lists)]
+        self.ids = [np.empty(0, dtype=np.int64) for _ in range(self.num_lists)]
+        self.sizes = np.zeros(self.num_lists, dtype=np.int64)
+
+    def add(self, x, ids=None):
+        # Appends (n, D) vectors, ids default to the insertion order
+        assert self.centroids is not None, "train the index first"
+        x = np.asarray(x, dtype=np.float32)
+        ids = np.arange(self.ntotal, self.ntotal + len(x)) if ids is None else np.asarray(ids, dtype=np.int64)
+        assign = assign_lists(x, self.centroids)
+        order = np.argsort(assign, kind="stable")
+        lists, starts = np.unique(assign[order], return_index=True)
+        for l, group in zip(lists, np.split(order, starts[1:])):
+            n, size = len(group), self.sizes[l]
+            if size + n > len(self.ids[l]):
+                capacity = max(2 * len(self.ids[l]), size + n, 16)
+                self.vectors[l] = np.resize(self.vectors[l], (capacity, x.shape[1]))
+                self.norms[l] = np.resize(self.norms[l], capacity)
+                self.ids[l] = np.resize(self.ids[l], capacity)
+            self.vectors[l][size:size+n] = x[group]
+            self.norms[l][size:size+n] = np.einsum("ij,ij->i", x[group], x[group])
+            self.ids[l][size:size+n] = ids[group]
+            self.sizes[l] += n
+        self.ntotal += len(x)
+
+    def add_codes(self, codes, scale=None, chunk=65536):
+        # Adds memory-mapped codes chunk by chunk, ids are the rows
+        for i in range(0, len(codes), chunk):
+            self.add(dequantize(codes[i:i+chunk], scale), np.arange(i, min(i + chunk, len(codes))))
+
+    def search(self, queries, k, nprobe=None):
+        # (nq, D) queries -> (nq, k) squared distances and ids, sorted
+        nprobe = min(nprobe or self.nprobe, self.num_lists)
+        queries = np.asarray(queries, dtype=np.float32)
+        nq = len(queries)
+        probes = np.argpartition(squared_distances(queries, self.centroids, self.centroid_norms), nprobe - 1, axis=1)[:, :nprobe]
+
+        cand_d = np.full((nq, nprobe, k), np.inf, dtype=np.float32)
+        cand_i = np.full((nq, nprobe, k), -1, dtype=np.int64)
+        # (query, slot) pairs grouped by list
+        flat = probes.ravel()
+        order = np.argsort(flat, kind="stable")
+        lists, starts = np.unique(flat[order], return_index=True)
+        for l, group in zip(lists, np.split(order, starts[1:])):
+            size = self.sizes[l]
+            if size == 0:
+                continue
+            q_idx, slot = group // nprobe, group % nprobe
+            d = squared_distances(queries[q_idx], self.vectors[l][:size], self.norms[l][:size])
+            d, ids = top_k(d, np.broadcast_to(self.ids[l][:size], d.shape), k)
+            cand_d[q_idx, slot], cand_i[q_idx, slot] = d, ids
+        return top_k(cand_d.reshape(nq, -1), cand_i.reshape(nq, -1), k)
+
+    def save(self, path):
+        sizes = self.sizes
+        np.savez(path, centroids=self.centroids, nprobe=self.nprobe, sizes=sizes,
+                 vectors=np.concatenate([v[:s] for v, s in zip(self.vectors, sizes)]),
+                 ids=np.concatenate([i[:s] for i, s in zip(self.ids, sizes)]))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        index = cls(len(data["centroids"]), int(data["nprobe"]))
+        index.centroids = data["centroids"]
+        index.centroid_norms = np.einsum("ij,ij->i", index.centroids, index.centroids)
+        bounds = np.cumsum(data["sizes"])[:-1]
+        index.vectors = np.split(data["vectors"], bounds)
+        index.ids = np.split(data["ids"], bounds)
+        index.norms = [np.einsum("ij,ij->i", v, v) for v in index.vectors]
+        index.sizes = data["sizes"].copy()
+        index.ntotal = int(index.sizes.sum())
+        return index
+
+def near_duplicates(index, codes, radius, scale=None, batch_size=4096):
+    # (i, j) pairs of rows with i < j within `radius` (L2) of each other, among the 8 nearest neighbours of each row
+    pairs = []
+    for i in range(0, len(codes), batch_size):
+        q = dequantize(codes[i:i+batch_size], scale)
+        d, ids = index.search(q, 8)
+        rows = np.arange(i, i + len(q))[:, None]
+        mask = (d <= radius ** 2) & (ids > rows)
+        pairs.append(np.stack([np.broadcast_to(rows, ids.shape)[mask], ids[mask]], 1))
+    return np.concatenate(pairs)
@@ -0,0 +1,119 @@
+# %%
+import os
+import time
+import argparse
+
+import numpy as np
+from tqdm import tqdm
+
+import torch
+from torch.utils.data import DataLoader
+from torchvision import transforms, datasets
+
+from models import encoder_dict, encode
+from index import IVF_Index, quantize_codes, load_codes, dequantize, brute_force_knn, near_duplicates
+
+def encode_dataset(net, loader, path, flatten_input, dtype="float16", device="cpu"):
+    """
+    Encodes the whole dataset batch by batch into {path}_codes.npy (float16, or int8 + {path}_scale.npy)
+    and the labels into {path}_labels.npy. The codes are written to a memory-mapped file, never held in memory at once.
+    """
+    net.eval()
+    num_samples = len(loader.dataset)
+    codes = labels = None
+    offset = 0
+    with torch.inference_mode():
+        for batch_img, batch_lab in tqdm(loader, desc="Encoding"):
+            z = encode(net, batch_img.to(device, non_blocking=True), flatten_input).half().cpu().numpy()
+            if codes is None:
+                codes = np.lib.format.open_memmap(path + "_codes.npy", mode="w+", dtype=np.float16, shape=(num_samples, z.shape[1]))
+                labels = np.lib.format.open_memmap(path + "_labels.npy", mode="w+", dtype=np.int64, shape=(num_samples,))
+            codes[offset:offset+len(z)] = z
+            labels[offset:offset+len(z)] = batch_lab.numpy()
+            offset += len(z)
+    codes.flush()
+    labels.flush()
+    del codes, labels
+    if os.path.exists(path + "_scale.npy"):
+        os.remove(path + "_scale.npy")
+    if dtype == "int8":
+        quantize_codes(path)
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+def recall(found, truth):
+    # Fraction of the true k nearest neighbours found, averaged over the queries
+    return np.mean([len(np.intersect1d(f, t)) / len(t) for f, t in zip(found, truth)])
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="AE", type=str, help=f"{list(encoder_dict.keys())}")
+    parser.add_argument("--WEIGHTS", type=str, required=True, help="state_dict saved by the Vanilla / CAE script")
+    parser.add_argument("--CODES", default="./codes/mnist_train", type=str, help="prefix of the code files")
+    parser.add_argument("--DTYPE", default="float16", type=str, help="float16 or int8")
+    parser.add_argument("--REENCODE", action="store_true", help="encode again even if the code files exist")
+    parser.add_argument("--NUM_LISTS", default=256, type=int, help="IVF lists")
+    parser.add_argument("--NPROBES", default=[1, 4, 16, 64], nargs="+", type=int, help="lists scanned per query")
+    parser.add_argument("--K", default=10, type=int, help="")
+    parser.add_argument("--QUERIES", default=1000, type=int, help="test images used as queries")
+    parser.add_argument("--INSERT", default=10000, type=int, help="codes added to the trained index afterwards")
+    parser.add_argument("--DEDUP_RADIUS", default=None, type=float, help="report near duplicate pairs within this L2 distance")
+    parser.add_argument("--BATCH_SIZE", default=1024, type=int, help="")
+    args = parser.parse_args()
+
+    assert args.MODEL in encoder_dict, f"Please use model in {list(encoder_dict.keys())}"
+    assert args.DTYPE in ["float16", "int8"], "Please use dtype in ['float16', 'int8']"
+    spec = encoder_dict[args.MODEL]
+    device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
+
+    net = spec["model"](**spec["kwargs"])
+    net.load_state_dict(torch.load(args.WEIGHTS, map_location="cpu"))
+    net = net.to(device)
+
+    train_dataset = datasets.MNIST(root='../../../data/', train=True, transform=transforms.ToTensor(), download=True)
+    val_dataset = datasets.MNIST(root='../../../data/', train=False, transform=transforms.ToTensor(), download=True)
+
+    if args.REENCODE or not os.path.exists(args.CODES + "_codes.npy"):
+        os.makedirs(os.path.dirname(args.CODES) or ".", exist_ok=True)
+        loader = DataLoader(train_dataset, batch_size=args.BATCH_SIZE, shuffle=False, num_workers=2, pin_memory=True)
+        encode_dataset(net, loader, args.CODES, spec["flatten_input"], args.DTYPE, device)
+    codes, scale = load_codes(args.CODES)
+    labels = np.load(args.CODES + "_labels.npy")
+
+    query_loader = DataLoader(torch.utils.data.Subset(val_dataset, range(args.QUERIES)), batch_size=args.BATCH_SIZE)
+    with torch.inference_mode():
+        queries = np.concatenate([encode(net.eval(), x.to(device), spec["flatten_input"]).float().cpu().numpy() for x, _ in query_loader])
+    query_labels = val_dataset.targets[:args.QUERIES].numpy()
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL} ({codes.shape[1]}-dim {codes.dtype} codes, {codes.nbytes / 2**20:.1f} MB)")
+    print(f"Database : {len(codes)}, Queries : {len(queries)}, K : {args.K}")
+    print("===========================================\n")
+
+    # Index of the first codes, then incremental insert of the last INSERT ones
+    base = len(codes) - args.INSERT
+    index = IVF_Index(args.NUM_LISTS)
+    _, train_time = timed(index.train, codes[:base], scale)
+    _, add_time = timed(index.add_codes, codes[:base], scale)
+    insert_time = 0
+    for i in range(base, len(codes), args.BATCH_SIZE):
+        _, t = timed(index.add, dequantize(codes[i:i+args.BATCH_SIZE], scale), np.arange(i, min(i + args.BATCH_SIZE, len(codes))))
+        insert_time += t
+    print(f"k-means : {train_time:.2f}s, add {base} : {add_time:.2f}s, insert {args.INSERT} in batches of {args.BATCH_SIZE} : {insert_time:.2f}s\n")
+
+    (_, truth), brute_time = timed(brute_force_knn, codes, queries, args.K, scale)
+    precision = lambda ids: np.mean(labels[ids] == query_labels[:, None])
+
+    print(f"{'search':<16}{'recall@' + str(args.K):>12}{'label prec.':>14}{'ms / query':>14}{'speedup':>10}")
+    print(f"{'brute force':<16}{1.:>12.3f}{precision(truth):>14.3f}{1000 * brute_time / len(queries):>14.3f}{1.:>9.1f}x")
+    for nprobe in args.NPROBES:
+        (_, found), search_time = timed(index.search, queries, args.K, nprobe)
+        print(f"{'IVF nprobe ' + str(nprobe):<16}{recall(found, truth):>12.3f}{precision(found):>14.3f}"
+              f"{1000 * search_time / len(queries):>14.3f}{brute_time / search_time:>9.1f}x")
+
+    if args.DEDUP_RADIUS is not None:
+        pairs = near_duplicates(index, codes, args.DEDUP_RADIUS, scale)
+        print(f"\nNear duplicates within {args.DEDUP_RADIUS} : {len(pairs)} pairs")
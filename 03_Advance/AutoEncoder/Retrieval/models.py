@@ -0,0 +1,86 @@
+from torch import nn
+
+# Same network definitions as the 03_Advance/AutoEncoder/{Vanilla, CAE} PyTorch scripts,
+# so the state_dicts saved by those scripts can be loaded as they are.
+
+# =================
+# AE
+# =================
+class build_AE(nn.Module):
+    def __init__(self, input_features=784):
+        super(build_AE, self).__init__()
+
+        self.encoder = nn.Sequential(
+            nn.Linear(input_features, 64),
+            nn.ReLU(),
+            nn.Linear(64, 16),
+            nn.ReLU()
+        )
+
+        self.decoder = nn.Sequential(
+            nn.Linear(16, 64),
+            nn.ReLU(),
+            nn.Linear(64, input_features),
+            nn.Sigmoid()
+        )
+
+        self.init_weights(self.encoder)
+        self.init_weights(self.decoder)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        encoded = self.encoder(x)
+        decoded = self.decoder(encoded)
+        return decoded
+
+# =================
+# CAE
+# =================
+class build_CAE(nn.Module):
+    def __init__(self, input_features=1):
+        super(build_CAE, self).__init__()
+
+        self.encoder = nn.Sequential(
+            nn.Conv2d(input_features, 16, 3, 1, 1),
+            nn.ReLU(),
+            nn.MaxPool2d(2),
+            nn.Conv2d(16, 64, 3, 1, 1),
+            nn.ReLU(),
+            nn.MaxPool2d(2)
+        )
+
+        self.decoder = nn.Sequential(
+            nn.ConvTranspose2d(64, 16, 4, 2, 1),
+            nn.ReLU(),
+            nn.ConvTranspose2d(16, input_features, 4, 2, 1),
+            nn.Sigmoid()
+        )
+
+        self.init_weights(self.encoder)
+        self.init_weights(self.decoder)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        encoded = self.encoder(x)
+        decoded = self.decoder(encoded)
+        return decoded
+
+# Encoders used for the retrieval : input transform of the training script and size of the flattened code
+encoder_dict = {
+    "AE": {"model": build_AE, "kwargs": {"input_features": 784}, "flatten_input": True, "code_size": 16},
+    "CAE": {"model": build_CAE, "kwargs": {"input_features": 1}, "flatten_input": False, "code_size": 64 * 7 * 7},
+}
+
+def encode(net, x, flatten_input):
+    # (B, 1, 28, 28) images in [0, 1] -> (B, code_size) codes
+    if flatten_input:
+        x = x.view(x.size(0), -1)
+    return net.encoder(x).flatten(1)
@@ -111,4 +111,9 @@ for epoch in range(epochs):
             
     print(f"Epoch : {epoch+1}, Loss : {(avg_loss/len(train_loader)):.3f}, Val Loss : {val_loss.item():.3f}")
 
-print("Training Done !")
\ No newline at end of file
+print("Training Done !")
+
+# %%
+# Weights for the latent retrieval (../Retrieval)
+os.makedirs("./trained", exist_ok=True)
+torch.save(net.state_dict(), "./trained/ae.pt")
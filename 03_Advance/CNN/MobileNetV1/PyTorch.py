@@ -11,21 +11,16 @@ from torch.nn import functional as F
 from torch.utils.data import Dataset, DataLoader 
 from torchvision import transforms, datasets, utils
 
+import sys
+sys.path.append("../../..") # the model definitions are in model_zoo/, importable without running this script
+from model_zoo.pytorch.mobilenet_v1 import Build_MobileNet
+
 # Device Configuration
 device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
 
 # %%
 SAVE_PATH = "../../../data"
 URL = "https://storage.googleapis.com/download.tensorflow.org/example_images/flower_photos.tgz"
-file_name = URL.split("/")[-1]
-data = datasets.utils.download_and_extract_archive(URL, SAVE_PATH)
-PATH = os.path.join(SAVE_PATH, "flower_photos")
-
-category_list = [i for i in os.listdir(PATH) if os.path.isdir(os.path.join(PATH, i)) ]
-print(category_list)
-
-num_classes = len(category_list)
-img_size = 128
 
 def read_img(path, img_size):
     img = cv.imread(path)
@@ -33,122 +28,49 @@ def read_img(path, img_size):
     img = cv.resize(img, (img_size, img_size))
     return img
 
-imgs_tr = []
-labs_tr = []
+def load_flowers(save_path, img_size):
+    # Downloads and decodes the flower dataset, only called by main()
+    data = datasets.utils.download_and_extract_archive(URL, save_path)
+    PATH = os.path.join(save_path, "flower_photos")
 
-imgs_val = []
-labs_val = []
+    category_list = [i for i in os.listdir(PATH) if os.path.isdir(os.path.join(PATH, i)) ]
+    print(category_list)
 
-for i, category in enumerate(category_list):
-    path = os.path.join(PATH, category)
-    imgs_list = os.listdir(path)
-    print("Total '%s' images : %d"%(category, len(imgs_list)))
-    ratio = int(np.round(0.05 * len(imgs_list)))
-    print("%s Images for Training : %d"%(category, len(imgs_list[ratio:])))
-    print("%s Images for Validation : %d"%(category, len(imgs_list[:ratio])))
-    print("=============================")
+    imgs_tr = []
+    labs_tr = []
 
-    imgs = [read_img(os.path.join(path, img),img_size) for img in imgs_list]
-    labs = [i]*len(imgs_list)
+    imgs_val = []
+    labs_val = []
 
-    imgs_tr += imgs[ratio:]
-    labs_tr += labs[ratio:]
-    
-    imgs_val += imgs[:ratio]
-    labs_val += labs[:ratio]
+    for i, category in enumerate(category_list):
+        path = os.path.join(PATH, category)
+        imgs_list = os.listdir(path)
+        print("Total '%s' images : %d"%(category, len(imgs_list)))
+        ratio = int(np.round(0.05 * len(imgs_list)))
+        print("%s Images for Training : %d"%(category, len(imgs_list[ratio:])))
+        print("%s Images for Validation : %d"%(category, len(imgs_list[:ratio])))
+        print("=============================")
 
-imgs_tr = np.array(imgs_tr)/255.
-labs_tr = np.array(labs_tr)
+        imgs = [read_img(os.path.join(path, img),img_size) for img in imgs_list]
+        labs = [i]*len(imgs_list)
 
-imgs_val = np.array(imgs_val)/255.
-labs_val = np.array(labs_val)
+        imgs_tr += imgs[ratio:]
+        labs_tr += labs[ratio:]
+        
+        imgs_val += imgs[:ratio]
+        labs_val += labs[:ratio]
 
-print(imgs_tr.shape, labs_tr.shape)
-print(imgs_val.shape, labs_val.shape)
+    imgs_tr = np.array(imgs_tr)/255.
+    labs_tr = np.array(labs_tr)
 
-# %%
-# Build network
-
-class ConvBlock(nn.Module):
-    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1):
-        super(ConvBlock, self).__init__()
-        self.block = nn.Sequential(
-            nn.Conv2d(input_feature, output_feature, ksize, strides, padding),
-            nn.BatchNorm2d(output_feature),
-            nn.ReLU(True)
-            )
-
-    def forward(self, x):
-        return self.block(x)
-
-class Depthwise_Separable_Block(nn.Module):
-    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1, alpha=1):
-        super(Depthwise_Separable_Block, self).__init__()
-        self.block = nn.Sequential(
-            nn.Conv2d(input_feature, input_feature, ksize, strides, padding, groups=input_feature),
-            nn.BatchNorm2d(input_feature),
-            nn.ReLU(True),
-            nn.Conv2d(input_feature, int(output_feature*alpha), 1),
-            nn.BatchNorm2d(int(output_feature*alpha)),
-            nn.ReLU(True)
-        )
-
-    def forward(self, x):
-        return self.block(x)
-            
-
-class Build_MobileNet(nn.Sequential):
-    def __init__(self, input_channel=3, num_classes=1000, alpha=1):
-        super(Build_MobileNet, self).__init__()
-
-        self.Stem = ConvBlock(input_channel, 32, 3, 2, 1)
-
-        layer_list = []
-
-        layer_list.append(Depthwise_Separable_Block(32, 64, alpha=alpha))
-        layer_list.append(Depthwise_Separable_Block(64, 128, strides=2, alpha=alpha))
-        layer_list.append(Depthwise_Separable_Block(128, 128, alpha=alpha))
-        layer_list.append(Depthwise_Separable_Block(128, 256, strides=2, alpha=alpha))
-        layer_list.append(Depthwise_Separable_Block(256, 256, alpha=alpha))
-        layer_list.append(Depthwise_Separable_Block(256, 512, strides=2, alpha=alpha))
-        
-        for _ in range(5):
-            layer_list.append(Depthwise_Separable_Block(512, 512, alpha=alpha))
-        
-        layer_list.append(Depthwise_Separable_Block(512, 1024, strides=2, alpha=alpha))
-        layer_list.append(Depthwise_Separable_Block(1024, 1024, alpha=alpha))
-        
-        self.Main_Block = nn.Sequential(*layer_list)
-
-        self.Classifier = nn.Sequential(
-            nn.AdaptiveAvgPool2d((1,1)),
-            nn.Flatten(),
-            nn.Linear(1024, num_classes)
-        )
-
-        self.init_weights(self.Stem)
-        self.init_weights(self.Main_Block)
-        self.init_weights(self.Classifier)
-
-    def init_weights(self, m):
-        if isinstance(m, nn.Linear):
-            nn.init.xavier_uniform_(m.weight)
-            m.bias.data.fill_(0.01)
-        
-    def forward(self, x):
-        x = self.Stem(x)
-        x = self.Main_Block(x)
-        x = self.Classifier(x)
-        return x
+    imgs_val = np.array(imgs_val)/255.
+    labs_val = np.array(labs_val)
 
-net = Build_MobileNet(input_channel=imgs_tr.shape[-1], num_classes=5, alpha=1).to(device)
-criterion = nn.CrossEntropyLoss()
-optimizer = optim.Adam(net.parameters(), lr=0.001)
+    print(imgs_tr.shape, labs_tr.shape)
+    print(imgs_val.shape, labs_val.shape)
+    return category_list, imgs_tr, labs_tr, imgs_val, labs_val
 
 # %%
-epochs=100
-batch_size=16
-
 class CustomDataset(Dataset):
     def __init__(self, train_x, train_y): 
         self.len = len(train_x) 
@@ -160,70 +82,86 @@ class CustomDataset(Dataset):
 
     def __len__(self): 
         return self.len
-        
-train_dataset = CustomDataset(imgs_tr, labs_tr) 
-train_loader = DataLoader(dataset=train_dataset, batch_size=batch_size, shuffle=True, num_workers=2)
 
-val_dataset = CustomDataset(imgs_val, labs_val) 
-val_loader = DataLoader(dataset=val_dataset, batch_size=batch_size, shuffle=True, num_workers=2)
+# %%
+def main():
+    img_size = 128
+    category_list, imgs_tr, labs_tr, imgs_val, labs_val = load_flowers(SAVE_PATH, img_size)
+    num_classes = len(category_list)
 
-print("Iteration maker Done !")
+    # Build network
+    net = Build_MobileNet(input_channel=imgs_tr.shape[-1], num_classes=num_classes, alpha=1).to(device)
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(net.parameters(), lr=0.001)
 
-# %%
-# Training Network
-
-for epoch in range(epochs):
-    net.train()
-    avg_loss = 0
-    avg_acc = 0
-    
-    with tqdm(total=len(train_loader)) as t:
-        t.set_description(f'[{epoch+1}/{epochs}]')
-        total = 0
-        correct = 0
-        for i, (batch_img, batch_lab) in enumerate(train_loader):
-            X = batch_img.to(device)
-            Y = batch_lab.to(device)
-
-            optimizer.zero_grad()
-
-            y_pred = net.forward(X)
-
-            loss = criterion(y_pred, Y)
-            
-            loss.backward()
-            optimizer.step()
-            avg_loss += loss.item()
-
-            _, predicted = torch.max(y_pred.data, 1)
-            total += Y.size(0)
-            correct += (predicted == Y).sum().item()
-            
-            t.set_postfix({"loss": f"{loss.item():05.3f}"})
-            t.update()
-        acc = (100 * correct / total)
-
-    net.eval()
-    with tqdm(total=len(val_loader)) as t:
-        t.set_description(f'[{epoch+1}/{epochs}]')
-        with torch.no_grad():
-            val_loss = 0
+    epochs=100
+    batch_size=16
+
+    train_dataset = CustomDataset(imgs_tr, labs_tr) 
+    train_loader = DataLoader(dataset=train_dataset, batch_size=batch_size, shuffle=True, num_workers=2)
+
+    val_dataset = CustomDataset(imgs_val, labs_val) 
+    val_loader = DataLoader(dataset=val_dataset, batch_size=batch_size, shuffle=True, num_workers=2)
+
+    print("Iteration maker Done !")
+
+    # Training Network
+
+    for epoch in range(epochs):
+        net.train()
+        avg_loss = 0
+        avg_acc = 0
+
+        with tqdm(total=len(train_loader)) as t:
+            t.set_description(f'[{epoch+1}/{epochs}]')
             total = 0
             correct = 0
-            for i, (batch_img, batch_lab) in enumerate(val_loader):
+            for i, (batch_img, batch_lab) in enumerate(train_loader):
                 X = batch_img.to(device)
                 Y = batch_lab.to(device)
-                y_pred = net(X)
-                val_loss += criterion(y_pred, Y)
+
+                optimizer.zero_grad()
+
+                y_pred = net.forward(X)
+
+                loss = criterion(y_pred, Y)
+
+                loss.backward()
+                optimizer.step()
+                avg_loss += loss.item()
+
                 _, predicted = torch.max(y_pred.data, 1)
                 total += Y.size(0)
                 correct += (predicted == Y).sum().item()
-                t.set_postfix({"val_loss": f"{val_loss.item()/(i+1):05.3f}"})
-                t.update()
-
-            val_loss /= total
-            val_acc = (100 * correct / total)
-            
-    print(f"Epoch : {epoch+1}, Loss : {(avg_loss/len(train_loader)):.3f}, Acc: {acc:.3f}, Val Loss : {val_loss.item():.3f}, Val Acc : {val_acc:.3f}")
 
-print("Training Done !")
\ No newline at end of file
+                t.set_postfix({"loss": f"{loss.item():05.3f}"})
+                t.update()
+            acc = (100 * correct / total)
+
+        net.eval()
+        with tqdm(total=len(val_loader)) as t:
+            t.set_description(f'[{epoch+1}/{epochs}]')
+            with torch.no_grad():
+                val_loss = 0
+                total = 0
+                correct = 0
+                for i, (batch_img, batch_lab) in enumerate(val_loader):
+                    X = batch_img.to(device)
+                    Y = batch_lab.to(device)
+                    y_pred = net(X)
+                    val_loss += criterion(y_pred, Y)
+                    _, predicted = torch.max(y_pred.data, 1)
+                    total += Y.size(0)
+                    correct += (predicted == Y).sum().item()
+                    t.set_postfix({"val_loss": f"{val_loss.item()/(i+1):05.3f}"})
+                    t.update()
+
+                val_loss /= total
+                val_acc = (100 * correct / total)
+
+        print(f"Epoch : {epoch+1}, Loss : {(avg_loss/len(train_loader)):.3f}, Acc: {acc:.3f}, Val Loss : {val_loss.item():.3f}, Val Acc : {val_acc:.3f}")
+
+    print("Training Done !")
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,11 @@
 import os
 import cv2 as cv
 import numpy as np
+import sys
+sys.path.append("../../..") # utils/tf_steps.py is shared by the tf_subclassing scripts
 import tensorflow as tf
-from tensorflow.keras import layers, models, losses, optimizers, datasets, utils
+from tensorflow.keras import layers, models, losses, metrics, optimizers, datasets, utils
+from utils.tf_steps import Compiled_Steps
 
 # %%
 URL = "https://storage.googleapis.com/download.tensorflow.org/example_images/flower_photos.tgz"
@@ -17,6 +20,8 @@ num_classes = len(category_list)
 img_size = 150
 EPOCHS = 500
 BATCH_SIZE = 128
+STEPS_PER_EXECUTION = 50 # train steps per graph call
+JIT_COMPILE = False # XLA
 def read_img(path, img_size):
     img = cv.imread(path)
     img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
@@ -98,14 +103,12 @@ model = Build_VGG(input_shape=input_shape, num_classes=num_classes, num_layer=nu
 
 loss_object = losses.BinaryCrossentropy() if num_classes==1 else losses.CategoricalCrossentropy()
 
+metric = metrics.BinaryAccuracy(name='acc') if num_classes==1 else metrics.CategoricalAccuracy(name='acc')
 optimizer = optimizers.Adam()
 
+steps = Compiled_Steps(model, loss_object, optimizer, train_ds.element_spec, metric, STEPS_PER_EXECUTION, JIT_COMPILE)
+
 for epoch in range(EPOCHS):
-    for batch_x, batch_y in train_ds:
-        with tf.GradientTape() as tape:
-            predictions = model(batch_x, training=True)
-            loss = loss_object(batch_y, predictions)
-            gradients = tape.gradient(loss, model.trainable_variables)
-            optimizer.apply_gradients(zip(gradients, model.trainable_variables))
-            
-    print("{:5}|{:10.6f}".format(epoch+1, loss))
+    logs = steps.fit_epoch(train_ds)
+    logs.update(steps.evaluate(test_ds))
+    print(f"{epoch+1:5} | " + " | ".join(f"{k} {v:10.6f}" for k, v in logs.items()))
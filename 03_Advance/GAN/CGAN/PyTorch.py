@@ -11,6 +11,10 @@ import os
 import numpy as np
 from matplotlib import pyplot as plt
 
+import sys
+sys.path.append("..") # ema.py is shared by the GAN scripts
+from ema import TorchEMA
+
 def find_data_dir():
     data_path = 'data'
     while os.path.exists(data_path) != True:
@@ -40,12 +44,24 @@ print("Downloading Test Data Done ! ")
 device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
 # our model
+class One_Hot_Condition(nn.Module):
+    # Class ids -> one-hot channels broadcast to (size, size), built on the device of the ids
+    def __init__(self, n_c=10, size=1):
+        super(One_Hot_Condition, self).__init__()
+        self.n_c = n_c
+        self.size = size
+
+    def forward(self, c):
+        C = F.one_hot(c, self.n_c).to(torch.float)[:, :, None, None]
+        return C.expand(-1, -1, self.size, self.size)
+
 class Generator(nn.Module):
     def __init__(self, n_z=100, n_c=10, d=128):
         super(Generator, self).__init__()
         
         self.deconv1_z = nn.ConvTranspose2d(n_z, d*4, 4, 1, 0)
         self.bn1_z = nn.BatchNorm2d(d*4)
+        self.condition = One_Hot_Condition(n_c, 1)
         self.deconv1_c = nn.ConvTranspose2d(n_c, d*4, 4, 1, 0)
         self.bn1_c = nn.BatchNorm2d(d*4)
         
@@ -55,9 +71,10 @@ class Generator(nn.Module):
         self.bn3 = nn.BatchNorm2d(d*2)
         self.deconv4 = nn.ConvTranspose2d(d*2, 1, 4, 2, 1)
                     
-    def forward(self, X, C):
+    def forward(self, X, c):
+        # c : class ids
         X = F.leaky_relu(self.bn1_z(self.deconv1_z(X)), negative_slope=0.03)
-        C = F.leaky_relu(self.bn1_c(self.deconv1_c(C)), negative_slope=0.03)
+        C = F.leaky_relu(self.bn1_c(self.deconv1_c(self.condition(c))), negative_slope=0.03)
         X = torch.cat([X, C], 1)
         X = F.leaky_relu(self.bn2(self.deconv2(X)), negative_slope=0.003)
         X = F.leaky_relu(self.bn3(self.deconv3(X)), negative_slope=0.003)
@@ -65,11 +82,12 @@ class Generator(nn.Module):
         return X
     
 class Discriminator(nn.Module):
-    def __init__(self, d=128):
+    def __init__(self, d=128, n_c=10, img_size=32):
         super(Discriminator, self).__init__()
         self.conv1_z = nn.Conv2d(1, d//2, 4, 2, 1)
         self.bn1_z = nn.BatchNorm2d(d//2)
-        self.conv1_c = nn.Conv2d(10, d//2, 4, 2, 1)
+        self.condition = One_Hot_Condition(n_c, img_size)
+        self.conv1_c = nn.Conv2d(n_c, d//2, 4, 2, 1)
         self.bn1_c = nn.BatchNorm2d(d//2)
         
         self.conv2 = nn.Conv2d(d, d*2, 4, 2, 1)
@@ -78,9 +96,10 @@ class Discriminator(nn.Module):
         self.bn3 = nn.BatchNorm2d(d*4)
         self.conv4 = nn.Conv2d(d*4, 1, 4, 1, 0)
     
-    def forward(self, X, C):
+    def forward(self, X, c):
+        # c : class ids
         X = F.leaky_relu(self.bn1_z(self.conv1_z(X)), negative_slope=0.003)
-        C = F.leaky_relu(self.bn1_c(self.conv1_c(C)), negative_slope=0.003)
+        C = F.leaky_relu(self.bn1_c(self.conv1_c(self.condition(c))), negative_slope=0.003)
         X = torch.cat([X,C], 1)
         X = F.leaky_relu(self.bn2(self.conv2(X)), negative_slope=0.003)
         X = F.leaky_relu(self.bn3(self.conv3(X)), negative_slope=0.003)
@@ -88,6 +107,10 @@ class Discriminator(nn.Module):
         return X
 
 G = Generator().to(device)
+# Shadow generator for sampling and saving, updated every `ema_every` steps
+ema_decay = 0.999
+ema_every = 1
+G_ema = TorchEMA(G, ema_decay, ema_every)
 D = Discriminator().to(device)
 
 criterion = nn.BCELoss()
@@ -96,13 +119,14 @@ g_optimizer = torch.optim.Adam(G.parameters(), lr=0.0002)
 
 batch_size = 100
 
-data_iter = DataLoader(mnist_train, batch_size=batch_size, shuffle=True, num_workers=1)
+data_iter = DataLoader(mnist_train, batch_size=batch_size, shuffle=True, num_workers=1, drop_last=True, pin_memory=torch.cuda.is_available())
 
 def plot_generator(num = 10):
-    z = torch.randn(num, 100, 1, 1).to(device)
-    c = torch.arange(0, 10).type(torch.LongTensor)
+    z = torch.randn(num, 100, 1, 1, device=device)
+    c = torch.arange(0, 10, device=device)
     
-    test_g = G.forward(z, g_fill[c].to(device))
+    with torch.no_grad():
+        test_g = G_ema.model(z, c)
     plt.figure(figsize=(8, 2))
     for i in range(num):
         plt.subplot(1, num, i+1)
@@ -112,15 +136,13 @@ def plot_generator(num = 10):
     plt.show()
     
 
-label_dim = 10
-image_size = 32
-d_fill = torch.zeros([label_dim, label_dim, image_size, image_size])
-for i in range(label_dim):
-    d_fill[i, i, :, :] = 1
-    
-g_fill = torch.zeros([label_dim, label_dim, 1, 1])
-for i in range(label_dim):
-    g_fill[i, i] = 1
+# Labels are built once on the device, class ids are turned into one-hot channels inside the models
+real_lab = torch.ones(batch_size, 1, device=device)
+fake_lab = torch.zeros(batch_size, 1, device=device)
+
+# Losses stay on the device and are copied to `history` every `flush_every` steps
+flush_every = 100
+loss_buffer = torch.zeros(flush_every, 2, device=device)
 
 print("Iteration maker Done !")
 history = {}
@@ -134,13 +156,9 @@ for epoch in range(10):
     for i, (batch_img, batch_c) in enumerate(data_iter):
         
         # Preparing train data
-        X = batch_img.to(device)
+        X = batch_img.to(device, non_blocking=True)
         
-        C = d_fill[batch_c].to(device)
-        
-        real_lab = torch.ones(batch_size, 1).to(device)
-        
-        fake_lab = torch.zeros(batch_size, 1).to(device)
+        C = batch_c.to(device, non_blocking=True)
         
         
         # Training Discriminator
@@ -148,11 +166,11 @@ for epoch in range(10):
         d_loss_real = criterion(D_pred.view(-1, 1), real_lab)
         real_score = D_pred
         
-        z = torch.randn(batch_size, 100, 1, 1).to(device)
-        c = torch.randint(0, 10, (batch_size,)).type(torch.LongTensor)
+        z = torch.randn(batch_size, 100, 1, 1, device=device)
+        c = torch.randint(0, 10, (batch_size,), device=device)
         
-        fake_images = G.forward(z, g_fill[c].to(device))
-        G_pred = D.forward(fake_images, d_fill[c].to(device))
+        fake_images = G.forward(z, c)
+        G_pred = D.forward(fake_images, c)
         d_loss_fake = criterion(G_pred.view(-1, 1), fake_lab)
         fake_score = G_pred
         
@@ -164,29 +182,38 @@ for epoch in range(10):
         
         
         # Training Generator
-        z = torch.randn(batch_size, 100, 1, 1).to(device)
-        c = torch.randint(0, 10, (batch_size,)).type(torch.LongTensor)
+        z = torch.randn(batch_size, 100, 1, 1, device=device)
+        c = torch.randint(0, 10, (batch_size,), device=device)
         
-        fake_images = G.forward(z, g_fill[c].to(device))
-        G_pred = D.forward(fake_images, d_fill[c].to(device))
+        fake_images = G.forward(z, c)
+        G_pred = D.forward(fake_images, c)
         
         g_loss = criterion(G_pred.view(-1, 1), real_lab)
         
         g_optimizer.zero_grad()
         g_loss.backward()
         g_optimizer.step()
-        
-        history['g_loss'].append(g_loss.data.cpu().numpy())
-        history['d_loss'].append(d_loss.data.cpu().numpy())
-        
-        if (i+1)%100 == 0 :
-            print("Epoch : ", epoch+1, "Iteration : ", i+1, "G_loss : ", g_loss.data.cpu().numpy(), "D_loss : ", d_loss.data.cpu().numpy())
+        G_ema.step()
+        
+        loss_buffer[i % flush_every, 0] = g_loss.detach()
+        loss_buffer[i % flush_every, 1] = d_loss.detach()
+        
+        if (i+1)%flush_every == 0 :
+            losses = loss_buffer.cpu().numpy()
+            history['g_loss'].extend(losses[:, 0])
+            history['d_loss'].extend(losses[:, 1])
+            print("Epoch : ", epoch+1, "Iteration : ", i+1, "G_loss : ", losses[-1, 0], "D_loss : ", losses[-1, 1])
+    if (i+1)%flush_every:
+        losses = loss_buffer[:(i+1)%flush_every].cpu().numpy()
+        history['g_loss'].extend(losses[:, 0])
+        history['d_loss'].extend(losses[:, 1])
     plot_generator()
     
-torch.save(G.state_dict(), './trained/Conditional_GAN/sd_gen')
+torch.save(G_ema.model.state_dict(), './trained/Conditional_GAN/sd_gen')
+torch.save(G.state_dict(), './trained/Conditional_GAN/sd_gen_raw')
 torch.save(D.state_dict(), './trained/Conditional_GAN/sd_dis')
 
-torch.save(G, './trained/Conditional_GAN/gen.pt')
+torch.save(G_ema.model, './trained/Conditional_GAN/gen.pt')
 torch.save(D, './trained/Conditional_GAN/dis.pt')
 
 plt.figure(figsize=(8,4))
@@ -7,6 +7,10 @@ import tensorflow as tf
 from matplotlib import pyplot as plt
 from tensorflow.keras import layers, models, losses, optimizers, datasets, utils
 
+import sys
+sys.path.append("..") # ema.py is shared by the GAN scripts
+from ema import TFEMA
+
 # %%
 # Data Prepare
 
@@ -84,6 +88,10 @@ D.compile(optimizer=optimizers.RMSprop(), loss=losses.binary_crossentropy, metri
 D.trainable = False
 
 G = Build_Generator(input_shape=input_shape, input_condition=input_condition, output_size=img_size, name="Generator")
+# Shadow generator for sampling, updated every `ema_every` steps
+ema_decay = 0.999
+ema_every = 1
+G_ema = TFEMA(G, ema_decay, ema_every)
 
 A_latent = layers.Input(shape=input_shape, name='GAN_Latent')
 A_condition = layers.Input(shape=input_condition, name='GAN_Condition')
@@ -136,6 +144,7 @@ for epoch in range(epochs):
         latent = np.random.normal(-1, 1, (batch_size, n_latent))
         
         G_loss = A.train_on_batch([latent, condition], real_label)
+        G_ema.step()
 
         G_loss_epoch += G_loss
     
@@ -144,7 +153,7 @@ for epoch in range(epochs):
     latent = np.random.normal(-1, 1, (20, n_latent))
     condition = utils.to_categorical(np.arange(10), n_c)
     condition = np.repeat(condition, 2, axis=0)
-    fake_x = G.predict([latent, condition])
+    fake_x = G_ema.model.predict([latent, condition])
 
     plt.figure(figsize=(10, 3))
     for i in range(10):
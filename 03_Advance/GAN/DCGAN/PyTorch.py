@@ -11,6 +11,10 @@ import os
 import numpy as np
 from matplotlib import pyplot as plt
 
+import sys
+sys.path.append("..") # ema.py is shared by the GAN scripts
+from ema import TorchEMA
+
 def find_data_dir():
     data_path = 'data'
     while os.path.exists(data_path) != True:
@@ -43,47 +47,51 @@ device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 class Generator(nn.Module):
     def __init__(self, n_z=100, d=128):
         super(Generator, self).__init__() 
-        self.deconv1 = nn.ConvTranspose2d(n_z, d*8, 4, 1, 0),
-        self.bnorm1 = nn.BatchNorm2d(d*8),
+        self.deconv1 = nn.ConvTranspose2d(n_z, d*8, 4, 1, 0)
+        self.bnorm1 = nn.BatchNorm2d(d*8)
         
-        self.devonc2 = nn.ConvTranspose2d(d*8, d*4, 4, 2, 1),
-        self.bnorm2 = nn.BatchNorm2d(d*4),
+        self.deconv2 = nn.ConvTranspose2d(d*8, d*4, 4, 2, 1)
+        self.bnorm2 = nn.BatchNorm2d(d*4)
         
-        self.deconv3 = nn.ConvTranspose2d(d*4, d*2, 4, 2, 1),
-        self.bnorm3 = nn.BatchNorm2d(d*2),
+        self.deconv3 = nn.ConvTranspose2d(d*4, d*2, 4, 2, 1)
+        self.bnorm3 = nn.BatchNorm2d(d*2)
         
-        self.deconv4 = nn.ConvTranspose2d(d*2, 1, 4, 2, 1),
+        self.deconv4 = nn.ConvTranspose2d(d*2, 1, 4, 2, 1)
         
                     
     def forward(self, X):
         X = F.relu(self.bnorm1(self.deconv1(X)))
         X = F.relu(self.bnorm2(self.deconv2(X)))
         X = F.relu(self.bnorm3(self.deconv3(X)))
-        X = F.tanh(self.deconv4(X))
+        X = torch.tanh(self.deconv4(X))
         return X
     
 class Discriminator(nn.Module):
     def __init__(self, d=128):
         super(Discriminator, self).__init__()
-        self.conv1 = nn.Conv2d(1, d, 4, 2, 1),
-        self.bnorm1 = nn.BatchNorm2d(d),
+        self.conv1 = nn.Conv2d(1, d, 4, 2, 1)
+        self.bnorm1 = nn.BatchNorm2d(d)
         
-        self.conv2 = nn.Conv2d(d, d*2, 4, 2, 1),
-        self.bnorm2 = nn.BatchNorm2d(d*2),
+        self.conv2 = nn.Conv2d(d, d*2, 4, 2, 1)
+        self.bnorm2 = nn.BatchNorm2d(d*2)
         
-        self.conv3 = nn.Conv2d(d*2, d*4, 4, 2, 1),
-        self.bnorm3 = nn.BatchNorm2d(d*4),
+        self.conv3 = nn.Conv2d(d*2, d*4, 4, 2, 1)
+        self.bnorm3 = nn.BatchNorm2d(d*4)
         
-        self.conv4 = nn.Conv2d(d*4, 1, 4, 1, 0),
+        self.conv4 = nn.Conv2d(d*4, 1, 4, 1, 0)
         
     def forward(self, X):
         X = F.leaky_relu(self.bnorm1(self.conv1(X)), negative_slope=0.003)
         X = F.leaky_relu(self.bnorm2(self.conv2(X)), negative_slope=0.003)
         X = F.leaky_relu(self.bnorm3(self.conv3(X)), negative_slope=0.003)
-        X = torch.sigmoid(self.conv1(X))
+        X = torch.sigmoid(self.conv4(X))
         return X
 
 G = Generator().to(device)
+# Shadow generator for sampling and saving, updated every `ema_every` steps
+ema_decay = 0.999
+ema_every = 1
+G_ema = TorchEMA(G, ema_decay, ema_every)
 D = Discriminator().to(device)
 
 criterion = nn.BCELoss()
@@ -97,7 +105,8 @@ data_iter = DataLoader(mnist_train, batch_size=batch_size, shuffle=True, num_wor
 def plot_generator(num = 10):
     z = torch.randn(num, 100, 1, 1).to(device)
     
-    test_g = G.forward(z)
+    with torch.no_grad():
+        test_g = G_ema.model(z)
     plt.figure(figsize=(8, 2))
     for i in range(num):
         plt.subplot(1, num, i+1)
@@ -154,6 +163,7 @@ for epoch in range(10):
         g_optimizer.zero_grad()
         g_loss.backward()
         g_optimizer.step()
+        G_ema.step()
         
         history['g_loss'].append(g_loss.data.cpu().numpy())
         history['d_loss'].append(d_loss.data.cpu().numpy())
@@ -162,10 +172,12 @@ for epoch in range(10):
             print("Epoch : ", epoch+1, "Iteration : ", i+1, "G_loss : ", g_loss.data.cpu().numpy(), "D_loss : ", d_loss.data.cpu().numpy())
     plot_generator()
     
-torch.save(G.state_dict(), './trained/DCGAN/sd_gen')
+os.makedirs('./trained/DCGAN', exist_ok=True)
+torch.save(G_ema.model.state_dict(), './trained/DCGAN/sd_gen')
+torch.save(G.state_dict(), './trained/DCGAN/sd_gen_raw')
 torch.save(D.state_dict(), './trained/DCGAN/sd_dis')
 
-torch.save(G, './trained/DCGAN/gen.pt')
+torch.save(G_ema.model, './trained/DCGAN/gen.pt')
 torch.save(D, './trained/DCGAN/dis.pt')
 
 plt.figure(figsize=(8,4))
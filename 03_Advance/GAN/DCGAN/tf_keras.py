@@ -7,6 +7,10 @@ import tensorflow as tf
 from matplotlib import pyplot as plt
 from tensorflow.keras import layers, models, losses, optimizers, datasets, utils
 
+import sys
+sys.path.append("..") # ema.py is shared by the GAN scripts
+from ema import TFEMA
+
 # %%
 # Data Prepare
 
@@ -62,6 +66,10 @@ D.compile(optimizer=optimizers.RMSprop(), loss=losses.binary_crossentropy, metri
 D.trainable = False
 
 G = Build_Generator(input_shape=input_shape, output_size=img_size, name="Generator")
+# Shadow generator for sampling, updated every `ema_every` steps
+ema_decay = 0.999
+ema_every = 1
+G_ema = TFEMA(G, ema_decay, ema_every)
 
 A = models.Model(inputs=G.input, outputs=D(G.output), name="GAN")
 A.compile(optimizer=optimizers.RMSprop(), loss=losses.binary_crossentropy)
@@ -105,13 +113,14 @@ for epoch in range(epochs):
         latent = np.random.randn(batch_size, n_latent)
         
         G_loss = A.train_on_batch(latent, real_label)
+        G_ema.step()
 
         G_loss_epoch += G_loss
     
     print(f"{epoch+1}/{epochs}, G loss : {G_loss_epoch/(i+1)}, D loss : {D_loss_epoch/(i+1)}, D acc : {D_acc_epoch/(i+1)}")
 
     latent = np.random.normal(-1, 1, (20, n_latent))
-    fake_x = G.predict(latent)
+    fake_x = G_ema.model.predict(latent)
 
     plt.figure(figsize=(10, 3))
     for i in range(10):
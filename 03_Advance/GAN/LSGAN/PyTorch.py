@@ -11,6 +11,10 @@ from torchvision import transforms
 import os
 import numpy as np
 from matplotlib import pyplot as plt
+
+import sys
+sys.path.append("..") # ema.py is shared by the GAN scripts
+from ema import TorchEMA
 #%%
 def find_data_dir():
     data_path = 'data'
@@ -59,6 +63,10 @@ class Discriminator(nn.Module):
         return X
 
 G = Generator().to(device)
+# Shadow generator for sampling and saving, updated every `ema_every` steps
+ema_decay = 0.999
+ema_every = 1
+G_ema = TorchEMA(G, ema_decay, ema_every)
 D = Discriminator().to(device)
 
 criterion = nn.MSELoss()
@@ -72,7 +80,8 @@ data_iter = DataLoader(mnist_train, batch_size=batch_size, shuffle=True, num_wor
 def plot_generator(num = 10):
     z = torch.randn(num, 100).to(device)
     
-    test_g = G.forward(z)
+    with torch.no_grad():
+        test_g = G_ema.model(z)
     plt.figure(figsize=(8, 2))
     for i in range(num):
         plt.subplot(1, num, i+1)
@@ -123,14 +132,16 @@ for epoch in range(100):
         g_optimizer.zero_grad()
         g_loss.backward()
         g_optimizer.step()
+        G_ema.step()
         
         if (i+1)%200 == 0 :
             print("Epoch : ", epoch+1, "Iteration : ", i+1, "G_loss : ", g_loss.data.cpu().numpy(), "D_loss : ", d_loss.data.cpu().numpy())
     plot_generator()
         
         
-torch.save(G.state_dict(), './trained/LSGAN/sd_gen')
+torch.save(G_ema.model.state_dict(), './trained/LSGAN/sd_gen')
+torch.save(G.state_dict(), './trained/LSGAN/sd_gen_raw')
 torch.save(D.state_dict(), './trained/LSGAN/sd_dis')
 
-torch.save(G, './trained/LSGAN/gen.pt')
+torch.save(G_ema.model, './trained/LSGAN/gen.pt')
 torch.save(D, './trained/LSGAN/dis.pt')
\ No newline at end of file
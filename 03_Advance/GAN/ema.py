@@ -0,0 +1,113 @@
+import copy
+
+# Exponential moving average of generator weights.
+# Shared by the PyTorch / tf_keras scripts of 03_Advance/GAN and 04_Extra/Image_Translation, they add this folder to sys.path.
+# Sample and export with `ema.model`, the raw generator is only used for training.
+
+class EMA:
+    """
+    shadow = shadow + (1 - decay) * (weights - shadow), every `every` steps.
+
+    With `every` > 1 the decay is raised to the power of `every`, so the averaging horizon in steps stays the same.
+    `warmup` uses min(decay, (1 + n) / (10 + n)) for the n-th update, so early shadows do not stick to the random init.
+    """
+    def __init__(self, model, decay=0.999, every=1, warmup=True):
+        self.decay = decay
+        self.every = every
+        self.warmup = warmup
+        self.num_steps = 0
+        self.num_updates = 0
+        self.model = self.copy(model)
+        self.source = model
+
+    def current_decay(self):
+        decay = self.decay
+        if self.warmup:
+            decay = min(decay, (1 + self.num_updates) / (10 + self.num_updates))
+        return decay ** self.every
+
+    def step(self):
+        self.num_steps += 1
+        if self.num_steps % self.every:
+            return
+        self.update(1 - self.current_decay())
+        self.num_updates += 1
+
+    def state_dict(self):
+        return {"decay": self.decay, "every": self.every, "warmup": self.warmup,
+                "num_steps": self.num_steps, "num_updates": self.num_updates, "weights": self.get_weights()}
+
+    def load_state_dict(self, state):
+        for key in ["decay", "every", "warmup", "num_steps", "num_updates"]:
+            setattr(self, key, state[key])
+        self.set_weights(state["weights"])
+
+    # Framework specific
+    def copy(self, model):
+        raise NotImplementedError
+
+    def update(self, weight):
+        raise NotImplementedError
+
+    def get_weights(self):
+        raise NotImplementedError
+
+    def set_weights(self, weights):
+        raise NotImplementedError
+
+class TorchEMA(EMA):
+    # The shadow module lives on the device of the generator, parameters are updated in place with one fused foreach lerp
+    def copy(self, model):
+        shadow = copy.deepcopy(model).eval().requires_grad_(False)
+        self.shadow_params = list(shadow.parameters())
+        self.source_params = list(model.parameters())
+        self.shadow_buffers = list(shadow.buffers())
+        self.source_buffers = list(model.buffers())
+        return shadow
+
+    def update(self, weight):
+        import torch
+        with torch.no_grad():
+            torch._foreach_lerp_(self.shadow_params, self.source_params, weight)
+            # BatchNorm statistics are copied, not averaged
+            for shadow, source in zip(self.shadow_buffers, self.source_buffers):
+                shadow.copy_(source)
+
+    def get_weights(self):
+        return self.model.state_dict()
+
+    def set_weights(self, weights):
+        self.model.load_state_dict(weights)
+
+class TFEMA(EMA):
+    # Trainable variables are averaged in one tf.function call, the other variables (BatchNorm statistics) are copied
+    def copy(self, model):
+        import tensorflow as tf
+        shadow = tf.keras.models.clone_model(model)
+        shadow.set_weights(model.get_weights())
+        shadow.trainable = False
+
+        trainable = set(id(w) for w in model.trainable_weights)
+        pairs = list(zip(shadow.weights, model.weights))
+        averaged = [(s, w) for s, w in pairs if id(w) in trainable]
+        copied = [(s, w) for s, w in pairs if id(w) not in trainable]
+
+        @tf.function
+        def update(weight):
+            for s, w in averaged:
+                s.assign_add(weight * (w - s))
+            for s, w in copied:
+                s.assign(w)
+        self.update_fn = update
+        return shadow
+
+    def update(self, weight):
+        import tensorflow as tf
+        # A tensor argument, so the tf.function is not traced again for every new decay
+        self.update_fn(tf.constant(weight, tf.float32))
+
+    def get_weights(self):
+        return self.model.get_weights()
+
+    def set_weights(self, weights):
+        self.model.set_weights(weights)
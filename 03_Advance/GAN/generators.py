@@ -0,0 +1,89 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+# Generators of the PyTorch GAN scripts, to load their checkpoints (sd_gen) outside of the training scripts.
+# The state dicts are the same as the ones of the scripts.
+
+class MLP_Generator(nn.Module):
+    # Generator of Vanilla_GAN and LSGAN
+    def __init__(self):
+        super(MLP_Generator, self).__init__()
+        self.linear1 = nn.Linear(100, 256)
+        self.bnorm1 = nn.BatchNorm1d(256)
+        self.linear2 = nn.Linear(256, 512)
+        self.bnorm2 = nn.BatchNorm1d(512)
+        self.linear3 = nn.Linear(512, 784)
+
+    def forward(self, X):
+        X = F.leaky_relu(self.bnorm1(self.linear1(X)), negative_slope=0.03)
+        X = F.leaky_relu(self.bnorm2(self.linear2(X)), negative_slope=0.03)
+        X = torch.sigmoid(self.linear3(X))
+        return X
+
+class DC_Generator(nn.Module):
+    def __init__(self, n_z=100, d=128):
+        super(DC_Generator, self).__init__()
+        self.deconv1 = nn.ConvTranspose2d(n_z, d*8, 4, 1, 0)
+        self.bnorm1 = nn.BatchNorm2d(d*8)
+
+        self.deconv2 = nn.ConvTranspose2d(d*8, d*4, 4, 2, 1)
+        self.bnorm2 = nn.BatchNorm2d(d*4)
+
+        self.deconv3 = nn.ConvTranspose2d(d*4, d*2, 4, 2, 1)
+        self.bnorm3 = nn.BatchNorm2d(d*2)
+
+        self.deconv4 = nn.ConvTranspose2d(d*2, 1, 4, 2, 1)
+
+    def forward(self, X):
+        X = F.relu(self.bnorm1(self.deconv1(X)))
+        X = F.relu(self.bnorm2(self.deconv2(X)))
+        X = F.relu(self.bnorm3(self.deconv3(X)))
+        X = torch.tanh(self.deconv4(X))
+        return X
+
+class One_Hot_Condition(nn.Module):
+    # Class ids -> one-hot channels broadcast to (size, size), built on the device of the ids
+    def __init__(self, n_c=10, size=1):
+        super(One_Hot_Condition, self).__init__()
+        self.n_c = n_c
+        self.size = size
+
+    def forward(self, c):
+        C = F.one_hot(c, self.n_c).to(torch.float)[:, :, None, None]
+        return C.expand(-1, -1, self.size, self.size)
+
+class C_Generator(nn.Module):
+    def __init__(self, n_z=100, n_c=10, d=128):
+        super(C_Generator, self).__init__()
+
+        self.deconv1_z = nn.ConvTranspose2d(n_z, d*4, 4, 1, 0)
+        self.bn1_z = nn.BatchNorm2d(d*4)
+        self.condition = One_Hot_Condition(n_c, 1)
+        self.deconv1_c = nn.ConvTranspose2d(n_c, d*4, 4, 1, 0)
+        self.bn1_c = nn.BatchNorm2d(d*4)
+
+        self.deconv2 = nn.ConvTranspose2d(d*8, d*4, 4, 2, 1)
+        self.bn2 = nn.BatchNorm2d(d*4)
+        self.deconv3 = nn.ConvTranspose2d(d*4, d*2, 4, 2, 1)
+        self.bn3 = nn.BatchNorm2d(d*2)
+        self.deconv4 = nn.ConvTranspose2d(d*2, 1, 4, 2, 1)
+
+    def forward(self, X, c):
+        # c : class ids
+        X = F.leaky_relu(self.bn1_z(self.deconv1_z(X)), negative_slope=0.03)
+        C = F.leaky_relu(self.bn1_c(self.deconv1_c(self.condition(c))), negative_slope=0.03)
+        X = torch.cat([X, C], 1)
+        X = F.leaky_relu(self.bn2(self.deconv2(X)), negative_slope=0.003)
+        X = F.leaky_relu(self.bn3(self.deconv3(X)), negative_slope=0.003)
+        X = torch.sigmoid(self.deconv4(X))
+        return X
+
+# latent_shape : shape of one latent vector, img_shape : (C, H, W) of one sample,
+# value_range : output range of the last activation, num_classes : None for unconditional generators
+generator_specs = {
+    "Vanilla_GAN": {"model": MLP_Generator, "latent_shape": (100,), "img_shape": (1, 28, 28), "value_range": (0., 1.), "num_classes": None},
+    "LSGAN": {"model": MLP_Generator, "latent_shape": (100,), "img_shape": (1, 28, 28), "value_range": (0., 1.), "num_classes": None},
+    "DCGAN": {"model": DC_Generator, "latent_shape": (100, 1, 1), "img_shape": (1, 32, 32), "value_range": (-1., 1.), "num_classes": None},
+    "CGAN": {"model": C_Generator, "latent_shape": (100, 1, 1), "img_shape": (1, 32, 32), "value_range": (0., 1.), "num_classes": 10},
+}
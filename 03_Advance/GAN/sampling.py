@@ -0,0 +1,244 @@
+import os
+import queue
+import argparse
+import threading
+
+import numpy as np
+import torch
+from torch import nn
+from matplotlib import image as mpimg
+
+from generators import generator_specs
+
+# Large-batch sampling of the PyTorch GAN generators.
+# `generate` is the batched stream of uint8 samples, for the sample dumps and for the evaluation metrics.
+# ShardWriter / GridWriter write its batches on a background thread.
+#
+# python sampling.py --MODEL CGAN --CHECKPOINT ./CGAN/trained/Conditional_GAN/sd_gen --NUM_SAMPLES 50000
+
+def load_generator(model, checkpoint, device="cpu"):
+    # `checkpoint` is a state dict (sd_gen) or a whole module (gen.pt, needs the classes of the training script)
+    state = torch.load(checkpoint, map_location=device, weights_only=False)
+    if isinstance(state, nn.Module):
+        return state.to(device).eval()
+    generator = generator_specs[model]["model"]()
+    generator.load_state_dict(state)
+    return generator.to(device).eval()
+
+def to_uint8(images, value_range=(0., 1.)):
+    # float images in `value_range` -> uint8 in [0, 255], on the device of the images
+    low, high = value_range
+    images = (images.float() - low) * (255. / (high - low))
+    return images.clamp_(0, 255).round_().to(torch.uint8)
+
+def generate(generator, num_samples, batch_size=1000, latent_shape=(100,), img_shape=None,
+             value_range=(0., 1.), num_classes=None, bf16=False, seed=0, device=None):
+    """
+    Yields (images, labels) batches, `num_samples` in total.
+    images : uint8 (B, C, H, W) tensor on the device, labels : class ids on the device (None for unconditional generators)
+
+    The latents are drawn on the device with a seeded torch.Generator, so the same seed gives the same samples.
+    The classes cycle in order, every class gets the same number of samples.
+    With `bf16`, the forward runs under autocast in bfloat16, the conversion to uint8 is done in float32.
+    """
+    device = torch.device(device) if device is not None else next(generator.parameters()).device
+    rng = torch.Generator(device=device).manual_seed(seed)
+    generator.eval()
+
+    for start in range(0, num_samples, batch_size):
+        size = min(batch_size, num_samples - start)
+        with torch.inference_mode():
+            z = torch.randn((size,) + tuple(latent_shape), generator=rng, device=device)
+            labels = None
+            if num_classes is None:
+                inputs = [z]
+            else:
+                labels = torch.arange(start, start + size, device=device) % num_classes
+                inputs = [z, labels]
+
+            with torch.autocast(device.type, dtype=torch.bfloat16, enabled=bf16):
+                images = generator(*inputs)
+            if img_shape is not None:
+                images = images.view((size,) + tuple(img_shape))
+            images = to_uint8(images, value_range)
+        yield images, labels
+
+def make_grid(images, nrow=10, padding=2):
+    # uint8 (N, H, W, C) -> one (rows * (H + padding) + padding, nrow * (W + padding) + padding, C) image
+    N, H, W, C = images.shape
+    rows = -(-N // nrow)
+    grid = np.zeros((rows * (H + padding) + padding, nrow * (W + padding) + padding, C), dtype=np.uint8)
+    for i in range(N):
+        top = (i // nrow) * (H + padding) + padding
+        left = (i % nrow) * (W + padding) + padding
+        grid[top:top+H, left:left+W] = images[i]
+    return grid
+
+class BackgroundWriter:
+    """
+    Writes the batches of `generate` on a background thread, so the device keeps sampling while the files are written.
+
+    `put` only queues the device tensors. The copy to the host and the compression run on the writer thread,
+    `put` blocks when `max_pending` batches are waiting. Errors of the writer thread are raised by the next `put` or by `close`.
+    """
+    def __init__(self, path, max_pending=4):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.num_images = 0
+        self.error = None
+        self.queue = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                images, labels = item
+                images = images.permute(0, 2, 3, 1).cpu().numpy()
+                labels = None if labels is None else labels.cpu().numpy()
+                self.write(images, labels)
+                self.num_images += len(images)
+            except Exception as e:
+                self.error = e
+
+    def put(self, images, labels=None):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((images, labels))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is None:
+            self.flush()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Format specific
+    def write(self, images, labels):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+class ShardWriter(BackgroundWriter):
+    # uint8 NHWC images (and labels) in compressed shard_XXXXX.npz files of `shard_size` images, read them back with `read_shards`
+    def __init__(self, path, shard_size=10000, max_pending=4):
+        self.shard_size = shard_size
+        self.num_shards = 0
+        self.images, self.labels = [], []
+        self.pending = 0
+        super(ShardWriter, self).__init__(path, max_pending)
+
+    def write(self, images, labels):
+        self.images.append(images)
+        if labels is not None:
+            self.labels.append(labels)
+        self.pending += len(images)
+        while self.pending >= self.shard_size:
+            self.write_shard(self.shard_size)
+
+    def flush(self):
+        if self.pending:
+            self.write_shard(self.pending)
+
+    def write_shard(self, size):
+        images = np.concatenate(self.images)
+        arrays = {"images": images[:size]}
+        self.images = [images[size:]]
+        if self.labels:
+            labels = np.concatenate(self.labels)
+            arrays["labels"] = labels[:size]
+            self.labels = [labels[size:]]
+        self.pending -= size
+
+        np.savez_compressed(os.path.join(self.path, f"shard_{self.num_shards:05d}.npz"), **arrays)
+        self.num_shards += 1
+
+class GridWriter(BackgroundWriter):
+    # Tiled grid_XXXXX.png images of `nrow` x `nrow` samples
+    def __init__(self, path, nrow=10, max_pending=4):
+        self.nrow = nrow
+        self.num_grids = 0
+        self.images = np.zeros((0,), dtype=np.uint8)
+        super(GridWriter, self).__init__(path, max_pending)
+
+    def write(self, images, labels):
+        self.images = images if len(self.images) == 0 else np.concatenate([self.images, images])
+        per_grid = self.nrow * self.nrow
+        while len(self.images) >= per_grid:
+            self.write_grid(self.images[:per_grid])
+            self.images = self.images[per_grid:]
+
+    def flush(self):
+        if len(self.images):
+            self.write_grid(self.images)
+
+    def write_grid(self, images):
+        grid = make_grid(images, self.nrow)
+        path = os.path.join(self.path, f"grid_{self.num_grids:05d}.png")
+        if grid.shape[-1] == 1:
+            mpimg.imsave(path, grid[..., 0], cmap="gray", vmin=0, vmax=255)
+        else:
+            mpimg.imsave(path, grid)
+        self.num_grids += 1
+
+def read_shards(path):
+    # Yields (images, labels) of the shards written by ShardWriter, labels is None for unconditional generators
+    for f in sorted(os.listdir(path)):
+        if f.startswith("shard_") and f.endswith(".npz"):
+            with np.load(os.path.join(path, f)) as shard:
+                yield shard["images"], shard["labels"] if "labels" in shard else None
+
+def sample_to_disk(generator, spec, writer, num_samples, batch_size=1000, bf16=False, seed=0):
+    with writer:
+        for images, labels in generate(generator, num_samples, batch_size, spec["latent_shape"], spec["img_shape"],
+                                       spec["value_range"], spec["num_classes"], bf16, seed):
+            writer.put(images, labels)
+    return writer.num_images
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="CGAN", type=str, help=f"{list(generator_specs.keys())}")
+    parser.add_argument("--CHECKPOINT", type=str, required=True, help="sd_gen of the training script")
+    parser.add_argument("--NUM_SAMPLES", default=50000, type=int, help="")
+    parser.add_argument("--BATCH_SIZE", default=1000, type=int, help="")
+    parser.add_argument("--BF16", action="store_true", help="bfloat16 autocast for the forward")
+    parser.add_argument("--FORMAT", default="shard", type=str, help="shard (compressed .npz) or grid (.png)")
+    parser.add_argument("--SHARD_SIZE", default=10000, type=int, help="")
+    parser.add_argument("--NROW", default=10, type=int, help="samples per row and column of a grid")
+    parser.add_argument("--SEED", default=0, type=int, help="")
+    parser.add_argument("--SAVE_PATH", default="./samples", type=str, help="")
+    args = parser.parse_args()
+
+    assert args.MODEL in generator_specs, f"Please use model in {list(generator_specs.keys())}"
+    assert args.FORMAT in ["shard", "grid"], "Please use format in ['shard', 'grid']"
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    generator = load_generator(args.MODEL, args.CHECKPOINT, device)
+    save_path = os.path.join(args.SAVE_PATH, args.MODEL)
+    if args.FORMAT == "shard":
+        writer = ShardWriter(save_path, args.SHARD_SIZE)
+    else:
+        writer = GridWriter(save_path, args.NROW)
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print(f"Samples : {args.NUM_SAMPLES} (batch {args.BATCH_SIZE}, bf16 {args.BF16})")
+    print(f"Format : {args.FORMAT}")
+    print(f"Save path : {save_path}")
+    print("===========================================\n")
+
+    num_images = sample_to_disk(generator, generator_specs[args.MODEL], writer, args.NUM_SAMPLES, args.BATCH_SIZE, args.BF16, args.SEED)
+    print(f"{num_images} samples written to {save_path}")
@@ -0,0 +1,57 @@
+# %%
+import time
+import argparse
+
+import cv2 as cv
+import numpy as np
+import torch
+
+from models import model_dict
+from tiling import TiledInference, open_image
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="UNet", type=str, help=f"{list(model_dict.keys())}")
+    parser.add_argument("--WEIGHTS", type=str, required=True, help="state_dict saved by the U-Net / Deconvnet script")
+    parser.add_argument("--NUM_CLASSES", default=2, type=int, help="")
+    parser.add_argument("--INPUT", type=str, required=True, help="image file, or (H, W, 3) uint8 .npy for memory-mapped input")
+    parser.add_argument("--OUTPUT", default="./mask.png", type=str, help=".png, or .npy for a memory-mapped label map")
+    parser.add_argument("--TILE_SIZE", default=None, type=int, help="default : tile size of the model")
+    parser.add_argument("--OVERLAP", default=64, type=int, help="")
+    parser.add_argument("--BATCH_SIZE", default=8, type=int, help="")
+    parser.add_argument("--NUM_THREADS", default=8, type=int, help="tile reading threads")
+    parser.add_argument("--BF16", action="store_true", help="bfloat16 autocast for the forward")
+    parser.add_argument("--MEMMAP_DIR", default=None, type=str, help="keep the logits accumulator on disk")
+    args = parser.parse_args()
+
+    assert args.MODEL in model_dict, f"Please use model in {list(model_dict.keys())}"
+    spec = model_dict[args.MODEL]
+    tile_size = args.TILE_SIZE or spec["tile_size"]
+    assert not spec["fixed"] or tile_size == spec["tile_size"], f"{args.MODEL} only runs on {spec['tile_size']} tiles"
+    assert tile_size % spec["multiple"] == 0, f"Tile size has to be a multiple of {spec['multiple']}"
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    model = spec["model"](input_channel=3, num_classes=args.NUM_CLASSES)
+    model.load_state_dict(torch.load(args.WEIGHTS, map_location="cpu"))
+    model = model.to(device)
+
+    image = open_image(args.INPUT)
+    engine = TiledInference(model, args.NUM_CLASSES, tile_size, args.OVERLAP, args.BATCH_SIZE,
+                            args.NUM_THREADS, args.BF16, args.MEMMAP_DIR, device)
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print(f"Image : {args.INPUT} {image.shape[:2]}")
+    print(f"Tiles : {len(engine.tiles(*image.shape[:2]))} x {tile_size}px (overlap {args.OVERLAP})")
+    print("===========================================\n")
+
+    start = time.perf_counter()
+    if args.OUTPUT.endswith(".npy"):
+        labels = engine(image, args.OUTPUT)
+        labels.flush()
+    else:
+        labels = engine(image)
+        # Binary masks are saved as 0 / 255
+        scale = 255 if args.NUM_CLASSES == 2 else 1
+        cv.imwrite(args.OUTPUT, labels * np.uint8(scale))
+    print(f"Done in {time.perf_counter() - start:.2f}s, saved to {args.OUTPUT}")
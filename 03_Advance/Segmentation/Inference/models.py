@@ -0,0 +1,9 @@
+import sys
+sys.path.append("../../..") # the networks are the model_zoo/ definitions of the 03_Advance/Segmentation scripts
+from model_zoo.pytorch.unet import Build_UNet
+from model_zoo.pytorch.deconvnet import Build_DeconvNet
+
+model_dict = {
+    "UNet": {"model": Build_UNet, "tile_size": 512, "multiple": 16, "fixed": False},
+    "DeconvNet": {"model": Build_DeconvNet, "tile_size": 224, "multiple": 32, "fixed": True},
+}
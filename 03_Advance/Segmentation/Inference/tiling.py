@@ -0,0 +1,130 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+import torch
+
+def open_image(path):
+    # (H, W, 3) uint8 RGB. A .npy file is memory-mapped, so gigapixel images are never loaded at once
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    img = cv.imread(path, cv.IMREAD_COLOR)
+    return cv.cvtColor(img, cv.COLOR_BGR2RGB)
+
+def allocate(shape, dtype, path=None):
+    # Zero-filled array, memory-mapped to `path` if given
+    if path is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+def tile_starts(length, tile, stride):
+    # Tile origins along one axis, the last tile is moved back so it ends at the border
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    return starts + [length - tile]
+
+def cosine_window(tile, overlap):
+    """
+    (tile, tile) blending weights : 1 in the center, raised cosine over the `overlap` border pixels.
+    The weights never reach 0, so the image borders (covered by a single tile) keep their logits.
+    """
+    w = np.ones(tile, dtype=np.float32)
+    if overlap > 0:
+        ramp = 0.5 - 0.5 * np.cos(np.pi * (np.arange(overlap) + 0.5) / overlap)
+        w[:overlap] = ramp
+        w[-overlap:] = ramp[::-1]
+    return np.outer(w, w)
+
+class TiledInference:
+    """
+    Sliding-window inference of a segmentation network on images larger than the memory allows.
+
+    - The image is split into `tile_size` tiles overlapping by `overlap` pixels, tiles are run in batches of `batch_size`.
+    - Tiles are sliced (from a memory-mapped .npy if needed) and converted on a thread pool, one batch ahead of the network.
+    - Logits are weighted with a cosine window and added into a preallocated (C, H, W) accumulator,
+      memory-mapped under `memmap_dir` for gigapixel images. The labels are the argmax of the accumulator, computed by rows.
+    """
+    def __init__(self, model, num_classes, tile_size=512, overlap=64, batch_size=8,
+                 num_threads=8, bf16=False, memmap_dir=None, device="cpu"):
+        assert 2 * overlap < tile_size, "overlap has to be smaller than half of the tile"
+        self.model = model.eval()
+        self.num_classes = num_classes
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.bf16 = bf16
+        self.memmap_dir = memmap_dir
+        self.device = torch.device(device)
+        self.window = cosine_window(tile_size, overlap)
+        self.window_t = torch.from_numpy(self.window).to(self.device)
+
+    def tiles(self, H, W):
+        stride = self.tile_size - self.overlap
+        return [(y, x) for y in tile_starts(H, self.tile_size, stride) for x in tile_starts(W, self.tile_size, stride)]
+
+    def read_tile(self, image, y, x):
+        # float (3, tile, tile) in [0, 1] as in the training scripts, images smaller than a tile are reflect-padded
+        tile = np.asarray(image[y:y+self.tile_size, x:x+self.tile_size], dtype=np.float32) / 255.
+        h, w = tile.shape[:2]
+        if h < self.tile_size or w < self.tile_size:
+            tile = np.pad(tile, ((0, self.tile_size - h), (0, self.tile_size - w), (0, 0)), mode="reflect")
+        return tile.transpose(2, 0, 1)
+
+    def forward(self, tiles):
+        x = torch.from_numpy(np.stack(tiles)).to(self.device, non_blocking=True)
+        with torch.inference_mode():
+            with torch.autocast(self.device.type, dtype=torch.bfloat16, enabled=self.bf16):
+                logits = self.model(x)
+            return (logits.float() * self.window_t).cpu().numpy()
+
+    def accumulate(self, image):
+        H, W = image.shape[:2]
+        path = lambda name: None if self.memmap_dir is None else os.path.join(self.memmap_dir, name)
+        if self.memmap_dir is not None:
+            os.makedirs(self.memmap_dir, exist_ok=True)
+        acc = allocate((self.num_classes, H, W), np.float32, path("logits.npy"))
+        weight = allocate((H, W), np.float32, path("weight.npy"))
+
+        grid = self.tiles(H, W)
+        batches = [grid[i:i+self.batch_size] for i in range(0, len(grid), self.batch_size)]
+        with ThreadPoolExecutor(self.num_threads) as pool:
+            read = lambda batch: [pool.submit(self.read_tile, image, y, x) for y, x in batch]
+            futures = read(batches[0])
+            for i, batch in enumerate(batches):
+                tiles = [f.result() for f in futures]
+                if i + 1 < len(batches):
+                    futures = read(batches[i + 1])
+
+                logits = self.forward(tiles)
+                for (y, x), tile_logits in zip(batch, logits):
+                    h, w = min(self.tile_size, H - y), min(self.tile_size, W - x)
+                    acc[:, y:y+h, x:x+w] += tile_logits[:, :h, :w]
+                    weight[y:y+h, x:x+w] += self.window[:h, :w]
+        return acc, weight
+
+    def __call__(self, image, output=None):
+        """
+        image : (H, W, 3) uint8 array (or memmap), output : None or a path of a .npy label map
+        Returns the (H, W) uint8 label map (memory-mapped when `output` is given).
+        """
+        acc, _ = self.accumulate(image)
+        H, W = image.shape[:2]
+        labels = allocate((H, W), np.uint8, output)
+        # The weights are positive, so the argmax of the weighted sum is the argmax of the blended logits
+        for y in range(0, H, self.tile_size):
+            labels[y:y+self.tile_size] = np.argmax(acc[:, y:y+self.tile_size], axis=0)
+        return labels
+
+    def probabilities(self, image, output=None):
+        # (C, H, W) float32 softmax of the blended logits, memory-mapped when `output` is given
+        acc, weight = self.accumulate(image)
+        H, W = image.shape[:2]
+        probs = allocate((self.num_classes, H, W), np.float32, output)
+        for y in range(0, H, self.tile_size):
+            logits = acc[:, y:y+self.tile_size] / weight[y:y+self.tile_size]
+            logits = np.exp(logits - logits.max(0, keepdims=True))
+            probs[:, y:y+self.tile_size] = logits / logits.sum(0, keepdims=True)
+        return probs
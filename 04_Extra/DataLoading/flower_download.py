@@ -1,48 +1,23 @@
-import io
 import os
 import sys
-import time
 import shutil
-import tarfile
-import urllib.request
 
-# For progressbar
-def report(url):
-    file_name = url.split("/")[-1]
-    def progbar(blocknr, blocksize, size):
-        current = blocknr*blocksize
-        sys.stdout.write(f"\rDownloading {file_name} ...... {100.0*current/size:.2f}%")
-    return progbar
+sys.path.append("../..") # utils/fetch.py : shared dataset cache, resumable and checksummed downloads
+from utils.fetch import fetch_and_extract
 
 SAVE_PATH = "./data"
 URL = "https://storage.googleapis.com/download.tensorflow.org/example_images/flower_photos.tgz"
-file_name = URL.split("/")[-1]
-file_path = os.path.join(SAVE_PATH, file_name)
 
-# Data Download
-if not os.path.exists(file_path):
-    print("In progress to download data ....")
-    urllib.request.urlretrieve(URL, file_path, report(URL))
-    print()
-else:
-    print("Already downloaded !")
-
-# Data Extract
-if not os.path.exists(os.path.join(SAVE_PATH, "flower_photos")):
-    print("In progress to extract data ....")
-    tar = tarfile.open(file_path)
-    members = tar.getmembers()
-    for idx, member in enumerate(members):
-        tar.extract(member=member, path=SAVE_PATH)
-        sys.stdout.write(f"\rExtracting {file_name} ...... {100.0*(idx+1)/len(members):.2f}%")
-    print()
-else:
-    print("Already extracted !")
+# Data Download & Extract (extracted while it downloads, only once)
+fetch_and_extract(URL, SAVE_PATH)
 
 # Data Split
+flower_photos_path = os.path.join(SAVE_PATH, "flower_photos")
+if os.path.exists(os.path.join(flower_photos_path, "train")):
+    print("Already split !")
+    sys.exit()
 print("In progress to split data ....")
 
-flower_photos_path = os.path.join(SAVE_PATH, "flower_photos")
 for i, (root, subdir, files) in enumerate(os.walk(flower_photos_path)):
     
     if not i: continue
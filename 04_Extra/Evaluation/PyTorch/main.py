@@ -0,0 +1,140 @@
+# %%
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+import torch
+from torch.nn import functional as F
+from torchvision import datasets
+
+from models import extractor_dict
+from metrics import *
+
+sys.path.append("../../../03_Advance/GAN")
+from sampling import generate, load_generator, read_shards
+from generators import generator_specs
+
+IMG_FORMAT = ["jpg", "jpeg", "tif", "tiff", "bmp", "png"]
+
+def resize(images, resolution):
+    # uint8 (N, C, H, W) -> uint8 (N, C, resolution, resolution)
+    if images.shape[-2:] == (resolution, resolution):
+        return images
+    images = F.interpolate(images.float(), size=(resolution, resolution), mode="bilinear", align_corners=False, antialias=True)
+    return images.round_().clamp_(0, 255).to(torch.uint8)
+
+def mnist_batches(path, resolution, batch_size):
+    # MNIST train images, resized to the resolution of the GAN scripts
+    data = datasets.MNIST(root=path, train=True, download=True).data
+    for start in range(0, len(data), batch_size):
+        yield resize(data[start:start+batch_size, None], resolution)
+
+def list_images(path):
+    return sorted([f for f in os.listdir(path) if f.split(".")[-1].lower() in IMG_FORMAT])
+
+def folder_batches(path, resolution, batch_size, num_threads=8):
+    # Images of a folder (real images, or the results of the image translation models), decoded one batch ahead on a thread pool
+    files = list_images(path)
+
+    def decode(f):
+        img = cv.imread(os.path.join(path, f), cv.IMREAD_COLOR)
+        img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+        return cv.resize(img, (resolution, resolution), interpolation=cv.INTER_AREA)
+
+    with ThreadPoolExecutor(num_threads) as pool:
+        futures = [pool.submit(decode, f) for f in files[:batch_size]]
+        for start in range(0, len(files), batch_size):
+            batch = np.stack([f.result() for f in futures])
+            futures = [pool.submit(decode, f) for f in files[start+batch_size:start+2*batch_size]]
+            yield torch.from_numpy(batch).permute(0, 3, 1, 2)
+
+def shard_batches(path, resolution, batch_size):
+    # Shards written by 03_Advance/GAN/sampling.py, resized like the reference images
+    for images, _ in read_shards(path):
+        images = torch.from_numpy(images).permute(0, 3, 1, 2)
+        for start in range(0, len(images), batch_size):
+            yield resize(images[start:start+batch_size], resolution)
+
+def generator_batches(model, checkpoint, resolution, num_samples, batch_size, bf16, seed, device):
+    # Generated images, resized like the reference images (Vanilla_GAN / LSGAN generate 28px images)
+    spec = generator_specs[model]
+    generator = load_generator(model, checkpoint, device)
+    for images, _ in generate(generator, num_samples, batch_size, spec["latent_shape"], spec["img_shape"],
+                              spec["value_range"], spec["num_classes"], bf16, seed):
+        yield resize(images, resolution)
+
+def evaluate(args, device):
+    extractor = extractor_dict[args.EXTRACTOR]["model"](args.WEIGHTS, args.NUM_CLASSES).to(device)
+    input_size = extractor_dict[args.EXTRACTOR]["input_size"]
+    extractor_name = args.EXTRACTOR
+    if args.WEIGHTS is not None:
+        extractor_name += "-" + os.path.splitext(os.path.basename(args.WEIGHTS))[0]
+
+    if args.REFERENCE == "mnist":
+        reference_name = "mnist"
+        reference_source = ["mnist", "train"]
+        reference = lambda: mnist_batches(args.DATA_PATH, args.RESOLUTION, args.BATCH_SIZE)
+    else:
+        reference_name = os.path.basename(os.path.normpath(args.REFERENCE))
+        reference_source = [os.path.abspath(args.REFERENCE)] + list_images(args.REFERENCE)
+        reference = lambda: folder_batches(args.REFERENCE, args.RESOLUTION, args.BATCH_SIZE, args.NUM_THREADS)
+    real = reference_stats(reference_name, reference_source, reference, extractor, extractor_name, input_size, args.RESOLUTION,
+                           args.CACHE_DIR, args.KID_SAMPLES, args.BF16, device)
+
+    if args.SAMPLES is None:
+        fakes = generator_batches(args.MODEL, args.CHECKPOINT, args.RESOLUTION, args.NUM_SAMPLES, args.BATCH_SIZE, args.BF16, args.SEED, device)
+    elif any(f.startswith("shard_") for f in os.listdir(args.SAMPLES)):
+        fakes = shard_batches(args.SAMPLES, args.RESOLUTION, args.BATCH_SIZE)
+    else:
+        fakes = folder_batches(args.SAMPLES, args.RESOLUTION, args.BATCH_SIZE, args.NUM_THREADS)
+    stats = accumulate(extractor, fakes, input_size, FeatureStats(args.KID_SAMPLES, args.IS_SPLITS, args.SEED), args.BF16, device)
+    fake = stats.state_dict()
+
+    results = {"FID": frechet_distance(real["mu"], real["sigma"], fake["mu"], fake["sigma"]),
+               "KID": kernel_inception_distance(real["features"], fake["features"], seed=args.SEED),
+               "IS": stats.inception_score()}
+    return results, real["n"], fake["n"]
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--EXTRACTOR", default="InceptionV3", type=str, help=f"{list(extractor_dict.keys())}")
+    parser.add_argument("--WEIGHTS", default=None, type=str, help="state_dict of the 03_Advance/CNN/InceptionV3 PyTorch script")
+    parser.add_argument("--NUM_CLASSES", default=5, type=int, help="classes of WEIGHTS")
+    parser.add_argument("--REFERENCE", default="mnist", type=str, help="mnist or a folder of real images")
+    parser.add_argument("--DATA_PATH", default="../../../data", type=str, help="root of the MNIST dataset")
+    parser.add_argument("--RESOLUTION", default=32, type=int, help="resolution of the real and generated images")
+    parser.add_argument("--CACHE_DIR", default="./stats", type=str, help="reference statistics cache")
+    parser.add_argument("--SAMPLES", default=None, type=str, help="shards of sampling.py or a folder of images, instead of MODEL / CHECKPOINT")
+    parser.add_argument("--MODEL", default="CGAN", type=str, help=f"{list(generator_specs.keys())}")
+    parser.add_argument("--CHECKPOINT", default=None, type=str, help="sd_gen of the GAN script")
+    parser.add_argument("--NUM_SAMPLES", default=50000, type=int, help="")
+    parser.add_argument("--BATCH_SIZE", default=250, type=int, help="")
+    parser.add_argument("--KID_SAMPLES", default=10000, type=int, help="features kept for KID")
+    parser.add_argument("--IS_SPLITS", default=10, type=int, help="")
+    parser.add_argument("--NUM_THREADS", default=8, type=int, help="image decoding threads")
+    parser.add_argument("--BF16", action="store_true", help="bfloat16 autocast for the forwards")
+    parser.add_argument("--SEED", default=0, type=int, help="")
+    args = parser.parse_args()
+
+    assert args.EXTRACTOR in extractor_dict, f"Please use extractor in {list(extractor_dict.keys())}"
+    assert args.SAMPLES is not None or args.CHECKPOINT is not None, "Please set SAMPLES or CHECKPOINT"
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
+    print("\n================ Options ================")
+    print(f"Extractor : {args.EXTRACTOR} ({args.WEIGHTS})")
+    print(f"Reference : {args.REFERENCE} ({args.RESOLUTION}px)")
+    print(f"Samples : {args.SAMPLES if args.SAMPLES is not None else args.CHECKPOINT}")
+    print("===========================================\n")
+
+    results, num_real, num_fake = evaluate(args, device)
+
+    print("==================== Result ====================")
+    print(f"Real images : {num_real}, Generated images : {num_fake}")
+    print(f"FID : {results['FID']:.4f}")
+    print(f"KID : {results['KID'][0]:.6f} ± {results['KID'][1]:.6f}")
+    print(f"IS : {results['IS'][0]:.4f} ± {results['IS'][1]:.4f}")
+    print("================================================\n")
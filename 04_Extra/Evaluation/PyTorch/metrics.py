@@ -0,0 +1,153 @@
+import os
+import hashlib
+
+import numpy as np
+import torch
+from torch.nn import functional as F
+
+def to_input(images, input_size):
+    # uint8 or float [0, 1] (N, C, H, W) -> float (N, 3, input_size, input_size) in [0, 1], gray images are repeated to 3 channels
+    if images.dtype == torch.uint8:
+        images = images.float().div_(255.)
+    if images.shape[1] == 1:
+        images = images.expand(-1, 3, -1, -1)
+    if images.shape[-2:] != (input_size, input_size):
+        images = F.interpolate(images, size=(input_size, input_size), mode="bilinear", align_corners=False, antialias=True)
+    return images.clamp(0, 1)
+
+class FeatureStats:
+    """
+    Streaming statistics of the extractor outputs, the features of 50k images never have to be held at once.
+
+    - FID : sum and sum of outer products of the features, in float64 on the device.
+    - KID : a uniform random subset of `kid_samples` features (reservoir sampling), on the host.
+    - IS : per split, sum of p(y|x) and sum of p(y|x) log p(y|x). Images are dealt to the splits in turn.
+    """
+    def __init__(self, kid_samples=10000, is_splits=10, seed=0):
+        self.n = 0
+        self.kid_samples = kid_samples
+        self.is_splits = is_splits
+        self.rng = np.random.default_rng(seed)
+        self.sum = None
+        self.split_prob = None
+
+    def allocate(self, features, logits):
+        # Buffers are allocated at the first batch, on the device of the extractor outputs
+        D, device = features.shape[1], features.device
+        self.sum = torch.zeros(D, dtype=torch.float64, device=device)
+        self.outer = torch.zeros(D, D, dtype=torch.float64, device=device)
+        self.features = np.zeros((0, D), dtype=np.float32)
+        if logits is not None and self.is_splits:
+            self.split_count = torch.zeros(self.is_splits, dtype=torch.float64, device=device)
+            self.split_prob = torch.zeros(self.is_splits, logits.shape[1], dtype=torch.float64, device=device)
+            self.split_plogp = torch.zeros(self.is_splits, dtype=torch.float64, device=device)
+
+    def update(self, features, logits=None):
+        if self.sum is None:
+            self.allocate(features, logits)
+        B = len(features)
+        f = features.double()
+        self.sum += f.sum(0)
+        self.outer.addmm_(f.T, f)
+        self.reservoir(features)
+
+        if logits is not None and self.split_prob is not None:
+            split = torch.arange(self.n, self.n + B, device=features.device) % self.is_splits
+            log_p = F.log_softmax(logits.double(), dim=1)
+            p = log_p.exp()
+            self.split_count.index_add_(0, split, torch.ones(B, dtype=torch.float64, device=features.device))
+            self.split_prob.index_add_(0, split, p)
+            self.split_plogp.index_add_(0, split, (p * log_p).sum(1))
+        self.n += B
+
+    def reservoir(self, features):
+        if self.kid_samples == 0:
+            return
+        features = features.float().cpu().numpy()
+        num_fill = min(len(features), self.kid_samples - len(self.features))
+        if num_fill:
+            self.features = np.concatenate([self.features, features[:num_fill]])
+
+        # The i-th feature replaces a random slot with probability kid_samples / (i + 1)
+        index = np.arange(self.n + num_fill, self.n + len(features))
+        slots = (self.rng.random(len(index)) * (index + 1)).astype(np.int64)
+        keep = slots < self.kid_samples
+        self.features[slots[keep]] = features[num_fill:][keep]
+
+    def state_dict(self):
+        mu = self.sum / self.n
+        sigma = (self.outer - self.n * torch.outer(mu, mu)) / (self.n - 1)
+        return {"n": self.n, "mu": mu.cpu().numpy(), "sigma": sigma.cpu().numpy(), "features": self.features}
+
+    def inception_score(self):
+        # IS = exp(E_x[KL(p(y|x) || p(y))]), E_x[p(y|x) log p(y)] = p(y) log p(y) so only the sums are needed
+        count = self.split_count.cpu().numpy()
+        p_y = self.split_prob.cpu().numpy() / count[:, None]
+        kl = self.split_plogp.cpu().numpy() / count - (p_y * np.log(np.clip(p_y, 1e-12, None))).sum(1)
+        scores = np.exp(kl)
+        return float(scores.mean()), float(scores.std())
+
+def save_stats(stats, path):
+    np.savez(path, **stats)
+
+def load_stats(path):
+    with np.load(path) as f:
+        return {"n": int(f["n"]), "mu": f["mu"], "sigma": f["sigma"], "features": f["features"]}
+
+def frechet_distance(mu1, sigma1, mu2, sigma2):
+    """
+    |mu1 - mu2|^2 + Tr(S1) + Tr(S2) - 2 Tr(sqrt(S1 S2))
+
+    sqrt(S1) S2 sqrt(S1) is symmetric and has the same eigenvalues as S1 S2,
+    so the trace of the square root only needs two symmetric eigendecompositions instead of a general sqrtm.
+    """
+    w, V = np.linalg.eigh(sigma1)
+    sqrt_sigma1 = (V * np.sqrt(np.clip(w, 0, None))) @ V.T
+    eig = np.linalg.eigvalsh(sqrt_sigma1 @ sigma2 @ sqrt_sigma1)
+    tr_covmean = np.sqrt(np.clip(eig, 0, None)).sum()
+
+    diff = mu1 - mu2
+    return float(diff @ diff + np.trace(sigma1) + np.trace(sigma2) - 2 * tr_covmean)
+
+def kernel_inception_distance(features1, features2, num_subsets=100, subset_size=1000, seed=0):
+    # Unbiased MMD^2 with the kernel (x.y / d + 1)^3, mean and std over random subsets
+    rng = np.random.default_rng(seed)
+    d = features1.shape[1]
+    m = min(subset_size, len(features1), len(features2))
+    mmds = []
+    for _ in range(num_subsets):
+        x = features1[rng.choice(len(features1), m, replace=False)].astype(np.float64)
+        y = features2[rng.choice(len(features2), m, replace=False)].astype(np.float64)
+        a = (x @ x.T / d + 1) ** 3 + (y @ y.T / d + 1) ** 3
+        b = (x @ y.T / d + 1) ** 3
+        mmds.append(((a.sum() - np.diag(a).sum()) / (m - 1) - b.sum() * 2 / m) / m)
+    return float(np.mean(mmds)), float(np.std(mmds))
+
+def accumulate(extractor, batches, input_size, stats, bf16=False, device="cpu"):
+    # batches : iterable of uint8 / float (N, C, H, W) tensors, one forward per batch under inference_mode
+    device = torch.device(device)
+    for images in batches:
+        with torch.inference_mode():
+            x = to_input(images.to(device, non_blocking=True), input_size)
+            with torch.autocast(device.type, dtype=torch.bfloat16, enabled=bf16):
+                features, logits = extractor(x)
+            stats.update(features.float(), logits.float())
+    return stats
+
+def reference_stats(name, source, batches, extractor, extractor_name, input_size, resolution, cache_dir,
+                    kid_samples=10000, bf16=False, device="cpu"):
+    """
+    Statistics of a real dataset, cached as {cache_dir}/{name}_{source hash}_{resolution}_{extractor_name}_kid{kid_samples}.npz.
+    `source` identifies the dataset (e.g. its full path and sorted file list), so datasets with the same folder name don't share a cache.
+    `batches` is a function returning the image batches, only called when there is no cache.
+    """
+    digest = hashlib.sha1("\n".join(source).encode()).hexdigest()[:12]
+    path = os.path.join(cache_dir, f"{name}_{digest}_{resolution}_{extractor_name}_kid{kid_samples}.npz")
+    if os.path.exists(path):
+        return load_stats(path)
+
+    stats = FeatureStats(kid_samples=kid_samples, is_splits=0)
+    stats = accumulate(extractor, batches(), input_size, stats, bf16, device).state_dict()
+    os.makedirs(cache_dir, exist_ok=True)
+    save_stats(stats, path)
+    return stats
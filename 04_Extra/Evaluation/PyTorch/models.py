@@ -0,0 +1,74 @@
+import torch
+from torch import nn
+
+import sys
+sys.path.append("../../..") # Build_InceptionV3 is the model_zoo/ definition of the 03_Advance/CNN/InceptionV3 script
+from model_zoo.pytorch.inception_v3 import Build_InceptionV3, fuse_inception_modules
+
+# Feature extractors on the 03_Advance/CNN/InceptionV3 network (state_dicts saved by that script load as they are)
+# and on the torchvision ImageNet InceptionV3.
+
+# =================
+# Feature extractors
+# =================
+class Inception_Features(nn.Module):
+    """
+    Build_InceptionV3 -> (2048 pooled features, logits), the auxiliary classifier is skipped.
+    Inputs are float (N, 3, H, W) in [0, 1], as in the training script (imgs / 255.).
+    The inception modules are fused (fuse_inception_modules), the extractor is only used for inference.
+    """
+    def __init__(self, net):
+        super(Inception_Features, self).__init__()
+        self.net = fuse_inception_modules(net.eval())
+
+    def forward(self, x):
+        net = self.net
+        x = net.Stem(x)
+        x = net.inception1(x)
+        x = net.inception2(x)
+        x = net.inception3(x)
+        x = net.grid_reduction1(x)
+
+        x = net.inception4(x)
+        x = net.inception5(x)
+        x = net.inception6(x)
+        x = net.inception7(x)
+
+        x = net.grid_reduction2(x)
+        x = net.inception8(x)
+        x = net.inception9(x)
+
+        # Classifier : AdaptiveAvgPool2d, Flatten, Dropout, Linear
+        features = net.Classifier[1](net.Classifier[0](x))
+        return features, net.Classifier[3](features)
+
+class Torchvision_Inception_Features(nn.Module):
+    # torchvision inception_v3 with ImageNet weights, inputs are float (N, 3, H, W) in [0, 1]
+    def __init__(self):
+        super(Torchvision_Inception_Features, self).__init__()
+        from torchvision.models import inception_v3, Inception_V3_Weights
+        net = inception_v3(weights=Inception_V3_Weights.IMAGENET1K_V1)
+        self.fc = net.fc
+        net.fc = nn.Identity()
+        self.net = net.eval()
+        self.register_buffer("mean", torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1))
+        self.register_buffer("std", torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1))
+
+    def forward(self, x):
+        features = self.net((x - self.mean) / self.std)
+        return features, self.fc(features)
+
+def build_inception_features(weights=None, num_classes=5):
+    net = Build_InceptionV3(input_channel=3, num_classes=num_classes)
+    if weights is not None:
+        net.load_state_dict(torch.load(weights, map_location="cpu"))
+    return Inception_Features(net)
+
+def build_torchvision_features(weights=None, num_classes=None):
+    return Torchvision_Inception_Features()
+
+# input_size : resolution the images are resized to before the extractor
+extractor_dict = {
+    "InceptionV3": {"model": build_inception_features, "input_size": 299},
+    "torchvision_InceptionV3": {"model": build_torchvision_features, "input_size": 299},
+}
@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+import onnxruntime as ort
+
+import torch
+
+# Inputs of each model without the batch axis.
+# `ids` : integer inputs (class ids, one per sample) and their number of classes
+# `spatial` : height / width of the inputs (and of the outputs for dense prediction) are exported as dynamic axes
+# `step` : the spatial size must be a multiple of it, used for the parity check on another size (32 by default)
+# `dense` : output keeps the spatial axes of the input
+# `same_size` : dense output of the input height / width, so they share the axis names (SRCNN's valid convolutions give H-12 x W-12)
+export_specs = {
+    "ResNet50": {"inputs": {"input": (3, 224, 224)}, "spatial": True, "dense": False},
+    "ResNet101": {"inputs": {"input": (3, 224, 224)}, "spatial": True, "dense": False},
+    "VGG16": {"inputs": {"input": (3, 224, 224)}, "spatial": True, "dense": False},
+    "VGG19": {"inputs": {"input": (3, 224, 224)}, "spatial": True, "dense": False},
+    "UNet": {"inputs": {"input": (3, 224, 224)}, "spatial": True, "dense": True, "same_size": True},
+    # fc_block uses a 7x7 valid conv, so DeconvNet only works on 224 x 224 inputs
+    "DeconvNet": {"inputs": {"input": (3, 224, 224)}, "spatial": False, "dense": True},
+    "SRCNN": {"inputs": {"input": (3, 64, 64)}, "spatial": True, "dense": True, "same_size": False},
+    "VDSR": {"inputs": {"input": (3, 64, 64)}, "spatial": True, "dense": True, "same_size": True},
+    "Vanilla_GAN": {"inputs": {"z": (100,)}, "spatial": False, "dense": False},
+    "LSGAN": {"inputs": {"z": (100,)}, "spatial": False, "dense": False},
+    "DCGAN": {"inputs": {"z": (100, 1, 1)}, "spatial": False, "dense": False},
+    "CGAN": {"inputs": {"z": (100, 1, 1)}, "ids": {"c": 10}, "spatial": False, "dense": False},
+    # ResnetGenerator with 2 downsamplings, the Encoder-Decoder halves the size 8 times
+    "CycleGAN": {"inputs": {"input": (3, 256, 256)}, "spatial": True, "step": 4, "dense": True, "same_size": True},
+    "Pix2Pix": {"inputs": {"input": (3, 256, 256)}, "spatial": True, "step": 256, "dense": True, "same_size": True}
+}
+
+def dummy_inputs(spec, batch_size=1, offset=0):
+    # `offset` is added to height / width of the spatial models to check the dynamic axes
+    inputs = {}
+    for name, shape in spec["inputs"].items():
+        if spec["spatial"]:
+            shape = shape[:-2] + (shape[-2] + offset, shape[-1] + offset)
+        inputs[name] = torch.rand(batch_size, *shape)
+    for name, num_classes in spec.get("ids", {}).items():
+        inputs[name] = torch.randint(0, num_classes, (batch_size,))
+    return inputs
+
+def dynamic_axes(spec):
+    axes = {}
+    for name in spec["inputs"]:
+        axes[name] = {0: "batch", 2: "height", 3: "width"} if spec["spatial"] else {0: "batch"}
+    for name in spec.get("ids", {}):
+        axes[name] = {0: "batch"}
+    axes["output"] = {0: "batch"}
+    if spec["spatial"] and spec["dense"]:
+        axes["output"].update({2: "height", 3: "width"} if spec["same_size"] else {2: "out_height", 3: "out_width"})
+    return axes
+
+def export_onnx(net, spec, path, opset=17):
+    net.eval()
+    inputs = dummy_inputs(spec)
+    with torch.no_grad():
+        torch.onnx.export(net, tuple(inputs.values()), path,
+                        input_names=list(inputs.keys()), output_names=["output"],
+                        dynamic_axes=dynamic_axes(spec), opset_version=opset, do_constant_folding=True)
+    return path
+
+class ORTRunner:
+    # Runs an exported graph through ONNX Runtime's CPU provider
+    def __init__(self, path, num_threads=0):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        # Class ids stay integers
+        self.input_dtypes = [np.int64 if i.type == "tensor(int64)" else np.float32 for i in self.session.get_inputs()]
+
+    def __call__(self, *inputs):
+        feed = {name: np.ascontiguousarray(x, dtype=dtype) for name, dtype, x in zip(self.input_names, self.input_dtypes, inputs)}
+        return self.session.run(None, feed)[0]
+
+def check_parity(net, runner, spec, rtol=1e-3, atol=1e-4):
+    # Compare eager PyTorch and ONNX Runtime on the export shape and on other batch / spatial sizes
+    net.eval()
+    cases = [(1, 0), (4, 0)] + ([(2, max(32, spec.get("step", 32)))] if spec["spatial"] else [])
+    max_diff = 0.
+    for batch_size, offset in cases:
+        inputs = list(dummy_inputs(spec, batch_size, offset).values())
+        with torch.no_grad():
+            expected = net(*inputs).numpy()
+        output = runner(*[x.numpy() for x in inputs])
+        np.testing.assert_allclose(output, expected, rtol=rtol, atol=atol,
+                                   err_msg=f"Mismatch at batch {batch_size}, spatial offset {offset}")
+        max_diff = max(max_diff, float(np.abs(output - expected).max()))
+    return max_diff
+
+def measure_latency(fn, inputs, warmup=5, iters=30):
+    times = []
+    for _ in range(warmup):
+        fn(*inputs)
+    for _ in range(iters):
+        start = time.perf_counter()
+        fn(*inputs)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50)
+
+def print_report(results):
+    print("\n==================== Report ====================")
+    print(f"{'':>12} | {'Max diff':>9} | {'Torch(ms)':>9} | {'ORT(ms)':>8} | {'Speedup':>7}")
+    for name, r in results.items():
+        print(f"{name:>12} | {r['diff']:9.2e} | {r['torch']:9.2f} | {r['ort']:8.2f} | {r['torch']/r['ort']:6.2f}x")
+    print("================================================\n")
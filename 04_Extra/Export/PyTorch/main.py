@@ -0,0 +1,69 @@
+# %%
+import os
+import argparse
+
+import torch
+
+from models import *
+from export import *
+
+# Models which take `input_channel` and `num_classes`
+CLASS_MODELS = ["ResNet50", "ResNet101", "VGG16", "VGG19", "UNet", "DeconvNet"]
+
+def build(name, args):
+    if name in CLASS_MODELS:
+        net = model_dict[name](input_channel=3, num_classes=args.NUM_CLASSES)
+    else:
+        net = model_dict[name]()
+    if args.WEIGHTS:
+        state = torch.load(args.WEIGHTS, map_location="cpu")
+        # Checkpoints holding several models (cyclegan) : path of the state_dict inside, e.g. G_AtoB_ema/weights
+        for key in filter(None, args.WEIGHTS_KEY.split("/")):
+            state = state[key]
+        net.load_state_dict(state)
+    return net.eval()
+
+def main(args):
+    torch.set_num_threads(args.NUM_THREADS)
+    os.makedirs(args.SAVE_PATH, exist_ok=True)
+    names = list(model_dict.keys()) if args.MODEL == "all" else [args.MODEL]
+
+    results = {}
+    for name in names:
+        spec = export_specs[name]
+        net = build(name, args)
+
+        path = export_onnx(net, spec, os.path.join(args.SAVE_PATH, f"{name}.onnx"), args.OPSET)
+        runner = ORTRunner(path, args.NUM_THREADS)
+        diff = check_parity(net, runner, spec)
+        print(f"{name} : exported to {path}, max abs diff {diff:.2e}")
+
+        inputs = list(dummy_inputs(spec, args.BATCH_SIZE).values())
+        with torch.inference_mode():
+            torch_ms = measure_latency(net, inputs)
+        ort_ms = measure_latency(runner, [x.numpy() for x in inputs])
+        results[name] = {"diff": diff, "torch": torch_ms, "ort": ort_ms}
+    print_report(results)
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="all", type=str, help="'all' exports every model")
+    parser.add_argument("--WEIGHTS", default="", type=str, help="state_dict of the trained model, only with a single model")
+    parser.add_argument("--WEIGHTS_KEY", default="", type=str, help="'/' separated keys of the state_dict inside the checkpoint")
+    parser.add_argument("--NUM_CLASSES", default=5, type=int, help="")
+    parser.add_argument("--OPSET", default=17, type=int, help="")
+    parser.add_argument("--BATCH_SIZE", default=1, type=int, help="batch size of the latency measurement")
+    parser.add_argument("--NUM_THREADS", default=4, type=int, help="")
+    parser.add_argument("--SAVE_PATH", default="./onnx", type=str, help="")
+
+    args = parser.parse_args()
+
+    assert args.MODEL == "all" or args.MODEL in model_dict, f"Please use model in {['all'] + list(model_dict.keys())}"
+    assert not (args.WEIGHTS and args.MODEL == "all"), "Weights can only be given with a single model"
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print(f"Opset : {args.OPSET}")
+    print("===========================================\n")
+
+    main(args)
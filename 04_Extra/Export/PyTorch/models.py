@@ -0,0 +1,308 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+from functools import partial
+
+import sys
+sys.path.append("../../..") # ResNet / VGGNet / U-Net / DeconvNet are the model_zoo/ definitions of the 03_Advance scripts
+from model_zoo.pytorch.resnet import Residual_block, build_resnet
+from model_zoo.pytorch.vgg import build_vgg
+from model_zoo.pytorch.unet import Build_UNet
+from model_zoo.pytorch.deconvnet import Build_DeconvNet
+
+# Same network definitions as 04_Extra/Super_Resolution/{SRCNN, VDSR}, 03_Advance/GAN/{Vanilla_GAN, DCGAN, CGAN} and
+# 04_Extra/Image_Translation/{cyclegan, pix2pix} PyTorch scripts, ResNet / VGGNet / U-Net / DeconvNet are imported from model_zoo/.
+# Layer names are kept, so the state_dicts saved by those scripts can be loaded as they are.
+
+# =================
+# Super Resolution
+# =================
+def basic_conv(in_ch, out_ch, ksize=3, pad='same'):
+    assert ksize%2 == 1, "Please use ksize of odd number."
+
+    if pad=='same':
+        pad = (ksize-1)//2
+    elif pad=='valid':
+        pad = 0
+
+    return nn.Conv2d(in_ch, out_ch, kernel_size=ksize, stride=1, padding=pad)
+
+class SRCNN(nn.Module):
+    def __init__(self):
+        super(SRCNN, self).__init__()
+        layers = [
+            basic_conv(3, 64, 9, 'valid'), 
+            nn.ReLU(inplace=True), 
+            basic_conv(64, 32, 1, 'valid'), 
+            nn.ReLU(inplace=True),
+            basic_conv(32, 3, 5, 'valid')]
+        self.net = nn.Sequential(*layers)
+
+    def forward(self, x):
+        out = self.net(x)
+        return out
+
+class VDSR(nn.Module):
+    def __init__(self):
+        super(VDSR, self).__init__()
+
+        layers = [
+            basic_conv(3, 64, 3, 'same'), 
+            nn.ReLU(inplace=True)]
+
+        for _ in range(1, 19):
+            layers.append(basic_conv(64, 64, 3, 'same'))
+            layers.append(nn.ReLU(inplace=True))
+
+        layers.append(basic_conv(64, 3, 3, 'same'))
+
+        self.net = nn.Sequential(*layers)
+
+    def forward(self, x):
+        out = self.net(x)
+        return out + x
+
+# =================
+# GAN Generators
+# =================
+class MLP_Generator(nn.Module):
+    # Generator of Vanilla_GAN and LSGAN
+    def __init__(self):
+        super(MLP_Generator, self).__init__()
+        self.linear1 = nn.Linear(100, 256)
+        self.bnorm1 = nn.BatchNorm1d(256)
+        self.linear2 = nn.Linear(256, 512)
+        self.bnorm2 = nn.BatchNorm1d(512)
+        self.linear3 = nn.Linear(512, 784)
+        
+    def forward(self, X):
+        X = F.leaky_relu(self.bnorm1(self.linear1(X)), negative_slope=0.03)
+        X = F.leaky_relu(self.bnorm2(self.linear2(X)), negative_slope=0.03)
+        X = torch.sigmoid(self.linear3(X))
+        return X
+
+class DC_Generator(nn.Module):
+    def __init__(self, n_z=100, d=128):
+        super(DC_Generator, self).__init__() 
+        self.deconv1 = nn.ConvTranspose2d(n_z, d*8, 4, 1, 0)
+        self.bnorm1 = nn.BatchNorm2d(d*8)
+        
+        self.deconv2 = nn.ConvTranspose2d(d*8, d*4, 4, 2, 1)
+        self.bnorm2 = nn.BatchNorm2d(d*4)
+        
+        self.deconv3 = nn.ConvTranspose2d(d*4, d*2, 4, 2, 1)
+        self.bnorm3 = nn.BatchNorm2d(d*2)
+        
+        self.deconv4 = nn.ConvTranspose2d(d*2, 1, 4, 2, 1)
+                    
+    def forward(self, X):
+        X = F.relu(self.bnorm1(self.deconv1(X)))
+        X = F.relu(self.bnorm2(self.deconv2(X)))
+        X = F.relu(self.bnorm3(self.deconv3(X)))
+        X = torch.tanh(self.deconv4(X))
+        return X
+
+class One_Hot_Condition(nn.Module):
+    # Class ids -> one-hot channels broadcast to (size, size), as in the CGAN script (no parameters)
+    def __init__(self, n_c=10, size=1):
+        super(One_Hot_Condition, self).__init__()
+        self.n_c = n_c
+        self.size = size
+
+    def forward(self, c):
+        C = F.one_hot(c, self.n_c).to(torch.float)[:, :, None, None]
+        return C.expand(-1, -1, self.size, self.size)
+
+class C_Generator(nn.Module):
+    def __init__(self, n_z=100, n_c=10, d=128):
+        super(C_Generator, self).__init__()
+        
+        self.deconv1_z = nn.ConvTranspose2d(n_z, d*4, 4, 1, 0)
+        self.bn1_z = nn.BatchNorm2d(d*4)
+        self.condition = One_Hot_Condition(n_c, 1)
+        self.deconv1_c = nn.ConvTranspose2d(n_c, d*4, 4, 1, 0)
+        self.bn1_c = nn.BatchNorm2d(d*4)
+        
+        self.deconv2 = nn.ConvTranspose2d(d*8, d*4, 4, 2, 1)
+        self.bn2 = nn.BatchNorm2d(d*4)
+        self.deconv3 = nn.ConvTranspose2d(d*4, d*2, 4, 2, 1)
+        self.bn3 = nn.BatchNorm2d(d*2)
+        self.deconv4 = nn.ConvTranspose2d(d*2, 1, 4, 2, 1)
+                    
+    def forward(self, X, c):
+        # c : class ids, the one-hot encoding is part of the exported graph
+        X = F.leaky_relu(self.bn1_z(self.deconv1_z(X)), negative_slope=0.03)
+        C = F.leaky_relu(self.bn1_c(self.deconv1_c(self.condition(c))), negative_slope=0.03)
+        X = torch.cat([X, C], 1)
+        X = F.leaky_relu(self.bn2(self.deconv2(X)), negative_slope=0.003)
+        X = F.leaky_relu(self.bn3(self.deconv3(X)), negative_slope=0.003)
+        X = torch.sigmoid(self.deconv4(X))
+        return X
+
+# =================
+# Image Translation Generators
+# =================
+class NormLayer(nn.Module):
+    def __init__(self, features, norm_type='IN'):
+        super(NormLayer, self).__init__()
+        
+        if norm_type == "BN":
+            self.norm = nn.BatchNorm2d(features, affine=True, track_running_stats=True)
+        elif norm_type == "IN":
+            self.norm = nn.InstanceNorm2d(features, affine=False, track_running_stats=False)
+        elif norm_type == "None":
+            self.norm = nn.Identity()
+        else:
+            raise ValueError(f"Please input 'norm_type', ['BN', 'IN', 'None']")
+
+    def forward(self, x):
+        x = self.norm(x)
+        return x
+
+class ResidualBlock(nn.Module):
+    def __init__(self, features, norm_type):
+        super(ResidualBlock, self).__init__()
+        layers = []
+        layers.append(nn.ReflectionPad2d(1))
+        layers.append(nn.Conv2d(features, features, kernel_size=3))
+        layers.append(NormLayer(features, norm_type))
+        layers.append(nn.ReLU(True))
+
+        layers.append(nn.ReflectionPad2d(1))
+        layers.append(nn.Conv2d(features, features, kernel_size=3))
+        layers.append(NormLayer(features, norm_type))
+
+        self.block = nn.Sequential(*layers)
+
+    def forward(self, x):
+        out = x + self.block(x)
+        return out
+
+class Cycle_Generator(nn.Module):
+    # `Generator` of the cyclegan PyTorch script
+    def __init__(self, in_channels, out_channels, features, norm_type, n_downsampling, n_blocks):
+        super(Cycle_Generator, self).__init__()
+        
+        layers = [
+            nn.ReflectionPad2d(3), 
+            nn.Conv2d(in_channels, features, kernel_size=7, padding=0),
+            NormLayer(features, norm_type),
+            nn.ReLU(True)
+        ]
+
+        # Downsampling
+        for i in range(n_downsampling):
+            multiply = 2 ** i
+            prev_channels = features * multiply
+            new_channels = prev_channels * 2
+            layers.append(nn.Conv2d(prev_channels, new_channels, kernel_size=3, stride=2, padding=1))
+            layers.append(NormLayer(new_channels, norm_type))
+            layers.append(nn.ReLU(True))
+        
+        # Residual BlockS
+        multiply = 2 ** n_downsampling
+        curr_channels = features * multiply
+        for i in range(n_blocks):
+            layers.append(ResidualBlock(curr_channels, norm_type))
+        
+        # Upsampling
+        for i in range(n_downsampling):
+            prev_channels = features * (2 ** (n_downsampling - i))
+            curr_channels = int(prev_channels /2)
+            layers.append(nn.ConvTranspose2d(prev_channels, curr_channels, 
+                                             kernel_size=3, stride=2, padding=1, 
+                                             output_padding=1))
+            layers.append(NormLayer(curr_channels, norm_type))
+            layers.append(nn.ReLU(True))
+        
+        layers.append(nn.ReflectionPad2d(3))
+        layers.append(nn.Conv2d(features, out_channels, kernel_size=7, padding=0))
+        layers.append(nn.Tanh())
+
+        self.model = nn.Sequential(*layers)
+
+    def forward(self, x):
+        x = self.model(x)
+        return x
+
+class Encoding_Block(nn.Module):
+    def __init__(self, in_channel=3, output_channel=32, ksize=4, strides=2, padding=1, use_act=True, use_bn=True):
+        super(Encoding_Block, self).__init__()
+        
+        layer_list = []
+        if use_act:
+            layer_list.append(nn.LeakyReLU(0.2))
+        layer_list.append(nn.Conv2d(in_channel, output_channel, ksize, strides, padding))
+        if use_bn:
+            layer_list.append(nn.BatchNorm2d(output_channel))
+        
+        self.module = nn.Sequential(*layer_list)
+
+    def forward(self, x):
+        return self.module(x)
+
+class Decoding_Block(nn.Module):
+    def __init__(self, in_channel=3, output_channel=32, ksize=4, strides=2, padding=1, use_bn=True):
+        super(Decoding_Block, self).__init__()
+
+        layer_list = []
+        layer_list.append(nn.ReLU())
+        layer_list.append(nn.ConvTranspose2d(in_channel, output_channel, ksize, strides, padding))
+        if use_bn:
+            layer_list.append(nn.BatchNorm2d(output_channel))
+        
+        self.module = nn.Sequential(*layer_list)
+
+    def forward(self, x):
+        return self.module(x)
+
+class Generator_Encoder_Decoder(nn.Module):
+    # Generator of the pix2pix PyTorch script
+    def __init__(self, A_channel=3, B_channel=3, num_features=64):
+        super(Generator_Encoder_Decoder, self).__init__()
+        layer_list = []
+
+        layer_list.append(Encoding_Block(A_channel, num_features, use_act=False, use_bn=False))
+        prev_features = num_features
+        
+        for i in range(1, 7):
+            output_channel = min(num_features * (2**(i+1)), 512)
+            layer_list.append(Encoding_Block(prev_features, output_channel))
+            prev_features = output_channel
+        layer_list.append(Encoding_Block(prev_features, prev_features, use_bn=False))
+
+        for i in range(3):
+            layer_list.append(Decoding_Block(prev_features, prev_features))
+            layer_list.append(nn.Dropout(0.5))
+
+        for i in range(4):
+            sub = 1 if i==0 else 2
+            output_channel = prev_features // sub
+            layer_list.append(Decoding_Block(prev_features, output_channel))
+            prev_features = output_channel
+
+        layer_list.append(Decoding_Block(prev_features, B_channel, use_bn=False))
+        layer_list.append(nn.Tanh())
+
+        self.net = nn.Sequential(*layer_list)
+
+    def forward(self, x):
+        return self.net(x)
+
+model_dict = {
+    "ResNet50": partial(build_resnet, num_layer=50),
+    "ResNet101": partial(build_resnet, num_layer=101),
+    "VGG16": partial(build_vgg, num_layer=16),
+    "VGG19": partial(build_vgg, num_layer=19),
+    "UNet": Build_UNet,
+    "DeconvNet": Build_DeconvNet,
+    "SRCNN": SRCNN,
+    "VDSR": VDSR,
+    "Vanilla_GAN": MLP_Generator,
+    "LSGAN": MLP_Generator,
+    "DCGAN": DC_Generator,
+    "CGAN": C_Generator,
+    # Same arguments as the cyclegan / pix2pix PyTorch scripts
+    "CycleGAN": partial(Cycle_Generator, 3, 3, 64, "IN", 2, 3),
+    "Pix2Pix": partial(Generator_Encoder_Decoder, A_channel=3, B_channel=3, num_features=64)
+}
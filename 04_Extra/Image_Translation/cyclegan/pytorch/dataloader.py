@@ -1,49 +1,122 @@
-import random
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
 import torch
-from PIL import Image
+from torch import nn
 from torch.utils.data import Dataset, DataLoader
-import torchvision.transforms as transforms
 
-class BaseDataset(Dataset):
+IMG_FORMAT = ["jpg", "jpeg", "tif", "tiff", "bmp", "png"]
+
+def load_img(path, size):
+    # IMREAD_COLOR also turns gray / RGBA images into 3 channels
+    img = cv.imread(path, cv.IMREAD_COLOR)
+    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    img = cv.resize(img, (size, size))
+    return img
+
+def decode_domain(path, size, cache_path=None, num_threads=8):
+    """
+    Decodes every image of a domain once into a (N, size, size, 3) uint8 array.
+    With `cache_path`, the array is written to a .npy file and memory-mapped, so later runs skip the decoding.
+    """
+    if cache_path is not None and os.path.exists(cache_path):
+        return np.load(cache_path, mmap_mode="r")
+
+    file_list = sorted([f for f in os.listdir(path) if f.split(".")[-1].lower() in IMG_FORMAT])
+    if cache_path is not None:
+        images = np.lib.format.open_memmap(cache_path + ".tmp", mode="w+", dtype=np.uint8, shape=(len(file_list), size, size, 3))
+    else:
+        images = np.empty((len(file_list), size, size, 3), dtype=np.uint8)
+
+    def decode(i):
+        images[i] = load_img(os.path.join(path, file_list[i]), size)
 
-    def __init__(self, data_dir, transform, type):
-        self.data_dir = data_dir
+    # cv2 releases the GIL while decoding
+    with ThreadPoolExecutor(num_threads) as pool:
+        list(pool.map(decode, range(len(file_list))))
 
-        self.A_path = os.path.join(self.data_dir, f"{type}A")
-        self.A_list = os.listdir(self.A_path)
+    if cache_path is None:
+        return images
+    images.flush()
+    del images
+    os.replace(cache_path + ".tmp", cache_path)
+    return np.load(cache_path, mmap_mode="r")
 
-        self.B_path = os.path.join(self.data_dir, f"{type}B")
-        self.B_list = os.listdir(self.B_path)
+class UnpairedDataset(Dataset):
+    """
+    Both domains are decoded once (see `decode_domain`) and items are uint8 (3, H, W) tensors,
+    the conversion to float and the augmentation run on the whole batch with `BatchAugment`.
 
-        self.transform = transform
+    A / B pairs come from a seeded permutation of each domain, call `set_epoch` before every epoch to draw new pairs.
+    """
+    def __init__(self, data_dir, type, load_size, cache_dir=None, seed=0):
+        # The cache dir can be shared by datasets, the dataset name is part of the file name
+        name = os.path.basename(os.path.normpath(data_dir))
+        cache_path = lambda domain: None if cache_dir is None else os.path.join(cache_dir, f"{name}_{type}{domain}_{load_size}.npy")
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.A = decode_domain(os.path.join(data_dir, f"{type}A"), load_size, cache_path("A"))
+        self.B = decode_domain(os.path.join(data_dir, f"{type}B"), load_size, cache_path("B"))
+        self.seed = seed
+        self.set_epoch(0)
+
+    def set_epoch(self, epoch):
+        rng = np.random.default_rng([self.seed, epoch])
+        length = len(self)
+        # Every image of the smaller domain is used before any one is repeated
+        self.A_idx = np.concatenate([rng.permutation(len(self.A)) for _ in range(-(-length // len(self.A)))])[:length]
+        self.B_idx = np.concatenate([rng.permutation(len(self.B)) for _ in range(-(-length // len(self.B)))])[:length]
 
     def __len__(self):
-        return max(len(self.A_list), len(self.B_list))
+        return max(len(self.A), len(self.B))
 
     def __getitem__(self, idx):
-        A_idx = random.randint(0, len(self.A_list)-1)
-        B_idx = random.randint(0, len(self.B_list)-1)
+        A_image = torch.from_numpy(np.ascontiguousarray(self.A[self.A_idx[idx]])).permute(2, 0, 1)
+        B_image = torch.from_numpy(np.ascontiguousarray(self.B[self.B_idx[idx]])).permute(2, 0, 1)
+        return A_image, B_image
 
-        A_image = Image.open(os.path.join(self.A_path, self.A_list[A_idx]))
-        if len(A_image.getbands()) != 3:
-            A_image = A_image.convert("RGB")
+class BatchAugment(nn.Module):
+    """
+    uint8 (N, 3, load_size, load_size) -> float (N, 3, input_size, input_size) in [0, 1].
+    Random crop (jitter) and horizontal flip are drawn per image, but applied with single indexing ops on the batch.
+    Without training, the center is cropped and nothing is flipped.
+    """
+    def __init__(self, input_size, flip=True):
+        super(BatchAugment, self).__init__()
+        self.input_size = input_size
+        self.flip = flip
 
-        B_image = Image.open(os.path.join(self.B_path, self.B_list[B_idx]))
-        if len(B_image.getbands()) != 3:
-            B_image = B_image.convert("RGB")
-        
-        if self.transform:
-            A_image = self.transform(A_image)
-            B_image = self.transform(B_image)
+    def forward(self, x):
+        N, _, H, W = x.shape
+        size = self.input_size
+        if self.training:
+            top = torch.randint(0, H - size + 1, (N,), device=x.device)
+            left = torch.randint(0, W - size + 1, (N,), device=x.device)
+        else:
+            top = torch.full((N,), (H - size) // 2, device=x.device)
+            left = torch.full((N,), (W - size) // 2, device=x.device)
 
-        return A_image, B_image
+        rows = top[:, None] + torch.arange(size, device=x.device)
+        cols = left[:, None] + torch.arange(size, device=x.device)
+        if self.training and self.flip:
+            flip = torch.rand(N, device=x.device) < 0.5
+            cols = torch.where(flip[:, None], cols.flip(1), cols)
+
+        # (N, size, size, C) by advanced indexing, then back to NCHW
+        x = x.permute(0, 2, 3, 1)[torch.arange(N, device=x.device)[:, None, None], rows[:, :, None], cols[:, None, :]]
+        return x.permute(0, 3, 1, 2).float().div_(255.)
 
 def CustomDataloader(transform=None, **kwargs):
-    input_size = (kwargs['input_size'], kwargs['input_size'])
+    # `transform` is kept for compatibility, the augmentation is done on the device by BatchAugment
+    load_size = kwargs.get('load_size', kwargs['input_size'])
     dataloaders = {}
     for split in ['train', 'test']:
-        transform_list = [transforms.Resize(input_size), transforms.ToTensor()]
-        dl = DataLoader(BaseDataset(kwargs['path'], transforms.Compose(transform_list), split), batch_size=kwargs['batch_size'], num_workers=kwargs['num_workers'], drop_last=True)
+        dataset = UnpairedDataset(kwargs['path'], split, load_size, kwargs.get('cache_dir'), kwargs.get('seed', 0))
+        # The dataset shuffles itself with set_epoch, so the loader keeps the order
+        dl = DataLoader(dataset, batch_size=kwargs['batch_size'], num_workers=kwargs['num_workers'],
+                        drop_last=True, pin_memory=torch.cuda.is_available())
         dataloaders[split] = dl
-    return dataloaders
\ No newline at end of file
+    return dataloaders
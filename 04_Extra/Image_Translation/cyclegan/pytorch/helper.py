@@ -1,11 +1,121 @@
+import time
+from contextlib import contextmanager
+from collections import defaultdict
+
 import torch
 from torch import nn
 
+from image_pool import TorchImagePool
+
 def set_requires_grad(models:list, requires_grad:bool) -> None:
     for model in models:
         if model is not None:
             for param in model.parameters():
                 param.requires_grad = requires_grad
 
+class PhaseTimer:
+    """
+    Wall-clock time of each phase in ms, synchronizes CUDA around the phase so the kernels are counted.
+    """
+    def __init__(self, device, enabled:bool=True):
+        self.sync = enabled and torch.device(device).type == "cuda"
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self) -> None:
+        self.times = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    @contextmanager
+    def __call__(self, phase:str):
+        if not self.enabled:
+            yield
+            return
+        if self.sync:
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        yield
+        if self.sync:
+            torch.cuda.synchronize()
+        self.times[phase] += (time.perf_counter() - start) * 1000
+        self.counts[phase] += 1
+
+    def summary(self) -> dict:
+        return {phase: self.times[phase] / self.counts[phase] for phase in self.times}
+
+class CycleGANStep:
+    """
+    One training step of CycleGAN.
+
+    - Generators : single backward of both directions through one optimizer, discriminators are frozen.
+    - Discriminators : the fakes of the generator phase are reused (through the image pools), one optimizer.
+    - Identity forwards are skipped when `lambda_identity` is 0.
+    """
+    def __init__(self, G_AtoB, G_BtoA, D_A, D_B, optimizer_G, optimizer_D,
+                 lambda_cycle:float=10., lambda_identity:float=0.5, pool_size:int=50, timer:PhaseTimer=None, seed:int=0):
+        self.G_AtoB, self.G_BtoA = G_AtoB, G_BtoA
+        self.D_A, self.D_B = D_A, D_B
+        self.optimizer_G = optimizer_G
+        self.optimizer_D = optimizer_D
+        self.lambda_cycle = lambda_cycle
+        self.lambda_identity = lambda_identity
+        self.pool_A = TorchImagePool(pool_size, seed=seed)
+        self.pool_B = TorchImagePool(pool_size, seed=seed+1)
+        self.timer = timer if timer is not None else PhaseTimer("cpu", enabled=False)
+
+        self.GANLoss = nn.BCEWithLogitsLoss()
+        self.CycleLoss = nn.L1Loss()
+        self.IdentityLoss = nn.L1Loss()
+
+    def gan_loss(self, pred, target_is_real:bool) -> torch.Tensor:
+        target = torch.ones_like(pred) if target_is_real else torch.zeros_like(pred)
+        return self.GANLoss(pred, target)
+
+    def generator_step(self, a_img, b_img):
+        set_requires_grad([self.D_A, self.D_B], False)
+
+        fake_B = self.G_AtoB(a_img)
+        recon_A = self.G_BtoA(fake_B)
+        fake_A = self.G_BtoA(b_img)
+        recon_B = self.G_AtoB(fake_A)
+
+        loss_gan = self.gan_loss(self.D_B(fake_B), True) + self.gan_loss(self.D_A(fake_A), True)
+        loss_cycle = self.CycleLoss(recon_A, a_img) + self.CycleLoss(recon_B, b_img)
+        loss_G = loss_gan + self.lambda_cycle * loss_cycle
+
+        if self.lambda_identity > 0:
+            idt_A = self.G_AtoB(b_img)
+            idt_B = self.G_BtoA(a_img)
+            loss_identity = self.IdentityLoss(idt_A, b_img) + self.IdentityLoss(idt_B, a_img)
+            loss_G = loss_G + self.lambda_cycle * self.lambda_identity * loss_identity
+        else:
+            loss_identity = torch.zeros((), device=a_img.device)
+
+        self.optimizer_G.zero_grad(set_to_none=True)
+        loss_G.backward()
+        self.optimizer_G.step()
+
+        losses = {"G GAN Loss": loss_gan * 0.5, "Cycle Loss": loss_cycle * 0.5, "Identity Loss": loss_identity * 0.5}
+        return fake_A.detach(), fake_B.detach(), losses
+
+    def discriminator_step(self, a_img, b_img, fake_A, fake_B):
+        set_requires_grad([self.D_A, self.D_B], True)
+
+        fake_A = self.pool_A.query(fake_A)
+        fake_B = self.pool_B.query(fake_B)
+
+        loss_D_A = (self.gan_loss(self.D_A(a_img), True) + self.gan_loss(self.D_A(fake_A), False)) * 0.5
+        loss_D_B = (self.gan_loss(self.D_B(b_img), True) + self.gan_loss(self.D_B(fake_B), False)) * 0.5
+
+        self.optimizer_D.zero_grad(set_to_none=True)
+        (loss_D_A + loss_D_B).backward()
+        self.optimizer_D.step()
+
+        return {"D GAN Loss": (loss_D_A + loss_D_B) * 0.5}
 
-# def train_generator(models:list, ):
+    def __call__(self, a_img, b_img) -> dict:
+        with self.timer("generator"):
+            fake_A, fake_B, losses = self.generator_step(a_img, b_img)
+        with self.timer("discriminator"):
+            losses.update(self.discriminator_step(a_img, b_img, fake_A, fake_B))
+        return {k: v.detach() for k, v in losses.items()}
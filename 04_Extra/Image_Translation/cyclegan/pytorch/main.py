@@ -1,4 +1,6 @@
 # %%
+import os
+import sys
 import itertools
 import numpy as np
 from tqdm import tqdm
@@ -8,9 +10,13 @@ from matplotlib import pyplot as plt
 import torch
 from torch import nn
 
+sys.path.append("../..") # image_pool.py is shared with pix2pix and tf_keras
+sys.path.append("../../../../03_Advance/GAN") # ema.py is shared with the GAN scripts
+
 from dataloader import *
 from models import *
 from helper import *
+from ema import TorchEMA
 
 device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
 # %%
@@ -19,18 +25,28 @@ device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
 # =================
 PATH= "../../datasets/horse2zebra"
 INPUTSIZE= 256
+LOADSIZE= 256 # > INPUTSIZE for random crop jitter, e.g. 286
+CACHEDIR= "../../datasets/cache" # decoded uint8 arrays, None keeps them only in memory
 BATCHSIZE= 4
 NUMWORKER= 2
 
 EPOCHS = 5
 BATCH_SIZE = 16
 LR = 1e-5
+LAMBDA_CYCLE = 10
+LAMBDA_IDENTITY = 0.5 # identity forwards are skipped with 0
+POOL_SIZE = 50 # 0 uses only the fakes of the current batch
+EMA_DECAY = 0.999
+EMA_EVERY = 1
+CKPT_PATH = "./ckpt"
 
 # %%
 # =================
 # Data Processing
 # =================
-dataloaders = CustomDataloader(None, input_size=INPUTSIZE, path=PATH, batch_size=BATCHSIZE, num_workers=NUMWORKER)
+dataloaders = CustomDataloader(None, input_size=INPUTSIZE, load_size=LOADSIZE, path=PATH, cache_dir=CACHEDIR,
+                               batch_size=BATCHSIZE, num_workers=NUMWORKER)
+augment = BatchAugment(INPUTSIZE, flip=True).to(device)
 
 # %%
 # =================
@@ -38,18 +54,20 @@ dataloaders = CustomDataloader(None, input_size=INPUTSIZE, path=PATH, batch_size
 # =================
 G_AtoB = Generator(3, 3, 64, "IN", 2, 3).to(device)
 G_BtoA = Generator(3, 3, 64, "IN", 2, 3).to(device)
+# Shadow generators for the test phase and the checkpoints
+G_AtoB_ema = TorchEMA(G_AtoB, EMA_DECAY, EMA_EVERY)
+G_BtoA_ema = TorchEMA(G_BtoA, EMA_DECAY, EMA_EVERY)
 
 D_A = Discriminator(3, 64, "BN", 3).to(device)
 D_B = Discriminator(3, 64, "BN", 3).to(device)
 
-GANLoss = nn.BCEWithLogitsLoss()
-CycleLoss = torch.nn.L1Loss()
-IdentityLoss = torch.nn.L1Loss()
+# Both generators share one optimizer (single backward), as do both discriminators
+optimizer_G = torch.optim.Adam(itertools.chain(G_AtoB.parameters(), G_BtoA.parameters()), lr=LR)
+optimizer_D = torch.optim.Adam(itertools.chain(D_A.parameters(), D_B.parameters()), lr=LR)
 
-optimizer_G_AtoB = torch.optim.Adam(G_AtoB.parameters(), lr=LR)
-optimizer_G_BtoA = torch.optim.Adam(G_BtoA.parameters(), lr=LR)
-optimizer_D_A = torch.optim.Adam(D_A.parameters(), lr=LR)
-optimizer_D_B = torch.optim.Adam(D_B.parameters(), lr=LR)
+timer = PhaseTimer(device)
+train_step = CycleGANStep(G_AtoB, G_BtoA, D_A, D_B, optimizer_G, optimizer_D,
+                          LAMBDA_CYCLE, LAMBDA_IDENTITY, POOL_SIZE, timer)
 
 # %%
 # =================
@@ -66,74 +84,32 @@ for epoch in range(EPOCHS):
     with tqdm(total=len(dataloaders['train'])) as t:
 
         t.set_description(f"Training Phase")
-        for step, (a_img, b_img) in enumerate(dataloaders['train']):
-            a_img = a_img.to(device)
-            b_img = b_img.to(device)
-
-            fake_B = G_AtoB(a_img)
-            recon_A = G_BtoA(fake_B)
-            idt_A = G_AtoB(b_img)
-
-            fake_A = G_BtoA(b_img)
-            recon_B = G_AtoB(fake_A)
-            idt_B = G_BtoA(a_img)
-
-
-            # Training Discriminator
-            set_requires_grad([D_A, D_B], True)
-            real_B_pred = D_B(b_img)
-            real_B_label = torch.ones_like(real_B_pred)
-            loss_real_B = GANLoss(real_B_pred, real_B_label)
-            fake_B_pred = D_B(fake_B.detach())
-            fake_B_label = torch.zeros_like(fake_B_pred)
-            loss_fake_B = GANLoss(fake_B_pred, fake_B_label)
-            loss_D_B = (loss_real_B + loss_fake_B) * 0.5
-            optimizer_D_B.zero_grad()
-            loss_D_B.backward()
-            optimizer_D_B.step()
-
-            real_A_pred = D_A(b_img)
-            real_A_label = torch.ones_like(real_A_pred)
-            loss_real_A = GANLoss(real_A_pred, real_A_label)
-            fake_A_pred = D_A(fake_A.detach())
-            fake_A_label = torch.zeros_like(fake_A_pred)
-            loss_fake_A = GANLoss(fake_A_pred, fake_A_label)
-            loss_D_A = (loss_real_A + loss_fake_A) * 0.5
-            optimizer_D_A.zero_grad()
-            loss_D_A.backward()
-            optimizer_D_A.step()
-
-
-            # Training Generator
-            set_requires_grad([D_A, D_B], False)
-            
-            fake_A_pred = D_A(fake_A)
-            fake_A_label = torch.ones_like(fake_A_pred)
-            loss_fake_A = GANLoss(fake_A_pred, fake_A_label)
-            cycle_A = CycleLoss(a_img, recon_A)
-            identity_A = IdentityLoss(b_img, idt_A)
-            loss_A = loss_fake_A + 10*(cycle_A + 0.5*identity_A)
-
-            fake_B_pred = D_A(fake_B)
-            fake_B_label = torch.ones_like(fake_B_pred)
-            loss_fake_B = GANLoss(fake_B_pred, fake_B_label)
-            cycle_B = CycleLoss(b_img, recon_B)
-            identity_B = IdentityLoss(a_img, idt_B)
-            loss_B = loss_fake_B + 10*(cycle_B + 0.5*identity_B)
-
-            Gen_loss = loss_A + loss_B
-            
-            optimizer_G_AtoB.zero_grad()
-            optimizer_G_BtoA.zero_grad()
-            Gen_loss.backward()
-            optimizer_G_AtoB.step()
-            optimizer_G_BtoA.step()
-
-            t.set_postfix(
-                {"GAN Loss": (loss_D_A.item() + loss_D_B.item()) * 0.5, 
-                "Cycle Loss": (cycle_A.item() + cycle_B.item()) * 0.5, 
-                "Identity Loss": (identity_A.item() + identity_B.item()) * 0.5})
+        timer.reset()
+        augment.train()
+        dataloaders['train'].dataset.set_epoch(epoch)
+        train_iter = iter(dataloaders['train'])
+        for step in range(len(dataloaders['train'])):
+            with timer("data"):
+                a_img, b_img = next(train_iter)
+                a_img = augment(a_img.to(device, non_blocking=True))
+                b_img = augment(b_img.to(device, non_blocking=True))
+
+            losses = train_step(a_img, b_img)
+            G_AtoB_ema.step()
+            G_BtoA_ema.step()
+
+            t.set_postfix({k: v.item() for k, v in losses.items()})
             t.update()
+    print(" / ".join(f"{phase} {ms:.1f} ms" for phase, ms in timer.summary().items()))
+
+    # The pools are saved too, so a resumed run keeps feeding the discriminators the same history
+    os.makedirs(CKPT_PATH, exist_ok=True)
+    torch.save({"G_AtoB": G_AtoB.state_dict(), "G_BtoA": G_BtoA.state_dict(),
+                "G_AtoB_ema": G_AtoB_ema.state_dict(), "G_BtoA_ema": G_BtoA_ema.state_dict(),
+                "D_A": D_A.state_dict(), "D_B": D_B.state_dict(),
+                "optimizer_G": optimizer_G.state_dict(), "optimizer_D": optimizer_D.state_dict(),
+                "pool_A": train_step.pool_A.state_dict(), "pool_B": train_step.pool_B.state_dict()},
+                os.path.join(CKPT_PATH, f"{epoch:04d}_params.pt"))
 
             
         
@@ -146,15 +122,16 @@ for epoch in range(EPOCHS):
         t.set_description(f"Test Phase")
         with torch.no_grad():
 
+            augment.eval()
             for step, (a_img, b_img) in enumerate(dataloaders['test']):
-                a_img = a_img.to(device)
-                b_img = b_img.to(device)
+                a_img = augment(a_img.to(device))
+                b_img = augment(b_img.to(device))
 
-                fake_B = G_AtoB(a_img)
-                recon_A = G_BtoA(fake_B)
+                fake_B = G_AtoB_ema.model(a_img)
+                recon_A = G_BtoA_ema.model(fake_B)
 
-                fake_A = G_BtoA(b_img)
-                recon_B = G_AtoB(fake_A)
+                fake_A = G_BtoA_ema.model(b_img)
+                recon_B = G_AtoB_ema.model(fake_A)
                 
                 # =================
                 a_img = a_img.detach().cpu().numpy()
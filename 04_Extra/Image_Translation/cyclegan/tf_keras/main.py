@@ -1,3 +1,4 @@
+import sys
 import argparse
 
 # strategy = tf.distribute.MirroredStrategy()
@@ -11,7 +12,12 @@ def main(args):
     from tensorflow.keras import models, layers, losses, optimizers
     from tensorflow.keras.utils import Progbar
 
-    from models import *
+    from models import ResnetGenerator, NLayerDiscriminator
+
+    sys.path.append("../..") # image_pool.py is shared with pix2pix and PyTorch
+    sys.path.append("../../../../03_Advance/GAN") # ema.py is shared with the GAN scripts
+    from image_pool import TFImagePool
+    from ema import TFEMA
 
     tf.random.set_seed(42)
 
@@ -62,16 +68,20 @@ def main(args):
     B_channel = train_B.shape[-1]
     n_layers = 3
 
-    G_B2A = ResnetGenerator(input_size=args.IMG_SIZE, A_channel=A_channel, B_channel=B_channel, norm_type="IN", name="G_A")
-    D_A = NLayerDiscriminator(input_size=args.IMG_SIZE, A_channel=A_channel, B_channel=B_channel, n_layers=n_layers, name="D_A")
+    G_B2A = ResnetGenerator(input_size=args.IMG_SIZE, input_nc=B_channel, output_nc=A_channel, norm_type="IN", name="G_A")
+    D_A = NLayerDiscriminator(input_size=args.IMG_SIZE, input_channel=A_channel, n_layers=n_layers, name="D_A")
     
-    G_A2B = ResnetGenerator(input_size=args.IMG_SIZE, A_channel=A_channel, B_channel=B_channel, norm_type="IN", name="G_B")
-    D_B = NLayerDiscriminator(input_size=args.IMG_SIZE, A_channel=A_channel, B_channel=B_channel, n_layers=n_layers, name="D_B")
+    G_A2B = ResnetGenerator(input_size=args.IMG_SIZE, input_nc=A_channel, output_nc=B_channel, norm_type="IN", name="G_B")
+    D_B = NLayerDiscriminator(input_size=args.IMG_SIZE, input_channel=B_channel, n_layers=n_layers, name="D_B")
+
+    # Shadow generators for saving
+    G_A2B_ema = TFEMA(G_A2B, args.EMA_DECAY, args.EMA_EVERY)
+    G_B2A_ema = TFEMA(G_B2A, args.EMA_DECAY, args.EMA_EVERY)
 
-    D_A.compile(optimizer=optimizers.Adam(lr=0.0001, epsilon=1e-8), loss=losses.BinaryCrossentropy())
+    D_A.compile(optimizer=optimizers.Adam(learning_rate=0.0001, epsilon=1e-8), loss=losses.BinaryCrossentropy(from_logits=True))
     D_A.trainable=False
 
-    D_B.compile(optimizer=optimizers.Adam(lr=0.0001, epsilon=1e-8), loss=losses.BinaryCrossentropy())
+    D_B.compile(optimizer=optimizers.Adam(learning_rate=0.0001, epsilon=1e-8), loss=losses.BinaryCrossentropy(from_logits=True))
     D_B.trainable=False
 
     A_img = layers.Input(shape=(args.IMG_SIZE, args.IMG_SIZE, A_channel), name="GAN_Input_A")
@@ -83,8 +93,8 @@ def main(args):
     id_B = G_A2B(B_img)
     A_B2A = models.Model(inputs=B_img, outputs = [D_A_output, recon_B, id_B], name='GAN_A')
 
-    A_B2A.compile(optimizer=optimizers.Adam(lr=0.0001, epsilon=1e-8), 
-            loss=[losses.BinaryCrossentropy(), losses.MeanAbsoluteError(), losses.MeanAbsoluteError()], 
+    A_B2A.compile(optimizer=optimizers.Adam(learning_rate=0.0001, epsilon=1e-8), 
+            loss=[losses.BinaryCrossentropy(from_logits=True), losses.MeanAbsoluteError(), losses.MeanAbsoluteError()], 
             loss_weights=[1, 10, 0.5])
 
     fake_B = G_A2B(A_img)
@@ -94,8 +104,8 @@ def main(args):
 
     A_A2B = models.Model(inputs=A_img, outputs = [D_B_output, recon_A, id_A], name='GAN_A')
 
-    A_A2B.compile(optimizer=optimizers.Adam(lr=0.0001, epsilon=1e-8), 
-            loss=[losses.BinaryCrossentropy(), losses.MeanAbsoluteError(), losses.MeanAbsoluteError()], 
+    A_A2B.compile(optimizer=optimizers.Adam(learning_rate=0.0001, epsilon=1e-8), 
+            loss=[losses.BinaryCrossentropy(from_logits=True), losses.MeanAbsoluteError(), losses.MeanAbsoluteError()], 
             loss_weights=[1, 10, 0.5])
 
 
@@ -104,7 +114,8 @@ def main(args):
 
     print("================ Training Network ================")
 
-    d_output_size = args.IMG_SIZE // (2**(n_layers-1))
+    # NLayerDiscriminator halves the size n_layers times
+    d_output_size = args.IMG_SIZE // (2**n_layers)
     epochs = args.EPOCHS
     batch_size = args.BATCH_SIZE
     train_length = len(train_A)
@@ -128,6 +139,9 @@ def main(args):
     SAMPLE_PATH = './result'
     os.makedirs(SAMPLE_PATH, exist_ok=True) 
 
+    fake_A_pool = TFImagePool(args.POOL_SIZE, seed=0)
+    fake_B_pool = TFImagePool(args.POOL_SIZE, seed=1)
+
     for epoch in range(epochs):
         
         g_a2b_total = 0
@@ -158,8 +172,8 @@ def main(args):
 
             # Train Discriminator
             dis_label = np.concatenate([fake_label, real_label])
-            Set_A = np.concatenate([fake_A_imgs, train_A[step_idx]], axis=0)
-            Set_B = np.concatenate([fake_B_imgs, train_B[step_idx]], axis=0)
+            Set_A = np.concatenate([fake_A_pool.query(fake_A_imgs).numpy(), train_A[step_idx]], axis=0)
+            Set_B = np.concatenate([fake_B_pool.query(fake_B_imgs).numpy(), train_B[step_idx]], axis=0)
             # [Ad]
             D_A_Loss = D_A.train_on_batch(Set_A, dis_label)
             D_B_Loss = D_B.train_on_batch(Set_B, dis_label)
@@ -170,6 +184,8 @@ def main(args):
             G_B2A_Loss = A_B2A.train_on_batch(train_B[step_idx], [real_label, train_B[step_idx], train_B[step_idx]])
 
             G_A2B_Loss = A_A2B.train_on_batch(train_A[step_idx], [real_label, train_A[step_idx], train_A[step_idx]])
+            G_A2B_ema.step()
+            G_B2A_ema.step()
             
             g_a2b_total += G_A2B_Loss[0]
             g_a2b_ad += G_A2B_Loss[1]
@@ -184,12 +200,12 @@ def main(args):
             d_b_ad += D_B_Loss
 
             if i < num_iter:
-                epoch_progbar.update(i+1, [("G_A2B_Total", G_A2B_Loss[0])
+                epoch_progbar.update(i+1, [("G_A2B_Total", G_A2B_Loss[0]),
                                             ("G_A2B_Ad", G_A2B_Loss[1]), 
                                             ("G_A2B_Cyc", G_A2B_Loss[2]), 
                                             ("G_A2B_Idt", G_A2B_Loss[3]), 
                                             ("D_A_Ad", D_A_Loss),
-                                            ("G_B2A_Total", G_B2A_Loss[0])
+                                            ("G_B2A_Total", G_B2A_Loss[0]),
                                             ("G_B2A_Ad", G_B2A_Loss[1]), 
                                             ("G_B2A_Cyc", G_B2A_Loss[2]), 
                                             ("G_B2A_Idt", G_B2A_Loss[3]), 
@@ -198,14 +214,22 @@ def main(args):
 
         A_A2B.save_weights(os.path.join(CKPT_PATH, f"{epoch:04d}_A2B_params.h5"))
         A_B2A.save_weights(os.path.join(CKPT_PATH, f"{epoch:04d}_B2A_params.h5"))
+        G_A2B_ema.model.save_weights(os.path.join(CKPT_PATH, f"{epoch:04d}_G_A2B_ema_params.h5"))
+        G_B2A_ema.model.save_weights(os.path.join(CKPT_PATH, f"{epoch:04d}_G_B2A_ema_params.h5"))
+        fake_A_pool.save(os.path.join(CKPT_PATH, f"{epoch:04d}_A_pool.pkl"))
+        fake_B_pool.save(os.path.join(CKPT_PATH, f"{epoch:04d}_B_pool.pkl"))
+
+        # Samples of the EMA generators, the raw generators are only used for training
+        ema_fake_B_imgs = G_A2B_ema.model.predict(train_A[step_idx][:1])
+        ema_fake_A_imgs = G_B2A_ema.model.predict(train_B[step_idx][:1])
 
-        train_float2int = np.concatenate((train_B[step_idx][0], fake_B_imgs[0]), axis=1)
+        train_float2int = np.concatenate((train_B[step_idx][0], ema_fake_B_imgs[0]), axis=1)
         train_float2int = (train_float2int + 1) * 127.5
         train_float2int = cv.cvtColor(train_float2int.astype(np.uint8), cv.COLOR_RGB2BGR)
         Train_Result_PATH = os.path.join(SAMPLE_PATH, f"{epoch+1:04d}_A2B_result.jpg")
         cv.imwrite(Train_Result_PATH, train_float2int)
 
-        train_float2int = np.concatenate((train_A[step_idx][0], fake_A_imgs[0]), axis=1)
+        train_float2int = np.concatenate((train_A[step_idx][0], ema_fake_A_imgs[0]), axis=1)
         train_float2int = (train_float2int + 1) * 127.5
         train_float2int = cv.cvtColor(train_float2int.astype(np.uint8), cv.COLOR_RGB2BGR)
         Train_Result_PATH = os.path.join(SAMPLE_PATH, f"{epoch+1:04d}_B2A_result.jpg")
@@ -220,6 +244,9 @@ if __name__ ==  "__main__":
     parser.add_argument("--IMG_SIZE", default=256, type=int, help="Imgae size")
     parser.add_argument("--EPOCHS", default=100, type=int, help="Number of Epoch")
     parser.add_argument("--BATCH_SIZE", default=32, type=int, help="Number of Batch")
+    parser.add_argument("--EMA_DECAY", default=0.999, type=float, help="Decay of the generator weight average")
+    parser.add_argument("--EMA_EVERY", default=1, type=int, help="Steps between the weight average updates")
+    parser.add_argument("--POOL_SIZE", default=50, type=int, help="Number of fake images for the discriminator, 0 uses only the current batch")
 
     args = parser.parse_args()
 
@@ -3,13 +3,11 @@ import argparse
 
 def main(args):
 
-    import io
     import os
     import sys
-    import time
-    import shutil
-    import tarfile
-    import urllib.request
+
+    sys.path.append("../..") # utils/fetch.py : shared dataset cache, resumable and checksummed downloads
+    from utils.fetch import fetch_and_extract
 
     datatype = args.datatype
     dataset = args.dataset
@@ -20,38 +18,12 @@ def main(args):
     else : 
         URL = f"http://efrosgans.eecs.berkeley.edu/cyclegan/datasets/{dataset}.zip"
 
-    file_name = URL.split("/")[-1]
-    file_path = os.path.join(SAVE_PATH, file_name)
-    # Data Download
-    
-    ## For progressbar
-    def report(url):
-        file_name = url.split("/")[-1]
-        def progbar(blocknr, blocksize, size):
-            current = blocknr*blocksize
-            sys.stdout.write(f"\rDownloading {file_name} ...... {100.0*current/size:.2f}%")
-        return progbar
-        
-    if not os.path.exists(file_path):
-        print(f"In progress to download '{dataset}' data ....")
-        urllib.request.urlretrieve(URL, file_path, report(URL))
-        print()
-    else:
-        print("Already downloaded !")
-
+    # Data Download & Extract
+    # tar.gz (paired) is extracted while it downloads, zip (unpaired) after it with one thread per group of members.
+    # Both are only extracted once into SAVE_PATH/{dataset}
+    print(f"In progress to download '{dataset}' data ....")
+    fetch_and_extract(URL, SAVE_PATH)
     print(f"Downloading Done!")
-
-    # Data Extract
-    if not os.path.exists(os.path.join(SAVE_PATH, "flower_photos")):
-        print("In progress to extract data ....")
-        tar = tarfile.open(file_path)
-        members = tar.getmembers()
-        for idx, member in enumerate(members):
-            tar.extract(member=member, path=SAVE_PATH)
-            sys.stdout.write(f"\rExtracting {file_name} ...... {100.0*(idx+1)/len(members):.2f}%")
-        print()
-    else:
-        print("Already extracted !")
         
 if __name__=="__main__":
     parser = argparse.ArgumentParser()
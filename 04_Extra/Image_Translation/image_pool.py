@@ -0,0 +1,149 @@
+import pickle
+
+import numpy as np
+
+# Shared by cyclegan / pix2pix, PyTorch and tf_keras.
+# The scripts add "../.." to sys.path and use TorchImagePool or TFImagePool.
+
+class ImagePool:
+    """
+    Fixed-capacity history of generated images for the discriminator updates.
+
+    Until the pool is full, every fake is stored and returned as it is.
+    After that, each fake is swapped with a random stored image with probability `swap_prob`,
+    so the discriminator also sees fakes of older generators.
+
+    Storage is preallocated on the device at the first query. The slots are drawn with a seeded NumPy generator,
+    so the PyTorch and TensorFlow pools behave the same and the whole state can be checkpointed.
+    """
+    def __init__(self, capacity=50, swap_prob=0.5, seed=0):
+        self.capacity = capacity
+        self.swap_prob = swap_prob
+        self.rng = np.random.default_rng(seed)
+        self.num_images = 0
+        self.buffer = None
+
+    def __len__(self):
+        return self.num_images
+
+    def plan(self, batch_size):
+        # Batch indices [0, num_fill) go to the free slots from `start`, batch indices `swap` are exchanged with `swap_slots`
+        num_fill = min(batch_size, self.capacity - self.num_images)
+        start = self.num_images
+        self.num_images += num_fill
+
+        rest = np.arange(num_fill, batch_size)
+        swap = rest[self.rng.random(len(rest)) < self.swap_prob]
+        swap_slots = self.rng.integers(0, self.capacity, len(swap))
+        # One image per slot, otherwise the stored and the returned images would disagree
+        swap_slots, first = np.unique(swap_slots, return_index=True)
+        return num_fill, start, swap[first], swap_slots
+
+    def query(self, images):
+        if self.buffer is None:
+            self.buffer = self.allocate(images)
+        if self.capacity == 0:
+            # Only the framework conversion (and detach) of the current fakes
+            return self.update(images, 0, 0, np.zeros(0, np.int64), np.zeros(0, np.int64))
+        return self.update(images, *self.plan(len(images)))
+
+    def state_dict(self):
+        return {"capacity": self.capacity,
+                "swap_prob": self.swap_prob,
+                "num_images": self.num_images,
+                "rng": self.rng.bit_generator.state,
+                "images": None if self.buffer is None else self.to_numpy(self.buffer)[:self.num_images]}
+
+    def load_state_dict(self, state):
+        self.capacity = state["capacity"]
+        self.swap_prob = state["swap_prob"]
+        self.num_images = state["num_images"]
+        self.rng.bit_generator.state = state["rng"]
+        self.buffer = None
+        if state["images"] is not None:
+            self.buffer = self.from_numpy(state["images"])
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self.state_dict(), f)
+
+    def load(self, path):
+        with open(path, "rb") as f:
+            self.load_state_dict(pickle.load(f))
+
+    # Framework specific
+    def allocate(self, images):
+        raise NotImplementedError
+
+    def update(self, images, num_fill, start, swap, swap_slots):
+        raise NotImplementedError
+
+    def to_numpy(self, buffer):
+        raise NotImplementedError
+
+    def from_numpy(self, images):
+        raise NotImplementedError
+
+class TorchImagePool(ImagePool):
+    # NCHW tensors, the buffer lives on the device of the first queried batch
+    def __init__(self, capacity=50, swap_prob=0.5, seed=0, device=None):
+        super(TorchImagePool, self).__init__(capacity, swap_prob, seed)
+        self.device = device
+
+    def allocate(self, images):
+        import torch
+        return torch.empty((self.capacity,) + tuple(images.shape[1:]), dtype=images.dtype, device=self.device or images.device)
+
+    def update(self, images, num_fill, start, swap, swap_slots):
+        import torch
+        images = images.detach()
+        if num_fill:
+            self.buffer[start:start+num_fill] = images[:num_fill]
+        if len(swap) == 0:
+            return images
+
+        swap = torch.as_tensor(swap, device=images.device)
+        swap_slots = torch.as_tensor(swap_slots, device=self.buffer.device)
+        output = images.clone()
+        output[swap] = self.buffer[swap_slots].to(images.device)
+        self.buffer[swap_slots] = images[swap].to(self.buffer.device)
+        return output
+
+    def to_numpy(self, buffer):
+        return buffer.cpu().numpy()
+
+    def from_numpy(self, images):
+        import torch
+        buffer = torch.empty((self.capacity,) + images.shape[1:], dtype=torch.from_numpy(images).dtype, device=self.device)
+        buffer[:len(images)] = torch.from_numpy(images).to(buffer.device)
+        return buffer
+
+class TFImagePool(ImagePool):
+    # NHWC tensors (or NumPy arrays), the buffer is a non-trainable tf.Variable
+    def allocate(self, images):
+        import tensorflow as tf
+        images = tf.convert_to_tensor(images)
+        return tf.Variable(tf.zeros((self.capacity,) + tuple(images.shape[1:]), dtype=images.dtype), trainable=False)
+
+    def update(self, images, num_fill, start, swap, swap_slots):
+        import tensorflow as tf
+        images = tf.convert_to_tensor(images, dtype=self.buffer.dtype)
+        if num_fill:
+            self.buffer[start:start+num_fill].assign(images[:num_fill])
+        if len(swap) == 0:
+            return images
+
+        swap = swap[:, None].astype(np.int32)
+        swap_slots = swap_slots[:, None].astype(np.int32)
+        output = tf.tensor_scatter_nd_update(images, swap, tf.gather_nd(self.buffer, swap_slots))
+        self.buffer.scatter_nd_update(swap_slots, tf.gather_nd(images, swap))
+        return output
+
+    def to_numpy(self, buffer):
+        return buffer.numpy()
+
+    def from_numpy(self, images):
+        import tensorflow as tf
+        buffer = np.zeros((self.capacity,) + images.shape[1:], dtype=images.dtype)
+        buffer[:len(images)] = images
+        return tf.Variable(buffer, trainable=False)
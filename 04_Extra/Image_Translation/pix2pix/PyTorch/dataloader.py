@@ -0,0 +1,58 @@
+import sys
+
+import numpy as np
+import torch
+from torch import nn
+from torch.utils.data import Dataset
+
+sys.path.append("..") # paired_cache.py is shared with tf_keras
+from paired_cache import decode_pairs
+
+class PairedDataset(Dataset):
+    """
+    Combined A|B images decoded once (see `decode_pairs`), items are uint8 (3, H, 2W) tensors.
+    The split into A and B and the augmentation run on the whole batch with `PairedAugment`.
+    """
+    def __init__(self, data_dir, load_size, cache_path=None):
+        self.images = decode_pairs(data_dir, load_size, cache_path)
+
+    def __len__(self):
+        return len(self.images)
+
+    def __getitem__(self, idx):
+        return torch.from_numpy(np.ascontiguousarray(self.images[idx])).permute(2, 0, 1)
+
+class PairedAugment(nn.Module):
+    """
+    uint8 (N, 3, load_size, 2*load_size) -> A, B float (N, 3, input_size, input_size) in [0, 1].
+    A and B are sliced out of the combined batch by the same index op,
+    so the random crop (jitter) and horizontal flip of each pair are always the same.
+    Without training, the center is cropped and nothing is flipped.
+    """
+    def __init__(self, input_size, flip=True):
+        super(PairedAugment, self).__init__()
+        self.input_size = input_size
+        self.flip = flip
+
+    def forward(self, x):
+        N, _, H, W = x.shape
+        W = W // 2
+        size = self.input_size
+        if self.training:
+            top = torch.randint(0, H - size + 1, (N,), device=x.device)
+            left = torch.randint(0, W - size + 1, (N,), device=x.device)
+        else:
+            top = torch.full((N,), (H - size) // 2, device=x.device)
+            left = torch.full((N,), (W - size) // 2, device=x.device)
+
+        rows = top[:, None] + torch.arange(size, device=x.device)
+        cols = left[:, None] + torch.arange(size, device=x.device)
+        if self.training and self.flip:
+            flip = torch.rand(N, device=x.device) < 0.5
+            cols = torch.where(flip[:, None], cols.flip(1), cols)
+        # Same columns in the A half and in the B half
+        cols = torch.cat([cols, cols + W], dim=1)
+
+        x = x.permute(0, 2, 3, 1)[torch.arange(N, device=x.device)[:, None, None], rows[:, :, None], cols[:, None, :]]
+        x = x.permute(0, 3, 1, 2).float().div_(255.)
+        return x[..., :size], x[..., size:]
@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import torch
 from tqdm import tqdm
@@ -7,50 +8,33 @@ from torch import nn
 from torch.utils.data import Dataset, DataLoader
 from torchvision import transforms
 from models import *
+from dataloader import *
+
+sys.path.append("../..") # image_pool.py is shared with cyclegan and tf_keras
+sys.path.append("../../../../03_Advance/GAN") # ema.py is shared with the GAN scripts
+from image_pool import TorchImagePool
+from ema import TorchEMA
 
 device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
 
 PATH = "../../datasets/night2day"
-IMG_FORMAT = ["jpg", "jpeg", "tif", "tiff", "bmp", "png"]
 
 img_size = 256
+load_size = 256 # > img_size for random crop jitter, e.g. 286
 batch_size = 32
+pool_size = 50 # 0 uses only the fakes of the current batch
+ema_decay = 0.999
+ema_every = 1
 
-transform = transforms.Compose([
-                                transforms.Resize([img_size, img_size]), 
-                                transforms.ToTensor()
-                                ])
-
-class CustomDataset(Dataset):
-    def __init__(self, data_dir, transform):
-        
-        self.filelist = []
-        self.classes = sorted(os.listdir(data_dir))
-        for root, _, files in os.walk(data_dir):
-            if not len(files): continue
-            files = [os.path.join(root, file) for file in files if file.split(".")[-1].lower() in IMG_FORMAT]
-            self.filelist += files
-        self.transform = transform
-
-    def __len__(self):
-        return len(self.filelist)
-
-    def __getitem__(self, idx):
+# Combined images are decoded once into a uint8 cache, the batches are split and augmented on the device
+dataset = PairedDataset(PATH, load_size, cache_path=os.path.join(PATH + "_cache", f"{load_size}.npy"))
 
-        image = Image.open(self.filelist[idx])
-        min_side = min(image.size)
-        max_side = max(image.size)
-        dom_a = image.crop((0, 0, min_side, min_side))
-        dom_b = image.crop((min_side, 0, max_side, min_side))
-        dom_a = self.transform(dom_a)
-        dom_b = self.transform(dom_b)
-        return dom_a, dom_b
-
-dataset = CustomDataset(PATH, transform)
-
-loader = DataLoader(dataset, batch_size=batch_size, num_workers=4)
+loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=4, pin_memory=torch.cuda.is_available())
+augment = PairedAugment(img_size, flip=True).to(device)
 
 generator = Generator_Encoder_Decoder(A_channel=3, B_channel=3, num_features=64).to(device)
+# Shadow generator for sampling and saving
+generator_ema = TorchEMA(generator, ema_decay, ema_every)
 discriminator = Discriminator(A_channel=3, B_channel=3, num_features=64, n_layers=1).to(device)
 
 gan_loss = nn.BCELoss()
@@ -59,16 +43,18 @@ l1_lambda = 10
 d_optimizer = torch.optim.Adam(discriminator.parameters(), lr=0.0002)
 g_optimizer = torch.optim.Adam(generator.parameters(), lr=0.0002)
 
+# The discriminator sees (A, fake B) pairs, so the pairs are pooled
+fake_pool = TorchImagePool(pool_size)
+
 with tqdm(total=len(loader)) as t:
     t.set_description(f'Loader')
-    for i, (batch_img_a, batch_img_b) in enumerate(loader):
+    for i, batch_img in enumerate(loader):
         # time.sleep(0.1)
-        batch_img_a = batch_img_a.to(device)
-        batch_img_b = batch_img_b.to(device)
+        batch_img_a, batch_img_b = augment(batch_img.to(device, non_blocking=True))
 
         gen_b = generator(batch_img_a)
         dis_pred_real = discriminator(torch.cat([batch_img_a, batch_img_b], dim=1))
-        dis_pred_fake = discriminator(torch.cat([batch_img_a, gen_b], dim=1).detach())
+        dis_pred_fake = discriminator(fake_pool.query(torch.cat([batch_img_a, gen_b], dim=1)))
 
         # Training Discriminator
         real_lab = torch.ones_like(dis_pred_real).to(device)
@@ -90,7 +76,13 @@ with tqdm(total=len(loader)) as t:
         g_optimizer.zero_grad()
         gen_loss.backward()
         g_optimizer.step()
+        generator_ema.step()
 
         # Logger
         t.set_postfix({"Generator loss": f"{gen_loss.item():.3f}", "Discriminator loss": f"{dis_loss.item():.3f}"})
-        t.update()
\ No newline at end of file
+        t.update()
+
+# The averaged generator is the one to sample from
+os.makedirs("./ckpt", exist_ok=True)
+torch.save(generator_ema.model.state_dict(), "./ckpt/generator_ema.pt")
+torch.save(generator.state_dict(), "./ckpt/generator.pt")
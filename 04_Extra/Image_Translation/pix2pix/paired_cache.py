@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+
+# Shared by pix2pix/PyTorch and pix2pix/tf_keras, the scripts add ".." to sys.path.
+
+IMG_FORMAT = ["jpg", "jpeg", "tif", "tiff", "bmp", "png"]
+
+def load_pair(path, size):
+    # Combined A|B image -> (size, 2*size, 3), A is the left half and B the right half
+    img = cv.imread(path, cv.IMREAD_COLOR)
+    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    img = cv.resize(img, (2*size, size))
+    return img
+
+def decode_pairs(path, size, cache_path=None, num_threads=8):
+    """
+    Decodes every combined image under `path` once into a (N, size, 2*size, 3) uint8 array.
+    With `cache_path` the array is written to a .npy file and memory-mapped, so it does not have to fit in RAM
+    and later runs skip the decoding.
+    """
+    if cache_path is not None and os.path.exists(cache_path):
+        return np.load(cache_path, mmap_mode="r")
+
+    file_list = []
+    for root, _, files in os.walk(path):
+        file_list += [os.path.join(root, f) for f in files if f.split(".")[-1].lower() in IMG_FORMAT]
+    file_list = sorted(file_list)
+
+    shape = (len(file_list), size, 2*size, 3)
+    if cache_path is not None:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        images = np.lib.format.open_memmap(cache_path + ".tmp", mode="w+", dtype=np.uint8, shape=shape)
+    else:
+        images = np.empty(shape, dtype=np.uint8)
+
+    def decode(i):
+        images[i] = load_pair(file_list[i], size)
+
+    # cv2 releases the GIL while decoding
+    with ThreadPoolExecutor(num_threads) as pool:
+        list(pool.map(decode, range(len(file_list))))
+
+    if cache_path is None:
+        return images
+    images.flush()
+    del images
+    os.replace(cache_path + ".tmp", cache_path)
+    return np.load(cache_path, mmap_mode="r")
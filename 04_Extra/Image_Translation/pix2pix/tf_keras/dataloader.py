@@ -0,0 +1,49 @@
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+sys.path.append("..") # paired_cache.py is shared with PyTorch
+from paired_cache import decode_pairs
+
+def paired_augment(x, input_size, training=True, flip=True):
+    """
+    uint8 (N, load_size, 2*load_size, 3) -> A, B float32 (N, input_size, input_size, 3) in [-1, 1].
+    A and B are gathered from the combined batch with the same indices,
+    so the random crop (jitter) and horizontal flip of each pair are always the same.
+    """
+    N, H, W = tf.shape(x)[0], tf.shape(x)[1], tf.shape(x)[2] // 2
+    if training:
+        top = tf.random.uniform([N], 0, H - input_size + 1, tf.int32)
+        left = tf.random.uniform([N], 0, W - input_size + 1, tf.int32)
+    else:
+        top = tf.fill([N], (H - input_size) // 2)
+        left = tf.fill([N], (W - input_size) // 2)
+
+    rows = top[:, None] + tf.range(input_size)
+    cols = left[:, None] + tf.range(input_size)
+    if training and flip:
+        cols = tf.where(tf.random.uniform([N, 1]) < 0.5, tf.reverse(cols, [1]), cols)
+    cols = tf.concat([cols, cols + W], axis=1)
+
+    x = tf.gather(x, rows, axis=1, batch_dims=1)
+    x = tf.gather(x, cols, axis=2, batch_dims=1)
+    x = tf.cast(x, tf.float32) / 127.5 - 1
+    return x[:, :, :input_size], x[:, :, input_size:]
+
+def paired_dataset(images, batch_size, input_size, training=True, seed=None):
+    """
+    Streams batches from the decoded (memory-mapped) cache instead of one big float array.
+    Only the indices are shuffled, each batch is read from the cache as a sorted slice.
+    """
+    def read(idx):
+        return images[np.sort(idx)]
+
+    ds = tf.data.Dataset.range(len(images))
+    if training:
+        ds = ds.shuffle(len(images), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.map(lambda idx: tf.numpy_function(read, [idx], tf.uint8), num_parallel_calls=tf.data.AUTOTUNE)
+    ds = ds.map(lambda x: paired_augment(tf.ensure_shape(x, [None] + list(images.shape[1:])), input_size, training),
+                num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
@@ -1,4 +1,5 @@
 import os
+import sys
 import argparse
 
 import cv2 as cv
@@ -8,6 +9,12 @@ from tensorflow.keras import models, layers, losses, optimizers
 from tensorflow.keras.utils import Progbar
 
 from models import *
+from dataloader import *
+
+sys.path.append("../..") # image_pool.py is shared with cyclegan and PyTorch
+sys.path.append("../../../../03_Advance/GAN") # ema.py is shared with the GAN scripts
+from image_pool import TFImagePool
+from ema import TFEMA
 
 tf.random.set_seed(42)
 
@@ -22,12 +29,6 @@ if gpus:
     except RuntimeError as e:
         print(e)
 
-def load_img(path, size):
-    img = cv.imread(path)
-    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
-    img = cv.resize(img, (size, size))
-    return img
-
 # strategy = tf.distribute.MirroredStrategy()
 # with strategy.scope():
 def main(args):
@@ -36,34 +37,30 @@ def main(args):
 
     datasets_root = "../../datasets" # Please edit your root path of datasets
     
-    train_domain_A_path = os.path.join(datasets_root, args.DATASET, "trainA")
-    train_domain_B_path = os.path.join(datasets_root, args.DATASET, "trainB")
-
-    val_domain_A_path = os.path.join(datasets_root, args.DATASET, "valA")
-    val_domain_B_path = os.path.join(datasets_root, args.DATASET, "valB")
+    # Combined A|B images of train / val are decoded once into memory-mapped uint8 caches
+    cache_root = os.path.join(datasets_root, args.DATASET + "_cache")
+    train_images = decode_pairs(os.path.join(datasets_root, args.DATASET, "train"), args.LOAD_SIZE, os.path.join(cache_root, f"train_{args.LOAD_SIZE}.npy"))
+    val_images = decode_pairs(os.path.join(datasets_root, args.DATASET, "val"), args.LOAD_SIZE, os.path.join(cache_root, f"val_{args.LOAD_SIZE}.npy"))
 
-    train_A = np.array([load_img(os.path.join(train_domain_A_path, img), args.IMG_SIZE) for img in sorted(os.listdir(train_domain_A_path))])/127.5 -1
-    train_B = np.array([load_img(os.path.join(train_domain_B_path, img), args.IMG_SIZE) for img in sorted(os.listdir(train_domain_B_path))])/127.5 -1
-    
-    val_A = np.array([load_img(os.path.join(val_domain_A_path, img), args.IMG_SIZE) for img in sorted(os.listdir(val_domain_A_path))])/127.5 -1
-    val_B = np.array([load_img(os.path.join(val_domain_B_path, img), args.IMG_SIZE) for img in sorted(os.listdir(val_domain_B_path))])/127.5 -1
+    train_ds = paired_dataset(train_images, args.BATCH_SIZE, args.IMG_SIZE, training=True, seed=42)
+    val_ds = paired_dataset(val_images, args.BATCH_SIZE, args.IMG_SIZE, training=False)
 
     print("\nTraining data shape")
-    print(f"Domain A: {train_A.shape}")
-    print(f"Domain B: {train_B.shape}")
+    print(f"Combined A|B: {train_images.shape}")
 
     print("\nValidation data shape")
-    print(f"Domain A: {val_A.shape}")
-    print(f"Domain B: {val_B.shape}")
+    print(f"Combined A|B: {val_images.shape}")
 
 
     print("================ Building Network ================")
-    A_channel = train_A.shape[-1]
-    B_channel = train_B.shape[-1]
+    A_channel = 3
+    B_channel = 3
     n_layers = 3
 
     G = generator_unet(input_size=args.IMG_SIZE, A_channel=A_channel, B_channel=B_channel, name="Generator")
     G.summary()
+    # Shadow generator for sampling and saving
+    G_ema = TFEMA(G, args.EMA_DECAY, args.EMA_EVERY)
 
     D = discriminator(input_size=args.IMG_SIZE, A_channel=A_channel, B_channel=B_channel, n_layers=n_layers, name="Discriminator")
     D.summary()
@@ -93,8 +90,8 @@ def main(args):
     d_output_size = args.IMG_SIZE // (2**(n_layers-1))
     epochs = args.EPOCHS
     batch_size = args.BATCH_SIZE
-    train_length = len(train_A)
-    val_length = len(val_A)
+    train_length = len(train_images)
+    val_length = len(val_images)
     num_iter = int(np.ceil(train_length/batch_size))
     num_val_iter = int(np.ceil(val_length/batch_size))
 
@@ -108,6 +105,9 @@ def main(args):
     SAMPLE_PATH = './result'
     os.makedirs(SAMPLE_PATH, exist_ok=True) 
 
+    # The discriminator sees (A, fake B) pairs, so the pairs are pooled
+    fake_pool = TFImagePool(args.POOL_SIZE)
+
     for epoch in range(epochs):
         
         g_total = 0
@@ -115,37 +115,38 @@ def main(args):
         g_mae = 0
         d_ad = 0
 
-        shuffle_idx = np.random.choice(train_length, train_length, replace=False)
-        
         epoch_progbar = Progbar(num_iter, width=15)
 
-        for i, step in enumerate(range(0, train_length, batch_size)):
+        for i, (batch_A, batch_B) in enumerate(train_ds):
 
-            step_idx = shuffle_idx[step:step+batch_size]
-            real_label = np.ones((len(step_idx), d_output_size, d_output_size, 1))
-            fake_label = np.zeros((len(step_idx), d_output_size, d_output_size, 1))
+            batch_A = batch_A.numpy()
+            batch_B = batch_B.numpy()
+            real_label = np.ones((len(batch_A), d_output_size, d_output_size, 1))
+            fake_label = np.zeros((len(batch_A), d_output_size, d_output_size, 1))
 
             # Generate fake images
-            fake_imgs = G.predict(train_A[step_idx])
+            fake_imgs = G.predict(batch_A)
 
             # Train Discriminator
+            fake_pairs = fake_pool.query(np.concatenate([batch_A, fake_imgs], axis=-1)).numpy()
             dis_label = np.concatenate([fake_label, real_label])
-            Set_A = np.concatenate([fake_imgs, train_A[step_idx]], axis=0)
-            Set_B = np.concatenate([train_B[step_idx], train_B[step_idx]], axis=0)
+            Set_A = np.concatenate([fake_pairs[..., :A_channel], batch_A], axis=0)
+            Set_B = np.concatenate([fake_pairs[..., A_channel:], batch_B], axis=0)
             # [Ad]
             D_Loss = D.train_on_batch([Set_A, Set_B], dis_label)
             
             # Train Generator
             # [Ad + 100*mae, Ad, mae]
-            G_Loss = A.train_on_batch([train_A[step_idx], train_B[step_idx]], 
-                                        [real_label, train_B[step_idx]])
+            G_Loss = A.train_on_batch([batch_A, batch_B], 
+                                        [real_label, batch_B])
+            G_ema.step()
 
             g_total += G_Loss[0]
             g_ad += G_Loss[1]
             g_mae += G_Loss[2]
             d_ad += D_Loss
             if i < num_iter:
-                epoch_progbar.update(i+1, [("G_Total", G_Loss[0])
+                epoch_progbar.update(i+1, [("G_Total", G_Loss[0]),
                                             ("G_Ad", G_Loss[1]), 
                                             ("G_MAE", G_Loss[2]), 
                                             ("D_Ad", D_Loss)
@@ -155,10 +156,14 @@ def main(args):
         val_g_ad = 0
         val_g_mae = 0
 
-        for j, val_idx in enumerate(range(0, val_length, batch_size)):
-            val_label = np.ones([len(val_A[val_idx:val_idx+batch_size]), d_output_size, d_output_size, 1])
-            V_loss = A.test_on_batch(val_A[val_idx:val_idx+batch_size], 
-                                            [val_B[val_idx:val_idx+batch_size], val_label])
+        for j, (val_A, val_B) in enumerate(val_ds):
+            val_A = val_A.numpy()
+            val_B = val_B.numpy()
+            if j == 0:
+                sample_A, sample_B = val_A[:1], val_B[:1]
+            val_label = np.ones([len(val_A), d_output_size, d_output_size, 1])
+            V_loss = A.test_on_batch([val_A, val_B], 
+                                            [val_label, val_B])
             
             val_g_total += V_loss[0]
             val_g_ad += V_loss[1]
@@ -167,15 +172,17 @@ def main(args):
         epoch_progbar.update(i+1, [("Val_G_Total", val_g_total/num_val_iter), ("Val_G_Ad", val_g_ad/num_val_iter), ("Val_G_MAE", val_g_mae/num_val_iter)])
 
         A.save_weights(os.path.join(CKPT_PATH, f"{epoch:04d}_params.h5"))
+        G_ema.model.save_weights(os.path.join(CKPT_PATH, f"{epoch:04d}_G_ema_params.h5"))
+        fake_pool.save(os.path.join(CKPT_PATH, f"{epoch:04d}_pool.pkl"))
 
-        train_float2int = np.concatenate((train_B[step_idx][0], fake_imgs[0]), axis=1)
+        train_float2int = np.concatenate((batch_B[0], fake_imgs[0]), axis=1)
         train_float2int = (train_float2int + 1) * 127.5
         train_float2int = cv.cvtColor(train_float2int.astype(np.uint8), cv.COLOR_RGB2BGR)
         Train_Result_PATH = os.path.join(SAMPLE_PATH, f"{epoch+1:04d}_train_result.jpg")
         cv.imwrite(Train_Result_PATH, train_float2int)
 
-        val_result = G.predict(val_A[:1])
-        val_float2int = np.concatenate((val_B[0], val_result[0]), axis=1)
+        val_result = G_ema.model.predict(sample_A)
+        val_float2int = np.concatenate((sample_B[0], val_result[0]), axis=1)
         val_float2int = (val_float2int + 1) * 127.5
         val_float2int = cv.cvtColor(val_float2int.astype(np.uint8), cv.COLOR_RGB2BGR)
         Val_Result_PATH = os.path.join(SAMPLE_PATH, f"{epoch+1:04d}_val_result.jpg")
@@ -187,8 +194,12 @@ if __name__ ==  "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--DATASET", default="facades", type=str, help="Dataset")
     parser.add_argument("--IMG_SIZE", default=256, type=int, help="Imgae size")
+    parser.add_argument("--LOAD_SIZE", default=256, type=int, help="Size of the decoded cache, > IMG_SIZE for random crop jitter")
     parser.add_argument("--EPOCHS", default=100, type=int, help="Number of Epoch")
     parser.add_argument("--BATCH_SIZE", default=32, type=int, help="Number of Batch")
+    parser.add_argument("--EMA_DECAY", default=0.999, type=float, help="Decay of the generator weight average")
+    parser.add_argument("--EMA_EVERY", default=1, type=int, help="Steps between the weight average updates")
+    parser.add_argument("--POOL_SIZE", default=50, type=int, help="Number of fake images for the discriminator, 0 uses only the current batch")
 
     
 
@@ -0,0 +1,117 @@
+# %%
+import os
+import copy
+import argparse
+from tqdm import tqdm
+
+import torch
+from torch import nn, optim
+from torch.utils.data import DataLoader
+
+from models import *
+from pruning import *
+
+device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
+
+def evaluate(net, loader):
+    net.eval()
+    total = 0
+    correct = 0
+    with torch.no_grad():
+        for batch_img, batch_lab in loader:
+            X = batch_img.to(device)
+            Y = batch_lab.to(device)
+            _, predicted = torch.max(net(X), 1)
+            total += Y.size(0)
+            correct += (predicted == Y).sum().item()
+    return 100 * correct / total
+
+def fine_tune(net, loader, epochs, lr):
+    # Short schedule: SGD with cosine decay over all iterations
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.SGD(net.parameters(), lr=lr, momentum=0.9, weight_decay=1e-4)
+    scheduler = optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=max(1, epochs * len(loader)))
+
+    for epoch in range(epochs):
+        net.train()
+        with tqdm(total=len(loader)) as t:
+            t.set_description(f'[{epoch+1}/{epochs}]')
+            for batch_img, batch_lab in loader:
+                X = batch_img.to(device)
+                Y = batch_lab.to(device)
+
+                optimizer.zero_grad()
+                loss = criterion(net(X), Y)
+                loss.backward()
+                optimizer.step()
+                scheduler.step()
+
+                t.set_postfix({"loss": f"{loss.item():05.3f}"})
+                t.update()
+    return net
+
+def summarize(net, loader, input_shape):
+    return {
+        "params": count_params(net), 
+        "flops": count_flops(net, input_shape), 
+        "latency": measure_latency(net, (1,) + input_shape[1:]), 
+        "acc": evaluate(net, loader)
+    }
+
+def main(args):
+    net = model_dict[args.MODEL](input_channel=3, num_classes=args.NUM_CLASSES).to(device)
+    if args.WEIGHTS:
+        net.load_state_dict(torch.load(args.WEIGHTS, map_location=device))
+
+    train_loader = DataLoader(FlowerDataset(args.PATH, args.IMG_SIZE, "train"), 
+                            batch_size=args.BATCH_SIZE, shuffle=True, num_workers=args.NUM_WORKER)
+    val_loader = DataLoader(FlowerDataset(args.PATH, args.IMG_SIZE, "validation"), 
+                            batch_size=args.BATCH_SIZE, num_workers=args.NUM_WORKER)
+    input_shape = (1, 3, args.IMG_SIZE, args.IMG_SIZE)
+
+    results = {}
+    results["original"] = summarize(net, val_loader, input_shape)
+
+    net, units = prune_network(copy.deepcopy(net), args.RATIO, args.CRITERION)
+    print(f"Pruned {len(units)} conv layers by {args.RATIO*100:.0f}% ({args.CRITERION})")
+    results["pruned"] = summarize(net, val_loader, input_shape)
+
+    if args.EPOCHS:
+        net = fine_tune(net, train_loader, args.EPOCHS, args.LR)
+        results["fine-tuned"] = summarize(net, val_loader, input_shape)
+
+    print_report(results)
+
+    os.makedirs(args.SAVE_PATH, exist_ok=True)
+    save_path = os.path.join(args.SAVE_PATH, f"{args.MODEL}_pruned.pth")
+    # Layer shapes are changed, so the whole module is saved instead of the state_dict
+    torch.save(net, save_path)
+    print(f"Saved to {save_path}")
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="ResNet50", type=str, help="")
+    parser.add_argument("--WEIGHTS", default="", type=str, help="state_dict of the trained model")
+    parser.add_argument("--PATH", default="../../../data/flower_photos", type=str, help="")
+    parser.add_argument("--NUM_CLASSES", default=5, type=int, help="")
+    parser.add_argument("--IMG_SIZE", default=128, type=int, help="")
+    parser.add_argument("--RATIO", default=0.3, type=float, help="ratio of channels to remove in each prunable layer")
+    parser.add_argument("--CRITERION", default="l1", type=str, help="")
+    parser.add_argument("--EPOCHS", default=3, type=int, help="fine-tune epochs after pruning")
+    parser.add_argument("--LR", default=1e-3, type=float, help="")
+    parser.add_argument("--BATCH_SIZE", default=16, type=int, help="")
+    parser.add_argument("--NUM_WORKER", default=2, type=int, help="")
+    parser.add_argument("--SAVE_PATH", default="./pruned", type=str, help="")
+
+    args = parser.parse_args()
+
+    assert args.MODEL in model_dict, f"Please use model in {list(model_dict.keys())}"
+    assert args.CRITERION in ["l1", "gamma"], "Please use criterion in ['l1', 'gamma']"
+    assert 0 <= args.RATIO < 1, "RATIO must be in [0, 1)"
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print(f"Ratio : {args.RATIO}, Criterion : {args.CRITERION}")
+    print("===========================================\n")
+
+    main(args)
@@ -0,0 +1,17 @@
+from functools import partial
+
+import sys
+sys.path.append("../../..") # the networks are the model_zoo/ definitions of the 03_Advance/CNN scripts
+from model_zoo.pytorch.resnet import Residual_block, build_resnet
+from model_zoo.pytorch.vgg import build_vgg
+from model_zoo.pytorch.xception import Build_Xception
+from model_zoo.pytorch.densenet import Build_Densenet
+
+model_dict = {
+    "ResNet50": partial(build_resnet, num_layer=50),
+    "ResNet101": partial(build_resnet, num_layer=101),
+    "VGG16": partial(build_vgg, num_layer=16),
+    "VGG19": partial(build_vgg, num_layer=19),
+    "Xception": Build_Xception,
+    "DenseNet121": partial(Build_Densenet, num_blocks=121)
+}
@@ -0,0 +1,229 @@
+import os
+import copy
+import time
+from collections import Counter
+
+import cv2 as cv
+import numpy as np
+
+import torch
+from torch import nn, fx
+from torch.nn import functional as F
+from torch.utils.data import Dataset
+
+# Modules and functions which keep the channels of their input as they are
+PASS_MODULES = (nn.ReLU, nn.ReLU6, nn.MaxPool2d, nn.AvgPool2d, nn.ZeroPad2d, nn.Dropout, nn.Identity)
+PASS_FUNCTIONS = (F.relu, torch.relu)
+
+def read_img(path, img_size):
+    img = cv.imread(path)
+    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    img = cv.resize(img, (img_size, img_size))
+    return img
+
+class FlowerDataset(Dataset):
+    # Same 95/5 split per category as the 03_Advance/CNN scripts, images are decoded lazily
+    def __init__(self, path, img_size, split="train"):
+        self.img_size = img_size
+        self.category_list = [i for i in os.listdir(path) if os.path.isdir(os.path.join(path, i))]
+
+        self.filelist = []
+        self.labels = []
+        for i, category in enumerate(self.category_list):
+            imgs_list = os.listdir(os.path.join(path, category))
+            ratio = int(np.round(0.05 * len(imgs_list)))
+            imgs_list = imgs_list[ratio:] if split == "train" else imgs_list[:ratio]
+            self.filelist += [os.path.join(path, category, img) for img in imgs_list]
+            self.labels += [i]*len(imgs_list)
+
+    def __len__(self):
+        return len(self.filelist)
+
+    def __getitem__(self, idx):
+        img = read_img(self.filelist[idx], self.img_size)
+        img = torch.tensor(np.transpose(img, [2, 0, 1]) / 255., dtype=torch.float)
+        return img, self.labels[idx]
+
+# =================
+# Dependency analysis
+# =================
+def is_depthwise(m):
+    return isinstance(m, nn.Conv2d) and m.groups > 1 and m.groups == m.in_channels == m.out_channels
+
+def is_global_pool(m):
+    return isinstance(m, nn.AdaptiveAvgPool2d) and m.output_size in [1, (1, 1)]
+
+def follow(node, modules, unit, pooled=False):
+    # Walk every path from a conv output until each one ends in a layer which only reads the channels.
+    # Paths into add / cat / anything unknown make the whole unit unprunable,
+    # so the residual adds and the DenseNet / Inception concatenations keep their channels.
+    if not node.users:
+        return False
+
+    for user in node.users:
+        user_pooled = pooled
+        if user.op == "call_module":
+            m = modules[user.target]
+            if isinstance(m, nn.Conv2d) and m.groups == 1:
+                unit["in"].append(user.target)
+                continue
+            if isinstance(m, nn.Linear) and pooled:
+                unit["in"].append(user.target)
+                continue
+
+            if isinstance(m, nn.BatchNorm2d) or is_depthwise(m):
+                unit["out"].append(user.target)
+            elif is_global_pool(m):
+                user_pooled = True
+            elif isinstance(m, nn.Flatten) and pooled:
+                pass
+            elif not isinstance(m, PASS_MODULES):
+                return False
+        elif user.op == "call_function":
+            if user.target is torch.flatten and pooled:
+                pass
+            elif user.target not in PASS_FUNCTIONS:
+                return False
+        else:
+            return False
+
+        if not follow(user, modules, unit, user_pooled):
+            return False
+    return True
+
+def find_prunable_units(net):
+    gm = fx.symbolic_trace(net)
+    modules = dict(gm.named_modules())
+    call_count = Counter(node.target for node in gm.graph.nodes if node.op == "call_module")
+
+    units = []
+    for node in gm.graph.nodes:
+        if node.op != "call_module":
+            continue
+        m = modules[node.target]
+        if not isinstance(m, nn.Conv2d) or m.groups != 1:
+            continue
+
+        unit = {"conv": node.target, "out": [], "in": []}
+        if not follow(node, modules, unit):
+            continue
+        unit["out"] = list(dict.fromkeys(unit["out"]))
+        unit["in"] = list(dict.fromkeys(unit["in"]))
+
+        # Shared modules would be pruned differently at each call site
+        if all(call_count[name] == 1 for name in [unit["conv"]] + unit["out"] + unit["in"]):
+            units.append(unit)
+    return units
+
+# =================
+# Ranking
+# =================
+def rank_channels(net, unit, criterion="l1"):
+    bn = [name for name in unit["out"] if isinstance(net.get_submodule(name), nn.BatchNorm2d)]
+    if criterion == "gamma" and bn:
+        return net.get_submodule(bn[0]).weight.detach().abs()
+    return net.get_submodule(unit["conv"]).weight.detach().abs().sum(dim=(1, 2, 3))
+
+def select_channels(scores, ratio):
+    num_keep = max(1, int(round(len(scores) * (1 - ratio))))
+    idx = torch.topk(scores, num_keep).indices
+    return torch.sort(idx).values
+
+# =================
+# Module surgery
+# =================
+def set_module(net, name, module):
+    parent, _, attr = name.rpartition(".")
+    setattr(net.get_submodule(parent) if parent else net, attr, module)
+
+def conv_like(conv, in_channels, out_channels, groups):
+    return nn.Conv2d(in_channels, out_channels, conv.kernel_size, conv.stride, conv.padding, conv.dilation,
+                    groups, conv.bias is not None, conv.padding_mode).to(conv.weight.device)
+
+def prune_out(m, idx):
+    if isinstance(m, nn.BatchNorm2d):
+        new = nn.BatchNorm2d(len(idx), m.eps, m.momentum, m.affine, m.track_running_stats).to(m.running_mean.device)
+        if m.affine:
+            new.weight.data = m.weight.data[idx].clone()
+            new.bias.data = m.bias.data[idx].clone()
+        new.running_mean.data = m.running_mean.data[idx].clone()
+        new.running_var.data = m.running_var.data[idx].clone()
+        new.num_batches_tracked.data = m.num_batches_tracked.data.clone()
+        return new
+
+    if is_depthwise(m):
+        new = conv_like(m, len(idx), len(idx), len(idx))
+    else:
+        new = conv_like(m, m.in_channels, len(idx), m.groups)
+    new.weight.data = m.weight.data[idx].clone()
+    if m.bias is not None:
+        new.bias.data = m.bias.data[idx].clone()
+    return new
+
+def prune_in(m, idx):
+    if isinstance(m, nn.Linear):
+        new = nn.Linear(len(idx), m.out_features, m.bias is not None).to(m.weight.device)
+    else:
+        new = conv_like(m, len(idx), m.out_channels, 1)
+    new.weight.data = m.weight.data[:, idx].clone()
+    if m.bias is not None:
+        new.bias.data = m.bias.data.clone()
+    return new
+
+def prune_network(net, ratio=0.3, criterion="l1"):
+    units = find_prunable_units(net)
+    for unit in units:
+        idx = select_channels(rank_channels(net, unit, criterion), ratio)
+        for name in [unit["conv"]] + unit["out"]:
+            set_module(net, name, prune_out(net.get_submodule(name), idx))
+        for name in unit["in"]:
+            set_module(net, name, prune_in(net.get_submodule(name), idx))
+    return net, units
+
+# =================
+# Report
+# =================
+def count_params(net):
+    return sum(p.numel() for p in net.parameters())
+
+def count_flops(net, input_shape):
+    # Multiply-accumulates of conv and linear layers for one forward
+    flops = []
+    def conv_hook(m, input, output):
+        flops.append(output.numel() * (m.in_channels // m.groups) * m.kernel_size[0] * m.kernel_size[1])
+    def linear_hook(m, input, output):
+        flops.append(output.numel() * m.in_features)
+
+    hooks = []
+    for m in net.modules():
+        if isinstance(m, nn.Conv2d):
+            hooks.append(m.register_forward_hook(conv_hook))
+        elif isinstance(m, nn.Linear):
+            hooks.append(m.register_forward_hook(linear_hook))
+
+    net.eval()
+    with torch.no_grad():
+        net(torch.rand(*input_shape, device=next(net.parameters()).device))
+    for hook in hooks:
+        hook.remove()
+    return sum(flops) / input_shape[0]
+
+def measure_latency(net, input_shape, warmup=5, iters=30):
+    net = copy.deepcopy(net).cpu().eval()
+    X = torch.rand(*input_shape)
+    times = []
+    with torch.inference_mode():
+        for _ in range(warmup):
+            net(X)
+        for _ in range(iters):
+            start = time.perf_counter()
+            net(X)
+            times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50)
+
+def print_report(results):
+    print("\n==================== Report ====================")
+    print(f"{'':>10} | {'Params(M)':>9} | {'GFLOPs':>7} | {'CPU(ms)':>8} | {'Acc':>6}")
+    for name, r in results.items():
+        print(f"{name:>10} | {r['params']/1e6:9.2f} | {r['flops']/1e9:7.2f} | {r['latency']:8.2f} | {r['acc']:6.2f}")
+    print("================================================\n")
@@ -0,0 +1,67 @@
+# %%
+import os
+import argparse
+
+import torch
+from torch.utils.data import DataLoader
+
+from models import *
+from quantization import *
+
+def main(args):
+    net = model_dict[args.MODEL](input_channel=3, num_classes=args.NUM_CLASSES)
+    if args.WEIGHTS:
+        net.load_state_dict(torch.load(args.WEIGHTS, map_location="cpu"))
+    else:
+        print("No weights are given, accuracy of the randomly initialized model is meaningless.")
+    net.eval()
+
+    # =================
+    # Data Processing
+    # =================
+    calib_dataset = FlowerDataset(args.PATH, args.IMG_SIZE, "train", num_samples=args.CALIB_SIZE)
+    val_dataset = FlowerDataset(args.PATH, args.IMG_SIZE, "validation")
+    calib_loader = DataLoader(calib_dataset, batch_size=args.BATCH_SIZE, num_workers=args.NUM_WORKER)
+    val_loader = DataLoader(val_dataset, batch_size=args.BATCH_SIZE, num_workers=args.NUM_WORKER)
+
+    # =================
+    # Quantization
+    # =================
+    print(f"Calibrating with {len(calib_dataset)} images ....")
+    qnet = quantize(net, calib_loader, args.IMG_SIZE, args.BACKEND)
+
+    results = {}
+    for name, model in [("fp32", net), ("int8", qnet)]:
+        p50, p99 = measure_latency(model, (1, 3, args.IMG_SIZE, args.IMG_SIZE))
+        results[name] = {"acc": evaluate(model, val_loader), "size": model_size(model), "p50": p50, "p99": p99}
+    print_report(results)
+
+    os.makedirs(args.SAVE_PATH, exist_ok=True)
+    save_path = os.path.join(args.SAVE_PATH, f"{args.MODEL}_int8.pt")
+    torch.jit.save(torch.jit.script(qnet), save_path)
+    print(f"Saved to {save_path}")
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="MobileNetV2", type=str, help="")
+    parser.add_argument("--WEIGHTS", default="", type=str, help="state_dict of the trained fp32 model")
+    parser.add_argument("--PATH", default="../../../data/flower_photos", type=str, help="")
+    parser.add_argument("--NUM_CLASSES", default=5, type=int, help="")
+    parser.add_argument("--IMG_SIZE", default=128, type=int, help="")
+    parser.add_argument("--CALIB_SIZE", default=256, type=int, help="")
+    parser.add_argument("--BATCH_SIZE", default=16, type=int, help="")
+    parser.add_argument("--NUM_WORKER", default=2, type=int, help="")
+    parser.add_argument("--BACKEND", default="fbgemm", type=str, help="'fbgemm' for x86, 'qnnpack' for ARM")
+    parser.add_argument("--SAVE_PATH", default="./quantized", type=str, help="")
+
+    args = parser.parse_args()
+
+    assert args.MODEL in model_dict, f"Please use model in {list(model_dict.keys())}"
+    assert args.BACKEND in ["fbgemm", "qnnpack"], "Please use backend in ['fbgemm', 'qnnpack']"
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print(f"Backend : {args.BACKEND}")
+    print("===========================================\n")
+
+    main(args)
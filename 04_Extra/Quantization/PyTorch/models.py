@@ -0,0 +1,152 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+import sys
+sys.path.append("../../..") # MobileNet V1 / V2 and SqueezeNet are the model_zoo/ definitions of the 03_Advance/CNN scripts
+from model_zoo.pytorch.mobilenet_v1 import Build_MobileNet
+from model_zoo.pytorch.mobilenet_v2 import Build_MobileNetV2
+from model_zoo.pytorch.squeezenet import Build_SqueezeNet
+
+# MobileNet V3 of 03_Advance/CNN/MobileNetV3/PyTorch.py, with its activations written so that they map to quantized kernels.
+# Attribute names are kept, so the state_dict of a trained model can be loaded as it is.
+
+# =================
+# MobileNet V3
+# =================
+class Hard_Sigmoid(nn.Module):
+    def __init__(self, inplace=False):
+        super(Hard_Sigmoid, self).__init__()
+        self.inplace = inplace
+
+    def forward(self, x):
+        # max(0, min(1, 0.2x + 0.5)), written with hardtanh so that it maps to a quantized kernel
+        return F.hardtanh(x * 0.2 + 0.5, 0., 1.)
+
+# x * relu6(x + 3) / 6, same as Hard_Swish of the original script
+Hard_Swish = nn.Hardswish
+
+class HS_Conv_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1, use_hs=True):
+        super(HS_Conv_Block, self).__init__()
+        Act = Hard_Swish if use_hs else nn.ReLU6
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, output_feature, ksize, strides, padding),
+            nn.BatchNorm2d(output_feature),
+            Act(True)
+            )
+
+    def forward(self, x):
+        return self.block(x)
+
+class SE_Depthwise_Separable_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1, alpha=1, use_se=True, use_hs=True):
+        super(SE_Depthwise_Separable_Block, self).__init__()
+        
+        self.use_se = use_se
+
+        Act = Hard_Swish if use_hs else nn.ReLU6
+
+        self.depthwise = nn.Sequential(
+            nn.Conv2d(input_feature, input_feature, ksize, strides, padding, groups=input_feature),
+            nn.BatchNorm2d(input_feature),
+            Act(True)
+        )
+
+        self.pointhwise = nn.Sequential(
+            nn.Conv2d(input_feature, int(output_feature*alpha), 1),
+            nn.BatchNorm2d(int(output_feature*alpha)),
+            Act(True)
+        )
+
+        if use_se:
+            self.se = nn.Sequential(
+                nn.AdaptiveAvgPool2d((1, 1)),
+                nn.Conv2d(input_feature, input_feature, 1, 1),
+                nn.ReLU(True),
+                nn.Conv2d(input_feature, input_feature, 1, 1),
+                Hard_Sigmoid(True)
+            )
+
+    def forward(self, x):
+        out = self.depthwise(x)
+        if self.use_se:
+            out = out * self.se(out)
+        out = self.pointhwise(x)
+        return out
+
+class SE_Inverted_Residual_Block(nn.Module):
+    def __init__(self, input_feature, expansion, output_feature, strides=1, alpha=1, use_se=True, use_hs=True):
+        super(SE_Inverted_Residual_Block, self).__init__()
+        
+        self.stride = strides
+
+        self.intermediate_featrue = int(input_feature*expansion)
+        
+        self.output_feature = output_feature
+
+        self.alpha = alpha
+        
+        self.block = nn.Sequential(
+            HS_Conv_Block(input_feature, self.intermediate_featrue, 1, 1, 0, use_hs),
+            SE_Depthwise_Separable_Block(self.intermediate_featrue, self.output_feature, 3, strides, 1, self.alpha, use_se, use_hs)
+        )
+    
+    def forward(self, x):
+        output = self.block(x)
+        if self.stride==1 and self.intermediate_featrue == int(self.output_feature*self.alpha):
+            return x + output
+        return output
+
+class Build_MobileNetV3(nn.Sequential):
+    def __init__(self, input_channel=3, num_classes=1000, alpha=1):
+        super(Build_MobileNetV3, self).__init__()
+
+        self.Stem = HS_Conv_Block(input_channel, 16, 3, 2, 1)
+
+        layer_list = []
+
+        layer_list.append(SE_Inverted_Residual_Block(16, 1, 16, 1, 1, use_se=False, use_hs=False))
+
+        layer_list.append(SE_Inverted_Residual_Block(16, 4, 24, 2, 1, use_se=False, use_hs=False))
+        layer_list.append(SE_Inverted_Residual_Block(24, 3, 24, 1, 1, use_se=False, use_hs=False))
+
+        layer_list.append(SE_Inverted_Residual_Block(24, 3, 40, 2, 1, use_hs=False))
+        layer_list.append(SE_Inverted_Residual_Block(40, 3, 40, 1, 1, use_hs=False))
+        layer_list.append(SE_Inverted_Residual_Block(40, 3, 40, 1, 1, use_hs=False))
+
+        layer_list.append(SE_Inverted_Residual_Block(40, 6, 80, 2, 1, use_se=False))
+        layer_list.append(SE_Inverted_Residual_Block(80, 2.5, 80, 1, 1, use_se=False))
+        layer_list.append(SE_Inverted_Residual_Block(80, 2.3, 80, 1, 1, use_se=False))
+        layer_list.append(SE_Inverted_Residual_Block(80, 2.3, 80, 1, 1, use_se=False))
+        layer_list.append(SE_Inverted_Residual_Block(80, 6, 112, 1, 1))
+        layer_list.append(SE_Inverted_Residual_Block(112, 6, 112, 1, 1))
+        
+        layer_list.append(SE_Inverted_Residual_Block(112, 6, 160, 2, 1))
+        layer_list.append(SE_Inverted_Residual_Block(160, 6, 160, 1, 1))
+        layer_list.append(SE_Inverted_Residual_Block(160, 6, 160, 1, 1))
+
+        layer_list.append(HS_Conv_Block(160, 960, 1, 1, 0))
+
+        self.Main_Block = nn.Sequential(*layer_list)
+
+        self.Classifier = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Linear(960, 1280),
+            Hard_Swish(True),
+            nn.Linear(1280, num_classes)
+        )
+
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.Main_Block(x)
+        x = self.Classifier(x)
+        return x
+
+model_dict = {
+    "MobileNetV1": Build_MobileNet,
+    "MobileNetV2": Build_MobileNetV2,
+    "MobileNetV3": Build_MobileNetV3,
+    "SqueezeNet": Build_SqueezeNet
+}
@@ -0,0 +1,101 @@
+import io
+import os
+import copy
+import time
+import cv2 as cv
+import numpy as np
+
+import torch
+from torch.utils.data import Dataset, DataLoader
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+def read_img(path, img_size):
+    img = cv.imread(path)
+    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    img = cv.resize(img, (img_size, img_size))
+    return img
+
+class FlowerDataset(Dataset):
+    # Same 95/5 split per category as the 03_Advance/CNN scripts, images are decoded lazily
+    def __init__(self, path, img_size, split="train", num_samples=None, seed=0):
+        self.img_size = img_size
+        self.category_list = [i for i in os.listdir(path) if os.path.isdir(os.path.join(path, i))]
+
+        self.filelist = []
+        self.labels = []
+        for i, category in enumerate(self.category_list):
+            imgs_list = os.listdir(os.path.join(path, category))
+            ratio = int(np.round(0.05 * len(imgs_list)))
+            imgs_list = imgs_list[ratio:] if split == "train" else imgs_list[:ratio]
+            self.filelist += [os.path.join(path, category, img) for img in imgs_list]
+            self.labels += [i]*len(imgs_list)
+
+        if num_samples is not None and num_samples < len(self.filelist):
+            idx = np.random.RandomState(seed).choice(len(self.filelist), num_samples, replace=False)
+            self.filelist = [self.filelist[i] for i in idx]
+            self.labels = [self.labels[i] for i in idx]
+
+    def __len__(self):
+        return len(self.filelist)
+
+    def __getitem__(self, idx):
+        img = read_img(self.filelist[idx], self.img_size)
+        img = torch.tensor(np.transpose(img, [2, 0, 1]) / 255., dtype=torch.float)
+        return img, self.labels[idx]
+
+def calibrate(prepared, loader):
+    prepared.eval()
+    with torch.no_grad():
+        for batch_img, _ in loader:
+            prepared(batch_img)
+
+def quantize(net, calib_loader, img_size, backend="fbgemm"):
+    # FX graph mode inserts the quant/dequant stubs and fuses Conv-BN(-ReLU) by itself,
+    # so the residual adds and the Fire concatenation need no changes in the model code
+    torch.backends.quantized.engine = backend
+    net = copy.deepcopy(net).cpu().eval()
+
+    example_inputs = (torch.rand(1, 3, img_size, img_size),)
+    prepared = prepare_fx(net, get_default_qconfig_mapping(backend), example_inputs)
+    calibrate(prepared, calib_loader)
+    return convert_fx(prepared)
+
+def evaluate(net, loader):
+    net.eval()
+    total = 0
+    correct = 0
+    with torch.no_grad():
+        for batch_img, batch_lab in loader:
+            y_pred = net(batch_img)
+            _, predicted = torch.max(y_pred, 1)
+            total += batch_lab.size(0)
+            correct += (predicted == batch_lab).sum().item()
+    return 100 * correct / total
+
+def measure_latency(net, input_shape, warmup=5, iters=30):
+    net.eval()
+    X = torch.rand(*input_shape)
+    times = []
+    with torch.inference_mode():
+        for _ in range(warmup):
+            net(X)
+        for _ in range(iters):
+            start = time.perf_counter()
+            net(X)
+            times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+def model_size(net):
+    buffer = io.BytesIO()
+    torch.save(net.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / 1e6
+
+def print_report(results):
+    print("\n================ Report ================")
+    print(f"{'':>6} | {'Acc':>7} | {'Size(MB)':>8} | {'p50(ms)':>8} | {'p99(ms)':>8}")
+    for name, r in results.items():
+        print(f"{name:>6} | {r['acc']:7.2f} | {r['size']:8.2f} | {r['p50']:8.2f} | {r['p99']:8.2f}")
+    fp32, int8 = results["fp32"], results["int8"]
+    print(f"Speed up : {fp32['p50']/int8['p50']:.2f}x, Compression : {fp32['size']/int8['size']:.2f}x")
+    print("========================================\n")
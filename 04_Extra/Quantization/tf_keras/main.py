@@ -0,0 +1,128 @@
+# %%
+import os
+import time
+import argparse
+import cv2 as cv
+import numpy as np
+import tensorflow as tf
+
+from models import *
+
+def read_img(path, img_size):
+    img = cv.imread(path)
+    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    img = cv.resize(img, (img_size, img_size))
+    return img
+
+def load_split(path, split="train"):
+    # Same 95/5 split per category as the 03_Advance/CNN scripts
+    category_list = [i for i in os.listdir(path) if os.path.isdir(os.path.join(path, i))]
+    filelist = []
+    labels = []
+    for i, category in enumerate(category_list):
+        imgs_list = os.listdir(os.path.join(path, category))
+        ratio = int(np.round(0.05 * len(imgs_list)))
+        imgs_list = imgs_list[ratio:] if split == "train" else imgs_list[:ratio]
+        filelist += [os.path.join(path, category, img) for img in imgs_list]
+        labels += [i]*len(imgs_list)
+    return filelist, np.array(labels)
+
+def convert(model, representative_files=None, img_size=150):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if representative_files is None:
+        return converter.convert()
+
+    def representative_dataset():
+        for file in representative_files:
+            img = read_img(file, img_size)[None].astype(np.float32) / 255.
+            yield [img]
+
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    return converter.convert()
+
+def make_interpreter(tflite_model):
+    interpreter = tf.lite.Interpreter(model_content=tflite_model, num_threads=os.cpu_count())
+    interpreter.allocate_tensors()
+    return interpreter
+
+def invoke(interpreter, img):
+    input_detail = interpreter.get_input_details()[0]
+    output_detail = interpreter.get_output_details()[0]
+    if input_detail['dtype'] == np.uint8:
+        scale, zero_point = input_detail['quantization']
+        img = np.round(img / scale + zero_point).clip(0, 255).astype(np.uint8)
+    interpreter.set_tensor(input_detail['index'], img)
+    interpreter.invoke()
+    return interpreter.get_tensor(output_detail['index'])
+
+def evaluate(interpreter, files, labels, img_size):
+    correct = 0
+    for file, label in zip(files, labels):
+        img = read_img(file, img_size)[None].astype(np.float32) / 255.
+        correct += int(np.argmax(invoke(interpreter, img)) == label)
+    return 100 * correct / len(files)
+
+def measure_latency(interpreter, img_size, warmup=5, iters=30):
+    img = np.random.rand(1, img_size, img_size, 3).astype(np.float32)
+    times = []
+    for i in range(warmup + iters):
+        start = time.perf_counter()
+        invoke(interpreter, img)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+def main(args):
+    model = model_dict[args.MODEL](input_shape=(args.IMG_SIZE, args.IMG_SIZE, 3), num_classes=args.NUM_CLASSES)
+    if args.WEIGHTS:
+        model.load_weights(args.WEIGHTS)
+    else:
+        print("No weights are given, accuracy of the randomly initialized model is meaningless.")
+
+    train_files, _ = load_split(args.PATH, "train")
+    val_files, val_labels = load_split(args.PATH, "validation")
+    calib_files = [train_files[i] for i in np.random.RandomState(0).permutation(len(train_files))[:args.CALIB_SIZE]]
+
+    print(f"Calibrating with {len(calib_files)} images ....")
+    tflite_models = {
+        "fp32": convert(model),
+        "int8": convert(model, calib_files, args.IMG_SIZE)
+    }
+
+    os.makedirs(args.SAVE_PATH, exist_ok=True)
+    print("\n================ Report ================")
+    print(f"{'':>6} | {'Acc':>7} | {'Size(MB)':>8} | {'p50(ms)':>8} | {'p99(ms)':>8}")
+    for name, tflite_model in tflite_models.items():
+        with open(os.path.join(args.SAVE_PATH, f"{args.MODEL}_{name}.tflite"), "wb") as f:
+            f.write(tflite_model)
+
+        interpreter = make_interpreter(tflite_model)
+        acc = evaluate(interpreter, val_files, val_labels, args.IMG_SIZE)
+        p50, p99 = measure_latency(interpreter, args.IMG_SIZE)
+        print(f"{name:>6} | {acc:7.2f} | {len(tflite_model)/1e6:8.2f} | {p50:8.2f} | {p99:8.2f}")
+    print("========================================\n")
+    print(f"Saved to {args.SAVE_PATH}")
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="MobileNetV2", type=str, help="")
+    parser.add_argument("--WEIGHTS", default="", type=str, help="weights of the trained keras model")
+    parser.add_argument("--PATH", default="../../../data/flower_photos", type=str, help="")
+    parser.add_argument("--NUM_CLASSES", default=5, type=int, help="")
+    parser.add_argument("--IMG_SIZE", default=150, type=int, help="")
+    parser.add_argument("--CALIB_SIZE", default=256, type=int, help="")
+    parser.add_argument("--SAVE_PATH", default="./quantized", type=str, help="")
+
+    args = parser.parse_args()
+
+    assert args.MODEL in model_dict, f"Please use model in {list(model_dict.keys())}"
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print("===========================================\n")
+
+    main(args)
@@ -0,0 +1,225 @@
+from tensorflow.keras import layers, models
+from tensorflow.keras import backend as K
+
+# Same network definitions as 03_Advance/CNN/{MobileNetV1, MobileNetV2, MobileNetV3, SqueezeNet}/tf_keras.py
+# Layer names are kept, so the weights of a trained model can be loaded as they are.
+
+def relu6(x):
+    return K.relu(x, max_value=6.0)
+
+def hard_swish(x):
+    return x * K.relu(x + 3.0, max_value=6.0) / 6.0
+
+def conv_block(x, filters, ksize=3, strides=1, padding="same", max_value=None, name="Block"):
+    x = layers.Conv2D(filters, ksize, strides=strides, padding=padding, name=name+"_Conv")(x)
+    x = layers.BatchNormalization(name=name+"_BN")(x)
+    x = layers.ReLU(max_value=max_value, name=name+"_Act")(x)
+    return x
+
+# =================
+# MobileNet V1
+# =================
+def depthwise_separable_block(x, filters, ksize=3, strides=1, padding="same", depth_multiplier=1, alpha=1, name="Block"):    
+    x = layers.DepthwiseConv2D(ksize, strides=strides, padding=padding, depth_multiplier=depth_multiplier, name=name+"_Depthwise")(x)
+    x = layers.BatchNormalization(name=name+"_BN_1")(x)
+    x = layers.ReLU(name=name+"_Act_1")(x)
+
+    x = layers.Conv2D(int(filters*alpha), 1, name=name+"_Pointwise")(x)
+    x = layers.BatchNormalization(name=name+"_BN_2")(x)
+    x = layers.ReLU(name=name+"_Act_2")(x)
+    return x
+
+def build_mobilenet_v1(input_shape=(None, None, 3), num_classes=1, depth_multiplier=1, alpha=1, name='Mobile'):
+    
+    last_act = 'sigmoid' if num_classes==1 else 'softmax'
+
+    input = layers.Input(shape=input_shape, name=name+"_input")
+
+    x = conv_block(input, 32, 3, 2, "same", name=name+"_Stem")
+
+    x = depthwise_separable_block(x, 64, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_1")
+    x = depthwise_separable_block(x, 128, strides=2, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_2")
+    x = depthwise_separable_block(x, 128, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_3")
+    x = depthwise_separable_block(x, 256, strides=2, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_4")
+    x = depthwise_separable_block(x, 256, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_5")
+    x = depthwise_separable_block(x, 512, strides=2, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_6")
+
+    for i in range(5):
+        x = depthwise_separable_block(x, 512, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_%d"%(i+1+6))
+
+    x = depthwise_separable_block(x, 1024, strides=2, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_12")
+    x = depthwise_separable_block(x, 1024, depth_multiplier=depth_multiplier, alpha=alpha, name=name+"_Block_13")
+
+    x = layers.GlobalAveragePooling2D(name=name+"_GAP")(x)
+    x = layers.Dense(num_classes, activation=last_act, name=name+"_Output")(x)
+
+    return models.Model(input, x)
+
+# =================
+# MobileNet V2 / V3
+# =================
+def inverted_residual_block(input, expansion, filters, strides=1, alpha=1, use_se=False, use_hs=False, name="Inverted_Residual"):
+    
+    n_features = int(input.shape[-1])
+    exp_size = int(n_features*expansion)
+    act = hard_swish if use_hs else relu6
+
+    x = layers.Conv2D(exp_size, 1, name=name+"_Expansion")(input)
+    x = layers.BatchNormalization(name=name+"_BN_1")(x)
+    x = layers.Activation(act, name=name+"_Act_1")(x)
+
+    x = layers.DepthwiseConv2D(3, strides, padding="same", name=name+"_Depthwise")(x)
+    x = layers.BatchNormalization(name=name+"_BN_2")(x)
+    x = layers.Activation(act, name=name+"_Act_2")(x)
+
+    if use_se:
+        se = layers.GlobalAvgPool2D(name=name+"_SE_Pool")(x)
+        se = layers.Dense(exp_size, activation="relu", name=name+"_SE_FC1")(se)
+        se = layers.Dense(exp_size, activation="hard_sigmoid", name=name+"_SE_FC2")(se)
+        se = layers.Reshape((1, 1, exp_size), name=name+"_SE_Reshape")(se)
+        x = layers.Multiply(name=name+"_SE_Mul")([x, se])
+
+    x = layers.Conv2D(int(filters*alpha), 1, name=name+"_Pointwise")(x)
+    x = layers.BatchNormalization(name=name+"_BN_3")(x)
+
+    if strides==1 and n_features==int(filters*alpha):
+        x = layers.Add(name=name+"_Add")([input, x])
+    return x
+
+def build_mobilenet_v2(input_shape=(None, None, 3), num_classes=1, alpha=1, name='Mobile'):
+    
+    last_act = 'sigmoid' if num_classes==1 else 'softmax'
+
+    input = layers.Input(shape=input_shape, name=name+"_input")
+
+    x = conv_block(input, 32, 3, 2, "same", max_value=6, name=name+"_Stem")
+    
+    x = inverted_residual_block(x, 1, 16, alpha=alpha, name=name+"_Block_1")
+    
+    x = inverted_residual_block(x, 6, 24, strides=2, alpha=alpha, name=name+"_Block_2")
+    x = inverted_residual_block(x, 6, 24, alpha=alpha, name=name+"_Block_3")
+
+    x = inverted_residual_block(x, 6, 32, strides=2, alpha=alpha, name=name+"_Block_4")
+    x = inverted_residual_block(x, 6, 32, alpha=alpha, name=name+"_Block_5")
+    x = inverted_residual_block(x, 6, 32, alpha=alpha, name=name+"_Block_6")
+    
+    x = inverted_residual_block(x, 6, 64, strides=2, alpha=alpha, name=name+"_Block_7")
+    x = inverted_residual_block(x, 6, 64, alpha=alpha, name=name+"_Block_8")
+    x = inverted_residual_block(x, 6, 64, alpha=alpha, name=name+"_Block_9")
+    x = inverted_residual_block(x, 6, 64, alpha=alpha, name=name+"_Block_10")
+
+    x = inverted_residual_block(x, 6, 96, alpha=alpha, name=name+"_Block_11")
+    x = inverted_residual_block(x, 6, 96, alpha=alpha, name=name+"_Block_12")
+    x = inverted_residual_block(x, 6, 96, alpha=alpha, name=name+"_Block_13")
+
+    x = inverted_residual_block(x, 6, 160, strides=2, alpha=alpha, name=name+"_Block_14")
+    x = inverted_residual_block(x, 6, 160, alpha=alpha, name=name+"_Block_15")
+    x = inverted_residual_block(x, 6, 160, alpha=alpha, name=name+"_Block_16")
+
+    x = inverted_residual_block(x, 6, 320, alpha=alpha, name=name+"_Block_17")
+
+    x = conv_block(x, 1280, 1, 1, "valid", max_value=6, name=name+"_Exit")
+    
+    x = layers.GlobalAveragePooling2D(name=name+"_GAP")(x)
+    x = layers.Dense(num_classes, activation=last_act, name=name+"_Output")(x)
+
+    return models.Model(input, x)
+
+def build_mobilenet_v3(input_shape=(None, None, 3), num_classes=1, alpha=1, name='Mobile'):
+    
+    last_act = 'sigmoid' if num_classes==1 else 'softmax'
+
+    input = layers.Input(shape=input_shape, name=name+"_input")
+
+    x = layers.Conv2D(16, 3, strides=2, padding="same", name=name+"_Stem_Conv")(input)
+    x = layers.BatchNormalization(name=name+"_Stem_BN")(x)
+    x = layers.Activation(hard_swish, name=name+"_Stem_Act")(x)
+
+    x = inverted_residual_block(x, 1, 16, alpha=alpha, use_se=False, use_hs=False, name=name+"_Block_1")
+    
+    x = inverted_residual_block(x, 4, 24, strides=2, alpha=alpha, use_se=False, use_hs=False, name=name+"_Block_2")
+    x = inverted_residual_block(x, 3, 24, alpha=alpha, use_se=False, use_hs=False, name=name+"_Block_3")
+
+    x = inverted_residual_block(x, 3, 40, strides=2, alpha=alpha, use_se=True, use_hs=False, name=name+"_Block_4")
+    x = inverted_residual_block(x, 3, 40, alpha=alpha, use_se=True, use_hs=False, name=name+"_Block_5")
+    x = inverted_residual_block(x, 3, 40, alpha=alpha, use_se=True, use_hs=False, name=name+"_Block_6")
+    
+    x = inverted_residual_block(x, 6, 80, strides=2, alpha=alpha, use_se=False, use_hs=True, name=name+"_Block_7")
+    x = inverted_residual_block(x, 2.5, 80, alpha=alpha, use_se=False, use_hs=True, name=name+"_Block_8")
+    x = inverted_residual_block(x, 2.3, 80, alpha=alpha, use_se=False, use_hs=True, name=name+"_Block_9")
+    x = inverted_residual_block(x, 2.3, 80, alpha=alpha, use_se=False, use_hs=True, name=name+"_Block_10")
+    x = inverted_residual_block(x, 6, 112, alpha=alpha, use_se=True, use_hs=True, name=name+"_Block_11")
+    x = inverted_residual_block(x, 6, 112, alpha=alpha, use_se=True, use_hs=True, name=name+"_Block_12")
+
+    x = inverted_residual_block(x, 6, 160, strides=2, alpha=alpha, use_se=True, use_hs=True, name=name+"_Block_13")
+    x = inverted_residual_block(x, 6, 160, alpha=alpha, use_se=True, use_hs=True, name=name+"_Block_14")
+    x = inverted_residual_block(x, 6, 160, alpha=alpha, use_se=True, use_hs=True, name=name+"_Block_15")
+
+    x = layers.Conv2D(960, 1, name=name+"_Exit_Conv")(x)
+    x = layers.BatchNormalization(name=name+"_Exit_BN")(x)
+    x = layers.Activation(hard_swish, name=name+"_Exit_Act")(x)
+    
+    x = layers.GlobalAveragePooling2D(name=name+"_GAP")(x)
+    x = layers.Dense(1280, name=name+"_Dense")(x)
+    x = layers.Activation(hard_swish, name=name+"_Act")(x)
+    x = layers.Dense(num_classes, activation=last_act, name=name+"_Output")(x)
+
+    return models.Model(input, x)
+
+# =================
+# SqueezeNet
+# =================
+def Conv_Block(input, filters, ksize, stride, padding, activation, use_bn=False, name="Conv"):
+    out = layers.Conv2D(filters, ksize, stride, padding, name=name+"_Conv")(input)
+    if use_bn:
+        out = layers.BatchNormalization(name=name+"_BN")(out)
+    out = layers.Activation(activation, name=name+"_Act")(out)
+    return out
+
+def Fire_Module(input, squ, exp_1x1, exp_3x3, use_bn=False, name="Fire"):
+    
+    squeeze = Conv_Block(input, squ, 1, 1, 'valid', 'relu', name=name+"_Squeeze")
+
+    expand_1x1 = Conv_Block(squeeze, exp_1x1, 1, 1, 'valid', 'linear', name=name+"_Expand_1x1")
+    expand_3x3 = Conv_Block(squeeze, exp_3x3, 3, 1, 'same', 'linear', name=name+"_Expand_3x3")
+
+    out = layers.Concatenate(name=name+"_Expand")([expand_1x1, expand_3x3])
+    out = layers.ReLU(name=name+"_Act")(out)
+
+    return out
+
+def build_squeezenet(input_shape=(None, None, 3), num_classes=1, name='Squeeze'):
+    
+    last_act = 'sigmoid' if num_classes==1 else 'softmax'
+
+    input = layers.Input(shape=input_shape, name=name+"_input")
+
+    x = Conv_Block(input, 96, 7, 2, 'same', 'relu', name=name+"_Block_1")
+    x = layers.MaxPool2D(3, 2, name=name+"_Pool_1")(x)
+
+    x = Fire_Module(x, 16, 64, 64, name=name+"_Fire_2")
+    x = Fire_Module(x, 16, 64, 64, name=name+"_Fire_3")
+    x = Fire_Module(x, 32, 128, 128, name=name+"_Fire_4")
+    x = layers.MaxPool2D(3, 2, name=name+"_Pool_4")(x)
+
+    x = Fire_Module(x, 32, 128, 128, name=name+"_Fire_5")
+    x = Fire_Module(x, 48, 192, 192, name=name+"_Fire_6")
+    x = Fire_Module(x, 48, 192, 192, name=name+"_Fire_7")
+    x = Fire_Module(x, 64, 256, 256, name=name+"_Fire_8")
+    x = layers.MaxPool2D(3, 2, name=name+"_Pool_8")(x)
+
+    x = Fire_Module(x, 64, 256, 256, name=name+"_Fire_9")
+    x = layers.Dropout(0.5, name=name+"_Dropout")(x)
+    x = Conv_Block(x, num_classes, 1, 1, 'valid', 'relu', name=name+"_Block_10")
+
+    x = layers.GlobalAveragePooling2D(name=name+"_GAP")(x)
+    x = layers.Activation(last_act, name=name+"_Output")(x)
+
+    return models.Model(input, x)
+
+model_dict = {
+    "MobileNetV1": build_mobilenet_v1,
+    "MobileNetV2": build_mobilenet_v2,
+    "MobileNetV3": build_mobilenet_v3,
+    "SqueezeNet": build_squeezenet
+}
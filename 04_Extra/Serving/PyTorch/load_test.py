@@ -0,0 +1,81 @@
+# %%
+import os
+import time
+import random
+import asyncio
+import argparse
+
+import cv2 as cv
+import numpy as np
+
+from main import *
+
+def load_images(path, num_images, img_size):
+    # Encoded flower images if the dataset is there, otherwise random noise images, so the test runs fully offline
+    if os.path.isdir(path):
+        files = [os.path.join(path, c, f) for c in os.listdir(path) if os.path.isdir(os.path.join(path, c))
+                 for f in os.listdir(os.path.join(path, c))]
+        random.shuffle(files)
+        images = []
+        for f in files[:num_images]:
+            with open(f, "rb") as fp:
+                images.append(fp.read())
+        return images
+    return [cv.imencode(".jpg", np.random.randint(0, 256, (img_size, img_size, 3), dtype=np.uint8))[1].tobytes()
+            for _ in range(num_images)]
+
+async def post(reader, writer, data):
+    writer.write(f"POST /predict HTTP/1.1\r\nContent-Type: application/octet-stream\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    start_line, _, body = await read_http(reader)
+    return start_line.split(" ")[1] == "200"
+
+async def client(host, port, images, num_requests, latency, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(num_requests):
+        start = time.perf_counter()
+        if not await post(reader, writer, images[i % len(images)]):
+            errors.append(i)
+        latency.append((time.perf_counter() - start) * 1000)
+    writer.close()
+
+async def run_load_test(args):
+    images = load_images(args.PATH, args.NUM_IMAGES, args.IMG_SIZE)
+    server = build_server(args)
+    port = await server.start(args.HOST, 0)
+
+    # Warm up the model so the first batches are not counted
+    await asyncio.gather(*[client(args.HOST, port, images, 2, [], []) for _ in range(args.CONCURRENCY)])
+    server.stats.reset()
+
+    latency, errors = [], []
+    per_client = args.NUM_REQUESTS // args.CONCURRENCY
+    start = time.perf_counter()
+    await asyncio.gather(*[client(args.HOST, port, images, per_client, latency, errors) for _ in range(args.CONCURRENCY)])
+    elapsed = time.perf_counter() - start
+
+    print_stats(server.stats.summary(), "Server")
+    print("==================== Client ====================")
+    print(f"Concurrency : {args.CONCURRENCY}, Requests : {len(latency)} ({len(errors)} errors)")
+    print(f"Throughput : {len(latency) / elapsed:.1f} req/s")
+    print(f"Latency (ms) : p50 {np.percentile(latency, 50):.2f} / p99 {np.percentile(latency, 99):.2f}")
+    print("================================================\n")
+    await server.stop()
+
+if __name__=="__main__":
+    parser = add_server_arguments(argparse.ArgumentParser())
+    parser.add_argument("--CONCURRENCY", default=64, type=int, help="number of clients, each keeps one request in flight")
+    parser.add_argument("--NUM_REQUESTS", default=2048, type=int, help="")
+    parser.add_argument("--NUM_IMAGES", default=256, type=int, help="")
+    args = parser.parse_args()
+
+    assert args.MODEL in model_dict, f"Please use model in {list(model_dict.keys())}"
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print(f"Max batch size : {args.MAX_BATCH_SIZE}")
+    print(f"Max latency : {args.MAX_LATENCY_MS} ms")
+    print(f"Concurrency : {args.CONCURRENCY}")
+    print("===========================================\n")
+
+    asyncio.run(run_load_test(args))
@@ -0,0 +1,67 @@
+# %%
+import os
+import asyncio
+import argparse
+
+import torch
+
+from models import *
+from server import *
+
+def build_server(args):
+    device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
+
+    net = model_dict[args.MODEL](input_channel=3, num_classes=args.NUM_CLASSES)
+    if args.WEIGHTS:
+        net.load_state_dict(torch.load(args.WEIGHTS, map_location="cpu"))
+    else:
+        print("No weights are given, predictions of the randomly initialized model are meaningless.")
+
+    # Same category order as the training scripts
+    if os.path.isdir(args.PATH):
+        category_list = [i for i in os.listdir(args.PATH) if os.path.isdir(os.path.join(args.PATH, i))]
+    else:
+        category_list = [str(i) for i in range(args.NUM_CLASSES)]
+
+    return InferenceServer(net, category_list, args.IMG_SIZE, device,
+                           args.MAX_BATCH_SIZE, args.MAX_LATENCY_MS, args.NUM_WORKER)
+
+async def serve(args):
+    server = build_server(args)
+    port = await server.start(args.HOST, args.PORT)
+    print(f"Serving {args.MODEL} on http://{args.HOST}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print_stats(server.stats.summary())
+        await server.stop()
+
+def add_server_arguments(parser):
+    parser.add_argument("--MODEL", default="MobileNetV2", type=str, help="")
+    parser.add_argument("--WEIGHTS", default="", type=str, help="state_dict of the trained model")
+    parser.add_argument("--PATH", default="../../../data/flower_photos", type=str, help="used for the category names")
+    parser.add_argument("--NUM_CLASSES", default=5, type=int, help="")
+    parser.add_argument("--IMG_SIZE", default=224, type=int, help="")
+    parser.add_argument("--MAX_BATCH_SIZE", default=32, type=int, help="")
+    parser.add_argument("--MAX_LATENCY_MS", default=5., type=float, help="how long the first request of a batch waits for others")
+    parser.add_argument("--NUM_WORKER", default=4, type=int, help="preprocessing threads")
+    parser.add_argument("--HOST", default="127.0.0.1", type=str, help="")
+    parser.add_argument("--PORT", default=8000, type=int, help="")
+    return parser
+
+if __name__=="__main__":
+    parser = add_server_arguments(argparse.ArgumentParser())
+    args = parser.parse_args()
+
+    assert args.MODEL in model_dict, f"Please use model in {list(model_dict.keys())}"
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL}")
+    print(f"Max batch size : {args.MAX_BATCH_SIZE}")
+    print(f"Max latency : {args.MAX_LATENCY_MS} ms")
+    print("===========================================\n")
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,16 @@
+from functools import partial
+
+import sys
+sys.path.append("../../..") # the networks are the model_zoo/ definitions of the 03_Advance/CNN scripts
+from model_zoo.pytorch.resnet import Residual_block, build_resnet
+from model_zoo.pytorch.mobilenet_v1 import Build_MobileNet
+from model_zoo.pytorch.mobilenet_v2 import Build_MobileNetV2
+from model_zoo.pytorch.densenet import Build_Densenet
+
+model_dict = {
+    "ResNet50": partial(build_resnet, num_layer=50),
+    "ResNet101": partial(build_resnet, num_layer=101),
+    "MobileNetV1": Build_MobileNet,
+    "MobileNetV2": Build_MobileNetV2,
+    "DenseNet121": partial(Build_Densenet, num_blocks=121)
+}
@@ -0,0 +1,221 @@
+import json
+import time
+import asyncio
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+
+import torch
+
+def preprocess(data, img_size):
+    # Same as read_img of the 03_Advance/CNN scripts, but from the encoded bytes of a request
+    img = cv.imdecode(np.frombuffer(data, np.uint8), cv.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Cannot decode the image")
+    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    img = cv.resize(img, (img_size, img_size))
+    return np.transpose(img, [2, 0, 1]).astype(np.float32) / 255.
+
+# =================
+# Statistics
+# =================
+class ServerStats:
+    def __init__(self, max_records=100000):
+        self.max_records = max_records
+        self.reset()
+
+    def reset(self):
+        self.latency = deque(maxlen=self.max_records)
+        self.queue_wait = deque(maxlen=self.max_records)
+        self.batch_sizes = Counter()
+        self.num_errors = 0
+
+    def summary(self):
+        latency = np.array(self.latency) if self.latency else np.zeros(1)
+        queue_wait = np.array(self.queue_wait) if self.queue_wait else np.zeros(1)
+        num_batches = sum(self.batch_sizes.values())
+        return {
+            "requests": len(self.latency),
+            "errors": self.num_errors,
+            "batches": num_batches,
+            "mean_batch_size": sum(k * v for k, v in self.batch_sizes.items()) / max(num_batches, 1),
+            "latency_p50": float(np.percentile(latency, 50)),
+            "latency_p99": float(np.percentile(latency, 99)),
+            "queue_p50": float(np.percentile(queue_wait, 50)),
+            "queue_p99": float(np.percentile(queue_wait, 99)),
+            "batch_histogram": {str(k): self.batch_sizes[k] for k in sorted(self.batch_sizes)}
+        }
+
+def print_stats(summary, title="Server"):
+    print(f"\n==================== {title} ====================")
+    print(f"Requests : {summary['requests']} ({summary['errors']} errors), Batches : {summary['batches']}")
+    print(f"Latency (ms) : p50 {summary['latency_p50']:.2f} / p99 {summary['latency_p99']:.2f}")
+    print(f"Queue wait (ms) : p50 {summary['queue_p50']:.2f} / p99 {summary['queue_p99']:.2f}")
+    print(f"Mean batch size : {summary['mean_batch_size']:.2f}")
+    total = max(sum(summary["batch_histogram"].values()), 1)
+    for size, count in summary["batch_histogram"].items():
+        print(f"{size:>5} | {'#' * int(round(50 * count / total)):<50} {count}")
+    print("================================================\n")
+
+# =================
+# Dynamic batching
+# =================
+class DynamicBatcher:
+    def __init__(self, net, device, max_batch_size=32, max_latency_ms=5., stats=None):
+        self.net = net.to(device).eval()
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.stats = stats if stats is not None else ServerStats()
+        self.queue = asyncio.Queue()
+        # The forwards run in one thread, so the event loop keeps accepting requests and the next batch fills up meanwhile
+        self.executor = ThreadPoolExecutor(1)
+
+    async def submit(self, x):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((x, future, time.perf_counter()))
+        return await future
+
+    async def collect(self):
+        # Wait for the first request, then gather more until the batch is full or the first one hits its deadline
+        items = [await self.queue.get()]
+        deadline = items[0][2] + self.max_latency
+        while len(items) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                if timeout > 0:
+                    items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                else:
+                    items.append(self.queue.get_nowait())
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+        return items
+
+    def forward(self, inputs):
+        X = torch.from_numpy(np.stack(inputs)).to(self.device)
+        # inference_mode is thread local, so it is entered in the executor thread
+        with torch.inference_mode():
+            return torch.softmax(self.net(X), dim=1).cpu().numpy()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self.collect()
+            start = time.perf_counter()
+            try:
+                outputs = await loop.run_in_executor(self.executor, self.forward, [x for x, _, _ in items])
+            except Exception as e:
+                for _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.batch_sizes[len(items)] += 1
+            for (_, future, enqueued), output in zip(items, outputs):
+                self.stats.queue_wait.append((start - enqueued) * 1000)
+                if not future.done():
+                    future.set_result(output)
+
+    def close(self):
+        self.executor.shutdown()
+
+# =================
+# HTTP
+# =================
+def http_response(status, payload):
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+    body = json.dumps(payload).encode()
+    header = f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    return header.encode() + body
+
+async def read_http(reader):
+    # Returns (start line, headers, body) of one request / response, or None when the connection is closed
+    start_line = await reader.readline()
+    if not start_line:
+        return None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, value = line.decode().split(":", 1)
+        headers[key.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return start_line.decode().strip(), headers, body
+
+class InferenceServer:
+    """
+    POST /predict : body is an encoded image (jpg, png, ...), returns the top-1 label and probability
+    GET /stats : latency percentiles and batch size histogram
+    """
+    def __init__(self, net, category_list, img_size=224, device="cpu", max_batch_size=32, max_latency_ms=5., num_workers=4):
+        self.category_list = category_list
+        self.img_size = img_size
+        self.stats = ServerStats()
+        self.batcher = DynamicBatcher(net, device, max_batch_size, max_latency_ms, self.stats)
+        # cv2 releases the GIL while decoding and resizing, so threads are enough for the preprocessing
+        self.preprocess_pool = ThreadPoolExecutor(num_workers)
+
+    async def predict(self, data):
+        start = time.perf_counter()
+        x = await asyncio.get_running_loop().run_in_executor(self.preprocess_pool, preprocess, data, self.img_size)
+        prob = await self.batcher.submit(x)
+        self.stats.latency.append((time.perf_counter() - start) * 1000)
+
+        idx = int(prob.argmax())
+        return {"label": self.category_list[idx], "index": idx, "prob": float(prob[idx])}
+
+    async def route(self, method, path, body):
+        if method == "POST" and path == "/predict":
+            try:
+                return 200, await self.predict(body)
+            except ValueError as e:
+                self.stats.num_errors += 1
+                return 400, {"error": str(e)}
+            except Exception as e:
+                self.stats.num_errors += 1
+                return 500, {"error": repr(e)}
+        if method == "GET" and path == "/stats":
+            return 200, self.stats.summary()
+        return 404, {"error": f"{method} {path} is not found"}
+
+    async def handle(self, reader, writer):
+        # Keep-alive connection, requests on one connection are answered in order
+        try:
+            while True:
+                request = await read_http(reader)
+                if request is None:
+                    break
+                start_line, headers, body = request
+                method, path, _ = start_line.split(" ", 2)
+                status, payload = await self.route(method, path, body)
+                writer.write(http_response(status, payload))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        except ValueError as e:
+            # Malformed start line, header or Content-Length : the next request can't be framed, so the connection is closed
+            self.stats.num_errors += 1
+            try:
+                writer.write(http_response(400, {"error": f"Malformed request : {e}"}))
+                await writer.drain()
+            except ConnectionResetError:
+                pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8000):
+        self.batch_task = asyncio.create_task(self.batcher.run())
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batch_task.cancel()
+        self.batcher.close()
+        self.preprocess_pool.shutdown()
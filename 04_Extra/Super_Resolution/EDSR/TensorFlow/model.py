@@ -1,7 +1,6 @@
 import math
 import tensorflow as tf
 from tensorflow.keras import layers, models
-from tensorflow.python.keras.layers.advanced_activations import PReLU
 
 # To-do
 # EDSR Model
@@ -26,9 +25,9 @@ def ResBlock(x, filters, kernel_size, padding="same", use_bias=True, use_bn=Fals
         if use_bn:
             out = layers.BatchNormalization(name=name+f"_BN{i+1}")(out)
         if i==0:
-            layers.Activation(act, name=name+f"_Act{i+1}")(out)
+            out = layers.Activation(act, name=name+f"_Act{i+1}")(out)
     
-    out = layers.Add(name=name+"_Skip")([2*out, x])
+    out = layers.Add(name=name+"_Skip")([res_scale*out, x])
     return out
 
 def Upsampler(x, scale, filters, use_bias=True, use_bn=False, act="relu", name="Upsampler"):
@@ -36,17 +35,17 @@ def Upsampler(x, scale, filters, use_bias=True, use_bn=False, act="relu", name="
         out = x
         for i in range(int(math.log(scale, 2))):
             out = layers.Conv2D(4*filters, 3, padding="same", use_bias=use_bias, name=name+f"_Conv{i+1}")(out)
-            out = tf.nn.depth_to_space(out, scale, name=name+"_SubPixel")
+            out = tf.nn.depth_to_space(out, 2, name=name+f"_SubPixel{i+1}")
 
             if use_bn:
-                out = layers.BatchNormalization(name=name+"_BN")(out)
+                out = layers.BatchNormalization(name=name+f"_BN{i+1}")(out)
             if act == "relu":
-                out = layers.Activation("relu", name=name+"_Act")(out)
+                out = layers.Activation("relu", name=name+f"_Act{i+1}")(out)
             elif act == "prelu":
-                out = layers.PReLU(name=name+"_Act")(out)
+                out = layers.PReLU(name=name+f"_Act{i+1}")(out)
 
     elif scale == 3:
-        out = layers.Conv2D(9*filters, 3, padding="same", use_bias=use_bias, name=name+f"_Conv{i+1}")(out)
+        out = layers.Conv2D(9*filters, 3, padding="same", use_bias=use_bias, name=name+"_Conv1")(x)
         out = tf.nn.depth_to_space(out, scale, name=name+"_SubPixel")
 
         if use_bn:
@@ -67,7 +66,7 @@ def EDSR(img_channel=3, rgb_range=255, filters=64, n_resblocks=4, res_scale=1, a
     out = layers.Conv2D(filters, 3, padding="same", name=name+"_Conv1")(out)
     x = out
     for i in range(n_resblocks):
-        out = ResBlock(out, filters, kernel_size, act=act, res_scale=res_scale, name=name+f"_ResBlock_{i+1}")
+        out = ResBlock(out, filters, 3, act=act, res_scale=res_scale, name=name+f"_ResBlock_{i+1}")
     out = layers.Conv2D(filters, 3, padding="same", name=name+"_Conv2")(out)
     out = layers.Add(name=name+"_Add")([out, x])
     out = Upsampler(out, scale, filters, act=False, name=name+"_Upsampler")
@@ -1,5 +1,6 @@
 # %%
 import os
+import sys
 import numpy as np
 import tensorflow as tf
 from matplotlib import pyplot as plt
@@ -7,10 +8,12 @@ from tensorflow import io as tfi
 from tensorflow import image as tfimg
 from tensorflow.keras import models, layers, losses, metrics, optimizers, callbacks
 from tensorflow.keras.preprocessing.image import load_img
-from tensorflow.keras.preprocessing import image_dataset_from_directory
 
 from model import *
 
+sys.path.append("../..") # sr_data.py is shared by the TensorFlow SR scripts
+from sr_data import decode_luminance, patch_dataset
+
 os.environ["CUDA_DEVICE_ORDER"]="PCI_BUS_ID"
 os.environ["CUDA_VISIBLE_DEVICES"]="0"
 
@@ -36,42 +39,15 @@ scale = 2
 epochs = 100
 batch_size = 8
 
-train_ds = image_dataset_from_directory(
-    root_dir,
-    batch_size=batch_size,
-    image_size=(input_size*scale, input_size*scale),
-    validation_split=0.2,
-    subset="training",
-    seed=42, 
-    label_mode=None,
-)
-
-val_ds = image_dataset_from_directory(
-    root_dir,
-    batch_size=batch_size,
-    image_size=(input_size*scale, input_size*scale),
-    validation_split=0.2,
-    subset="validation",
-    seed=42,
-    label_mode=None,
-)
-
-def process_input(image, input_size):
-    image = image / 255.0
-    image = tf.image.rgb_to_yuv(image)
-    last_dimension_axis = len(image.shape) - 1
-    y, u, v = tf.split(image, 3, axis=last_dimension_axis)
-    label = y
-
-    return tf.image.resize(y, [input_size, input_size], method="area"), label
-
-train_ds = train_ds.map(lambda x: process_input(x, input_size))
-
-train_ds = train_ds.prefetch(tf.data.experimental.AUTOTUNE)
+patches_per_image = 32
 
-val_ds = val_ds.map(lambda x: process_input(x, input_size))
+# Each HR image is decoded once into a Y plane cache, patches are drawn from it every epoch
+train_planes = decode_luminance(train_path, os.path.join(ROOT, "cache", "bsds_train_y"))
+val_planes = decode_luminance(val_path, os.path.join(ROOT, "cache", "bsds_val_y"))
 
-val_ds = val_ds.prefetch(tf.data.experimental.AUTOTUNE)
+train_ds = patch_dataset(train_planes, input_size*scale, scale, batch_size, upsample="post",
+                         patches_per_image=patches_per_image, training=True, seed=42)
+val_ds = patch_dataset(val_planes, input_size*scale, scale, batch_size, upsample="post", training=False)
 
 # %%
 class Metric():
@@ -125,3 +101,6 @@ model.fit(train_ds, epochs=epochs, validation_data=val_ds, callbacks = [PlotCall
 
 
 # %%
+# Weights for the tiled inference (../../upscale.py)
+os.makedirs("./trained", exist_ok=True)
+model.save_weights("./trained/subpixel.weights.h5")
@@ -24,7 +24,7 @@ class VDSR(nn.Module):
             layers.append(basic_conv(64, 64, 3, 'same'))
             layers.append(nn.ReLU(inplace=True))
 
-        layers.append(layers.append(basic_conv(64, 3, 3, 'same')))
+        layers.append(basic_conv(64, 3, 3, 'same'))
 
         self.net = nn.Sequential(*layers)
     def forward(self, x):
@@ -1,8 +1,10 @@
 import os
-import cv2 as cv
-from tqdm import tqdm
-from tensorflow.keras import utils
+import sys
 
+sys.path.append("../..") # utils/fetch.py : shared dataset cache, resumable and checksummed downloads
+from utils.fetch import fetch_and_extract
+
+# BSDS500 into ./datasets/BSR (the training scripts read ../../datasets/BSR/BSDS500/data/images)
 dataset_url = "http://www.eecs.berkeley.edu/Research/Projects/CS/vision/grouping/BSR/BSR_bsds500.tgz"
-data_dir = utils.get_file(origin=dataset_url, fname="BSR", untar=True, cache_dir = './')
-root_dir = os.path.join(data_dir, "BSDS500/data")
\ No newline at end of file
+data_dir = os.path.join(fetch_and_extract(dataset_url, "./datasets"), "BSR")
+root_dir = os.path.join(data_dir, "BSDS500/data")
@@ -0,0 +1,148 @@
+# %%
+import os
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+
+from tiling import sr_specs
+from upscale import build_upscaler, torch_model_files
+
+# PSNR / SSIM on the Y channel of full-size test sets (Set5, Set14, BSDS100, ...), as in the SR papers :
+# HR images are cropped to a multiple of the scale, LR images are downscaled from them,
+# and `scale` border pixels are shaved before measuring.
+
+IMG_FORMAT = ["jpg", "jpeg", "tif", "tiff", "bmp", "png"]
+
+def rgb_to_y(img):
+    # (..., H, W, 3) uint8 RGB -> (..., H, W) float64 Y of ITU-R BT.601 in [16, 235], as MATLAB rgb2ycbcr
+    return img @ np.array([65.481, 128.553, 24.966]) / 255. + 16.
+
+def gaussian_kernel(size=11, sigma=1.5):
+    g = np.exp(-(np.arange(size) - size // 2) ** 2 / (2 * sigma ** 2))
+    return g / g.sum()
+
+def filter_valid(x, kernel):
+    # Separable "valid" filtering of a (N, H, W) batch, the windows are strided views so nothing is copied before the products
+    x = np.lib.stride_tricks.sliding_window_view(x, len(kernel), axis=2) @ kernel
+    return np.lib.stride_tricks.sliding_window_view(x, len(kernel), axis=1) @ kernel
+
+def psnr(x, y, data_range=255.):
+    # (N, H, W) batches -> (N,)
+    mse = np.mean((x - y) ** 2, axis=(1, 2))
+    return 10 * np.log10(data_range ** 2 / np.maximum(mse, 1e-10))
+
+def ssim(x, y, data_range=255.):
+    # (N, H, W) batches -> (N,), 11x11 gaussian window (sigma 1.5) of Wang et al.
+    C1, C2 = (0.01 * data_range) ** 2, (0.03 * data_range) ** 2
+    g = gaussian_kernel()
+    mu_x, mu_y = filter_valid(x, g), filter_valid(y, g)
+    var_x = filter_valid(x * x, g) - mu_x ** 2
+    var_y = filter_valid(y * y, g) - mu_y ** 2
+    cov = filter_valid(x * y, g) - mu_x * mu_y
+    ssim_map = ((2 * mu_x * mu_y + C1) * (2 * cov + C2)) / ((mu_x ** 2 + mu_y ** 2 + C1) * (var_x + var_y + C2))
+    return ssim_map.mean(axis=(1, 2))
+
+def measure(hr_list, sr_list, scale):
+    """
+    Y-channel PSNR / SSIM of each (HR, SR) pair, with `scale` pixels shaved on each side.
+    Images of the same size are stacked and measured as one batch.
+    """
+    groups = defaultdict(list)
+    for i, hr in enumerate(hr_list):
+        groups[hr.shape].append(i)
+
+    psnr_values, ssim_values = np.zeros(len(hr_list)), np.zeros(len(hr_list))
+    for idx in groups.values():
+        hr = rgb_to_y(np.stack([hr_list[i] for i in idx]))[:, scale:-scale, scale:-scale]
+        sr = rgb_to_y(np.stack([sr_list[i] for i in idx]))[:, scale:-scale, scale:-scale]
+        psnr_values[idx], ssim_values[idx] = psnr(hr, sr), ssim(hr, sr)
+    return psnr_values, ssim_values
+
+def load_test_set(path, scale, num_threads=8):
+    # File names, HR (cropped to a multiple of `scale`) and LR (area downscaling, as sr_data.degrade) RGB uint8 images
+    file_list = sorted([f for f in os.listdir(path) if f.split(".")[-1].lower() in IMG_FORMAT])
+
+    def load(f):
+        hr = cv.cvtColor(cv.imread(os.path.join(path, f), cv.IMREAD_COLOR), cv.COLOR_BGR2RGB)
+        H, W = hr.shape[0] - hr.shape[0] % scale, hr.shape[1] - hr.shape[1] % scale
+        hr = hr[:H, :W]
+        return hr, cv.resize(hr, (W // scale, H // scale), interpolation=cv.INTER_AREA)
+
+    with ThreadPoolExecutor(num_threads) as pool:
+        pairs = list(pool.map(load, file_list))
+    return file_list, [hr for hr, _ in pairs], [lr for _, lr in pairs]
+
+def bicubic_baseline(name, file_list, hr_list, lr_list, scale, cache_dir=None):
+    # Bicubic PSNR / SSIM, cached in {cache_dir}/{name}_x{scale}_bicubic.npz as long as the file list is the same
+    cache_path = None if cache_dir is None else os.path.join(cache_dir, f"{name}_x{scale}_bicubic.npz")
+    if cache_path is not None and os.path.exists(cache_path):
+        cache = np.load(cache_path)
+        if list(cache["files"]) == file_list:
+            return cache["psnr"], cache["ssim"]
+
+    sr_list = [cv.resize(lr, (hr.shape[1], hr.shape[0]), interpolation=cv.INTER_CUBIC) for hr, lr in zip(hr_list, lr_list)]
+    psnr_values, ssim_values = measure(hr_list, sr_list, scale)
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(cache_path, files=np.array(file_list), psnr=psnr_values, ssim=ssim_values)
+    return psnr_values, ssim_values
+
+def upscale_all(upscaler, lr_list, num_workers=4):
+    # The images run in parallel, the forwards release the GIL
+    with ThreadPoolExecutor(num_workers) as pool:
+        return list(pool.map(upscaler, lr_list))
+
+def print_table(results, test_sets, scale):
+    # results : {model : {test set : (psnr, ssim)}}
+    header = f"{'x' + str(scale):<16}" + "".join(f"{name:>20}" for name in test_sets)
+    print(header)
+    print("-" * len(header))
+    for model, scores in results.items():
+        row = f"{model:<16}"
+        for name in test_sets:
+            row += f"{'%.2f / %.4f' % scores[name]:>20}" if name in scores else f"{'-':>20}"
+        print(row)
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--TEST_SETS", nargs="+", required=True, help="directories of HR test images (Set5, Set14, BSDS100, ...)")
+    parser.add_argument("--MODEL", nargs=3, action="append", default=[], metavar=("NAME", "FRAMEWORK", "WEIGHTS"),
+                        help=f"model to evaluate, can be repeated. NAME in {list(sr_specs.keys())}")
+    parser.add_argument("--SCALE", default=3, type=int, help="")
+    parser.add_argument("--CACHE_DIR", default="./datasets/cache", type=str, help="bicubic baselines")
+    parser.add_argument("--TILE_SIZE", default=256, type=int, help="tile size in pixels of the model input")
+    parser.add_argument("--BATCH_SIZE", default=8, type=int, help="")
+    parser.add_argument("--NUM_WORKERS", default=4, type=int, help="images upscaled in parallel")
+    args = parser.parse_args()
+
+    for name, framework, _ in args.MODEL:
+        assert name in sr_specs, f"Please use model in {list(sr_specs.keys())}"
+        assert framework in ["tensorflow", "pytorch"], "Please use framework in ['tensorflow', 'pytorch']"
+        if framework == "pytorch":
+            assert name in torch_model_files, f"PyTorch models : {list(torch_model_files.keys())}"
+
+    start = time.perf_counter()
+    test_sets = {os.path.basename(os.path.normpath(path)): load_test_set(path, args.SCALE) for path in args.TEST_SETS}
+
+    results = {"Bicubic": {}}
+    for name, (file_list, hr_list, lr_list) in test_sets.items():
+        p, s = bicubic_baseline(name, file_list, hr_list, lr_list, args.SCALE, args.CACHE_DIR)
+        results["Bicubic"][name] = (p.mean(), s.mean())
+
+    threads = max(1, os.cpu_count() // args.NUM_WORKERS)
+    for model_name, framework, weights in args.MODEL:
+        label = f"{model_name} ({'pt' if framework == 'pytorch' else 'tf'})"
+        upscaler = build_upscaler(model_name, framework, weights, args.SCALE, args.TILE_SIZE, args.BATCH_SIZE, threads)
+        results[label] = {}
+        for name, (_, hr_list, lr_list) in test_sets.items():
+            sr_list = upscale_all(upscaler, lr_list, args.NUM_WORKERS)
+            p, s = measure(hr_list, sr_list, args.SCALE)
+            results[label][name] = (p.mean(), s.mean())
+
+    print(f"\nY-channel PSNR / SSIM, {args.SCALE} pixels shaved\n")
+    print_table(results, list(test_sets.keys()), args.SCALE)
+    print(f"\nDone in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+import tensorflow as tf
+
+# Patch pipeline of the TensorFlow SR scripts (SRCNN, SubPixel), they add "../.." to sys.path.
+
+IMG_FORMAT = ["jpg", "jpeg", "tif", "tiff", "bmp", "png"]
+
+def load_luminance(path):
+    # Y plane in [0, 1], same weights as tf.image.rgb_to_yuv
+    img = cv.imread(path, cv.IMREAD_COLOR).astype(np.float32) / 255.
+    return img @ np.array([0.114, 0.587, 0.299], dtype=np.float32) # BGR
+
+def decode_luminance(path, cache_path=None, num_threads=8):
+    """
+    Decodes every HR image under `path` once and keeps only its Y plane.
+    The images do not have the same size, so the planes are stored back to back in one flat float32 array,
+    with an (N, 3) index of (offset, H, W).
+    With `cache_path`, they are written to {cache_path}.npy / {cache_path}_index.npy and memory-mapped, so later runs skip the decoding.
+    """
+    if cache_path is not None and os.path.exists(cache_path + ".npy"):
+        return np.load(cache_path + ".npy", mmap_mode="r"), np.load(cache_path + "_index.npy")
+
+    file_list = sorted([f for f in os.listdir(path) if f.split(".")[-1].lower() in IMG_FORMAT])
+    # cv2 releases the GIL while decoding
+    with ThreadPoolExecutor(num_threads) as pool:
+        planes = list(pool.map(lambda f: load_luminance(os.path.join(path, f)), file_list))
+
+    shapes = np.array([p.shape for p in planes], dtype=np.int64)
+    sizes = shapes[:, 0] * shapes[:, 1]
+    index = np.concatenate([(np.cumsum(sizes) - sizes)[:, None], shapes], axis=1)
+    if cache_path is None:
+        return np.concatenate([p.ravel() for p in planes]), index
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    flat = np.lib.format.open_memmap(cache_path + ".tmp.npy", mode="w+", dtype=np.float32, shape=(int(sizes.sum()),))
+    for (offset, H, W), p in zip(index, planes):
+        flat[offset:offset+H*W] = p.ravel()
+    flat.flush()
+    del flat
+    np.save(cache_path + "_index.npy", index)
+    os.replace(cache_path + ".tmp.npy", cache_path + ".npy")
+    return np.load(cache_path + ".npy", mmap_mode="r"), index
+
+def degrade(hr, scale, upsample="pre", shrink=0):
+    """
+    HR Y patches (N, P, P, 1) -> (input, label) of one scale factor.
+    - "pre" (SRCNN) : area down- and upscaling back to P, the label loses the `shrink` border of the valid convolutions
+    - "post" (SubPixel) : area downscaling to P / scale, the label is the HR patch
+    """
+    P = hr.shape[1]
+    lr = tf.image.resize(hr, [P // scale, P // scale], method="area")
+    label = hr
+    if upsample == "pre":
+        lr = tf.image.resize(lr, [P, P], method="area")
+    if shrink:
+        label = hr[:, shrink:-shrink, shrink:-shrink, :]
+    return lr, label
+
+def patch_dataset(planes, patch_size, scale, batch_size, upsample="pre", shrink=0, patches_per_image=32, training=True, seed=None):
+    """
+    Random HR patches of the decoded Y planes.
+
+    Every epoch, each image gives `patches_per_image` patches at new random positions (with random flips),
+    so one decode feeds many views. Without training, one center patch per image.
+    Patches are cut from the (memory-mapped) planes and degraded in parallel map calls.
+    """
+    flat, index = planes
+    num_images = len(index)
+
+    def read(idx):
+        rng = np.random.default_rng()
+        patches = np.empty((len(idx), patch_size, patch_size, 1), dtype=np.float32)
+        for i, (offset, H, W) in enumerate(index[idx]):
+            plane = flat[offset:offset+H*W].reshape(H, W)
+            if training:
+                top, left = rng.integers(0, H - patch_size + 1), rng.integers(0, W - patch_size + 1)
+            else:
+                top, left = (H - patch_size) // 2, (W - patch_size) // 2
+            patches[i, ..., 0] = plane[top:top+patch_size, left:left+patch_size]
+        return patches
+
+    ds = tf.data.Dataset.range(num_images)
+    if training:
+        ds = ds.repeat(patches_per_image).shuffle(num_images * patches_per_image, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.map(lambda idx: tf.ensure_shape(tf.numpy_function(read, [idx], tf.float32), [None, patch_size, patch_size, 1]),
+                num_parallel_calls=tf.data.AUTOTUNE)
+    if training:
+        ds = ds.map(lambda x: tf.image.random_flip_up_down(tf.image.random_flip_left_right(x)), num_parallel_calls=tf.data.AUTOTUNE)
+    ds = ds.map(lambda x: degrade(x, scale, upsample, shrink), num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
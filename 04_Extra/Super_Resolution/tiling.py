@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+
+# Tiled inference of the super resolution models on images of any size.
+# Shared by PyTorch and TensorFlow, upscale.py uses TorchUpscaler or TFUpscaler.
+
+# Same matrices as tf.image.rgb_to_yuv / yuv_to_rgb, the TensorFlow models are trained on the Y channel
+RGB_TO_YUV = np.array([[0.299, -0.14714119, 0.61497538],
+                       [0.587, -0.28886916, -0.51496512],
+                       [0.114, 0.43601035, -0.10001026]], dtype=np.float32)
+YUV_TO_RGB = np.array([[1., 1., 1.],
+                       [0., -0.394642334, 2.03206185],
+                       [1.13988303, -0.58062185, 0.]], dtype=np.float32)
+
+# upsample : "pre" (the input is resized to the output size first) or "post" (the model upscales)
+# halo : receptive field radius of the "same" padded layers, shrink : border lost on each side by the "valid" layers,
+# both in pixels of the model input. value_range : the model works on images in [0, value_range]
+sr_specs = {
+    "SRCNN": {"upsample": "pre", "halo": 0, "shrink": 6, "value_range": 1.},
+    "VDSR": {"upsample": "pre", "halo": 20, "shrink": 0, "value_range": 1.},
+    "SubPixel": {"upsample": "post", "halo": 5, "shrink": 0, "value_range": 1.},
+    "EDSR": {"upsample": "post", "halo": 12, "shrink": 0, "value_range": 255.},
+}
+
+def allocate(shape, dtype, path=None):
+    if path is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+def axis_plan(length, tile, halo):
+    """
+    Tiles along one axis : (start, stop) of the kept pixels and the start of the window the model sees.
+    All windows have the same size, so the tiles can be batched. Away from the borders, a window reaches `halo`
+    pixels beyond its tile, at the borders it is moved inwards, so every kept pixel sees the same context as in a whole-image forward.
+    """
+    window = min(tile + 2 * halo, length)
+    if window == length:
+        return [(0, length, 0)], length
+    plan = []
+    for start in range(0, length, tile):
+        stop = min(start + tile, length)
+        plan.append((start, stop, max(0, min(start - halo, length - window))))
+    return plan, window
+
+def crop(image, y0, y1, x0, x1):
+    # image[y0:y1, x0:x1] as float32, the pixels outside of the image are reflected
+    H, W = image.shape[:2]
+    out = np.asarray(image[max(y0, 0):min(y1, H), max(x0, 0):min(x1, W)], dtype=np.float32)
+    pad = ((max(-y0, 0), max(y1 - H, 0)), (max(-x0, 0), max(x1 - W, 0)), (0, 0))
+    if any(p for axis in pad for p in axis):
+        out = np.pad(out, pad, mode="reflect")
+    return out
+
+class TiledUpscaler:
+    """
+    Upscales (H, W, 3) uint8 images by `scale` with bounded memory.
+
+    - Tiles of `tile_size` model input pixels are read with their halo (and the valid border) by a thread pool,
+      one batch ahead of the model. "pre" models get the tile resized with bicubic interpolation, from a few more
+      low resolution pixels so the interpolation is seamless too.
+    - The model runs on `batch_size` windows at once, only the pixels of each tile are kept, so tiles are stitched without seams.
+    - The conversion back to uint8 and the writes into the preallocated (or memory-mapped) output run on the same thread pool.
+    - `channels` : "rgb", or "y" for the models trained on the Y channel, the chroma is upscaled with bicubic interpolation.
+    """
+    def __init__(self, spec, scale, tile_size=256, batch_size=8, channels="rgb", num_threads=8):
+        self.spec = spec
+        self.scale = scale
+        self.pre = spec["upsample"] == "pre"
+        self.model_scale = 1 if self.pre else scale
+        self.tile_size = tile_size
+        self.batch_size = batch_size
+        self.channels = channels
+        self.num_threads = num_threads
+
+    def plan(self, H, W):
+        if self.pre:
+            H, W = H * self.scale, W * self.scale
+        rows, window_h = axis_plan(H, self.tile_size, self.spec["halo"])
+        cols, window_w = axis_plan(W, self.tile_size, self.spec["halo"])
+        return [(r, c) for r in rows for c in cols], (window_h, window_w)
+
+    def read_window(self, image, row, col, window):
+        # model input of one window, and the chroma of the kept pixels (for "y" models)
+        (_, _, wy), (_, _, wx) = row, col
+        s, v = self.scale, self.spec["shrink"]
+        y0, y1, x0, x1 = wy - v, wy + window[0] + v, wx - v, wx + window[1] + v
+        if self.pre:
+            # Low resolution pixels covering the window, with 2 more for the bicubic kernel
+            ly0, ly1, lx0, lx1 = y0 // s - 2, -(-y1 // s) + 2, x0 // s - 2, -(-x1 // s) + 2
+            lr = crop(image, ly0, ly1, lx0, lx1)
+            hr = cv.resize(lr, ((lx1 - lx0) * s, (ly1 - ly0) * s), interpolation=cv.INTER_CUBIC)
+            x = hr[y0 - ly0*s:y1 - ly0*s, x0 - lx0*s:x1 - lx0*s]
+        else:
+            x = crop(image, y0, y1, x0, x1)
+        x = x / 255.
+
+        if self.channels == "rgb":
+            return x * self.spec["value_range"], None
+        yuv = x @ RGB_TO_YUV
+        # Chroma of the kept pixels, in output pixels
+        (ky0, ky1, _), (kx0, kx1, _) = row, col
+        uv = yuv[v:-v or None, v:-v or None, 1:]
+        if not self.pre:
+            uv = cv.resize(uv, (uv.shape[1] * s, uv.shape[0] * s), interpolation=cv.INTER_CUBIC)
+        m = self.model_scale
+        uv = uv[(ky0 - wy)*m:(ky1 - wy)*m, (kx0 - wx)*m:(kx1 - wx)*m]
+        return yuv[..., :1] * self.spec["value_range"], uv
+
+    def write(self, output, row, col, pred, uv):
+        (ky0, ky1, wy), (kx0, kx1, wx) = row, col
+        m = self.model_scale
+        pred = pred[(ky0 - wy)*m:(ky1 - wy)*m, (kx0 - wx)*m:(kx1 - wx)*m] / self.spec["value_range"]
+        if uv is not None:
+            pred = np.concatenate([pred, uv], axis=-1) @ YUV_TO_RGB
+        output[ky0*m:ky1*m, kx0*m:kx1*m] = np.clip(pred * 255. + 0.5, 0, 255).astype(np.uint8)
+
+    def __call__(self, image, output=None):
+        """
+        image : (H, W, 3) uint8 array (or memmap), output : None or the path of a .npy file
+        Returns the (H * scale, W * scale, 3) uint8 image, memory-mapped when `output` is given.
+        """
+        H, W = image.shape[:2]
+        tiles, window = self.plan(H, W)
+        result = allocate((H * self.scale, W * self.scale, 3), np.uint8, output)
+        batches = [tiles[i:i+self.batch_size] for i in range(0, len(tiles), self.batch_size)]
+
+        with ThreadPoolExecutor(self.num_threads) as pool:
+            read = lambda batch: [pool.submit(self.read_window, image, row, col, window) for row, col in batch]
+            futures = read(batches[0])
+            writes = []
+            for i, batch in enumerate(batches):
+                windows = [f.result() for f in futures]
+                if i + 1 < len(batches):
+                    futures = read(batches[i + 1])
+
+                pred = self.predict(np.stack([x for x, _ in windows]))
+                writes += [pool.submit(self.write, result, row, col, p, uv) for (row, col), p, (_, uv) in zip(batch, pred, windows)]
+                # At most two batches wait to be written, so the memory stays bounded when writing is the slow part
+                while len(writes) > 2 * self.batch_size:
+                    writes.pop(0).result()
+            for w in writes:
+                w.result()
+        return result
+
+    # Framework specific
+    def predict(self, batch):
+        # float32 (N, h, w, C) -> float32 (N, h', w', C)
+        raise NotImplementedError
+
+class TorchUpscaler(TiledUpscaler):
+    # NCHW module, optional bfloat16 autocast
+    def __init__(self, model, spec, scale, tile_size=256, batch_size=8, channels="rgb", num_threads=8, bf16=False, device="cpu"):
+        import torch
+        super(TorchUpscaler, self).__init__(spec, scale, tile_size, batch_size, channels, num_threads)
+        self.device = torch.device(device)
+        self.model = model.to(self.device).eval()
+        self.bf16 = bf16
+
+    def predict(self, batch):
+        import torch
+        x = torch.from_numpy(batch).permute(0, 3, 1, 2).to(self.device, non_blocking=True)
+        with torch.inference_mode():
+            with torch.autocast(self.device.type, dtype=torch.bfloat16, enabled=self.bf16):
+                y = self.model(x)
+            return y.float().permute(0, 2, 3, 1).cpu().numpy()
+
+class TFUpscaler(TiledUpscaler):
+    # Keras model (NHWC), windows have one shape so the tf.function is traced once
+    def __init__(self, model, spec, scale, tile_size=256, batch_size=8, channels="y", num_threads=8):
+        import tensorflow as tf
+        super(TFUpscaler, self).__init__(spec, scale, tile_size, batch_size, channels, num_threads)
+        self.model = model
+        self.predict_fn = tf.function(lambda x: model(x, training=False))
+
+    def predict(self, batch):
+        return self.predict_fn(batch).numpy()
@@ -0,0 +1,84 @@
+# %%
+import os
+import time
+import argparse
+import importlib.util
+
+import cv2 as cv
+import numpy as np
+
+from tiling import sr_specs, TorchUpscaler, TFUpscaler
+
+# Model definitions of each folder, loaded by path since the files share their names
+torch_model_files = {"SRCNN": "SRCNN/PyTorch/PyTorch.py", "VDSR": "VDSR/PyTorch/model.py"}
+tf_model_files = {"SRCNN": "SRCNN/TensorFlow/model.py", "VDSR": "VDSR/TensorFlow/model.py",
+                  "SubPixel": "SubPixel/TensorFlow/model.py", "EDSR": "EDSR/TensorFlow/model.py"}
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def open_image(path):
+    # (H, W, 3) uint8 RGB, a .npy file is memory-mapped
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return cv.cvtColor(cv.imread(path, cv.IMREAD_COLOR), cv.COLOR_BGR2RGB)
+
+def build_upscaler(model_name, framework, weights, scale, tile_size=256, batch_size=8, num_threads=8, bf16=False):
+    spec = sr_specs[model_name]
+    if framework == "pytorch":
+        import torch
+        model = getattr(load_module(torch_model_files[model_name]), model_name)()
+        model.load_state_dict(torch.load(weights, map_location="cpu"))
+        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        # PyTorch models are RGB
+        return TorchUpscaler(model, spec, scale, tile_size, batch_size, "rgb", num_threads, bf16, device)
+
+    module = load_module(tf_model_files[model_name])
+    if model_name == "SubPixel":
+        model = module.SubPixel(upscale_factor=scale)
+    elif model_name == "EDSR":
+        model = module.EDSR(scale=scale)
+    else:
+        model = getattr(module, model_name)()
+    model.load_weights(weights)
+    channels = "y" if model.input_shape[-1] == 1 else "rgb"
+    return TFUpscaler(model, spec, scale, tile_size, batch_size, channels, num_threads)
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--MODEL", default="SRCNN", type=str, help=f"{list(sr_specs.keys())}")
+    parser.add_argument("--FRAMEWORK", default="tensorflow", type=str, help="tensorflow or pytorch")
+    parser.add_argument("--WEIGHTS", type=str, required=True, help="weights saved by the training script")
+    parser.add_argument("--SCALE", default=3, type=int, help="")
+    parser.add_argument("--INPUT", type=str, required=True, help="image file, or (H, W, 3) uint8 .npy for memory-mapped input")
+    parser.add_argument("--OUTPUT", default="./upscaled.png", type=str, help=".png, or .npy for a memory-mapped output")
+    parser.add_argument("--TILE_SIZE", default=256, type=int, help="tile size in pixels of the model input")
+    parser.add_argument("--BATCH_SIZE", default=8, type=int, help="")
+    parser.add_argument("--NUM_THREADS", default=os.cpu_count(), type=int, help="tile reading / writing threads")
+    parser.add_argument("--BF16", action="store_true", help="bfloat16 autocast, PyTorch only")
+    args = parser.parse_args()
+
+    assert args.MODEL in sr_specs, f"Please use model in {list(sr_specs.keys())}"
+    assert args.FRAMEWORK in ["tensorflow", "pytorch"], "Please use framework in ['tensorflow', 'pytorch']"
+    if args.FRAMEWORK == "pytorch":
+        assert args.MODEL in torch_model_files, f"PyTorch models : {list(torch_model_files.keys())}"
+
+    upscaler = build_upscaler(args.MODEL, args.FRAMEWORK, args.WEIGHTS, args.SCALE, args.TILE_SIZE, args.BATCH_SIZE, args.NUM_THREADS, args.BF16)
+    image = open_image(args.INPUT)
+    tiles, window = upscaler.plan(*image.shape[:2])
+
+    print("\n================ Options ================")
+    print(f"Model : {args.MODEL} ({args.FRAMEWORK}, x{args.SCALE})")
+    print(f"Image : {args.INPUT} {image.shape[:2]}")
+    print(f"Tiles : {len(tiles)}, window {window}")
+    print("===========================================\n")
+
+    start = time.perf_counter()
+    if args.OUTPUT.endswith(".npy"):
+        upscaler(image, args.OUTPUT).flush()
+    else:
+        cv.imwrite(args.OUTPUT, cv.cvtColor(upscaler(image), cv.COLOR_RGB2BGR))
+    print(f"Done in {time.perf_counter() - start:.2f}s, saved to {args.OUTPUT}")
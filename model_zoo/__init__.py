@@ -0,0 +1,51 @@
+import importlib
+
+# Model definitions shared by the training scripts, importable without side effects :
+# no dataset download, no image decoding, no sample model at import.
+# The framework subpackages are only imported on first access, `import model_zoo` loads neither torch nor tensorflow.
+#
+#   from model_zoo.pytorch.resnet import build_resnet            # imports torch
+#   net = model_zoo.build("resnet/pytorch", num_classes=5, num_layer=50)
+#
+#   python utils/import_profile.py model_zoo model_zoo.pytorch.resnet
+
+_submodules = ["pytorch", "tf_keras"]
+
+# name : (module, builder)
+registry = {
+    "resnet/pytorch": ("model_zoo.pytorch.resnet", "build_resnet"),
+    "vgg/pytorch": ("model_zoo.pytorch.vgg", "build_vgg"),
+    "densenet/pytorch": ("model_zoo.pytorch.densenet", "Build_Densenet"),
+    "googlenet/pytorch": ("model_zoo.pytorch.googlenet", "Build_GoogLeNet"),
+    "inception_v2/pytorch": ("model_zoo.pytorch.inception_v2", "Build_InceptionV2"),
+    "inception_v3/pytorch": ("model_zoo.pytorch.inception_v3", "Build_InceptionV3"),
+    "mobilenet_v1/pytorch": ("model_zoo.pytorch.mobilenet_v1", "Build_MobileNet"),
+    "mobilenet_v2/pytorch": ("model_zoo.pytorch.mobilenet_v2", "Build_MobileNetV2"),
+    "mobilenet_v3/pytorch": ("model_zoo.pytorch.mobilenet_v3", "Build_MobileNetV3"),
+    "senet/pytorch": ("model_zoo.pytorch.senet", "build_seresnet"),
+    "squeezenet/pytorch": ("model_zoo.pytorch.squeezenet", "Build_SqueezeNet"),
+    "xception/pytorch": ("model_zoo.pytorch.xception", "Build_Xception"),
+    "unet/pytorch": ("model_zoo.pytorch.unet", "Build_UNet"),
+    "deconvnet/pytorch": ("model_zoo.pytorch.deconvnet", "Build_DeconvNet"),
+    "vit_encoder/pytorch": ("model_zoo.pytorch.vit", "EncoderLayer"),
+    "vit_decoder/pytorch": ("model_zoo.pytorch.vit", "DecoderLayer"),
+    "resnet/tf_keras": ("model_zoo.tf_keras.resnet", "build_resnet"),
+    "vgg/tf_keras": ("model_zoo.tf_keras.vgg", "build_vgg"),
+}
+
+def get(name):
+    # Builder of a registered model, its framework is imported here
+    assert name in registry, f"Please use model in {list(registry.keys())}"
+    module, builder = registry[name]
+    return getattr(importlib.import_module(module), builder)
+
+def build(name, **kwargs):
+    return get(name)(**kwargs)
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals().keys()) + _submodules)
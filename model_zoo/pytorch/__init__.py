@@ -0,0 +1,14 @@
+import importlib
+
+# pytorch definitions, each submodule imports torch on first access only
+
+_submodules = ["resnet", "vgg", "vit", "densenet", "googlenet", "inception_v2", "inception_v3", "mobilenet_v1", "mobilenet_v2",
+               "mobilenet_v3", "senet", "squeezenet", "xception", "unet", "deconvnet"]
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals().keys()) + _submodules)
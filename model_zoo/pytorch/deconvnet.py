@@ -0,0 +1,131 @@
+from torch import nn
+
+# Network definitions of 03_Advance/Segmentation/Deconvnet/PyTorch.py (its data loading and training stay in the script)
+
+class Conv_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1):
+        super(Conv_Block, self).__init__()
+
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, output_feature, ksize, strides, padding),
+            nn.BatchNorm2d(output_feature),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return self.block(x)
+
+class Upconv_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1):
+        super(Upconv_Block, self).__init__()
+
+        self.block = nn.Sequential(
+            nn.ConvTranspose2d(input_feature, output_feature, ksize, strides, padding),
+            nn.BatchNorm2d(output_feature),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return self.block(x)
+
+class Build_DeconvNet(nn.Module):
+    """
+    Input size : 224 x 224
+    """
+    def __init__(self, input_channel= 3, num_classes=1000):
+        super(Build_DeconvNet, self).__init__()
+
+        self.en_block_1 = nn.Sequential(
+            Conv_Block(input_channel, 64, 3, 1, 1),
+            Conv_Block(64, 64, 3, 1, 1)
+        )
+
+        self.en_block_2 = nn.Sequential(
+            Conv_Block(64, 128, 3, 1, 1),
+            Conv_Block(128, 128, 3, 1, 1)
+        )
+
+        self.en_block_3 = nn.Sequential(
+            Conv_Block(128, 256, 3, 1, 1),
+            Conv_Block(256, 256, 3, 1, 1),
+            Conv_Block(256, 256, 3, 1, 1)
+        )
+
+        self.en_block_4 = nn.Sequential(
+            Conv_Block(256, 512, 3, 1, 1),
+            Conv_Block(512, 512, 3, 1, 1),
+            Conv_Block(512, 512, 3, 1, 1)
+        )
+
+        self.en_block_5 = nn.Sequential(
+            Conv_Block(512, 512, 3, 1, 1),
+            Conv_Block(512, 512, 3, 1, 1),
+            Conv_Block(512, 512, 3, 1, 1)
+        )
+
+        self.fc_block = nn.Sequential(
+            Conv_Block(512, 4096, 7, 1, 0),
+            Conv_Block(4096, 4096, 1, 1, 0),
+            Upconv_Block(4096, 512, 7, 1, 0)
+        )
+
+        self.de_block_5 = nn.Sequential(
+            Upconv_Block(512, 512, 3, 1, 1),
+            Upconv_Block(512, 512, 3, 1, 1),
+            Upconv_Block(512, 512, 3, 1, 1)
+        )
+
+        self.de_block_4 = nn.Sequential(
+            Upconv_Block(512, 512, 3, 1, 1),
+            Upconv_Block(512, 512, 3, 1, 1),
+            Upconv_Block(512, 256, 3, 1, 1)
+        )
+
+        self.de_block_3 = nn.Sequential(
+            Upconv_Block(256, 256, 3, 1, 1),
+            Upconv_Block(256, 256, 3, 1, 1),
+            Upconv_Block(256, 128, 3, 1, 1)
+        )
+
+        self.de_block_2 = nn.Sequential(
+            Upconv_Block(128, 128, 3, 1, 1),
+            Upconv_Block(128, 64, 3, 1, 1)
+        )
+
+        self.de_block_1 = nn.Sequential(
+            Upconv_Block(64, 64, 3, 1, 1),
+            Upconv_Block(64, 64, 3, 1, 1)
+        )
+
+        self.classification = nn.Conv2d(64, num_classes, 1)
+
+        self.pool = nn.MaxPool2d(2, 2, return_indices=True)
+
+        self.unpool = nn.MaxUnpool2d(2, 2)
+
+    def forward(self, x):
+
+        x = self.en_block_1(x)
+        x, idx_1 = self.pool(x)
+        x = self.en_block_2(x)
+        x, idx_2 = self.pool(x)
+        x = self.en_block_3(x)
+        x, idx_3 = self.pool(x)
+        x = self.en_block_4(x)
+        x, idx_4 = self.pool(x)
+        x = self.en_block_5(x)
+        x, idx_5 = self.pool(x)
+        x = self.fc_block(x)
+        x = self.unpool(x, idx_5)
+        x = self.de_block_5(x)
+        x = self.unpool(x, idx_4)
+        x = self.de_block_4(x)
+        x = self.unpool(x, idx_3)
+        x = self.de_block_3(x)
+        x = self.unpool(x, idx_2)
+        x = self.de_block_2(x)
+        x = self.unpool(x, idx_1)
+        x = self.de_block_1(x)
+        x = self.classification(x)
+
+        return x
@@ -0,0 +1,104 @@
+import torch
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/DenseNet/PyTorch.py (its data loading and training stay in the script)
+
+class DenseLayer(nn.Module):
+    def __init__(self, input_feature, growth_rate):
+        super(DenseLayer, self).__init__()
+        self.block = nn.Sequential(
+            nn.BatchNorm2d(input_feature),
+            nn.ReLU(True),
+            nn.Conv2d(input_feature, growth_rate * 4, 1),
+            nn.BatchNorm2d(growth_rate * 4),
+            nn.ReLU(True),
+            nn.Conv2d(growth_rate * 4, growth_rate, 3, padding=1)
+        )
+
+    def forward(self, x):
+        new_features = self.block(x)
+        return torch.cat([x, new_features], dim=1)
+
+class DenseBlock(nn.Module):
+    def __init__(self, num_layers, input_feature, growth_rate):
+        super(DenseBlock, self).__init__()
+
+        layer_list = []
+        for i in range(num_layers):
+            layer_list.append(DenseLayer(input_feature + (i * growth_rate), growth_rate))
+
+        self.block = nn.Sequential(*layer_list)
+
+    def forward(self, x):
+        return self.block(x)
+            
+class Transition_layer(nn.Module):
+    def __init__(self, input_feature, reduction):
+        super(Transition_layer, self).__init__()
+
+        self.block = nn.Sequential(
+            nn.BatchNorm2d(input_feature), 
+            nn.ReLU(True),
+            nn.Conv2d(input_feature, int(input_feature * reduction), kernel_size=1),
+            nn.AvgPool2d(2, 2)
+        )
+
+    def forward(self, x):
+        return self.block(x)
+
+class Build_Densenet(nn.Module):
+    def __init__(self, input_channel=3, num_classes=1000, num_blocks=121, growth_rate=32):
+        super(Build_Densenet, self).__init__()
+
+        blocks_dict = {
+        121: [6, 12, 24, 16],
+        169: [6, 12, 32, 32], 
+        201: [6, 12, 48, 32], 
+        264: [6, 12, 64, 48]
+    }
+
+        assert num_blocks in  blocks_dict.keys(), "Number of layer must be in %s"%blocks_dict.keys()
+
+        self.Stem = nn.Sequential(
+            nn.ZeroPad2d(3),
+            nn.Conv2d(3, 64, 7, 2),
+            nn.BatchNorm2d(64),
+            nn.ReLU(True),
+            nn.ZeroPad2d(1),
+            nn.MaxPool2d(3, 2)
+        )
+        
+        layer_list = []
+        num_features = 64
+        
+        for idx, layers in enumerate(blocks_dict[num_blocks]):
+            layer_list.append(DenseBlock(layers, num_features, growth_rate))
+            num_features = num_features + (layers * growth_rate)
+            if idx != 3:
+                layer_list.append(Transition_layer(num_features, 0.5))
+                num_features = int(num_features * 0.5)
+
+        self.Main_Block = nn.Sequential(*layer_list)
+
+        self.Classifier = nn.Sequential(
+            nn.BatchNorm2d(num_features),
+            nn.ReLU(True),
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Linear(num_features, num_classes)
+        )
+        
+        self.init_weights(self.Stem)
+        self.init_weights(self.Main_Block)
+        self.init_weights(self.Classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.Main_Block(x)
+        x = self.Classifier(x)
+        return x
@@ -0,0 +1,202 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+# Network definitions of 03_Advance/CNN/GoogLeNet/PyTorch.py (its data loading and training stay in the script)
+
+class Inception_Module(nn.Module):
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, 
+                filters_b3_1, filters_b3_2, filters_b4):
+        super(Inception_Module, self).__init__()
+
+        self.branch1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b1, 1), 
+            nn.ReLU(True))
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b2_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_1, filters_b2_2, 3, 1, 1),
+            nn.ReLU(True)
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b3_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_1, filters_b3_2, 5, 1, 2),
+            nn.ReLU(True)
+        )
+
+        self.branch4 = nn.Sequential(
+            nn.MaxPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return torch.cat([self.branch1(x), self.branch2(x), self.branch3(x), self.branch4(x)], dim=1)
+
+
+def concat_relu(tensors):
+    if torch.is_grad_enabled():
+        return F.relu(torch.cat(tensors, dim=1), inplace=True)
+
+    n, _, h, w = tensors[0].shape
+    out = tensors[0].new_empty(n, sum(t.size(1) for t in tensors), h, w)
+    start = 0
+    for t in tensors:
+        torch.clamp_min(t, 0, out=out[:, start:start+t.size(1)])
+        start += t.size(1)
+    return out
+
+class Fused_Inception_Module(nn.Module):
+    leading = (0, 1, 3)
+
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, 
+                filters_b3_1, filters_b3_2, filters_b4):
+        super(Fused_Inception_Module, self).__init__()
+
+        self.splits = [filters_b1, filters_b2_1, filters_b3_1]
+        self.reduce = nn.Conv2d(input_feature, sum(self.splits), 1)
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(filters_b2_1, filters_b2_2, 3, 1, 1)
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.Conv2d(filters_b3_1, filters_b3_2, 5, 1, 2)
+        )
+
+        self.branch4 = nn.Sequential(
+            nn.MaxPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1)
+        )
+
+    def forward(self, x):
+        b1, b2, b3 = torch.split(F.relu(self.reduce(x), inplace=True), self.splits, dim=1)
+        return concat_relu([b1, self.branch2(b2), self.branch3(b3), self.branch4(x)])
+
+
+fused_module_dict = {Inception_Module: Fused_Inception_Module}
+
+
+def fuse_inception(module):
+    convs = [m for m in module.modules() if isinstance(m, nn.Conv2d)]
+    fused = fused_module_dict[type(module)](convs[0].in_channels, *[c.out_channels for c in convs])
+
+    leading = [convs[i] for i in fused.leading]
+    rest = [c for i, c in enumerate(convs) if i not in fused.leading]
+    fused_rest = [m for m in fused.modules() if isinstance(m, nn.Conv2d) and m is not fused.reduce]
+
+    with torch.no_grad():
+        fused.reduce.weight.copy_(torch.cat([c.weight for c in leading]))
+        fused.reduce.bias.copy_(torch.cat([c.bias for c in leading]))
+        for dst, src in zip(fused_rest, rest):
+            dst.weight.copy_(src.weight)
+            dst.bias.copy_(src.bias)
+    return fused.to(convs[0].weight.device)
+
+def fuse_inception_modules(net):
+    for name, child in net.named_children():
+        if type(child) in fused_module_dict:
+            setattr(net, name, fuse_inception(child))
+    return net
+
+class Auxiliary_Classifier(nn.Module):
+    def __init__(self, input_feature, num_classes):
+        super(Auxiliary_Classifier, self).__init__()
+        self.block = nn.Sequential(
+            nn.AvgPool2d(5, 3, 1),
+            nn.Conv2d(input_feature, 128, 1),
+            nn.ReLU(True),
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Linear(128, num_classes)
+        )
+    
+    def forward(self, x):
+        return self.block(x)
+
+        
+class Build_GoogLeNet(nn.Module):
+    def __init__(self, input_channel=3, num_classes=1000):
+        super(Build_GoogLeNet, self).__init__()
+
+        self.Stem = nn.Sequential(
+            nn.ZeroPad2d(3),
+            nn.Conv2d(3, 64, 7, 2),
+            nn.ReLU(True),
+            nn.MaxPool2d(3, 2),
+            nn.LocalResponseNorm(64),
+            nn.Conv2d(64, 64, 1),
+            nn.ReLU(True),
+            nn.Conv2d(64, 192, 3, 1, 1),
+            nn.ReLU(True),
+            nn.LocalResponseNorm(192),
+            nn.MaxPool2d(3, 2)
+        )
+        
+        self.pool = nn.MaxPool2d(3, 2)
+
+        self.inception1 = Inception_Module(192, 64, 96, 128, 16, 32, 32)
+        self.inception2 = Inception_Module(256, 128, 128, 192, 32, 96, 64)
+        self.inception3 = Inception_Module(480, 192, 96, 208, 16, 48, 64)
+        self.aux1 = Auxiliary_Classifier(512, num_classes)
+        self.inception4 = Inception_Module(512, 160, 112, 224, 24, 64, 64)
+        self.inception5 = Inception_Module(512, 128, 128, 256, 24, 64, 64)
+        self.inception6 = Inception_Module(512, 112, 144, 288, 32, 64, 64)
+        self.aux2 = Auxiliary_Classifier(528, num_classes)
+        self.inception7 = Inception_Module(528, 256, 160, 320, 32, 128, 128)
+        self.inception8 = Inception_Module(832, 256, 160, 320, 32, 128, 128)
+        self.inception9 = Inception_Module(832, 384, 192, 384, 48, 128, 128)
+
+        self.classifier = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Dropout(0.4),
+            nn.Linear(1024, num_classes)
+        )
+
+        self.init_weights(self.Stem)
+        self.init_weights(self.inception1)
+        self.init_weights(self.inception2)
+        self.init_weights(self.inception3)
+        self.init_weights(self.aux1)
+        self.init_weights(self.inception4)
+        self.init_weights(self.inception5)
+        self.init_weights(self.inception6)
+        self.init_weights(self.aux2)
+        self.init_weights(self.inception7)
+        self.init_weights(self.inception8)
+        self.init_weights(self.inception9)
+        self.init_weights(self.classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+        
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.inception1(x)
+        x = self.inception2(x)
+        x = self.pool(x)
+        
+        x = self.inception3(x)
+        aux1 = self.aux1(x)
+
+        x = self.inception4(x)
+        x = self.inception5(x)
+        x = self.inception6(x)
+        aux2 = self.aux2(x)
+        
+        x = self.inception7(x)
+        x = self.pool(x)
+
+        x = self.inception8(x)
+        x = self.inception9(x)
+
+        x = self.classifier(x)
+        return x, aux1, aux2
@@ -0,0 +1,445 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+# Network definitions of 03_Advance/CNN/InceptionV3/PyTorch.py (its data loading and training stay in the script)
+
+class Inception_Module_A(nn.Module):
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, 
+                filters_b3_1, filters_b3_2, filters_b3_3, filters_b4):
+        super(Inception_Module_A, self).__init__()
+
+        self.branch1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b1, 1), 
+            nn.ReLU(True))
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b2_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_1, filters_b2_2, 3, 1, 1),
+            nn.ReLU(True)
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b3_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_1, filters_b3_2, 3, 1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_2, filters_b3_3, 3, 1, 1),
+            nn.ReLU(True)
+        )
+
+        self.branch4 = nn.Sequential(
+            nn.AvgPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return torch.cat([self.branch1(x), self.branch2(x), self.branch3(x), self.branch4(x)], dim=1)
+
+
+class Inception_Module_B(nn.Module):
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, filters_b2_3, 
+                filters_b3_1, filters_b3_2, filters_b3_3, filters_b3_4, filters_b3_5, 
+                filters_b4):
+        super(Inception_Module_B, self).__init__()
+
+        self.branch1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b1, 1), 
+            nn.ReLU(True))
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b2_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_1, filters_b2_2, (7, 1), 1, (3, 0)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_2, filters_b2_3, (1, 7), 1, (0, 3)),
+            nn.ReLU(True)
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b3_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_1, filters_b3_2, (7, 1), 1, (3, 0)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_2, filters_b3_3, (1, 7), 1, (0, 3)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_3, filters_b3_4, (7, 1), 1, (3, 0)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_4, filters_b3_5, (1, 7), 1, (0, 3)),
+            nn.ReLU(True)
+        )
+
+        self.branch4 = nn.Sequential(
+            nn.AvgPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return torch.cat([self.branch1(x), self.branch2(x), self.branch3(x), self.branch4(x)], dim=1)
+
+class Inception_Module_C(nn.Module):
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, filters_b2_3, 
+                filters_b3_1, filters_b3_2, filters_b3_3, filters_b3_4, 
+                filters_b4):
+        super(Inception_Module_C, self).__init__()
+
+        self.branch1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b1, 1), 
+            nn.ReLU(True))
+
+        self.branch2_block_1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b2_1, 1),
+            nn.ReLU(True)
+        )
+
+        self.branch2_block_2_1 = nn.Sequential(
+            nn.Conv2d(filters_b2_1, filters_b2_2, (1, 3), 1, (0, 1)),
+            nn.ReLU(True)
+        )
+
+        self.branch2_block_2_2 = nn.Sequential(
+            nn.Conv2d(filters_b2_1, filters_b2_3, (3, 1), 1, (1, 0)),
+            nn.ReLU(True)
+        )
+
+        self.branch3_block_1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b3_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_1, filters_b3_2, 3, 1, 1),
+            nn.ReLU(True)
+        )
+
+        self.branch3_block_2_1 = nn.Sequential(
+            nn.Conv2d(filters_b3_2, filters_b3_3, (1, 3), 1, (0, 1)),
+            nn.ReLU(True)
+        )
+        
+        self.branch3_block_2_2 = nn.Sequential(
+            nn.Conv2d(filters_b3_2, filters_b3_4, (3, 1), 1, (1, 0)),
+            nn.ReLU(True)
+        )
+
+        self.branch4 = nn.Sequential(
+            nn.AvgPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        block1 = self.branch1(x)
+        
+        block2 = self.branch2_block_1(x)
+        block2 = torch.cat([self.branch2_block_2_1(block2), self.branch2_block_2_2(block2)], dim=1)
+
+        block3 = self.branch3_block_1(x)
+        block3 = torch.cat([self.branch3_block_2_1(block3), self.branch3_block_2_2(block3)], dim=1)
+
+        block4 = self.branch4(x)
+
+        return torch.cat([block1, block2, block3, block4], dim=1)
+
+
+def concat_relu(tensors):
+    if torch.is_grad_enabled():
+        return F.relu(torch.cat(tensors, dim=1), inplace=True)
+
+    n, _, h, w = tensors[0].shape
+    out = tensors[0].new_empty(n, sum(t.size(1) for t in tensors), h, w)
+    start = 0
+    for t in tensors:
+        torch.clamp_min(t, 0, out=out[:, start:start+t.size(1)])
+        start += t.size(1)
+    return out
+
+class Fused_Inception_Module_A(nn.Module):
+    leading = (0, 1, 3)
+
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, 
+                filters_b3_1, filters_b3_2, filters_b3_3, filters_b4):
+        super(Fused_Inception_Module_A, self).__init__()
+
+        self.splits = [filters_b1, filters_b2_1, filters_b3_1]
+        self.reduce = nn.Conv2d(input_feature, sum(self.splits), 1)
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(filters_b2_1, filters_b2_2, 3, 1, 1)
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.Conv2d(filters_b3_1, filters_b3_2, 3, 1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_2, filters_b3_3, 3, 1, 1)
+        )
+
+        self.branch4 = nn.Sequential(
+            nn.AvgPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1)
+        )
+
+    def forward(self, x):
+        b1, b2, b3 = torch.split(F.relu(self.reduce(x), inplace=True), self.splits, dim=1)
+        return concat_relu([b1, self.branch2(b2), self.branch3(b3), self.branch4(x)])
+
+
+class Fused_Inception_Module_B(nn.Module):
+    leading = (0, 1, 4)
+
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, filters_b2_3, 
+                filters_b3_1, filters_b3_2, filters_b3_3, filters_b3_4, filters_b3_5, 
+                filters_b4):
+        super(Fused_Inception_Module_B, self).__init__()
+
+        self.splits = [filters_b1, filters_b2_1, filters_b3_1]
+        self.reduce = nn.Conv2d(input_feature, sum(self.splits), 1)
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(filters_b2_1, filters_b2_2, (7, 1), 1, (3, 0)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_2, filters_b2_3, (1, 7), 1, (0, 3))
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.Conv2d(filters_b3_1, filters_b3_2, (7, 1), 1, (3, 0)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_2, filters_b3_3, (1, 7), 1, (0, 3)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_3, filters_b3_4, (7, 1), 1, (3, 0)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b3_4, filters_b3_5, (1, 7), 1, (0, 3))
+        )
+
+        self.branch4 = nn.Sequential(
+            nn.AvgPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1)
+        )
+
+    def forward(self, x):
+        b1, b2, b3 = torch.split(F.relu(self.reduce(x), inplace=True), self.splits, dim=1)
+        return concat_relu([b1, self.branch2(b2), self.branch3(b3), self.branch4(x)])
+
+
+class Fused_Inception_Module_C(nn.Module):
+    leading = (0, 1, 4)
+
+    def __init__(self, input_feature, 
+                filters_b1, filters_b2_1, filters_b2_2, filters_b2_3, 
+                filters_b3_1, filters_b3_2, filters_b3_3, filters_b3_4, 
+                filters_b4):
+        super(Fused_Inception_Module_C, self).__init__()
+
+        self.splits = [filters_b1, filters_b2_1, filters_b3_1]
+        self.reduce = nn.Conv2d(input_feature, sum(self.splits), 1)
+
+        self.branch2_block_2_1 = nn.Conv2d(filters_b2_1, filters_b2_2, (1, 3), 1, (0, 1))
+        self.branch2_block_2_2 = nn.Conv2d(filters_b2_1, filters_b2_3, (3, 1), 1, (1, 0))
+
+        self.branch3_block_1 = nn.Sequential(
+            nn.Conv2d(filters_b3_1, filters_b3_2, 3, 1, 1),
+            nn.ReLU(True)
+        )
+
+        self.branch3_block_2_1 = nn.Conv2d(filters_b3_2, filters_b3_3, (1, 3), 1, (0, 1))
+        self.branch3_block_2_2 = nn.Conv2d(filters_b3_2, filters_b3_4, (3, 1), 1, (1, 0))
+
+        self.branch4 = nn.Sequential(
+            nn.AvgPool2d(3, 1, 1),
+            nn.Conv2d(input_feature, filters_b4, 1)
+        )
+
+    def forward(self, x):
+        b1, b2, b3 = torch.split(F.relu(self.reduce(x), inplace=True), self.splits, dim=1)
+        b3 = self.branch3_block_1(b3)
+
+        # inner concatenations of branch2/branch3 are written straight into the output buffer
+        return concat_relu([b1, 
+                            self.branch2_block_2_1(b2), self.branch2_block_2_2(b2), 
+                            self.branch3_block_2_1(b3), self.branch3_block_2_2(b3), 
+                            self.branch4(x)])
+
+
+fused_module_dict = {
+    Inception_Module_A: Fused_Inception_Module_A,
+    Inception_Module_B: Fused_Inception_Module_B,
+    Inception_Module_C: Fused_Inception_Module_C
+}
+
+
+def fuse_inception(module):
+    convs = [m for m in module.modules() if isinstance(m, nn.Conv2d)]
+    fused = fused_module_dict[type(module)](convs[0].in_channels, *[c.out_channels for c in convs])
+
+    leading = [convs[i] for i in fused.leading]
+    rest = [c for i, c in enumerate(convs) if i not in fused.leading]
+    fused_rest = [m for m in fused.modules() if isinstance(m, nn.Conv2d) and m is not fused.reduce]
+
+    with torch.no_grad():
+        fused.reduce.weight.copy_(torch.cat([c.weight for c in leading]))
+        fused.reduce.bias.copy_(torch.cat([c.bias for c in leading]))
+        for dst, src in zip(fused_rest, rest):
+            dst.weight.copy_(src.weight)
+            dst.bias.copy_(src.bias)
+    return fused.to(convs[0].weight.device)
+
+def fuse_inception_modules(net):
+    for name, child in net.named_children():
+        if type(child) in fused_module_dict:
+            setattr(net, name, fuse_inception(child))
+    return net
+
+class Grid_Reduction_1(nn.Module):
+    def __init__(self, input_feature, filters_b1, 
+                filters_b2_1, filters_b2_2, filters_b2_3):
+        super(Grid_Reduction_1, self).__init__()
+
+        self.branch1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b1, 3, 2),
+            nn.ReLU(True)
+        )
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b2_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_1, filters_b2_2, 3, 1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_2, filters_b2_3, 3, 2),
+            nn.ReLU(True)
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.MaxPool2d(3, 2)
+        )
+    def forward(self, x):
+        return torch.cat([self.branch1(x), self.branch2(x), self.branch3(x)], dim=1)
+
+class Grid_Reduction_2(nn.Module):
+    def __init__(self, input_feature, filters_b1_1, filters_b1_2, 
+                filters_b2_1, filters_b2_2, filters_b2_3, filters_b2_4):
+        super(Grid_Reduction_2, self).__init__()
+
+        self.branch1 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b1_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b1_1, filters_b1_2, 3, 2),
+            nn.ReLU(True)
+        )
+
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(input_feature, filters_b2_1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_1, filters_b2_2, (1, 7), 1, (0, 3)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_2, filters_b2_3, (7, 1), 1, (3, 0)),
+            nn.ReLU(True),
+            nn.Conv2d(filters_b2_3, filters_b2_4, 3, 2),
+            nn.ReLU(True)
+        )
+
+        self.branch3 = nn.Sequential(
+            nn.MaxPool2d(3, 2)
+        )
+    def forward(self, x):
+        return torch.cat([self.branch1(x), self.branch2(x), self.branch3(x)], dim=1)
+
+class Auxiliary_Classifier(nn.Module):
+    def __init__(self, input_feature, num_classes):
+        super(Auxiliary_Classifier, self).__init__()
+        self.block = nn.Sequential(
+            nn.AvgPool2d(5, 3, 1),
+            nn.Conv2d(input_feature, 128, 1),
+            nn.ReLU(True),
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Linear(128, num_classes)
+        )
+    
+    def forward(self, x):
+        return self.block(x)
+
+        
+class Build_InceptionV3(nn.Module):
+    def __init__(self, input_channel=3, num_classes=1000):
+        super(Build_InceptionV3, self).__init__()
+
+        self.Stem = nn.Sequential(
+            nn.Conv2d(input_channel, 32, 3, 2),
+            nn.ReLU(True),
+            nn.Conv2d(32, 32, 3, 1),
+            nn.ReLU(True),
+            nn.Conv2d(32, 64, 3, 1, 1),
+            nn.ReLU(True),
+            nn.MaxPool2d(3, 2),
+            
+            nn.Conv2d(64, 80, 1),
+            nn.ReLU(True),
+            nn.Conv2d(80, 192, 3, 1),
+            nn.ReLU(True),
+            nn.MaxPool2d(3, 2)
+        )
+        
+        self.inception1 = Inception_Module_A(192, 64, 48, 64, 64, 96, 96, 64)
+        self.inception2 = Inception_Module_A(288, 64, 48, 64, 64, 96, 96, 64)
+        self.inception3 = Inception_Module_A(288, 64, 48, 64, 64, 96, 96, 64)
+        self.grid_reduction1 = Grid_Reduction_1(288, 384, 64, 96, 96)    
+
+        self.inception4 = Inception_Module_B(768, 192, 128, 128, 192, 128, 128, 128, 128, 192, 192)
+        self.inception5 = Inception_Module_B(768, 192, 160, 160, 192, 160, 160, 160, 160, 192, 192)
+        self.inception6 = Inception_Module_B(768, 192, 160, 160, 192, 160, 160, 160, 160, 192, 192)
+        self.inception7 = Inception_Module_B(768, 192, 192, 192, 192, 192, 192, 192, 192, 192, 192)
+        self.aux = Auxiliary_Classifier(768, num_classes)
+
+        self.grid_reduction2 = Grid_Reduction_2(768, 192, 320, 192, 192, 192, 192)
+        self.inception8 = Inception_Module_C(1280, 320, 384, 384, 384, 448, 384, 384, 384, 192)
+        self.inception9 = Inception_Module_C(2048, 320, 384, 384, 384, 448, 384, 384, 384, 192)
+
+        self.Classifier = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Dropout(0.4),
+            nn.Linear(2048, num_classes)
+        )
+
+        self.init_weights(self.Stem)
+        self.init_weights(self.inception1)
+        self.init_weights(self.inception3)
+        self.init_weights(self.grid_reduction1)
+        self.init_weights(self.inception4)
+        self.init_weights(self.inception5)
+        self.init_weights(self.inception6)
+        self.init_weights(self.inception7)
+        self.init_weights(self.aux)
+        self.init_weights(self.grid_reduction2)
+        self.init_weights(self.inception8)
+        self.init_weights(self.inception9)
+        self.init_weights(self.Classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+        
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.inception1(x)
+        x = self.inception2(x)
+        x = self.inception3(x)
+        x = self.grid_reduction1(x)
+        
+        x = self.inception4(x)
+        x = self.inception5(x)
+        x = self.inception6(x)
+        x = self.inception7(x)
+        aux = self.aux(x)
+
+        x = self.grid_reduction2(x)
+        x = self.inception8(x)
+        x = self.inception9(x)
+        x = self.Classifier(x)
+        return x, aux
@@ -0,0 +1,75 @@
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/MobileNetV1/PyTorch.py (its data loading and training stay in the script)
+
+class ConvBlock(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1):
+        super(ConvBlock, self).__init__()
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, output_feature, ksize, strides, padding),
+            nn.BatchNorm2d(output_feature),
+            nn.ReLU(True)
+            )
+
+    def forward(self, x):
+        return self.block(x)
+
+class Depthwise_Separable_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1, alpha=1):
+        super(Depthwise_Separable_Block, self).__init__()
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, input_feature, ksize, strides, padding, groups=input_feature),
+            nn.BatchNorm2d(input_feature),
+            nn.ReLU(True),
+            nn.Conv2d(input_feature, int(output_feature*alpha), 1),
+            nn.BatchNorm2d(int(output_feature*alpha)),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return self.block(x)
+            
+
+class Build_MobileNet(nn.Sequential):
+    def __init__(self, input_channel=3, num_classes=1000, alpha=1):
+        super(Build_MobileNet, self).__init__()
+
+        self.Stem = ConvBlock(input_channel, 32, 3, 2, 1)
+
+        layer_list = []
+
+        layer_list.append(Depthwise_Separable_Block(32, 64, alpha=alpha))
+        layer_list.append(Depthwise_Separable_Block(64, 128, strides=2, alpha=alpha))
+        layer_list.append(Depthwise_Separable_Block(128, 128, alpha=alpha))
+        layer_list.append(Depthwise_Separable_Block(128, 256, strides=2, alpha=alpha))
+        layer_list.append(Depthwise_Separable_Block(256, 256, alpha=alpha))
+        layer_list.append(Depthwise_Separable_Block(256, 512, strides=2, alpha=alpha))
+        
+        for _ in range(5):
+            layer_list.append(Depthwise_Separable_Block(512, 512, alpha=alpha))
+        
+        layer_list.append(Depthwise_Separable_Block(512, 1024, strides=2, alpha=alpha))
+        layer_list.append(Depthwise_Separable_Block(1024, 1024, alpha=alpha))
+        
+        self.Main_Block = nn.Sequential(*layer_list)
+
+        self.Classifier = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Linear(1024, num_classes)
+        )
+
+        self.init_weights(self.Stem)
+        self.init_weights(self.Main_Block)
+        self.init_weights(self.Classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+        
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.Main_Block(x)
+        x = self.Classifier(x)
+        return x
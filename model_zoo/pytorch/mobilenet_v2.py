@@ -0,0 +1,112 @@
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/MobileNetV2/PyTorch.py (its data loading and training stay in the script)
+
+class ConvBlock(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1):
+        super(ConvBlock, self).__init__()
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, output_feature, ksize, strides, padding),
+            nn.BatchNorm2d(output_feature),
+            nn.ReLU6(True)
+            )
+
+    def forward(self, x):
+        return self.block(x)
+
+class Depthwise_Separable_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1, alpha=1):
+        super(Depthwise_Separable_Block, self).__init__()
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, input_feature, ksize, strides, padding, groups=input_feature),
+            nn.BatchNorm2d(input_feature),
+            nn.ReLU6(True),
+            nn.Conv2d(input_feature, int(output_feature*alpha), 1),
+            nn.BatchNorm2d(int(output_feature*alpha)),
+            nn.ReLU6(True)
+        )
+
+    def forward(self, x):
+        return self.block(x)
+            
+class Inverted_Residual_Block(nn.Module):
+    def __init__(self, input_feature, expansion, output_feature, strides=1, alpha=1):
+        super(Inverted_Residual_Block, self).__init__()
+        
+        self.stride = strides
+
+        self.intermediate_featrue = int(input_feature*expansion)
+        
+        self.output_feature = output_feature
+
+        self.alpha = alpha
+
+        self.block = nn.Sequential(
+            ConvBlock(input_feature, self.intermediate_featrue, 1, 1, 0),
+            Depthwise_Separable_Block(self.intermediate_featrue, self.output_feature, 3, strides, 1, self.alpha)
+        )
+    
+    def forward(self, x):
+        output = self.block(x)
+        if self.stride==1 and self.intermediate_featrue == int(self.output_feature*self.alpha):
+            return x + output
+        return output
+
+class Build_MobileNetV2(nn.Sequential):
+    def __init__(self, input_channel=3, num_classes=1000, alpha=1):
+        super(Build_MobileNetV2, self).__init__()
+
+        self.Stem = ConvBlock(input_channel, 32, 3, 2, 1)
+
+        layer_list = []
+
+        layer_list.append(Inverted_Residual_Block(32, 1, 16, 1, 1))
+
+        layer_list.append(Inverted_Residual_Block(16, 6, 24, 2, 1))
+        layer_list.append(Inverted_Residual_Block(24, 6, 24, 1, 1))
+
+        layer_list.append(Inverted_Residual_Block(24, 6, 32, 2, 1))
+        layer_list.append(Inverted_Residual_Block(32, 6, 32, 1, 1))
+        layer_list.append(Inverted_Residual_Block(32, 6, 32, 1, 1))
+
+        layer_list.append(Inverted_Residual_Block(32, 6, 64, 2, 1))
+        layer_list.append(Inverted_Residual_Block(64, 6, 64, 1, 1))
+        layer_list.append(Inverted_Residual_Block(64, 6, 64, 1, 1))
+        layer_list.append(Inverted_Residual_Block(64, 6, 64, 1, 1))
+
+        layer_list.append(Inverted_Residual_Block(64, 6, 96, 1, 1))
+        layer_list.append(Inverted_Residual_Block(96, 6, 96, 1, 1))
+        layer_list.append(Inverted_Residual_Block(96, 6, 96, 1, 1))
+        
+        layer_list.append(Inverted_Residual_Block(96, 6, 160, 2, 1))
+        layer_list.append(Inverted_Residual_Block(160, 6, 160, 1, 1))
+        layer_list.append(Inverted_Residual_Block(160, 6, 160, 1, 1))
+
+        layer_list.append(Inverted_Residual_Block(160, 6, 320, 1, 1))
+
+        self.Main_Block = nn.Sequential(*layer_list)
+
+        self.Exit = ConvBlock(320, 1280, 1, 1, 0)
+
+        self.Classifier = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten(),
+            nn.Linear(1280, num_classes)
+        )
+
+        self.init_weights(self.Stem)
+        self.init_weights(self.Main_Block)
+        self.init_weights(self.Exit)
+        self.init_weights(self.Classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+        
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.Main_Block(x)
+        x = self.Exit(x)
+        x = self.Classifier(x)
+        return x
@@ -0,0 +1,84 @@
+import torch
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/ResNet/PyTorch.py (its data loading and training stay in the script)
+
+class Residual_block(nn.Module):
+    def __init__(self, in_channel, output_channel, strides=1, use_branch=True):
+        super(Residual_block, self).__init__()
+
+        self.branch1 = nn.Identity()
+        if use_branch:
+            self.branch1 = nn.Conv2d(in_channel, output_channel, 1, strides)
+        
+        self.branch2 = nn.Sequential(
+            nn.Conv2d(in_channel, output_channel//4, 1, strides),
+            nn.BatchNorm2d(output_channel//4),
+            nn.ReLU(True),
+            nn.Conv2d(output_channel//4, output_channel//4, 3, 1, padding=1),
+            nn.BatchNorm2d(output_channel//4),
+            nn.ReLU(True),
+            nn.Conv2d(output_channel//4, output_channel, 1, 1),
+            nn.BatchNorm2d(output_channel),        
+        )
+
+        self.relu = nn.ReLU(True)
+
+    def forward(self, x):
+        out = self.branch2(x)
+        out = self.relu(out + self.branch1(x))
+
+        return out
+
+class build_resnet(nn.Module):
+    def __init__(self, input_channel= 3, num_classes=1000, num_layer=16):
+        super(build_resnet, self).__init__()
+
+        blocks_dict = {
+        50: [3, 4, 6, 3],
+        101: [3, 4, 23, 3], 
+        152: [3, 8, 36, 3]
+        }
+
+        num_channel_list = [256, 512, 1024, 2048]
+
+        assert num_layer in  blocks_dict.keys(), "Number of layer must be in %s"%blocks_dict.keys()
+
+        self.stem = nn.Sequential(
+            nn.ZeroPad2d((3,3)),
+            nn.Conv2d(input_channel, 64, 7, 2),
+            nn.BatchNorm2d(64),
+            nn.ReLU(True),
+            nn.MaxPool2d(3, 2, 1)
+        )
+
+        layer_list = []
+
+        input_features = 64
+
+        for idx, num_iter in enumerate(blocks_dict[num_layer]):
+            for j in range(num_iter):
+                if j==0:
+                    layer_list.append(Residual_block(input_features, num_channel_list[idx], strides=2))
+                else:
+                    layer_list.append(Residual_block(input_features, num_channel_list[idx], use_branch=False))
+                input_features = num_channel_list[idx]
+        self.main_net = nn.Sequential(*layer_list)
+        self.avgpool = nn.AdaptiveAvgPool2d((1, 1))
+        self.classifier = nn.Linear(input_features, num_classes)
+    
+        self.init_weights(self.main_net)
+        self.init_weights(self.classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        x = self.stem(x)
+        x = self.main_net(x)
+        x = self.avgpool(x)
+        x = torch.flatten(x, 1)
+        x = self.classifier(x)
+        return x
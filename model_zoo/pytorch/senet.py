@@ -0,0 +1,114 @@
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/SENet/PyTorch.py (its data loading and training stay in the script)
+
+class Conv_Block(nn.Module):
+    def __init__(self, in_channel, output_channel, ksize, stride, padding, activation=True, use_bn=False):
+        super(Conv_Block, self).__init__()
+
+        layer_list = []
+
+        layer_list.append(nn.Conv2d(in_channel, output_channel, ksize, stride, padding))
+        
+        if use_bn:
+            layer_list.append(nn.BatchNorm2d(output_channel))
+        
+        if activation:
+            layer_list.append(nn.ReLU(True))
+
+        self.block = nn.Sequential(*layer_list)
+    
+    def forward(self, x):
+        return self.block(x)
+
+class Squeeze_Excitation_Module(nn.Module):
+    def __init__(self, features, reduction_ratio):
+        super(Squeeze_Excitation_Module, self).__init__()
+
+        self.block = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1, 1)),
+            nn.Conv2d(features, features//reduction_ratio, 1, 1),
+            nn.ReLU(True),
+            nn.Conv2d(features//reduction_ratio, features, 1, 1),
+            nn.Sigmoid()   
+        )
+
+    def forward(self, x):
+        return x * self.block(x)
+
+class SE_Residual_Block(nn.Module):
+    def __init__(self, in_channel, output_channel, stride, reduction_ratio, use_bn=False, 
+                use_proj=False, proj_ksize=3, proj_pad=1):
+        super(SE_Residual_Block, self).__init__()
+        
+        self.use_proj = use_proj
+
+        layer_list = []
+
+        layer_list.append(Conv_Block(in_channel, output_channel//4, 1, 1, 0, True, use_bn))
+        layer_list.append(Conv_Block(output_channel//4, output_channel//4, 3, stride, 1, True, use_bn))
+        layer_list.append(Conv_Block(output_channel//4, output_channel, 1, 1, 0, False, use_bn))
+
+        layer_list.append(Squeeze_Excitation_Module(output_channel, reduction_ratio))
+
+        self.block = nn.Sequential(*layer_list)
+
+        self.proj = Conv_Block(in_channel, output_channel, proj_ksize, stride, proj_pad, False, use_bn)
+
+        self.relu = nn.ReLU(True)
+
+    def forward(self, x):
+        out = self.block(x)
+    
+        proj = self.proj(x) if self.use_proj else x
+
+        return self.relu(out + proj)
+
+class build_seresnet(nn.Module):
+    def __init__(self, input_channel= 3, num_classes=1000):
+        super(build_seresnet, self).__init__()
+
+        layer_list = []
+
+        layer_list.append(Conv_Block(input_channel, 64, 3, 2, 0, True, True))
+        layer_list.append(Conv_Block(64, 64, 3, 1, 1, True, True))
+        layer_list.append(Conv_Block(64, 128, 3, 1, 1, True, True))
+        layer_list.append(nn.MaxPool2d(3, 2))
+
+        layer_list.append(SE_Residual_Block(128, 256, 1, 16, True, True, 1, 0))
+        for _ in range(2):
+            layer_list.append(SE_Residual_Block(256, 256, 1, 16, True))
+
+        layer_list.append(SE_Residual_Block(256, 512, 2, 16, True, True, 3, 1))
+        for _ in range(3):
+            layer_list.append(SE_Residual_Block(512, 512, 1, 16, True))
+    
+        layer_list.append(SE_Residual_Block(512, 1024, 2, 16, True, True, 3, 1))
+        for _ in range(5):
+            layer_list.append(SE_Residual_Block(1024, 1024, 1, 16, True))
+        
+        layer_list.append(SE_Residual_Block(1024, 2048, 2, 16, True, True, 3, 1))
+        for _ in range(2):
+            layer_list.append(SE_Residual_Block(2048, 2048, 1, 16, True))
+
+        self.Stem = nn.Sequential(*layer_list)
+
+        self.Classifier = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1, 1)),
+            nn.Flatten(),
+            nn.Dropout(0.2),
+            nn.Linear(2048, num_classes)
+        )
+
+        self.init_weights(self.Stem)
+        self.init_weights(self.Classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.Classifier(x)
+        return x
@@ -0,0 +1,89 @@
+import torch
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/SqueezeNet/PyTorch.py (its data loading and training stay in the script)
+
+class Conv_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1, use_relu=True, use_bn=False):
+        super(Conv_Block, self).__init__()
+        
+        layer_list = []
+
+        layer_list.append(nn.Conv2d(input_feature, output_feature, ksize, strides, padding))
+        
+        if use_bn:
+            layer_list.append(nn.BatchNorm2d(output_feature))
+
+        if use_relu:
+            layer_list.append(nn.ReLU(True))
+
+        self.block = nn.Sequential(*layer_list)
+
+    def forward(self, x):
+        return self.block(x)
+
+class Fire_Module(nn.Module):
+    def __init__(self, input_feature, squ, exp_1x1, exp_3x3, use_bn=False):
+        super(Fire_Module, self).__init__()
+
+        self.squeeze = Conv_Block(input_feature, squ, 1, 1, 0)
+
+        self.expand_1x1 = Conv_Block(squ, exp_1x1, 1, 1, 0, False)
+        self.expand_3x3 = Conv_Block(squ, exp_3x3, 3, 1, 1, False)
+
+        self.relu = nn.ReLU(True)
+
+    def forward(self, x):
+        out = self.squeeze(x)
+
+        exp_1x1 = self.expand_1x1(out)
+        exp_3x3 = self.expand_3x3(out)
+
+        expand = torch.cat([exp_1x1, exp_3x3], dim=1)
+
+        out = self.relu(expand)
+        return out
+
+class Build_SqueezeNet(nn.Module):
+    def __init__(self, input_channel=3, num_classes=1000):
+        super(Build_SqueezeNet, self).__init__()
+
+        self.Stem = Conv_Block(input_channel, 96, 7, 2, 3)
+
+        layer_list = []
+        layer_list.append(Fire_Module(96, 16, 64, 64))
+        layer_list.append(Fire_Module(128, 16, 64, 64))
+        layer_list.append(Fire_Module(128, 32, 128, 128))
+        layer_list.append(nn.MaxPool2d(3, 2))
+
+        layer_list.append(Fire_Module(256, 32, 128, 128))
+        layer_list.append(Fire_Module(256, 48, 192, 192))
+        layer_list.append(Fire_Module(384, 48, 192, 192))
+        layer_list.append(Fire_Module(384, 64, 256, 256))
+        layer_list.append(nn.MaxPool2d(3, 2))
+
+        layer_list.append(Fire_Module(512, 64, 256, 256))       
+
+        self.Main_Block = nn.Sequential(*layer_list)
+
+        self.Classifier = nn.Sequential(
+            nn.Dropout(0.5), 
+            Conv_Block(512, num_classes, 1, 1, 0),
+            nn.AdaptiveAvgPool2d((1,1)),
+            nn.Flatten()
+        )
+        
+        self.init_weights(self.Stem)
+        self.init_weights(self.Main_Block)
+        self.init_weights(self.Classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        x = self.Stem(x)
+        x = self.Main_Block(x)
+        x = self.Classifier(x)
+        return x
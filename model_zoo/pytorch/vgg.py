@@ -0,0 +1,54 @@
+import torch
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/VGGNet/PyTorch.py (its data loading and training stay in the script)
+
+class build_vgg(nn.Module):
+    def __init__(self, input_channel= 3, num_classes=1000, num_layer=16):
+        super(build_vgg, self).__init__()
+        
+        blocks_dict = {
+        11: [1, 1, 2, 2, 2],
+        13: [2, 2, 2, 2, 2], 
+        16: [2, 2, 3, 3, 3], 
+        19: [2, 2, 4, 4, 4]
+        }
+
+        num_channel_list = [64, 128, 256, 512, 512]
+
+        assert num_layer in  blocks_dict.keys(), "Number of layer must be in %s"%blocks_dict.keys()
+
+        layer_list = []
+
+        input_features = input_channel
+        for idx, num_iter in enumerate(blocks_dict[num_layer]):
+            for jdx in range(num_iter):
+                layer_list.append(nn.Conv2d(input_features, num_channel_list[idx], 3, padding=1))
+                layer_list.append(nn.ReLU(True))
+                input_features = num_channel_list[idx]
+            layer_list.append(nn.MaxPool2d(2, 2))
+
+        self.vgg = nn.Sequential(*layer_list)
+        self.avgpool = nn.AdaptiveAvgPool2d((1, 1))
+        self.classifier = nn.Sequential(
+            nn.Linear(512, 512),
+            nn.ReLU(True),
+            nn.Linear(512, 512),
+            nn.ReLU(True),
+            nn.Linear(512, num_classes)
+        )
+        
+        self.init_weights(self.vgg)
+        self.init_weights(self.classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        x = self.vgg(x)
+        x = self.avgpool(x)
+        x = torch.flatten(x, 1)
+        x = self.classifier(x)
+        return x
@@ -0,0 +1,123 @@
+import torch
+from torch import nn
+
+# Network definitions of 03_Advance/CNN/Xception/PyTorch.py (its data loading and training stay in the script)
+
+class Conv_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1):
+        super(Conv_Block, self).__init__()
+
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, output_feature, ksize, strides, padding),
+            nn.BatchNorm2d(output_feature),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return self.block(x)
+
+class Depthwise_Separable_Block(nn.Module):
+    def __init__(self, input_feature, output_feature, ksize=3, strides=1, padding=1):
+        super(Depthwise_Separable_Block, self).__init__()
+        
+        self.block = nn.Sequential(
+            nn.Conv2d(input_feature, input_feature, ksize, strides, padding, groups=input_feature),
+            nn.Conv2d(input_feature, output_feature, 1),
+            nn.BatchNorm2d(output_feature),
+            nn.ReLU(True)
+        )
+
+    def forward(self, x):
+        return self.block(x)
+
+class Residual_Block(nn.Module):
+    def __init__(self, input_feature, intermediate_feature, output_feature):
+        super(Residual_Block, self).__init__()
+        
+        self.block1 = nn.Sequential(
+            nn.Conv2d(input_feature, output_feature, 1, 2),
+            nn.BatchNorm2d(output_feature)
+        )
+        self.block2 = nn.Sequential(
+            Depthwise_Separable_Block(input_feature, intermediate_feature),
+            nn.BatchNorm2d(intermediate_feature),
+            nn.ReLU(True),
+
+            Depthwise_Separable_Block(intermediate_feature, output_feature),
+            nn.BatchNorm2d(output_feature),
+            
+            nn.MaxPool2d(3, 2, 1)
+        )
+
+    def forward(self, x):
+        return self.block1(x) + self.block2(x)
+
+class Middle_Flow(nn.Module):
+    def __init__(self, features):
+        super(Middle_Flow, self).__init__()
+
+        self.block = nn.Sequential(
+            nn.ReLU(True),
+            Depthwise_Separable_Block(features, features),
+            nn.BatchNorm2d(features),
+            
+            nn.ReLU(True),
+            Depthwise_Separable_Block(features, features),
+            nn.BatchNorm2d(features),
+
+            nn.ReLU(True),
+            Depthwise_Separable_Block(features, features),
+            nn.BatchNorm2d(features)
+        )
+
+    def forward(self, x):
+        return self.block(x) + x
+
+class Build_Xception(nn.Module):
+    def __init__(self, input_channel= 3, num_classes=1000):
+        super(Build_Xception, self).__init__()
+
+        self.stem = nn.Sequential(
+            Conv_Block(input_channel, 32, 3, 2, 1),
+            Conv_Block(32, 64)
+        )
+
+        self.entry_block = nn.Sequential(
+            Residual_Block(64, 128, 128),
+            Residual_Block(128, 256, 256),
+            Residual_Block(256, 728, 728)
+        )
+
+        self.middle_block = nn.Sequential(
+            *[Middle_Flow(728) for _ in range(8)]
+        )
+
+        self.exit_block = nn.Sequential(
+            Residual_Block(728, 728, 1024),
+            Depthwise_Separable_Block(1024, 1536),
+            Depthwise_Separable_Block(1536, 2048)
+        )
+
+        self.avgpool = nn.AdaptiveAvgPool2d((1, 1))
+        self.classifier = nn.Linear(2048, num_classes)
+
+        self.init_weights(self.stem)
+        self.init_weights(self.entry_block)
+        self.init_weights(self.middle_block)
+        self.init_weights(self.exit_block)
+        self.init_weights(self.classifier)
+
+    def init_weights(self, m):
+        if isinstance(m, nn.Linear):
+            nn.init.xavier_uniform_(m.weight)
+            m.bias.data.fill_(0.01)
+
+    def forward(self, x):
+        x = self.stem(x)
+        x = self.entry_block(x)
+        x = self.middle_block(x)
+        x = self.exit_block(x)
+        x = self.avgpool(x)
+        x = torch.flatten(x, 1)
+        x = self.classifier(x)
+        return x
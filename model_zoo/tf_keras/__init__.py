@@ -0,0 +1,13 @@
+import importlib
+
+# tf_keras definitions, each submodule imports tensorflow on first access only
+
+_submodules = ["resnet", "vgg"]
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals().keys()) + _submodules)
@@ -0,0 +1,31 @@
+from tensorflow.keras import layers, models
+
+# Network definitions of 03_Advance/CNN/VGGNet/tf_keras.py (its data loading and training stay in the script)
+
+def build_vgg(input_shape=(None, None, 3), num_classes=1, num_layer=16, name='vgg'):
+    
+    blocks_dict = {
+        11: [1, 1, 2, 2, 2],
+        13: [2, 2, 2, 2, 2], 
+        16: [2, 2, 3, 3, 3], 
+        19: [2, 2, 4, 4, 4]
+    }
+
+    num_channel_list = [64, 128, 256, 512, 512]
+
+    assert num_layer in  blocks_dict.keys(), "Number of layer must be in %s"%blocks_dict.keys()
+    
+    last_act = 'sigmoid' if num_classes==1 else 'softmax'
+    name = name+str(num_layer)
+
+    model = models.Sequential(name=name)
+    model.add(layers.Input(shape=input_shape, name=name+"_Input"))
+    for idx, num_iter in enumerate(blocks_dict[num_layer]):
+        for jdx in range(num_iter):
+            model.add(layers.Conv2D(num_channel_list[idx], 3, strides=1, padding='same', activation='relu', name=name+"_Block_%d_Conv%d"%(idx+1, jdx+1)))
+        model.add(layers.MaxPool2D(name=name+"_Block%d_Pool"%(idx+1)))
+    model.add(layers.GlobalAveragePooling2D(name=name+"_GAP"))
+    model.add(layers.Dense(512, activation='relu', name=name+"_Dense_1"))
+    model.add(layers.Dense(512, activation='relu', name=name+"_Dense_2"))
+    model.add(layers.Dense(num_classes, activation=last_act, name=name+"_Output"))
+    return model
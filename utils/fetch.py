@@ -0,0 +1,440 @@
+import os
+import re
+import sys
+import json
+import time
+import queue
+import hashlib
+import tarfile
+import zipfile
+import argparse
+import threading
+import http.client
+import http.server
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError: # Windows, the cache is then not locked between processes
+    fcntl = None
+
+# Dataset downloads shared by the scripts.
+#
+# - One cache directory for every script ($DATASET_CACHE, ~/.cache/deep_learning_datasets by default),
+#   a file is downloaded once to {cache}/{host}/{file name}.
+# - Downloads go to {file}.part and resume from its bytes with an HTTP Range request, after a dropped connection
+#   (retried with backoff) or an interrupted run.
+# - manifest.json of the cache records the size and sha256 of every completed file. A cached file is checked against it
+#   (and against the sha256 given by the caller) before use, it is only hashed again when its size or mtime changed.
+# - One lock file per download, concurrent workers sharing the cache download a file once.
+# - tar archives are extracted while they download (stream mode, each member as its bytes arrive),
+#   zip archives (their index is at the end of the file) after the download, members in parallel.
+#
+#   python utils/fetch.py {url} --EXTRACT ./datasets
+#   python utils/fetch.py --SERVE {directory} --PORT 8000     # local server with Range support, to try the downloads
+
+CACHE_DIR = os.environ.get("DATASET_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "deep_learning_datasets"))
+CHUNK_SIZE = 1 << 20
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+class File_Lock:
+    # Exclusive lock between processes on a lock file (no-op without fcntl)
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+# =================
+# Manifest
+# =================
+def read_manifest(cache_dir):
+    # {key : {"url", "size", "mtime_ns", "sha256"}}
+    try:
+        with open(os.path.join(cache_dir, "manifest.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def record(cache_dir, key, entry):
+    path = os.path.join(cache_dir, "manifest.json")
+    with File_Lock(path + ".lock"):
+        manifest = read_manifest(cache_dir)
+        manifest[key] = entry
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(url, filename=None):
+    parsed = urllib.parse.urlparse(url)
+    return os.path.join(parsed.netloc.replace(":", "_") or "local", filename or os.path.basename(parsed.path))
+
+# =================
+# Download
+# =================
+def progress(name, current, total):
+    if total:
+        sys.stdout.write(f"\rDownloading {name} ...... {100.0*current/total:.2f}%")
+    else:
+        sys.stdout.write(f"\rDownloading {name} ...... {current/2**20:.1f} MB")
+    sys.stdout.flush()
+
+def download(url, path, sha256=None, sink=None, retries=5, timeout=60, verbose=True):
+    """
+    Downloads url to path through path.part, resuming from the bytes already in it. Returns (size, sha256).
+    sink : called with every chunk from the first byte on (the bytes of a resumed .part included), for streaming extraction
+    """
+    part = path + ".part"
+    name = os.path.basename(path)
+    digest = hashlib.sha256()
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    fed = 0 # bytes already given to the digest / sink
+    total = None
+
+    def feed(chunk):
+        nonlocal fed
+        digest.update(chunk)
+        if sink is not None:
+            sink(chunk)
+        fed += len(chunk)
+
+    def feed_part(f):
+        # Bytes of the partial file not yet fed, before the new ones
+        f.seek(fed)
+        while fed < offset:
+            feed(f.read(min(CHUNK_SIZE, offset - fed)))
+
+    for attempt in range(retries + 1):
+        request = urllib.request.Request(url, headers={"Range": f"bytes={offset}-"} if offset else {})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                content_range = re.match(r"bytes (\d+)-\d+/(\d+|\*)", response.headers.get("Content-Range", ""))
+                if offset and (response.status != 206 or content_range is None or int(content_range.group(1)) != offset):
+                    # No range support : start again from the first byte
+                    if fed:
+                        raise IOError(f"{url} stopped answering range requests, the download cannot resume")
+                    offset = 0
+                if content_range is not None and content_range.group(2) != "*":
+                    total = int(content_range.group(2))
+                elif response.headers.get("Content-Length") is not None:
+                    total = offset + int(response.headers["Content-Length"])
+
+                with open(part, "r+b" if offset else "wb") as f:
+                    feed_part(f)
+                    f.seek(offset)
+                    f.truncate()
+                    for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                        f.write(chunk)
+                        feed(chunk)
+                        offset += len(chunk)
+                        if verbose:
+                            progress(name, offset, total)
+            if total is not None and offset < total:
+                raise http.client.IncompleteRead(b"", total - offset)
+            break
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # Range past the end : the partial file is already complete (checked by the hash below)
+                with open(part, "rb") as f:
+                    feed_part(f)
+                total = offset
+                break
+            if e.code < 500 or attempt == retries:
+                raise
+        except (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError) as e:
+            if attempt == retries:
+                raise
+            if verbose:
+                print(f"\n{name} : {e}, resuming from {offset} bytes")
+        time.sleep(min(2 ** attempt, 30))
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+    if verbose:
+        print()
+
+    if total is not None and offset != total:
+        raise IOError(f"{url} : got {offset} bytes of {total}")
+    if sha256 is not None and digest.hexdigest() != sha256:
+        os.remove(part)
+        raise ValueError(f"{url} : sha256 {digest.hexdigest()} does not match {sha256}, the partial file was removed")
+    os.replace(part, path)
+    return offset, digest.hexdigest()
+
+def cached(cache_dir, key, path, sha256=None):
+    # sha256 of the cached file if it is complete and matches, None otherwise
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    entry = read_manifest(cache_dir).get(key)
+    if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        digest = entry["sha256"]
+    else:
+        # Not in the manifest, or changed since : hashed again
+        digest = file_sha256(path)
+        if entry is not None and entry["size"] == stat.st_size and entry["sha256"] != digest:
+            return None
+        record(cache_dir, key, {"url": entry["url"] if entry else None, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest})
+    if sha256 is not None and digest != sha256:
+        return None
+    return digest
+
+def fetch(url, sha256=None, cache_dir=None, filename=None, sink=None, retries=5, verbose=True):
+    """
+    Path of url in the shared cache, downloaded (or resumed) first if needed.
+    sha256 : expected hash, the download fails (and a cached file is downloaded again) if it differs
+    filename : name in the cache, the last part of the url by default
+    sink : called with the file content chunk by chunk, while it downloads or from the cached file
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    key = cache_key(url, filename)
+    path = os.path.join(cache_dir, key)
+    with File_Lock(path + ".lock"):
+        if cached(cache_dir, key, path, sha256) is not None:
+            if verbose:
+                print(f"Already downloaded : {path}")
+            if sink is not None:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        sink(chunk)
+            return path
+        if os.path.exists(path):
+            print(f"{path} does not match, downloading again")
+            os.remove(path)
+
+        size, digest = download(url, path, sha256, sink, retries, verbose=verbose)
+        stat = os.stat(path)
+        record(cache_dir, key, {"url": url, "size": size, "mtime_ns": stat.st_mtime_ns, "sha256": digest})
+    return path
+
+# =================
+# Extraction
+# =================
+class Pipe:
+    # Read end of a download for tarfile stream mode, the chunks are handed over through a bounded queue
+    def __init__(self, max_chunks=64):
+        self.queue = queue.Queue(max_chunks)
+        self.chunk, self.pos = b"", 0
+        self.eof = False
+        self.abandoned = False
+
+    def write(self, chunk):
+        # Blocks while the reader is behind, drops the chunks once it stopped reading
+        while not self.abandoned:
+            try:
+                self.queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def close(self, error=None):
+        self.write(error)
+
+    def abandon(self):
+        self.abandoned = True
+
+    def read(self, size=-1):
+        pieces, n = [], 0
+        while size < 0 or n < size:
+            if self.pos == len(self.chunk):
+                if self.eof:
+                    break
+                item = self.queue.get()
+                if item is None:
+                    self.eof = True
+                elif isinstance(item, BaseException):
+                    self.eof = True
+                    raise item
+                else:
+                    self.chunk, self.pos = item, 0
+                continue
+            end = len(self.chunk) if size < 0 else min(len(self.chunk), self.pos + size - n)
+            pieces.append(self.chunk[self.pos:end])
+            n += end - self.pos
+            self.pos = end
+        return b"".join(pieces)
+
+def safe_target(dest, name):
+    # Refuses members written outside of dest (absolute paths, ..)
+    root = os.path.realpath(dest)
+    target = os.path.realpath(os.path.join(dest, name))
+    if os.path.commonpath([root, target]) != root:
+        raise ValueError(f"Member outside of the destination : {name}")
+    return target
+
+def extract_tar_stream(fileobj, dest, verbose=True):
+    # Extracts members in archive order while reading, without the member list (getmembers) first. Returns the count
+    count = 0
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            safe_target(dest, member.name)
+            if member.issym():
+                safe_target(dest, os.path.join(os.path.dirname(member.name), member.linkname))
+            elif member.islnk():
+                safe_target(dest, member.linkname)
+            if hasattr(tarfile, "data_filter"):
+                tar.extract(member, dest, filter="data")
+            else:
+                tar.extract(member, dest)
+            count += 1
+            if verbose:
+                sys.stdout.write(f"\rExtracting ...... {count} files")
+    if verbose:
+        print()
+    return count
+
+def extract_zip(path, dest, num_workers=8, verbose=True):
+    """
+    Extracts the members of a zip archive in parallel, each thread with its own handle of the archive
+    (zlib releases the GIL while it decompresses). Returns the count.
+    """
+    with zipfile.ZipFile(path) as zf:
+        members = zf.infolist()
+    # Directories first, the threads then never race to create the same one
+    for member in members:
+        target = safe_target(dest, member.filename)
+        os.makedirs(target if member.is_dir() else os.path.dirname(target), exist_ok=True)
+    files = sorted([m for m in members if not m.is_dir()], key=lambda m: -m.file_size)
+    groups = [files[i::num_workers] for i in range(num_workers)]
+
+    lock = threading.Lock()
+    done = 0
+    def extract_group(group):
+        nonlocal done
+        with zipfile.ZipFile(path) as zf:
+            for member in group:
+                zf.extract(member, dest)
+                with lock:
+                    done += 1
+                    if verbose:
+                        sys.stdout.write(f"\rExtracting {os.path.basename(path)} ...... {100.0*done/len(files):.2f}%")
+
+    with ThreadPoolExecutor(num_workers) as pool:
+        list(pool.map(extract_group, groups))
+    if verbose:
+        print()
+    return len(files)
+
+def fetch_and_extract(url, dest, sha256=None, cache_dir=None, num_workers=8, verbose=True):
+    """
+    Downloads url into the cache and extracts the archive into dest, once :
+    dest/.{archive name}.extracted holds the sha256 of the extracted archive, written after the hash was checked.
+    tar archives are extracted while they download, zip archives after it, in parallel.
+    Returns dest.
+    """
+    name = os.path.basename(urllib.parse.urlparse(url).path)
+    marker = os.path.join(dest, f".{name}.extracted")
+    if os.path.exists(marker):
+        with open(marker) as f:
+            extracted = f.read().strip()
+        if sha256 is None or extracted == sha256:
+            if verbose:
+                print(f"Already extracted : {dest}")
+            return dest
+    os.makedirs(dest, exist_ok=True)
+
+    if name.endswith(".zip"):
+        path = fetch(url, sha256, cache_dir, verbose=verbose)
+        extract_zip(path, dest, num_workers, verbose)
+    elif name.endswith(TAR_SUFFIXES):
+        pipe = Pipe()
+        result = {}
+        def download_thread():
+            try:
+                result["path"] = fetch(url, sha256, cache_dir, sink=pipe.write, verbose=False)
+                pipe.close()
+            except BaseException as e:
+                result["error"] = e
+                pipe.close(IOError(f"Download of {url} failed : {e}"))
+
+        if verbose:
+            print(f"Downloading and extracting {name} ....")
+        thread = threading.Thread(target=download_thread, daemon=True)
+        thread.start()
+        try:
+            extract_tar_stream(pipe, dest, verbose)
+        finally:
+            pipe.abandon()
+            thread.join()
+            # The download error (hash mismatch, ...) rather than the broken stream it left to tarfile
+            if "error" in result:
+                raise result["error"]
+    else:
+        raise ValueError(f"Unknown archive type : {name}")
+
+    with open(marker, "w") as f:
+        f.write(read_manifest(cache_dir or CACHE_DIR)[cache_key(url)]["sha256"] if sha256 is None else sha256)
+    return dest
+
+# =================
+# Local server
+# =================
+class Range_Request_Handler(http.server.SimpleHTTPRequestHandler):
+    # Static files with "Range: bytes={start}-" requests answered by 206 (SimpleHTTPRequestHandler ignores Range)
+    def send_head(self):
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", "").strip())
+        path = self.translate_path(self.path)
+        if match is None or not os.path.isfile(path):
+            return super().send_head()
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        if start >= size:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Range", f"bytes {start}-{size-1}/{size}")
+        self.send_header("Content-Length", str(size - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        return f
+
+def serve(directory, port=8000):
+    handler = lambda *args, **kwargs: Range_Request_Handler(*args, directory=directory, **kwargs)
+    with http.server.ThreadingHTTPServer(("127.0.0.1", port), handler) as server:
+        print(f"Serving {directory} on http://127.0.0.1:{port}/")
+        server.serve_forever()
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("URLS", nargs="*", type=str, help="")
+    parser.add_argument("--SHA256", default=None, type=str, help="expected hash (with a single url)")
+    parser.add_argument("--EXTRACT", default=None, type=str, help="extract the archives into this directory")
+    parser.add_argument("--CACHE_DIR", default=CACHE_DIR, type=str, help="")
+    parser.add_argument("--NUM_WORKERS", default=8, type=int, help="threads extracting a zip archive")
+    parser.add_argument("--SERVE", default=None, type=str, help="serve this directory locally instead")
+    parser.add_argument("--PORT", default=8000, type=int, help="")
+    args = parser.parse_args()
+
+    if args.SERVE is not None:
+        serve(args.SERVE, args.PORT)
+    assert args.SHA256 is None or len(args.URLS) == 1, "--SHA256 needs a single url"
+    for url in args.URLS:
+        if args.EXTRACT is not None:
+            fetch_and_extract(url, args.EXTRACT, args.SHA256, args.CACHE_DIR, args.NUM_WORKERS)
+        else:
+            print(fetch(url, args.SHA256, args.CACHE_DIR))
@@ -0,0 +1,117 @@
+import os
+import ast
+import sys
+import time
+import argparse
+import subprocess
+
+# Import time per module of a module or a script, measured with `python -X importtime` in a fresh interpreter.
+#
+# - A module target is imported as is (`import model_zoo`), a script target (*.py) only runs its top-level imports
+#   and sys.path changes, from the script directory, so its data loading / training never runs.
+# - Each target runs `--REPEAT` times, the minimum per module is kept (the first run also pays the .pyc compilation).
+# - Reports the wall time of the process, the top-level packages by cumulative time, the modules by self time,
+#   and which heavy frameworks the target loaded.
+#
+#   python utils/import_profile.py model_zoo model_zoo.pytorch.resnet 03_Advance/CNN/ResNet/PyTorch.py
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ["torch", "torchvision", "tensorflow", "keras", "mxnet", "jax", "cv2", "matplotlib", "scipy", "pandas", "sklearn", "numpy"]
+
+def import_statements(path):
+    # Top-level imports and sys.path.append / insert calls of a script, as source
+    tree = ast.parse(open(path).read(), filename=path)
+    keep = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            keep.append(node)
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call) and "sys.path" in ast.unparse(node.value.func):
+            keep.append(node)
+    return "import sys\n" + "\n".join(ast.unparse(node) for node in keep)
+
+def parse_importtime(stderr):
+    """
+    {module: (self us, cumulative us, depth)} of the `-X importtime` lines
+    import time: self [us] | cumulative | imported package
+    import time:       152 |        152 |   encodings.aliases
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(fields[0]), int(fields[1]), depth)
+    return modules
+
+def run(statement, cwd, python=sys.executable):
+    # (modules, wall time in s, heavy packages in sys.modules) of one fresh interpreter
+    probe = statement + f"\nimport sys as _sys\nprint(','.join(m for m in {HEAVY!r} if m in _sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run([python, "-X", "importtime", "-c", probe], cwd=cwd, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}")
+    loaded = proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else ""
+    return parse_importtime(proc.stderr), wall, [m for m in loaded.split(",") if m]
+
+def profile(target, repeat=3, python=sys.executable):
+    """
+    Minimum over `repeat` runs of every module time and of the wall time.
+    target : module name, or path of a script
+    """
+    if target.endswith(".py"):
+        path = os.path.abspath(target)
+        statement, cwd = import_statements(path), os.path.dirname(path)
+    else:
+        statement, cwd = f"import {target}", ROOT
+
+    modules, wall, loaded = None, float("inf"), []
+    for _ in range(repeat):
+        m, w, loaded = run(statement, cwd, python)
+        wall = min(wall, w)
+        if modules is None:
+            modules = m
+        else:
+            modules = {k: (min(v[0], m.get(k, v)[0]), min(v[1], m.get(k, v)[1]), v[2]) for k, v in modules.items()}
+    return modules, wall, loaded
+
+def print_report(target, modules, wall, loaded, baseline, top=15):
+    # baseline : modules of the bare interpreter, not counted as the target's
+    own = {k: v for k, v in modules.items() if k not in baseline}
+    total = sum(v[1] for v in own.values() if v[2] == 0)
+    print(f"\n================ {target} ================")
+    print(f"Wall time : {wall:.3f}s, imports : {total / 1e6:.3f}s, {len(own)} modules")
+    print(f"Heavy packages loaded : {', '.join(loaded) if loaded else 'none'}")
+
+    print(f"\n{'top-level import':<40}{'cumulative ms':>16}")
+    for name, (_, cumulative, _) in sorted(((k, v) for k, v in own.items() if v[2] == 0), key=lambda kv: -kv[1][1])[:top]:
+        print(f"{name:<40}{cumulative / 1000:>16.1f}")
+
+    print(f"\n{'module':<40}{'self ms':>16}{'cumulative ms':>16}")
+    for name, (self_us, cumulative, _) in sorted(own.items(), key=lambda kv: -kv[1][0])[:top]:
+        print(f"{name:<40}{self_us / 1000:>16.1f}{cumulative / 1000:>16.1f}")
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("TARGETS", nargs="+", type=str, help="module names (model_zoo.pytorch.resnet) or script paths (*.py)")
+    parser.add_argument("--REPEAT", default=3, type=int, help="runs per target, the minimum is kept")
+    parser.add_argument("--TOP", default=15, type=int, help="rows per table")
+    parser.add_argument("--PYTHON", default=sys.executable, type=str, help="interpreter to profile")
+    args = parser.parse_args()
+
+    baseline, base_wall, _ = profile("sys", args.REPEAT, args.PYTHON)
+    print(f"Interpreter startup : {base_wall:.3f}s, {len(baseline)} modules")
+
+    for target in args.TARGETS:
+        try:
+            modules, wall, loaded = profile(target, args.REPEAT, args.PYTHON)
+        except RuntimeError as e:
+            print(f"\n{target} : import failed ({e})")
+            continue
+        print_report(target, modules, wall, loaded, baseline, args.TOP)
@@ -17,25 +17,16 @@
 
 import array
 import gzip
-import os
-from os import path
 import struct
-import urllib.request
 
 import numpy as np
 
-
-_DATA = "/tmp/jax_example_data/"
+from utils.fetch import fetch
 
 
 def _download(url, filename):
-    """Download a url to a file in the JAX data temp directory."""
-    if not path.exists(_DATA):
-        os.makedirs(_DATA)
-    out_file = path.join(_DATA, filename)
-    if not path.isfile(out_file):
-        urllib.request.urlretrieve(url, out_file)
-        print("downloaded {} to {}".format(url, _DATA))
+    """Download a url to the shared dataset cache (resumable, checksummed), returns its path."""
+    return fetch(url, filename=filename)
 
 
 def _partial_flatten(x):
@@ -64,14 +55,14 @@ def mnist_raw():
             return np.array(array.array("B", fh.read()),
                         dtype=np.uint8).reshape(num_data, rows, cols)
 
-    for filename in ["train-images-idx3-ubyte.gz", "train-labels-idx1-ubyte.gz",
-                    "t10k-images-idx3-ubyte.gz", "t10k-labels-idx1-ubyte.gz"]:
-        _download(base_url + filename, filename)
+    paths = {filename: _download(base_url + filename, filename)
+             for filename in ["train-images-idx3-ubyte.gz", "train-labels-idx1-ubyte.gz",
+                              "t10k-images-idx3-ubyte.gz", "t10k-labels-idx1-ubyte.gz"]}
 
-    train_images = parse_images(path.join(_DATA, "train-images-idx3-ubyte.gz"))
-    train_labels = parse_labels(path.join(_DATA, "train-labels-idx1-ubyte.gz"))
-    test_images = parse_images(path.join(_DATA, "t10k-images-idx3-ubyte.gz"))
-    test_labels = parse_labels(path.join(_DATA, "t10k-labels-idx1-ubyte.gz"))
+    train_images = parse_images(paths["train-images-idx3-ubyte.gz"])
+    train_labels = parse_labels(paths["train-labels-idx1-ubyte.gz"])
+    test_images = parse_images(paths["t10k-images-idx3-ubyte.gz"])
+    test_labels = parse_labels(paths["t10k-labels-idx1-ubyte.gz"])
 
     return train_images, train_labels, test_images, test_labels
 
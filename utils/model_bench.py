@@ -0,0 +1,292 @@
+import os
+import ast
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import platform
+import resource
+import subprocess
+
+import numpy as np
+
+# Benchmark of the same architectures across frameworks, on synthetic input.
+#
+# - The model definitions are taken from model_zoo/ or the training scripts : only their imports, classes, functions and constant
+#   assignments are executed, so the data loading / training preamble never runs.
+# - Each (variant, batch size) runs in its own process (frameworks do not share a process, and the peak RSS is its own),
+#   and reports forward (inference) and train step latency percentiles, throughput, peak RSS and parameter count.
+# - Results go into a SQLite database keyed by the git commit, a run can be compared against another commit.
+#
+#   python utils/model_bench.py --VARIANTS resnet50/pytorch resnet50/tf_keras --BATCH_SIZES 1 8 32
+#   python utils/model_bench.py --COMPARE {commit} --EXPORT results.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# =================
+# Definitions
+# =================
+def load_definitions(path):
+    """
+    Namespace of the imports, classes, functions and constant assignments of a script.
+    Imports that fail (plotting, data libraries not needed by the model) are skipped.
+    """
+    tree = ast.parse(open(path).read(), filename=path)
+    namespace = {"__name__": "bench_" + os.path.splitext(os.path.basename(path))[0], "__file__": path}
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            try:
+                exec(compile(ast.Module([node], []), path, "exec"), namespace)
+            except ImportError:
+                pass
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+            exec(compile(ast.Module([node], []), path, "exec"), namespace)
+        elif isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) for t in node.targets):
+            try:
+                ast.literal_eval(node.value)
+            except (ValueError, TypeError, SyntaxError):
+                continue
+            exec(compile(ast.Module([node], []), path, "exec"), namespace)
+    return namespace
+
+# framework, script, builder (namespace -> model), input shape without the batch (channels first for pytorch / mxnet), classes
+NUM_CLASSES = 5
+IMG_SIZE = 150
+variants = {
+    "resnet50/pytorch": ("pytorch", "model_zoo/pytorch/resnet.py",
+                         lambda ns: ns["build_resnet"](input_channel=3, num_classes=NUM_CLASSES, num_layer=50), (3, IMG_SIZE, IMG_SIZE), NUM_CLASSES),
+    "resnet50/tf_keras": ("tensorflow", "model_zoo/tf_keras/resnet.py",
+                          lambda ns: ns["build_resnet"](input_shape=(IMG_SIZE, IMG_SIZE, 3), num_classes=NUM_CLASSES, num_layer=50), (IMG_SIZE, IMG_SIZE, 3), NUM_CLASSES),
+    "resnet50/tf_subclassing": ("tensorflow", "03_Advance/CNN/ResNet/tf_subclassing.py",
+                                lambda ns: ns["Build_ResNet"](num_classes=NUM_CLASSES, num_layer=50), (IMG_SIZE, IMG_SIZE, 3), NUM_CLASSES),
+    "resnet50/mxnet": ("mxnet", "03_Advance/CNN/ResNet/MXNet_Gluon.py",
+                       lambda ns: ns["Build_Resnet"](num_classes=NUM_CLASSES, num_layer=50), (3, IMG_SIZE, IMG_SIZE), NUM_CLASSES),
+    "vgg16/pytorch": ("pytorch", "model_zoo/pytorch/vgg.py",
+                      lambda ns: ns["build_vgg"](input_channel=3, num_classes=NUM_CLASSES, num_layer=16), (3, IMG_SIZE, IMG_SIZE), NUM_CLASSES),
+    "vgg16/tf_keras": ("tensorflow", "model_zoo/tf_keras/vgg.py",
+                       lambda ns: ns["build_vgg"](input_shape=(IMG_SIZE, IMG_SIZE, 3), num_classes=NUM_CLASSES, num_layer=16), (IMG_SIZE, IMG_SIZE, 3), NUM_CLASSES),
+    "vgg16/tf_subclassing": ("tensorflow", "03_Advance/CNN/VGGNet/tf_subclassing.py",
+                             lambda ns: ns["Build_VGG"](input_shape=(IMG_SIZE, IMG_SIZE, 3), num_classes=NUM_CLASSES, num_layer=16), (IMG_SIZE, IMG_SIZE, 3), NUM_CLASSES),
+    "vgg16/mxnet": ("mxnet", "03_Advance/CNN/VGGNet/MXNet_Gluon.py",
+                    lambda ns: ns["Build_Vgg"](num_classes=NUM_CLASSES, num_layer=16), (3, IMG_SIZE, IMG_SIZE), NUM_CLASSES),
+    "mlp/pytorch": ("pytorch", "02_Intermediate/Multi_Layer_Neural_Network/PyTorch.py", lambda ns: ns["Model"](), (784,), 10),
+    "mlp/tf_subclassing": ("tensorflow", "02_Intermediate/Multi_Layer_Neural_Network/tf_subclassing.py",
+                           lambda ns: ns["MultiLayerNeuralNetwork"](), (784,), 10),
+    "cnn/pytorch": ("pytorch", "02_Intermediate/Simple_Convolutional_Neural_Network/PyTorch.py", lambda ns: ns["Model"](), (1, 28, 28), 10),
+    "cnn/tf_subclassing": ("tensorflow", "02_Intermediate/Simple_Convolutional_Neural_Network/tf_subclassing.py",
+                           lambda ns: ns["SimpleConvolutionalNeuralNetwork"](), (28, 28, 1), 10),
+}
+
+# =================
+# Framework runners
+# =================
+# Each returns (params, forward, train_step), the steps run on the synthetic batch and block until the result is ready
+def torch_runner(model, x, y):
+    import torch
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    sync = torch.cuda.synchronize if device.type == "cuda" else (lambda: None)
+    model = model.to(device)
+    x, y = torch.from_numpy(x).to(device), torch.from_numpy(y).to(device)
+    criterion = torch.nn.CrossEntropyLoss()
+    optimizer = torch.optim.SGD(model.parameters(), lr=1e-3)
+
+    def forward():
+        model.eval()
+        with torch.inference_mode():
+            model(x)
+        sync()
+
+    def train_step():
+        model.train()
+        optimizer.zero_grad()
+        criterion(model(x), y).backward()
+        optimizer.step()
+        sync()
+
+    return sum(p.numel() for p in model.parameters()), forward, train_step
+
+def tf_runner(model, x, y):
+    import tensorflow as tf
+    x, y = tf.constant(x), tf.constant(y)
+    loss_object = tf.keras.losses.SparseCategoricalCrossentropy()
+    optimizer = tf.keras.optimizers.SGD(1e-3)
+    model(x[:1], training=False)
+
+    @tf.function
+    def forward_fn():
+        return model(x, training=False)
+
+    @tf.function
+    def train_fn():
+        with tf.GradientTape() as tape:
+            loss = loss_object(y, model(x, training=True))
+        gradients = tape.gradient(loss, model.trainable_variables)
+        optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+        return loss
+
+    # .numpy() waits for the result
+    return model.count_params(), lambda: forward_fn().numpy(), lambda: train_fn().numpy()
+
+def mxnet_runner(model, x, y):
+    import mxnet as mx
+    from mxnet import autograd, gluon
+    ctx = mx.gpu() if mx.context.num_gpus() else mx.cpu()
+    model.initialize(ctx=ctx)
+    x, y = mx.nd.array(x, ctx=ctx), mx.nd.array(y, ctx=ctx)
+    model(x[:1])
+    loss_object = gluon.loss.SoftmaxCELoss()
+    trainer = gluon.Trainer(model.collect_params(), 'sgd', {'learning_rate': 1e-3})
+
+    def forward():
+        model(x).wait_to_read()
+
+    def train_step():
+        with autograd.record():
+            loss = loss_object(model(x), y)
+        loss.backward()
+        trainer.step(x.shape[0])
+        mx.nd.waitall()
+
+    params = sum(p.data().size for p in model.collect_params().values())
+    return params, forward, train_step
+
+runners = {"pytorch": torch_runner, "tensorflow": tf_runner, "mxnet": mxnet_runner}
+
+# =================
+# Measurement
+# =================
+def measure(fn, warmup, iters):
+    # Latencies in ms of `iters` calls after `warmup` ones
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(iters):
+        start = time.perf_counter()
+        fn()
+        latencies.append(1000 * (time.perf_counter() - start))
+    return np.array(latencies)
+
+def run_variant(name, batch_size, warmup, iters):
+    # In the worker process : [{mode, p50, p90, p99, throughput, ...}]
+    framework, script, build, input_shape, num_classes = variants[name]
+    sys.path.insert(0, ROOT)
+    model = build(load_definitions(os.path.join(ROOT, script)))
+    rng = np.random.default_rng(0)
+    x = rng.random((batch_size,) + input_shape, dtype=np.float32)
+    y = rng.integers(0, num_classes, batch_size).astype(np.int64)
+    if framework == "mxnet":
+        y = y.astype(np.float32)
+    params, forward, train_step = runners[framework](model, x, y)
+
+    rows = []
+    for mode, fn in [("forward", forward), ("train", train_step)]:
+        latencies = measure(fn, warmup, iters)
+        rows.append({"mode": mode, "p50": float(np.percentile(latencies, 50)), "p90": float(np.percentile(latencies, 90)),
+                     "p99": float(np.percentile(latencies, 99)), "throughput": 1000 * batch_size / float(latencies.mean())})
+    # ru_maxrss is in KB on Linux, in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    for row in rows:
+        row.update(params=int(params), peak_rss_mb=rss)
+    return rows
+
+# =================
+# Results database
+# =================
+SCHEMA = """CREATE TABLE IF NOT EXISTS results (
+    commit_id TEXT, dirty INTEGER, timestamp REAL, machine TEXT, variant TEXT, framework TEXT, mode TEXT, batch_size INTEGER,
+    p50 REAL, p90 REAL, p99 REAL, throughput REAL, peak_rss_mb REAL, params INTEGER)"""
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(git("status", "--porcelain", "--untracked-files=no"))
+
+def open_db(path):
+    db = sqlite3.connect(path)
+    db.execute(SCHEMA)
+    return db
+
+def latest(db, commit_id, machine):
+    # {(variant, mode, batch size) : (throughput, p50)} of the last run of a commit on this machine
+    rows = db.execute("""SELECT variant, mode, batch_size, throughput, p50 FROM results WHERE commit_id = ? AND machine = ?
+                         ORDER BY timestamp""", (commit_id, machine)).fetchall()
+    return {(v, m, b): (t, p) for v, m, b, t, p in rows}
+
+def previous_commit(db, commit_id, machine):
+    row = db.execute("""SELECT commit_id FROM results WHERE commit_id != ? AND machine = ?
+                        ORDER BY timestamp DESC LIMIT 1""", (commit_id, machine)).fetchone()
+    return None if row is None else row[0]
+
+def compare(db, commit_id, baseline, machine, tolerance):
+    # Prints the throughput ratio of every common entry, and returns the regressions (ratio < 1 - tolerance)
+    current, base = latest(db, commit_id, machine), latest(db, baseline, machine)
+    regressions = []
+    print(f"\n{commit_id} vs {baseline}\n")
+    print(f"{'variant':<26}{'mode':>9}{'batch':>7}{'throughput':>14}{'baseline':>14}{'ratio':>9}")
+    for key in sorted(set(current) & set(base)):
+        ratio = current[key][0] / base[key][0]
+        flag = "  <-- regression" if ratio < 1 - tolerance else ""
+        print(f"{key[0]:<26}{key[1]:>9}{key[2]:>7}{current[key][0]:>14.1f}{base[key][0]:>14.1f}{ratio:>9.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--VARIANTS", nargs="+", default=list(variants.keys()), help=f"{list(variants.keys())}")
+    parser.add_argument("--BATCH_SIZES", nargs="+", default=[1, 8, 32], type=int, help="")
+    parser.add_argument("--WARMUP", default=5, type=int, help="")
+    parser.add_argument("--ITERS", default=30, type=int, help="timed iterations per mode")
+    parser.add_argument("--DB", default=os.path.join(ROOT, "benchmark.db"), type=str, help="SQLite results database")
+    parser.add_argument("--COMPARE", default=None, type=str, help="commit to compare with, 'previous' for the last other commit in the database")
+    parser.add_argument("--TOLERANCE", default=0.05, type=float, help="throughput drop reported as a regression")
+    parser.add_argument("--EXPORT", default=None, type=str, help="also write this run as JSON")
+    parser.add_argument("--WORKER", nargs=2, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.WORKER is not None:
+        # One (variant, batch size), the rows are the last line of stdout
+        rows = run_variant(args.WORKER[0], int(args.WORKER[1]), args.WARMUP, args.ITERS)
+        print(json.dumps(rows))
+        sys.exit(0)
+
+    for name in args.VARIANTS:
+        assert name in variants, f"Please use variant in {list(variants.keys())}"
+
+    commit_id, dirty = git_commit()
+    machine = f"{platform.node()}/{platform.machine()}"
+    db = open_db(args.DB)
+    run = []
+
+    print(f"\nCommit {commit_id}{' (dirty)' if dirty else ''} on {machine}\n")
+    print(f"{'variant':<26}{'mode':>9}{'batch':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'samples/s':>12}{'RSS MB':>9}{'params':>12}")
+    for name in args.VARIANTS:
+        for batch_size in args.BATCH_SIZES:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--WORKER", name, str(batch_size),
+                                   "--WARMUP", str(args.WARMUP), "--ITERS", str(args.ITERS)], capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{name:<26} batch {batch_size} failed : {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+                continue
+            timestamp = time.time()
+            for row in json.loads(proc.stdout.strip().splitlines()[-1]):
+                row.update(commit_id=commit_id, dirty=int(dirty), timestamp=timestamp, machine=machine, variant=name,
+                           framework=variants[name][0], batch_size=batch_size)
+                run.append(row)
+                db.execute("INSERT INTO results VALUES (:commit_id, :dirty, :timestamp, :machine, :variant, :framework, :mode, :batch_size, "
+                           ":p50, :p90, :p99, :throughput, :peak_rss_mb, :params)", row)
+                print(f"{name:<26}{row['mode']:>9}{batch_size:>7}{row['p50']:>10.2f}{row['p90']:>10.2f}{row['p99']:>10.2f}"
+                      f"{row['throughput']:>12.1f}{row['peak_rss_mb']:>9.0f}{row['params']:>12}")
+            db.commit()
+
+    if args.EXPORT is not None:
+        with open(args.EXPORT, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.COMPARE is not None:
+        baseline = previous_commit(db, commit_id, machine) if args.COMPARE == "previous" else args.COMPARE
+        if baseline is None:
+            print("\nNo other commit in the database to compare with")
+        else:
+            regressions = compare(db, commit_id, baseline, machine, args.TOLERANCE)
+            sys.exit(1 if regressions else 0)
@@ -0,0 +1,83 @@
+import tensorflow as tf
+
+# Compiled train / eval steps of the tf_subclassing scripts.
+# Small models spend most of an eager step in Python, so the steps run as tf.function graphs :
+# - one trace per input signature (taken from the dataset, the batch dimension is left free for the last batch)
+# - optional XLA compilation of the step (jit_compile=True)
+# - `steps_per_execution` steps per call, the loop over the iterator runs inside the graph
+# - loss and metrics are tf.keras.metrics state, only read once per epoch
+
+class Compiled_Steps:
+    def __init__(self, model, loss_object, optimizer, element_spec, metric=None, steps_per_execution=1, jit_compile=False):
+        """
+        element_spec : dataset.element_spec, (x, y) TensorSpecs
+        metric : tf.keras.metrics instance (accuracy, ...), or None for the loss only
+        """
+        self.model = model
+        self.loss_object = loss_object
+        self.optimizer = optimizer
+        self.steps_per_execution = steps_per_execution
+
+        self.train_loss = tf.keras.metrics.Mean(name="loss")
+        self.val_loss = tf.keras.metrics.Mean(name="val_loss")
+        self.train_metric = metric
+        self.val_metric = None
+        if metric is not None:
+            config = metric.get_config()
+            config["name"] = "val_" + config["name"]
+            self.val_metric = metric.__class__.from_config(config)
+
+        signature = [tf.TensorSpec(shape=[None] + spec.shape[1:].as_list(), dtype=spec.dtype) for spec in element_spec]
+        self.train_step = tf.function(self._train_step, input_signature=signature, jit_compile=jit_compile)
+        self.eval_step = tf.function(self._eval_step, input_signature=signature, jit_compile=jit_compile)
+        self.train_loop = tf.function(self._train_loop)
+        self.eval_loop = tf.function(self._eval_loop)
+
+    def _train_step(self, x, y):
+        with tf.GradientTape() as tape:
+            predictions = self.model(x, training=True)
+            loss = self.loss_object(y, predictions)
+        # Outside of the tape, the gradient computation is not recorded
+        gradients = tape.gradient(loss, self.model.trainable_variables)
+        self.optimizer.apply_gradients(zip(gradients, self.model.trainable_variables))
+        return loss, predictions
+
+    def _eval_step(self, x, y):
+        predictions = self.model(x, training=False)
+        return self.loss_object(y, predictions), predictions
+
+    def _loop(self, iterator, step, loss_metric, metric):
+        # Up to `steps_per_execution` batches, returns the number of batches run (less at the end of the dataset)
+        steps = tf.constant(0)
+        for _ in tf.range(self.steps_per_execution):
+            batch = iterator.get_next_as_optional()
+            if not batch.has_value():
+                break
+            x, y = batch.get_value()
+            loss, predictions = step(x, y)
+            loss_metric.update_state(loss, sample_weight=tf.shape(x)[0])
+            if metric is not None:
+                metric.update_state(y, predictions)
+            steps += 1
+        return steps
+
+    def _train_loop(self, iterator):
+        return self._loop(iterator, self.train_step, self.train_loss, self.train_metric)
+
+    def _eval_loop(self, iterator):
+        return self._loop(iterator, self.eval_step, self.val_loss, self.val_metric)
+
+    def run(self, dataset, loop, metrics):
+        for m in metrics:
+            m.reset_state()
+        iterator = iter(dataset)
+        while loop(iterator) == self.steps_per_execution:
+            pass
+        return {m.name: m.result().numpy() for m in metrics}
+
+    def fit_epoch(self, train_ds):
+        # {"loss": ..., metric name : ...} of the epoch
+        return self.run(train_ds, self.train_loop, [m for m in [self.train_loss, self.train_metric] if m is not None])
+
+    def evaluate(self, test_ds):
+        return self.run(test_ds, self.eval_loop, [m for m in [self.val_loss, self.val_metric] if m is not None])